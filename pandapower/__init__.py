@@ -10,6 +10,7 @@ from pandapower.toolbox import *
 from pandapower.powerflow import *
 from pandapower.opf import *
 from pandapower.optimal_powerflow import OPFNotConverged
+from pandapower.numba_cache import precompile
 
 import pandas as pd
 pd.options.mode.chained_assignment = None  # default='warn'
@@ -177,10 +177,94 @@ class ADict(dict, MutableMapping):
         )
 
 
+class _DeferredTable(object):
+    """
+    Placeholder for a table of a pandapowerNet which is only created when it is accessed (see
+    pandapowerNet._defer). load() returns the table.
+    """
+    def __init__(self, load):
+        self.load = load
+
+
 class pandapowerNet(ADict):
+    # tables which are only loaded when they are accessed for the first time. They are not part
+    # of the dict, so that all other tables are accessed by a plain dict lookup
+    _deferred = None
+
     def __init__(self, *args, **kwargs):
         super(pandapowerNet, self).__init__(*args, **kwargs)
 
+    def _defer(self, key, table):
+        """
+        Replaces net[key] by the _DeferredTable table, which is loaded on the first access.
+        """
+        if self._deferred is None:
+            self._setattr("_deferred", dict())
+        dict.pop(self, key, None)
+        self._deferred[key] = table
+
+    def __missing__(self, key):
+        if not self._deferred or key not in self._deferred:
+            raise KeyError(key)
+        value = self._deferred.pop(key).load()
+        dict.__setitem__(self, key, value)
+        return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or bool(self._deferred) and key in self._deferred
+
+    def __delitem__(self, key):
+        if self._deferred and key in self._deferred and not dict.__contains__(self, key):
+            del self._deferred[key]
+            return
+        if self._deferred:
+            self._deferred.pop(key, None)
+        dict.__delitem__(self, key)
+
+    def pop(self, key, *args):
+        if key in self:
+            self[key]
+            if self._deferred:
+                self._deferred.pop(key, None)
+        return dict.pop(self, key, *args)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        if not self._deferred:
+            return dict.keys(self)
+        return list(dict.keys(self)) + [key for key in self._deferred
+                                        if not dict.__contains__(self, key)]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def _load_deferred(self):
+        if not self._deferred:
+            return
+        for key in list(self._deferred):
+            if dict.__contains__(self, key):
+                # the table was overwritten before it was loaded
+                del self._deferred[key]
+            else:
+                self[key]
+
+    def items(self):
+        self._load_deferred()
+        return super(pandapowerNet, self).items()
+
+    def values(self):
+        self._load_deferred()
+        return super(pandapowerNet, self).values()
+
+    def copy(self):
+        self._load_deferred()
+        return super(pandapowerNet, self).copy()
+
     def __repr__(self):  # pragma: no cover
         r = "This pandapower network includes the following parameter tables:"
         par = []
@@ -330,14 +414,48 @@ def _python_set_isolated_buses_oos(bus_in_service, ppc_bus_isolated, bus_lookup)
             bus_in_service[k] = False
 
 
+def _python_subtree_ranges(buses_ordered_bfs, predecs_bfs, nobus):  # pragma: no cover
+    """
+    calculates the depth and a depth-first (pre-order) numbering of a tree given by the buses in
+    breadth-first order and their predecessors, so that the subtree of every bus is the contiguous
+    range pos[bus]:pos[bus] + size[bus] of buses_preorder
+    """
+    depth = np.zeros(nobus, dtype=np.int64)
+    for i in range(1, len(buses_ordered_bfs)):
+        bus = buses_ordered_bfs[i]
+        depth[bus] = depth[predecs_bfs[bus]] + 1
+    size = np.zeros(nobus, dtype=np.int64)
+    for i in range(len(buses_ordered_bfs)):
+        size[buses_ordered_bfs[i]] = 1
+    for i in range(len(buses_ordered_bfs) - 1, 0, -1):
+        bus = buses_ordered_bfs[i]
+        size[predecs_bfs[bus]] += size[bus]
+    pos = np.zeros(nobus, dtype=np.int64)
+    next_pos = np.zeros(nobus, dtype=np.int64)
+    next_pos[buses_ordered_bfs[0]] = 1
+    for i in range(1, len(buses_ordered_bfs)):
+        bus = buses_ordered_bfs[i]
+        pred = predecs_bfs[bus]
+        pos[bus] = next_pos[pred]
+        next_pos[pred] += size[bus]
+        next_pos[bus] = pos[bus] + 1
+    buses_preorder = np.zeros(len(buses_ordered_bfs), dtype=np.int64)
+    for i in range(len(buses_ordered_bfs)):
+        bus = buses_ordered_bfs[i]
+        buses_preorder[pos[bus]] = bus
+    return buses_preorder, pos, size, depth
+
+
 try:
     get_values = jit(nopython=True, cache=True)(_get_values)
     set_elements_oos = jit(nopython=True, cache=True)(_python_set_elements_oos)
     set_isolated_buses_oos = jit(nopython=True, cache=True)(_python_set_isolated_buses_oos)
+    subtree_ranges = jit(nopython=True, cache=True)(_python_subtree_ranges)
 except RuntimeError:
     get_values = jit(nopython=True, cache=False)(_get_values)
     set_elements_oos = jit(nopython=True, cache=False)(_python_set_elements_oos)
     set_isolated_buses_oos = jit(nopython=True, cache=False)(_python_set_isolated_buses_oos)
+    subtree_ranges = jit(nopython=True, cache=False)(_python_subtree_ranges)
 
 
 def _select_is_elements_numba(net, isolated_nodes=None):
@@ -458,7 +576,8 @@ def _add_opf_options(net, trafo_loading, ac, v_debug=False, **kwargs):
 
 
 def _add_sc_options(net, fault, case, lv_tol_percent, tk_s, topology, r_fault_ohm,
-                    x_fault_ohm, kappa, ip, ith, consider_sgens, branch_results, kappa_method):
+                    x_fault_ohm, kappa, ip, ith, consider_sgens, branch_results, kappa_method,
+                    bus=None):
     """
     creates dictionary for pf, opf and short circuit calculations from input parameters.
     """
@@ -475,7 +594,8 @@ def _add_sc_options(net, fault, case, lv_tol_percent, tk_s, topology, r_fault_oh
         "ith": ith,
         "consider_sgens": consider_sgens,
         "branch_results": branch_results,
-        "kappa_method": kappa_method
+        "kappa_method": kappa_method,
+        "sc_bus": None if bus is None else np.array(bus, dtype=int, ndmin=1)
     }
     _add_options(net, options)
 
@@ -497,6 +617,9 @@ def _clean_up(net, res=True):
     # set internal selected _is_elements to None. This way it is not stored (saves disk space)
     # net._is_elements = None
 
+    # the array snapshot of the conversion refers to the net and must not be stored with it
+    net.pop("_arrays", None)
+
     mode = net._options["mode"]
     if res:
         res_bus = net["res_bus_sc"] if mode == "sc" else net["res_bus"]
@@ -15,6 +15,7 @@ from pandapower.auxiliary import get_values
 from pandapower.idx_brch import F_BUS, T_BUS, BR_R, BR_X, BR_B, TAP, SHIFT, BR_STATUS, RATE_A, \
     BR_R_ASYM, BR_X_ASYM, branch_cols
 from pandapower.idx_bus import BASE_KV, VM, VA
+from pandapower.net_arrays import ElementArrays
 
 
 def _build_branch_ppc(net, ppc):
@@ -92,17 +93,17 @@ def _initialize_branch_lookup(net):
 def _calc_trafo3w_parameter(net, ppc):
     copy_constraints_to_ppc = net["_options"]["copy_constraints_to_ppc"]
     bus_lookup = net["_pd2ppc_lookups"]["bus"]
-    trafo_df = _trafo_df_from_trafo3w(net)
-    net._equiv_trafo3w = trafo_df
+    net._equiv_trafo3w = _trafo_df_from_trafo3w(net)
+    trafo_df = ElementArrays(net._equiv_trafo3w)
 
     temp_para = np.zeros(shape=(len(trafo_df), 9), dtype=np.complex128)
-    temp_para[:, 0] = bus_lookup[(trafo_df["hv_bus"].values).astype(int)]
-    temp_para[:, 1] = bus_lookup[(trafo_df["lv_bus"].values).astype(int)]
+    temp_para[:, 0] = bus_lookup[trafo_df["hv_bus"].astype(int)]
+    temp_para[:, 1] = bus_lookup[trafo_df["lv_bus"].astype(int)]
     temp_para[:, 2:7] = _calc_branch_values_from_trafo_df(net, ppc, trafo_df)
-    temp_para[:, 7] = trafo_df["in_service"].values
+    temp_para[:, 7] = trafo_df["in_service"]
     if copy_constraints_to_ppc:
-        max_load = trafo_df.max_loading_percent if "max_loading_percent" in trafo_df else 0
-        temp_para[:, 8] = max_load / 100. * trafo_df.sn_kva / 1000.
+        max_load = trafo_df["max_loading_percent"] if "max_loading_percent" in trafo_df else 0
+        temp_para[:, 8] = max_load / 100. * trafo_df["sn_kva"] / 1000.
     return temp_para
 
 
@@ -121,32 +122,34 @@ def _calc_line_parameter(net, ppc):
     copy_constraints_to_ppc = net["_options"]["copy_constraints_to_ppc"]
     mode = net["_options"]["mode"]
     bus_lookup = net["_pd2ppc_lookups"]["bus"]
-    line = net["line"]
-    fb = bus_lookup[line["from_bus"].values]
-    tb = bus_lookup[line["to_bus"].values]
-    length = line["length_km"].values
-    parallel = line["parallel"].values
+    arrays = net["_arrays"]
+    line = arrays["line"]
+    fb = bus_lookup[line["from_bus"]]
+    tb = bus_lookup[line["to_bus"]]
+    length = line["length_km"]
+    parallel = line["parallel"]
     baseR = np.square(ppc["bus"][fb, BASE_KV]) / net.sn_kva * 1e3
-    t = np.zeros(shape=(len(line.index), 7), dtype=np.complex128)
+    t = np.zeros(shape=(len(line), 7), dtype=np.complex128)
 
     t[:, 0] = fb
     t[:, 1] = tb
 
-    t[:, 2] = line["r_ohm_per_km"].values * length / baseR / parallel
-    t[:, 3] = line["x_ohm_per_km"].values * length / baseR / parallel
+    t[:, 2] = line["r_ohm_per_km"] * length / baseR / parallel
+    t[:, 3] = line["x_ohm_per_km"] * length / baseR / parallel
     if mode == "sc":
         if net["_options"]["case"] == "min":
             t[:, 2] *= _end_temperature_correction_factor(net)
     else:
-        b = (2 * net.f_hz * math.pi * line["c_nf_per_km"].values * 1e-9 * baseR *
+        b = (2 * net.f_hz * math.pi * line["c_nf_per_km"] * 1e-9 * baseR *
              length * parallel)
-        g = line["g_us_per_km"].values * 1e-6 * baseR * length * parallel
+        g = line["g_us_per_km"] * 1e-6 * baseR * length * parallel
         t[:, 4] = b - g * 1j
-    t[:, 5] = line["in_service"].values
+    t[:, 5] = line["in_service"]
     if copy_constraints_to_ppc:
-        max_load = line.max_loading_percent.values if "max_loading_percent" in line else 0
-        vr = net.bus.vn_kv.loc[line["from_bus"].values].values * np.sqrt(3)
-        t[:, 6] = max_load / 100. * line.max_i_ka.values * line.df.values * parallel * vr
+        max_load = line["max_loading_percent"] if "max_loading_percent" in line else 0
+        bus = arrays["bus"]
+        vr = bus["vn_kv"][bus.positions(line["from_bus"])] * np.sqrt(3)
+        t[:, 6] = max_load / 100. * line["max_i_ka"] * line["df"] * parallel * vr
     return t
 
 
@@ -166,19 +169,19 @@ def _calc_trafo_parameter(net, ppc):
     copy_constraints_to_ppc = net["_options"]["copy_constraints_to_ppc"]
 
     bus_lookup = net["_pd2ppc_lookups"]["bus"]
-    temp_para = np.zeros(shape=(len(net["trafo"].index), 9), dtype=np.complex128)
-    trafo = net["trafo"]
-    parallel = trafo["parallel"].values
-    temp_para[:, 0] = bus_lookup[trafo["hv_bus"].values]
-    temp_para[:, 1] = bus_lookup[trafo["lv_bus"].values]
+    trafo = net["_arrays"]["trafo"]
+    temp_para = np.zeros(shape=(len(trafo), 9), dtype=np.complex128)
+    parallel = trafo["parallel"]
+    temp_para[:, 0] = bus_lookup[trafo["hv_bus"]]
+    temp_para[:, 1] = bus_lookup[trafo["lv_bus"]]
     temp_para[:, 2:7] = _calc_branch_values_from_trafo_df(net, ppc)
-    temp_para[:, 7] = trafo["in_service"].values
-    if any(trafo.df.values <= 0):
+    temp_para[:, 7] = trafo["in_service"]
+    if any(trafo["df"] <= 0):
         raise UserWarning("Rating factor df must be positive. Transformers with false "
-                          "rating factors: %s" % trafo.query('df<=0').index.tolist())
+                          "rating factors: %s" % trafo.index[trafo["df"] <= 0].tolist())
     if copy_constraints_to_ppc:
-        max_load = trafo.max_loading_percent.values if "max_loading_percent" in trafo else 0
-        temp_para[:, 8] = max_load / 100. * trafo.sn_kva.values / 1000. * trafo.df.values * parallel
+        max_load = trafo["max_loading_percent"] if "max_loading_percent" in trafo else 0
+        temp_para[:, 8] = max_load / 100. * trafo["sn_kva"] / 1000. * trafo["df"] * parallel
     return temp_para
 
 
@@ -217,9 +220,9 @@ def _calc_branch_values_from_trafo_df(net, ppc, trafo_df=None):
     """
     bus_lookup = net["_pd2ppc_lookups"]["bus"]
     if trafo_df is None:
-        trafo_df = net["trafo"]
-    parallel = trafo_df["parallel"].values
-    vn_lv = get_values(ppc["bus"][:, BASE_KV], trafo_df["lv_bus"].values, bus_lookup)
+        trafo_df = net["_arrays"]["trafo"]
+    parallel = trafo_df["parallel"]
+    vn_lv = get_values(ppc["bus"][:, BASE_KV], trafo_df["lv_bus"], bus_lookup)
     ### Construct np.array to parse results in ###
     # 0:r_pu; 1:x_pu; 2:b_pu; 3:tab;
     temp_para = np.zeros(shape=(len(trafo_df), 5), dtype=np.complex128)
@@ -242,12 +245,12 @@ def _calc_r_x_y_from_dataframe(net, trafo_df, vn_trafo_lv, vn_lv, sn_kva):
     r, x = _calc_r_x_from_dataframe(trafo_df, vn_lv, vn_trafo_lv, sn_kva)
     if mode == "sc":
         y = 0
-        if trafo_df.equals(net.trafo):
+        if trafo_df.element == "trafo":
             from pandapower.shortcircuit.idx_bus import C_MAX
             bus_lookup = net._pd2ppc_lookups["bus"]
-            cmax = net._ppc["bus"][bus_lookup[net.trafo.lv_bus.values], C_MAX]
-            kt = _transformer_correction_factor(trafo_df.vsc_percent, trafo_df.vscr_percent,
-                                                trafo_df.sn_kva, cmax)
+            cmax = net._ppc["bus"][bus_lookup[trafo_df["lv_bus"]], C_MAX]
+            kt = _transformer_correction_factor(trafo_df["vsc_percent"], trafo_df["vscr_percent"],
+                                                trafo_df["sn_kva"], cmax)
             r *= kt
             x *= kt
     else:
@@ -295,18 +298,18 @@ def _calc_y_from_dataframe(trafo_df, vn_lv, vn_trafo_lv, sn_kva):
     baseR = np.square(vn_lv) / sn_kva * 1e3
 
     ### Calculate subsceptance ###
-    vnl_squared = trafo_df["vn_lv_kv"].values ** 2
-    b_real = trafo_df["pfe_kw"].values / (1000. * vnl_squared) * baseR
-    i0 = trafo_df["i0_percent"].values
-    pfe = trafo_df["pfe_kw"].values
-    sn = trafo_df["sn_kva"].values
+    vnl_squared = trafo_df["vn_lv_kv"] ** 2
+    b_real = trafo_df["pfe_kw"] / (1000. * vnl_squared) * baseR
+    i0 = trafo_df["i0_percent"]
+    pfe = trafo_df["pfe_kw"]
+    sn = trafo_df["sn_kva"]
     b_img = (i0 / 100. * sn / 1000.) ** 2 - (pfe / 1000.) ** 2
 
     b_img[b_img < 0] = 0
     b_img = np.sqrt(b_img) * baseR / vnl_squared
     y = - b_real * 1j - b_img * np.sign(i0)
-    if "lv" in trafo_df["tp_side"].values:
-        return y / np.square(vn_trafo_lv / trafo_df["vn_lv_kv"].values)
+    if "lv" in trafo_df["tp_side"]:
+        return y / np.square(vn_trafo_lv / trafo_df["vn_lv_kv"])
     else:
         return y
 
@@ -333,42 +336,45 @@ def _calc_tap_from_dataframe(net, trafo_df):
     """
     calculate_voltage_angles = net["_options"]["calculate_voltage_angles"]
     mode = net["_options"]["mode"]
-    trafo_shift = trafo_df["shift_degree"].values.astype(float) if calculate_voltage_angles else \
+    trafo_shift = trafo_df["shift_degree"].astype(float) if calculate_voltage_angles else \
         np.zeros(len(trafo_df))
-    vnh = copy.copy(trafo_df["vn_hv_kv"].values.astype(float))
-    vnl = copy.copy(trafo_df["vn_lv_kv"].values.astype(float))
+    vnh = copy.copy(trafo_df["vn_hv_kv"].astype(float))
+    vnl = copy.copy(trafo_df["vn_lv_kv"].astype(float))
     if mode == "sc":
         return vnh, vnl, trafo_shift
 
-    tp_diff = trafo_df["tp_pos"].values - trafo_df["tp_mid"].values
+    tp_diff = trafo_df["tp_pos"] - trafo_df["tp_mid"]
+    tp_side = trafo_df["tp_side"]
+    tp_st_percent = trafo_df["tp_st_percent"]
+    tp_st_degree = trafo_df["tp_st_degree"]
 
     cos = lambda x: np.cos(np.deg2rad(x))
     sin = lambda x: np.sin(np.deg2rad(x))
     arctan = lambda x: np.rad2deg(np.arctan(x))
 
     for side, vn, direction in [("hv", vnh, 1), ("lv", vnl, -1)]:
-        phase_shifters = trafo_df["tp_phase_shifter"].values & (trafo_df["tp_side"].values == side)
-        tap_complex = (np.isfinite(trafo_df["tp_st_percent"].values) &
-                       np.isfinite(trafo_df["tp_pos"].values) &
-                       (trafo_df["tp_side"].values == side) &
+        phase_shifters = trafo_df["tp_phase_shifter"] & (tp_side == side)
+        tap_complex = (np.isfinite(tp_st_percent) &
+                       np.isfinite(trafo_df["tp_pos"]) &
+                       (tp_side == side) &
                        ~phase_shifters)
         if np.any(tap_complex):
-            tp_steps = trafo_df["tp_st_percent"].values[tap_complex] * tp_diff[tap_complex] / 100
-            tp_angles = np.nan_to_num(trafo_df["tp_st_degree"].values[tap_complex])
+            tp_steps = tp_st_percent[tap_complex] * tp_diff[tap_complex] / 100
+            tp_angles = np.nan_to_num(tp_st_degree[tap_complex])
             u1 = vn[tap_complex]
             du = u1 * np.nan_to_num(tp_steps)
             vn[tap_complex] = np.sqrt((u1 + du * cos(tp_angles)) ** 2 + (du * sin(tp_angles)) ** 2)
             trafo_shift[tap_complex] += (arctan(direction * du * sin(tp_angles) /
                                                 (u1 + du * cos(tp_angles))))
         if np.any(phase_shifters):
-            degree_is_set = np.nan_to_num(trafo_df["tp_st_degree"].values[phase_shifters])!= 0
-            percent_is_set = np.nan_to_num(trafo_df["tp_st_percent"].values[phase_shifters]) !=0
+            degree_is_set = np.nan_to_num(tp_st_degree[phase_shifters])!= 0
+            percent_is_set = np.nan_to_num(tp_st_percent[phase_shifters]) !=0
             if any( degree_is_set & percent_is_set):
                 raise UserWarning("Both tp_st_degree and tp_st_percent set for ideal phase shifter")
             trafo_shift[phase_shifters] += np.where(
                 (degree_is_set),
-                (direction * tp_diff[phase_shifters] * trafo_df["tp_st_degree"].values[phase_shifters]),
-                (direction * 2 * np.rad2deg(np.arcsin(tp_diff[phase_shifters] * trafo_df["tp_st_percent"].values[phase_shifters]/100/2)))
+                (direction * tp_diff[phase_shifters] * tp_st_degree[phase_shifters]),
+                (direction * 2 * np.rad2deg(np.arcsin(tp_diff[phase_shifters] * tp_st_percent[phase_shifters]/100/2)))
                 )
 
     return vnh, vnl, trafo_shift
@@ -381,9 +387,9 @@ def _calc_r_x_from_dataframe(trafo_df, vn_lv, vn_trafo_lv, sn_kva):
 
     """
     tap_lv = np.square(vn_trafo_lv / vn_lv) * sn_kva  # adjust for low voltage side voltage converter
-    sn_trafo_kva = trafo_df.sn_kva.values
-    z_sc = trafo_df["vsc_percent"].values / 100. / sn_trafo_kva * tap_lv
-    r_sc = trafo_df["vscr_percent"].values / 100. / sn_trafo_kva * tap_lv
+    sn_trafo_kva = trafo_df["sn_kva"]
+    z_sc = trafo_df["vsc_percent"] / 100. / sn_trafo_kva * tap_lv
+    r_sc = trafo_df["vscr_percent"] / 100. / sn_trafo_kva * tap_lv
     x_sc = np.sign(z_sc) * np.sqrt(z_sc ** 2 - r_sc ** 2)
     return r_sc, x_sc
 
@@ -406,8 +412,8 @@ def _calc_nominal_ratio_from_dataframe(ppc, trafo_df, vn_hv_kv, vn_lv_kv, bus_lo
     """
     # Calculating tab (trasformer off nominal turns ratio)
     tap_rat = vn_hv_kv / vn_lv_kv
-    nom_rat = get_values(ppc["bus"][:, BASE_KV], trafo_df["hv_bus"].values, bus_lookup) / \
-              get_values(ppc["bus"][:, BASE_KV], trafo_df["lv_bus"].values, bus_lookup)
+    nom_rat = get_values(ppc["bus"][:, BASE_KV], trafo_df["hv_bus"], bus_lookup) / \
+              get_values(ppc["bus"][:, BASE_KV], trafo_df["lv_bus"], bus_lookup)
     return tap_rat / nom_rat
 
 
@@ -512,33 +518,35 @@ def _trafo_df_from_trafo3w(net):
 
 def _calc_impedance_parameter(net):
     bus_lookup = net["_pd2ppc_lookups"]["bus"]
-    t = np.zeros(shape=(len(net["impedance"].index), 7), dtype=np.complex128)
-    sn_impedance = net["impedance"]["sn_kva"].values
+    impedance = net["_arrays"]["impedance"]
+    t = np.zeros(shape=(len(impedance), 7), dtype=np.complex128)
+    sn_impedance = impedance["sn_kva"]
     sn_net = net.sn_kva
-    rij = net["impedance"]["rft_pu"].values
-    xij = net["impedance"]["xft_pu"].values
-    rji = net["impedance"]["rtf_pu"].values
-    xji = net["impedance"]["xtf_pu"].values
-    t[:, 0] = bus_lookup[net["impedance"]["from_bus"].values]
-    t[:, 1] = bus_lookup[net["impedance"]["to_bus"].values]
+    rij = impedance["rft_pu"]
+    xij = impedance["xft_pu"]
+    rji = impedance["rtf_pu"]
+    xji = impedance["xtf_pu"]
+    t[:, 0] = bus_lookup[impedance["from_bus"]]
+    t[:, 1] = bus_lookup[impedance["to_bus"]]
     t[:, 2] = rij / sn_impedance * sn_net
     t[:, 3] = xij / sn_impedance * sn_net
     t[:, 4] = (rji - rij) / sn_impedance * sn_net
     t[:, 5] = (xji - xij) / sn_impedance * sn_net
-    t[:, 6] = net["impedance"]["in_service"].values
+    t[:, 6] = impedance["in_service"]
     return t
 
 
 def _calc_xward_parameter(net, ppc):
     bus_lookup = net["_pd2ppc_lookups"]["bus"]
-    baseR = np.square(get_values(ppc["bus"][:, BASE_KV], net["xward"]["bus"].values, bus_lookup)) / \
+    xward = net["_arrays"]["xward"]
+    baseR = np.square(get_values(ppc["bus"][:, BASE_KV], xward["bus"], bus_lookup)) / \
             net.sn_kva * 1e3
-    t = np.zeros(shape=(len(net["xward"].index), 5), dtype=np.complex128)
+    t = np.zeros(shape=(len(xward), 5), dtype=np.complex128)
     xw_is = net["_is_elements"]["xward"]
-    t[:, 0] = bus_lookup[net["xward"]["bus"].values]
-    t[:, 1] = bus_lookup[net["xward"]["ad_bus"].values]
-    t[:, 2] = net["xward"]["r_ohm"] / baseR
-    t[:, 3] = net["xward"]["x_ohm"] / baseR
+    t[:, 0] = bus_lookup[xward["bus"]]
+    t[:, 1] = bus_lookup[xward["ad_bus"]]
+    t[:, 2] = xward["r_ohm"] / baseR
+    t[:, 3] = xward["x_ohm"] / baseR
     t[:, 4] = xw_is
     return t
 
@@ -853,11 +861,11 @@ def _calc_switch_parameter(net, ppc):
     """
     r_switch = net["_options"]["r_switch"]
     bus_lookup = net["_pd2ppc_lookups"]["bus"]
-    switch = net.switch[net._closed_bb_switches]
-    fb = bus_lookup[switch["bus"].values]
-    tb = bus_lookup[switch["element"].values]
+    switch = net["_arrays"]["switch"]
+    fb = bus_lookup[switch["bus"][net._closed_bb_switches]]
+    tb = bus_lookup[switch["element"][net._closed_bb_switches]]
     baseR = np.square(ppc["bus"][fb, BASE_KV]) / net.sn_kva * 1e3
-    t = np.zeros(shape=(len(switch), 3), dtype=np.complex128)
+    t = np.zeros(shape=(len(fb), 3), dtype=np.complex128)
 
     t[:, 0] = fb
     t[:, 1] = tb
@@ -867,9 +875,10 @@ def _calc_switch_parameter(net, ppc):
 
 
 def _end_temperature_correction_factor(net):
-    if "endtemp_degree" not in net.line:
+    line = net["_arrays"]["line"]
+    if "endtemp_degree" not in line:
         raise UserWarning("Specify end temperature for lines in net.endtemp_degree")
-    return (1 + .004 * (net.line.endtemp_degree.values.astype(float) - 20))  # formula from standard
+    return (1 + .004 * (line["endtemp_degree"].astype(float) - 20))  # formula from standard
 
 
 def _transformer_correction_factor(vsc, vscr, sn, cmax):
@@ -62,22 +62,24 @@ def fill_bus_lookup(ar, bus_lookup, bus_index):
 
 
 def create_bus_lookup_numba(net, bus_is_idx, bus_index, gen_is_idx, eg_is_idx):
-    max_bus_idx = np.max(net["bus"].index.values)
+    arrays = net["_arrays"]
+    max_bus_idx = np.max(bus_index)
     # extract numpy arrays of switch table data
-    switch = net["switch"]
-    switch_bus = switch["bus"].values
-    switch_elm = switch["element"].values
-    switch_et_bus = switch["et"].values == "b"
-    switch_closed = switch["closed"].values
+    switch = arrays["switch"]
+    switch_bus = switch["bus"]
+    switch_elm = switch["element"]
+    switch_et_bus = switch["et"] == "b"
+    switch_closed = switch["closed"]
     # create array for fast checking if a bus is in_service
     bus_in_service = np.zeros(max_bus_idx + 1, dtype=bool)
     bus_in_service[bus_is_idx] = True
     # create array for fast checking if a bus is pv bus
     bus_is_pv = np.zeros(max_bus_idx + 1, dtype=bool)
-    bus_is_pv[net["ext_grid"]["bus"].values[eg_is_idx]] = True
-    bus_is_pv[net["gen"]["bus"].values[gen_is_idx]] = True
-    if len(net["xward"]) > 0:
-        bus_is_pv[net["xward"][net["xward"].in_service == 1]["ad_bus"].values] = True
+    bus_is_pv[arrays["ext_grid"]["bus"][eg_is_idx]] = True
+    bus_is_pv[arrays["gen"]["bus"][gen_is_idx]] = True
+    xward = arrays["xward"]
+    if len(xward) > 0:
+        bus_is_pv[xward["ad_bus"][xward["in_service"] == 1]] = True
     # create array that represents the disjoint set
     ar = np.arange(max_bus_idx + 1)
     ds_create(ar, switch_bus, switch_elm, switch_et_bus, switch_closed, bus_is_pv, bus_in_service)
@@ -115,10 +117,12 @@ def create_bus_lookup(net, n_bus, bus_index, bus_is_idx, gen_is_mask, eg_is_mask
     bus_lookup[bus_index] = consec_buses
 
     # if there are any closed bus-bus switches update those entries
-    slidx = ((net["switch"]["closed"].values == 1) &
-             (net["switch"]["et"].values == "b") &
-             (net["switch"]["bus"].isin(bus_is_idx).values) &
-             (net["switch"]["element"].isin(bus_is_idx).values))
+    arrays = net["_arrays"]
+    switch = arrays["switch"]
+    slidx = ((switch["closed"] == 1) &
+             (switch["et"] == "b") &
+             np.in1d(switch["bus"], bus_is_idx) &
+             np.in1d(switch["element"], bus_is_idx))
     net._closed_bb_switches = slidx
 
     if r_switch == 0 and slidx.any():
@@ -129,13 +133,14 @@ def create_bus_lookup(net, n_bus, bus_index, bus_is_idx, gen_is_mask, eg_is_mask
         # quite some time in the average usecase, where #busses >> #bus-bus switches.
 
         # Find PV / Slack nodes -> their bus must be kept when fused with a PQ node
-        pv_list = [net["ext_grid"]["bus"].values[eg_is_mask], net["gen"]["bus"].values[gen_is_mask]]
-        if len(net["xward"]) > 0:
-            pv_list.append(net["xward"][net["xward"].in_service == 1]["ad_bus"].values)
+        pv_list = [arrays["ext_grid"]["bus"][eg_is_mask], arrays["gen"]["bus"][gen_is_mask]]
+        xward = arrays["xward"]
+        if len(xward) > 0:
+            pv_list.append(xward["ad_bus"][xward["in_service"] == 1])
         pv_ref = np.unique(np.hstack(pv_list))
         # get the pp-indices of the buses which are connected to a switch
-        fbus = net["switch"]["bus"].values[slidx]
-        tbus = net["switch"]["element"].values[slidx]
+        fbus = switch["bus"][slidx]
+        tbus = switch["element"][slidx]
 
         # create a mapping to map each bus to itself at frist ...
         ds = DisjointSet({e: e for e in chain(fbus, tbus)})
@@ -219,8 +224,10 @@ def _build_bus_ppc(net, ppc):
     mode = net["_options"]["mode"]
     numba = net["_options"]["numba"] if "numba" in net["_options"] else False
 
+    arrays = net["_arrays"]
+    bus = arrays["bus"]
     # get bus indices
-    bus_index = net["bus"].index.values
+    bus_index = bus.index
     n_bus = len(bus_index)
     # get in service elements
     _is_elements = net["_is_elements"]
@@ -248,10 +255,9 @@ def _build_bus_ppc(net, ppc):
     ppc["bus"][:, BUS_I] = np.arange(n_bus)
 
     # init voltages from net
-    ppc["bus"][:n_bus, BASE_KV] = net["bus"]["vn_kv"].values
+    ppc["bus"][:n_bus, BASE_KV] = bus["vn_kv"]
     # set buses out of service (BUS_TYPE == 4)
-    ppc["bus"][bus_lookup[net["bus"].index.values[~net["bus"]["in_service"].values.astype(bool)]],
-               BUS_TYPE] = NONE
+    ppc["bus"][bus_lookup[bus_index[~bus["in_service"].astype(bool)]], BUS_TYPE] = NONE
 
     vm_pu = get_voltage_init_vector(net, init_vm_pu, "magnitude")
     if vm_pu is not None:
@@ -265,12 +271,12 @@ def _build_bus_ppc(net, ppc):
         _add_c_to_ppc(net, ppc)
 
     if copy_constraints_to_ppc:
-        if "max_vm_pu" in net.bus:
-            ppc["bus"][:n_bus, VMAX] = net["bus"].max_vm_pu.values
+        if "max_vm_pu" in bus:
+            ppc["bus"][:n_bus, VMAX] = bus["max_vm_pu"]
         else:
             ppc["bus"][:n_bus, VMAX] = 2  # changes of VMAX must be considered in check_opf_data
-        if "min_vm_pu" in net.bus:
-            ppc["bus"][:n_bus, VMIN] = net["bus"].min_vm_pu.values
+        if "min_vm_pu" in bus:
+            ppc["bus"][:n_bus, VMIN] = bus["min_vm_pu"]
         else:
             ppc["bus"][:n_bus, VMIN] = 0  # changes of VMIN must be considered in check_opf_data
 
@@ -35,7 +35,7 @@ def _build_gen_ppc(net, ppc):
 
         eg_end = np.sum(eg_is_mask)
         gen_end = eg_end + np.sum(gen_is_mask)
-        xw_end = gen_end + len(net["xward"])
+        xw_end = gen_end + len(net["_arrays"]["xward"])
 
         # define default q limits
         q_lim_default = 1e9  # which is 1000 TW - should be enough for distribution grids.
@@ -267,15 +267,16 @@ def _init_ppc_gen(ppc, xw_end, q_lim_default):
 def _build_pp_ext_grid(net, ppc, eg_is_mask, eg_end):
     calculate_voltage_angles = net["_options"]["calculate_voltage_angles"]
     bus_lookup = net["_pd2ppc_lookups"]["bus"]
+    ext_grid = net["_arrays"]["ext_grid"]
     # add ext grid / slack data
-    eg_buses = bus_lookup[net["ext_grid"]["bus"].values[eg_is_mask]]
+    eg_buses = bus_lookup[ext_grid["bus"][eg_is_mask]]
     ppc["gen"][:eg_end, GEN_BUS] = eg_buses
-    ppc["gen"][:eg_end, VG] = net["ext_grid"]["vm_pu"].values[eg_is_mask]
+    ppc["gen"][:eg_end, VG] = ext_grid["vm_pu"][eg_is_mask]
     ppc["gen"][:eg_end, GEN_STATUS] = True
 
     # set bus values for external grid buses
     if calculate_voltage_angles:
-        ppc["bus"][eg_buses, VA] = net["ext_grid"]["va_degree"].values[eg_is_mask]
+        ppc["bus"][eg_buses, VA] = ext_grid["va_degree"][eg_is_mask]
     ppc["bus"][eg_buses, BUS_TYPE] = REF
     # _build_gen_lookups(net, "ext_grid", 0, eg_end)
 
@@ -285,11 +286,12 @@ def _build_pp_gen(net, ppc, gen_is_mask, eg_end, gen_end, q_lim_default, p_lim_d
     bus_lookup = net["_pd2ppc_lookups"]["bus"]
     copy_constraints_to_ppc = net["_options"]["copy_constraints_to_ppc"]
 
-    gen_buses = bus_lookup[net["gen"]["bus"].values[gen_is_mask]]
-    gen_is_vm = net["gen"]["vm_pu"].values[gen_is_mask]
+    gen = net["_arrays"]["gen"]
+    gen_buses = bus_lookup[gen["bus"][gen_is_mask]]
+    gen_is_vm = gen["vm_pu"][gen_is_mask]
     ppc["gen"][eg_end:gen_end, GEN_BUS] = gen_buses
-    ppc["gen"][eg_end:gen_end, PG] = - (net["gen"]["p_kw"].values[gen_is_mask] * 1e-3 *
-                                        net["gen"]["scaling"].values[gen_is_mask])
+    ppc["gen"][eg_end:gen_end, PG] = - (gen["p_kw"][gen_is_mask] * 1e-3 *
+                                        gen["scaling"][gen_is_mask])
     ppc["gen"][eg_end:gen_end, VG] = gen_is_vm
 
     # set bus values for generator buses
@@ -309,19 +311,19 @@ def _build_pp_gen(net, ppc, gen_is_mask, eg_end, gen_end, q_lim_default, p_lim_d
 
 def _build_pp_xward(net, ppc, gen_end, xw_end, q_lim_default, update_lookup=True):
     bus_lookup = net["_pd2ppc_lookups"]["bus"]
-    xw = net["xward"]
+    xw = net["_arrays"]["xward"]
     xw_is = net["_is_elements"]['xward']
+    xward_buses = bus_lookup[xw["ad_bus"]]
     if update_lookup:
-        ppc["gen"][gen_end:xw_end, GEN_BUS] = bus_lookup[xw["ad_bus"].values]
-    ppc["gen"][gen_end:xw_end, VG] = xw["vm_pu"].values
+        ppc["gen"][gen_end:xw_end, GEN_BUS] = xward_buses
+    ppc["gen"][gen_end:xw_end, VG] = xw["vm_pu"]
     ppc["gen"][gen_end:xw_end, GEN_STATUS] = xw_is
     ppc["gen"][gen_end:xw_end, QMIN] = -q_lim_default
     ppc["gen"][gen_end:xw_end, QMAX] = q_lim_default
 
-    xward_buses = bus_lookup[net["xward"]["ad_bus"].values]
     ppc["bus"][xward_buses[xw_is], BUS_TYPE] = PV
     ppc["bus"][xward_buses[~xw_is], BUS_TYPE] = NONE
-    ppc["bus"][xward_buses, VM] = net["xward"]["vm_pu"].values
+    ppc["bus"][xward_buses, VM] = xw["vm_pu"]
 
 
 
@@ -390,20 +392,22 @@ def _copy_q_limits_to_ppc(net, ppc, eg_end, gen_end, gen_is_mask):
     # system (max <-> min)
 
     delta = net["_options"]["delta"]
+    gen = net["_arrays"]["gen"]
 
-    if "max_q_kvar" in net["gen"].columns:
-        ppc["gen"][eg_end:gen_end, QMIN] = -net["gen"]["max_q_kvar"].values[gen_is_mask] * 1e-3 - delta
-    if "min_q_kvar" in net["gen"].columns:
-        ppc["gen"][eg_end:gen_end, QMAX] = -net["gen"]["min_q_kvar"].values[gen_is_mask] * 1e-3 + delta
+    if "max_q_kvar" in gen:
+        ppc["gen"][eg_end:gen_end, QMIN] = -gen["max_q_kvar"][gen_is_mask] * 1e-3 - delta
+    if "min_q_kvar" in gen:
+        ppc["gen"][eg_end:gen_end, QMAX] = -gen["min_q_kvar"][gen_is_mask] * 1e-3 + delta
 
 
 def _copy_p_limits_to_ppc(net, ppc, eg_end, gen_end, gen_is_mask):
     delta = net["_options"]["delta"]
+    gen = net["_arrays"]["gen"]
 
-    if "max_p_kw" in net["gen"].columns:
-        ppc["gen"][eg_end:gen_end, PMIN] = -net["gen"]["max_p_kw"].values[gen_is_mask] * 1e-3 + delta
-    if "min_p_kw" in net["gen"].columns:
-        ppc["gen"][eg_end:gen_end, PMAX] = -net["gen"]["min_p_kw"].values[gen_is_mask] * 1e-3 - delta
+    if "max_p_kw" in gen:
+        ppc["gen"][eg_end:gen_end, PMIN] = -gen["max_p_kw"][gen_is_mask] * 1e-3 + delta
+    if "min_p_kw" in gen:
+        ppc["gen"][eg_end:gen_end, PMAX] = -gen["min_p_kw"][gen_is_mask] * 1e-3 - delta
 
 
 def _replace_nans_with_default_q_limits_in_ppc(ppc, eg_end, gen_end, q_lim_default):
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix, csgraph
+
+from pandapower.idx_brch import F_BUS, T_BUS, BR_STATUS
+from pandapower.idx_bus import VM, VA, BASE_KV
+from pandapower.idx_gen import GEN_BUS
+from pandapower.pd2ppc import _ppc2ppci_index
+from pandapower.pf.bustypes import bustypes
+from pandapower.pf.makePTDF import makePTDF, makeLODF
+from pandapower.pf.makeSbus import makeSbus
+from pandapower.pf.makeYbus_pypower import makeYbus as makeYbus_pypower
+from pandapower.pf.newtonpf import newtonpf
+from pandapower.pf.updateYbus import updateYbus
+from pandapower.powerflow import _init_ppci
+from pandapower.run import runpp
+
+try:
+    from pandapower.pf.makeYbus import makeYbus as makeYbus_numba
+except ImportError:
+    pass
+
+try:
+    import pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+
+def run_contingency(net, elements=("line", "trafo"), screening_threshold_percent=80., ac=True,
+                    **kwargs):
+    """
+    N-1 contingency analysis for single outages of lines and transformers.
+
+    All outages are screened at once with the line outage distribution factors (LODF) of the DC
+    model, which estimate the post-outage active power flows from the base case AC power flow.
+    Outages that lead to an estimated loading above screening_threshold_percent at any branch or
+    that split the network into islands are critical. For critical outages, an AC Newton-Raphson
+    power flow is carried out, starting from the base case voltages. Buses that lose their
+    connection to an ext_grid are disconnected in the AC power flow.
+
+    INPUT:
+        **net** - The pandapower format network
+
+    OPTIONAL:
+        **elements** (tuple, ("line", "trafo")) - element types which are switched off and
+        monitored
+
+        **screening_threshold_percent** (float, 80.) - estimated loading above which an outage
+        is considered critical and recalculated with an AC power flow
+
+        **ac** (bool, True) - if False, no AC power flows are carried out and the loadings of all
+        outages are the DC estimates
+
+        **kwargs** - power flow options that are passed to runpp for the base case
+
+    OUTPUT:
+        **loading** (DataFrame) - loading in percent of all monitored branches (columns) for each
+        outage (rows). Rows and columns are indexed with (element, index) tuples of all in
+        service branches of the given element types. The loadings of critical outages are the
+        AC results, the ones of all other outages the DC estimates. Outages with an AC power flow
+        that did not converge are NaN.
+
+        **outages** (DataFrame) - information about each outage with the columns
+
+            - "islanding" - the outage splits the network into islands
+            - "critical" - an AC power flow was carried out (if ac=True)
+            - "converged" - the AC power flow converged (always True if it was not carried out)
+            - "max_loading_percent" - maximum loading of all monitored branches
+
+    EXAMPLE:
+        loading, outages = run_contingency(net)
+
+        overloaded = loading.loc[:, loading.max() > 100.]
+    """
+    for element in elements:
+        if element not in ["line", "trafo"]:
+            raise ValueError("contingency analysis is only supported for lines and trafos, not "
+                             "for %s" % element)
+    runpp(net, **kwargs)
+    options = net["_options"]
+    if not options["ac"]:
+        raise ValueError("contingency analysis requires an AC power flow")
+    ppc, ppci = _init_ppci(net, net["_ppc"])
+    baseMVA, bus, gen, branch = ppci["baseMVA"], ppci["bus"], ppci["gen"], ppci["branch"]
+    makeYbus = makeYbus_numba if options["numba"] else makeYbus_pypower
+
+    index, rows = _get_monitored_branches(net, ppci, elements)
+    n = len(rows)
+
+    # base case flows
+    V = bus[:, VM] * np.exp(1j * np.deg2rad(bus[:, VA]))
+    Ybus_base, Yf_base, Yt_base = makeYbus(baseMVA, bus, branch)
+    loading_base, s_rated = _calc_loading(net, ppci, V, Yf_base, Yt_base, index, rows)
+    Sf = V[branch[:, F_BUS].real.astype(int)] * np.conj(Yf_base * V) * baseMVA
+
+    # DC screening of all outages at once
+    ref, _, _ = bustypes(bus, gen)
+    LODF = makeLODF(branch, makePTDF(bus, branch, ref))[np.ix_(rows, rows)]
+    islanding = np.isnan(LODF.diagonal())
+    pf_mw = Sf.real[rows]
+    qf_mvar = Sf.imag[rows]
+    # loading[k, l] is the loading of branch l after the outage of branch k
+    with np.errstate(invalid='ignore'):
+        pf_post = pf_mw[np.newaxis, :] + LODF.T * pf_mw[:, np.newaxis]
+        s_post = np.sqrt(pf_post ** 2 + qf_mvar[np.newaxis, :] ** 2)
+        loading = loading_base + 100. * (s_post - np.abs(Sf[rows])) / s_rated
+    loading[np.diag_indices(n)] = 0.
+    loading[islanding] = np.nan
+    critical = islanding.copy()
+    critical[~islanding] = np.max(loading[~islanding], axis=1) > screening_threshold_percent
+
+    converged = np.ones(n, dtype=bool)
+    if ac:
+        for k in np.flatnonzero(critical):
+            outage_branch = branch.copy()
+            outage_branch[rows[k], BR_STATUS] = 0
+            Ybus, Yf, Yt = Ybus_base.copy(), Yf_base.copy(), Yt_base.copy()
+            if not updateYbus(Ybus, Yf, Yt, branch, outage_branch, rows[k:k + 1]):
+                Ybus, Yf, Yt = makeYbus(baseMVA, bus, outage_branch)
+            V_out, converged[k] = _run_outage_pf(ppci, outage_branch, Ybus, V, options)
+            if converged[k]:
+                loading[k], _ = _calc_loading(net, ppci, V_out, Yf, Yt, index, rows)
+            else:
+                loading[k] = np.nan
+    else:
+        critical[:] = False
+    n_critical = np.sum(critical)
+    logger.info("%i of %i outages are critical" % (n_critical, n))
+
+    loading = pd.DataFrame(loading, index=index, columns=index)
+    outages = pd.DataFrame({"islanding": islanding, "critical": critical, "converged": converged},
+                           index=index, columns=["islanding", "critical", "converged"])
+    outages["max_loading_percent"] = loading.max(axis=1).values
+    return loading, outages
+
+
+def _get_monitored_branches(net, ppci, elements):
+    branch_lookup = _ppc2ppci_index(ppci["internal"]["branch_is"])
+    branch_ranges = net["_pd2ppc_lookups"]["branch"]
+    tuples, rows = [], []
+    for element in elements:
+        if element not in branch_ranges:
+            continue
+        f, t = branch_ranges[element]
+        ppci_rows = branch_lookup[f:t]
+        is_br = ppci_rows >= 0
+        tuples.extend((element, idx) for idx in net[element].index.values[is_br])
+        rows.append(ppci_rows[is_br])
+    rows = np.hstack(rows) if len(rows) else np.array([], dtype=int)
+    return pd.MultiIndex.from_tuples(tuples, names=["element", "index"]), rows
+
+
+def _calc_loading(net, ppci, V, Yf, Yt, index, rows):
+    """
+    Calculates the loading of the monitored branches like the power flow results do, as well as
+    the rated apparent power at the from end of each branch in MVA for the DC estimates.
+    """
+    baseMVA, bus, branch = ppci["baseMVA"], ppci["bus"], ppci["branch"][rows]
+    f = branch[:, F_BUS].real.astype(int)
+    t = branch[:, T_BUS].real.astype(int)
+    Yf, Yt = Yf[rows, :], Yt[rows, :]
+    # currents in kA and apparent power in kVA at both ends
+    i_ft = np.column_stack([np.abs(Yf * V) * baseMVA / np.sqrt(3) / bus[f, BASE_KV],
+                            np.abs(Yt * V) * baseMVA / np.sqrt(3) / bus[t, BASE_KV]])
+    s_ft = np.column_stack([np.abs(V[f] * np.conj(Yf * V)), np.abs(V[t] * np.conj(Yt * V))]) \
+           * baseMVA * 1e3
+    v_f = bus[f, VM] * bus[f, BASE_KV]
+
+    loading = np.zeros(len(rows))
+    s_rated = np.ones(len(rows))
+    elements = index.get_level_values("element")
+    for element in np.unique(elements):
+        is_el = elements == element
+        df = net[element].loc[index.get_level_values("index")[is_el]]
+        if element == "line":
+            i_max = df["max_i_ka"].values * df["df"].values * df["parallel"].values
+            loading[is_el] = np.max(i_ft[is_el], axis=1) / i_max * 100.
+            s_rated[is_el] = np.sqrt(3) * v_f[is_el] * i_max
+        else:
+            sn_mva = df["sn_kva"].values * 1e-3 * df["parallel"].values * df["df"].values
+            if net["_options"]["trafo_loading"] == "current":
+                vns = np.column_stack([df["vn_hv_kv"].values, df["vn_lv_kv"].values])
+                ld = np.max(i_ft[is_el] * vns, axis=1) * np.sqrt(3)
+                s_rated[is_el] = sn_mva * v_f[is_el] / df["vn_hv_kv"].values
+            else:
+                ld = np.max(s_ft[is_el], axis=1) * 1e-3
+                s_rated[is_el] = sn_mva
+            loading[is_el] = ld / sn_mva * 100.
+    return loading, s_rated
+
+
+def _run_outage_pf(ppci, branch, Ybus, V0, options):
+    """
+    Runs a Newton-Raphson power flow for the ppci with the given branch matrix. Buses without a
+    connection to a reference bus are disconnected and get a voltage of zero.
+    """
+    baseMVA, bus, gen = ppci["baseMVA"], ppci["bus"], ppci["gen"]
+    nb = bus.shape[0]
+    ref, _, _ = bustypes(bus, gen)
+
+    # find the buses that are still connected to a reference bus
+    is_br = branch[:, BR_STATUS].real > 0
+    f = branch[is_br, F_BUS].real.astype(int)
+    t = branch[is_br, T_BUS].real.astype(int)
+    adj = csr_matrix((np.ones(len(f)), (f, t)), shape=(nb, nb))
+    _, labels = csgraph.connected_components(adj, directed=False)
+    supplied = np.in1d(labels, labels[ref])
+
+    e2i = np.cumsum(supplied) - 1
+    gen_bus = gen[:, GEN_BUS].astype(int)
+    gen_supplied = gen[supplied[gen_bus]].copy()
+    gen_supplied[:, GEN_BUS] = e2i[gen_supplied[:, GEN_BUS].astype(int)]
+    ppci_supplied = {"baseMVA": baseMVA, "bus": bus[supplied], "gen": gen_supplied,
+                     "internal": dict()}
+    Ybus = Ybus.tocsr()[supplied, :][:, supplied].tocsr()
+    Ybus.sort_indices()
+
+    V = np.zeros(nb, dtype=np.complex128)
+    _, pv, pq = bustypes(ppci_supplied["bus"], gen_supplied)
+    if not len(pv) and not len(pq):
+        # only the reference buses are supplied
+        V[supplied] = V0[supplied]
+        return V, True
+    Sbus = makeSbus(baseMVA, ppci_supplied["bus"], gen_supplied)
+    options = dict(options, v_debug=False)
+    V_supplied, success, _, _, _, _ = newtonpf(Ybus, Sbus, V0[supplied].copy(), pv, pq,
+                                               ppci_supplied, options)
+    V[supplied] = V_supplied
+    return V, success
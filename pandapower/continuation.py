@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+from pandapower.pf.create_jacobian import create_jacobian_matrix, get_fastest_jacobian_function
+from pandapower.pf.makeSbus import makeSbus
+from pandapower.pf.newtonpf import _factorize_jacobian, _solve_factorized
+from pandapower.pf.ppci_variables import _get_pf_variables_from_ppci
+from pandapower.pf.run_newton_raphson_pf import _get_numba_functions
+from pandapower.probabilistic import _mismatch
+from pandapower.run import _run_base_case
+from pandapower.timeseries import _get_injection_incidence
+
+try:
+    import pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+
+def run_continuation(net, directions, step=0.1, min_step=1e-4, max_step=10., max_lambda=None,
+                     stop_at="nose", max_steps=500, **kwargs):
+    """
+    Continuation power flow, which traces the bus voltages (PV curves) for loads and generation
+    that change along one or more directions and determines the loadability margin of each
+    direction, i.e. the largest multiple lambda of the direction for which the power flow has a
+    solution (nose point).
+
+    The power injections are S(lambda) = S_base + lambda * S_direction. The curve is traced by a
+    predictor-corrector method with pseudo-arclength parametrization: The predictor follows the
+    tangent of the curve and the corrector solves the power flow equations together with an
+    additional row for the distance along the tangent. Contrary to a power flow with a fixed
+    lambda, the Jacobian augmented by this row stays regular at the nose point. The step size
+    is adapted to the number of corrector iterations and refined at the nose point. The sparsity
+    pattern and the column ordering of the LU factorization of the augmented Jacobian are
+    computed once and reused in all steps and directions.
+
+    INPUT:
+        **net** - The pandapower format network
+
+        **directions** (dict) - the keys are the names of the directions, the values are dicts
+        with the change of the elements for lambda = 1. Their keys are tuples (element,
+        variable) with element in ["load", "sgen", "storage", "gen"] and variable in ["p_kw",
+        "q_kvar"] (only "p_kw" for gen), the values are arrays with one value per element,
+        pandas Series indexed by element indices (other elements do not change) or scalars.
+
+    OPTIONAL:
+        **step** (float, 0.1) - initial step size along the curve
+
+        **min_step** (float, 1e-4) - smallest step size, also the accuracy of the nose point
+
+        **max_step** (float, 10.) - largest step size
+
+        **max_lambda** (float, None) - the continuation stops at the first point with a lambda
+        above this value
+
+        **stop_at** (str, "nose") - "nose" stops after the nose point, "full" traces the lower
+        part of the curve as well until lambda is 0 or the voltages collapse
+
+        **max_steps** (int, 500) - maximum number of steps per direction
+
+        **kwargs** - power flow options that are passed to runpp for the base case (e.g.
+        calculate_voltage_angles, tolerance_kva, numba)
+
+    OUTPUT:
+        **results** (dict) - contains
+
+            - "margins" (DataFrame) - one row per direction with lambda_max (largest lambda on
+              the traced curve), nose (True if the nose point was reached), critical_bus (bus
+              with the largest voltage sensitivity at the last point before the nose) and steps
+            - "curves" (dict) - for each direction a dict with the arrays "lambda" (n_points) and
+              "vm_pu" (n_points x len(net.bus)) of the traced points, starting with the base case
+
+        Loads are considered as constant power loads and the reactive power limits of the
+        generators are not enforced.
+
+    EXAMPLE:
+        load = {("load", "p_kw"): net.load.p_kw, ("load", "q_kvar"): net.load.q_kvar}
+
+        transfer = {("load", "p_kw"): net.load.p_kw.loc[area_b], ("gen", "p_kw"): dp_gen_area_a}
+
+        results = run_continuation(net, {"load": load, "transfer": transfer})
+
+        margin = results["margins"].lambda_max
+    """
+    if stop_at not in ["nose", "full"]:
+        raise ValueError("stop_at must be 'nose' or 'full', not %s" % stop_at)
+    ppc, ppci = _run_base_case(net, **kwargs)
+    system = _init_continuation_system(net, ppci)
+    options = {"tol": net["_options"]["tolerance_kva"] * 1e-3,
+               "max_iteration": net["_options"]["max_iteration"], "step": step,
+               "min_step": min_step, "max_step": max_step, "max_lambda": max_lambda,
+               "stop_at": stop_at, "max_steps": max_steps}
+
+    bus_idx = net["_pd2ppc_lookups"]["bus"][net.bus.index.values]
+    in_ppci = (bus_idx >= 0) & (bus_idx < len(system["V0"]))
+    margins = pd.DataFrame(index=pd.Index(list(directions.keys())),
+                           columns=["lambda_max", "nose", "critical_bus", "steps"])
+    curves = dict()
+    for name, direction in directions.items():
+        Sd = _get_direction(net, ppci, system, direction)
+        lam, V, nose, critical = _trace(system, Sd, options)
+        vm = np.full((len(lam), len(net.bus)), np.nan)
+        vm[:, in_ppci] = np.abs(V[:, bus_idx[in_ppci]])
+        curves[name] = {"lambda": lam, "vm_pu": vm}
+        # auxiliary buses (e.g. of open switches) are not considered as critical buses
+        critical_bus = net.bus.index[in_ppci][np.argmax(critical[bus_idx[in_ppci]])]
+        margins.loc[name] = [np.max(lam), nose, critical_bus, len(lam) - 1]
+        if not nose and (max_lambda is None or np.max(lam) < max_lambda):
+            logger.warning("continuation power flow for direction %s stopped at lambda %.4f "
+                           "before the nose point" % (name, lam[-1]))
+    margins["lambda_max"] = margins["lambda_max"].astype(float)
+    margins["nose"] = margins["nose"].astype(bool)
+    margins["steps"] = margins["steps"].astype(int)
+    return {"margins": margins, "curves": curves}
+
+
+def _init_continuation_system(net, ppci):
+    baseMVA, bus, gen, branch, ref, pv, pq, _, _, V0, _ = _get_pf_variables_from_ppci(ppci)
+    makeYbus, _ = _get_numba_functions(ppci, net["_options"])
+    Ybus, _, _ = makeYbus(baseMVA, bus, branch)
+    Ybus = Ybus.tocsr()
+    pvpq = np.r_[pv, pq]
+    pvpq_lookup = np.zeros(np.max(Ybus.indices) + 1, dtype=int)
+    pvpq_lookup[pvpq] = np.arange(len(pvpq))
+    numba = net["_options"]["numba"]
+    return {"baseMVA": baseMVA, "Ybus": Ybus, "Sbus": makeSbus(baseMVA, bus, gen), "V0": V0,
+            "pv": pv, "pq": pq, "pvpq": pvpq, "pvpq_lookup": pvpq_lookup, "numba": numba,
+            "createJ": get_fastest_jacobian_function(pvpq, pq, numba),
+            "dim": len(pvpq) + len(pq), "lu_cache": dict(), "pattern": None}
+
+
+def _get_direction(net, ppci, system, direction):
+    """
+    Returns the change of the complex bus power injections for lambda = 1.
+    """
+    values = dict()
+    for (element, variable), val in direction.items():
+        if element not in ["load", "sgen", "storage", "gen"] or \
+                variable not in ["p_kw", "q_kvar"] or (element == "gen" and variable != "p_kw"):
+            raise ValueError("continuation directions are not supported for %s %s"
+                             % (element, variable))
+        if isinstance(val, pd.Series):
+            delta = np.zeros(len(net[element]))
+            columns = net[element].index.get_indexer(val.index)
+            if np.any(columns < 0):
+                raise ValueError("direction for %s %s contains unknown %s indices"
+                                 % (element, variable, element))
+            delta[columns] = val.values
+        else:
+            delta = np.broadcast_to(np.asarray(val, dtype=float), (len(net[element]),))
+        values[(element, variable)] = delta
+    incidence, _, _ = _get_injection_incidence(net, ppci, values)
+    Sd = np.zeros(len(system["V0"]), dtype=complex)
+    for (element, variable), delta in values.items():
+        # the elements have the sign convention of loads
+        if variable == "p_kw":
+            Sd -= incidence[element] * delta / system["baseMVA"]
+        else:
+            Sd -= 1j * (incidence[element] * delta) / system["baseMVA"]
+    return Sd
+
+
+def _augmented_jacobian(system, V, F_lambda, z):
+    """
+    Returns the Jacobian augmented by the derivative with respect to lambda (last column) and
+    the parametrization row z. The positions of the entries of the augmented matrix are only
+    computed again if the sparsity pattern of the power flow Jacobian changes.
+    """
+    J = create_jacobian_matrix(system["Ybus"], V, system["pvpq"], system["pq"],
+                               system["createJ"], system["pvpq_lookup"], len(system["pv"]),
+                               len(system["pq"]), system["numba"]).tocsr()
+    dim = system["dim"]
+    pattern = system["pattern"]
+    if pattern is None or not np.array_equal(pattern["indptr"], J.indptr) or \
+            not np.array_equal(pattern["indices"], J.indices):
+        rows = np.repeat(np.arange(dim), np.diff(J.indptr))
+        indptr = np.r_[J.indptr + np.arange(dim + 1), J.nnz + 2 * dim + 1]
+        pos_J = np.arange(J.nnz) + rows
+        pos_lambda = J.indptr[1:] + np.arange(dim)
+        pos_z = np.arange(indptr[dim], indptr[-1])
+        indices = np.empty(indptr[-1], dtype=J.indices.dtype)
+        indices[pos_J] = J.indices
+        indices[pos_lambda] = dim
+        indices[pos_z] = np.arange(dim + 1)
+        pattern = {"indptr": J.indptr.copy(), "indices": J.indices.copy(), "pos_J": pos_J,
+                   "pos_lambda": pos_lambda, "pos_z": pos_z, "aug_indptr": indptr,
+                   "aug_indices": indices}
+        system["pattern"] = pattern
+    data = np.empty(len(pattern["aug_indices"]))
+    data[pattern["pos_J"]] = J.data
+    data[pattern["pos_lambda"]] = F_lambda
+    data[pattern["pos_z"]] = z
+    J_aug = csr_matrix((data, pattern["aug_indices"], pattern["aug_indptr"]),
+                       shape=(dim + 1, dim + 1))
+    return _factorize_jacobian(J_aug, system["lu_cache"])
+
+
+def _update(system, V, lam, dx):
+    n_pvpq, dim = len(system["pvpq"]), system["dim"]
+    Va, Vm = np.angle(V), np.abs(V)
+    Va[system["pvpq"]] += dx[:n_pvpq]
+    Vm[system["pq"]] += dx[n_pvpq:dim]
+    return Vm * np.exp(1j * Va), lam + dx[dim]
+
+
+def _tangent(system, V, F_lambda, z_previous):
+    """
+    Tangent of the curve in (Va[pvpq], Vm[pq], lambda), which points in the direction of the
+    previous tangent.
+    """
+    rhs = np.zeros(system["dim"] + 1)
+    rhs[-1] = 1.
+    z = _solve_factorized(_augmented_jacobian(system, V, F_lambda, z_previous), rhs)
+    return z / np.linalg.norm(z)
+
+
+def _corrector(system, V, lam, Sd, F_lambda, z, options):
+    """
+    Newton-Raphson iterations for the power flow equations and the pseudo-arclength condition
+    z * (x - x_predicted) = 0.
+    """
+    n_pvpq = len(system["pvpq"])
+    x_predicted = np.r_[np.angle(V)[system["pvpq"]], np.abs(V)[system["pq"]], lam]
+    for iteration in range(options["max_iteration"] + 1):
+        F = _mismatch(system, V, system["Sbus"] + lam * Sd)
+        if np.max(np.abs(F)) < options["tol"]:
+            return V, lam, iteration
+        if iteration == options["max_iteration"]:
+            break
+        x = np.r_[np.angle(V)[system["pvpq"]], np.abs(V)[system["pq"]], lam]
+        try:
+            lu = _augmented_jacobian(system, V, F_lambda, z)
+        except RuntimeError:
+            break
+        dx = -_solve_factorized(lu, np.r_[F, np.dot(z, x - x_predicted)])
+        V, lam = _update(system, V, lam, dx)
+        if np.any(np.abs(V[system["pq"]]) < 0.05) or not np.all(np.isfinite(dx[:n_pvpq])):
+            break
+    return None, None, None
+
+
+def _trace(system, Sd, options):
+    """
+    Traces the curve of one direction from the base case. Returns lambda and the voltages of the
+    traced points, whether the nose point was reached and the voltage sensitivities of the buses
+    at the last point before the nose.
+    """
+    n_pvpq, dim = len(system["pvpq"]), system["dim"]
+    F_lambda = -np.r_[Sd[system["pvpq"]].real, Sd[system["pq"]].imag]
+    V, lam = system["V0"].copy(), 0.
+    z = np.zeros(dim + 1)
+    z[-1] = 1.
+    z = _tangent(system, V, F_lambda, z)
+    lambdas, voltages = [lam], [V]
+    step, nose = options["step"], False
+    max_step = options["max_step"]
+    critical = _critical_bus(system, z)
+    while len(lambdas) <= options["max_steps"]:
+        dx = step * z
+        V_predicted, lam_predicted = _update(system, V, lam, dx)
+        V_new, lam_new, iterations = _corrector(system, V_predicted, lam_predicted, Sd, F_lambda,
+                                                z, options)
+        if V_new is None:
+            if step <= options["min_step"]:
+                break
+            step = max(step / 2., options["min_step"])
+            continue
+        z_new = _tangent(system, V_new, F_lambda, z)
+        if not nose and z[-1] > 0 >= z_new[-1]:
+            # the nose point is between the last and the new point
+            if step > options["min_step"]:
+                step = max_step = max(step / 4., options["min_step"])
+                continue
+            nose = True
+            max_step = options["max_step"]
+        V, lam = V_new, lam_new
+        lambdas.append(lam)
+        voltages.append(V)
+        if not nose:
+            critical = _critical_bus(system, z_new)
+        z = z_new
+        if nose and (options["stop_at"] == "nose" or lam <= 0):
+            break
+        if options["max_lambda"] is not None and lam >= options["max_lambda"]:
+            break
+        if iterations <= 2:
+            step = min(step * 2., max_step)
+        elif iterations > 4:
+            step = max(step / 2., options["min_step"])
+    return np.array(lambdas), np.array(voltages), nose, critical
+
+
+def _critical_bus(system, z):
+    # voltage magnitude sensitivity of all buses, the critical bus has the largest one
+    sensitivity = np.zeros(len(system["V0"]))
+    sensitivity[system["pq"]] = np.abs(z[len(system["pvpq"]):system["dim"]])
+    return sensitivity
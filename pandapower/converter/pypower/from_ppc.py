@@ -5,11 +5,14 @@
 
 
 from math import pi
-from numpy import sign, nan, append, zeros, array, power, sqrt, where
+from numpy import sign, nan, zeros, full, array, power, sqrt, where, arange, argsort, \
+    searchsorted, flatnonzero, isnan, maximum, minimum, empty, isin
 from numpy import max as max_
-from pandas import Series, DataFrame, concat
+from pandas import Series, DataFrame, MultiIndex
 
 import pandapower as pp
+from pandapower.create import _add_multiple_elements, _add_multiple_optional_entries, \
+    _get_multiple_index_with_check
 
 try:
     import pplog as logging
@@ -28,41 +31,66 @@ ppc_elms = ["bus", "branch", "gen"]
 
 
 def _create_costs(net, ppc, gen_lookup, type, idx):
-    if ppc['gencost'][idx, 0] == 1:
-        if not len(ppc['gencost'][idx, 4:]) == 2*ppc['gencost'][idx, 3]:
-            logger.error("In gencost line %s, the number n does not fit to the number of values" %
-                         idx)
-        pp.create_piecewise_linear_cost(net, gen_lookup.element.at[idx],
-                                        gen_lookup.element_type.at[idx],
-                                        - ppc['gencost'][idx, 4:], type)
-    elif ppc['gencost'][idx, 0] == 2:
-        if len(ppc['gencost'][idx, 4:]) == ppc['gencost'][idx, 3]:
-            n = len(ppc['gencost'][idx, 4:])
-            values = ppc['gencost'][idx, 4:] / power(1e3, array(range(n))[::-1])
-        else:
+    """
+    Creates the costs of the gencost lines idx. Polynomial costs are appended to
+    net.polynomial_cost at once, piecewise linear costs are created line by line.
+    """
+    idx = array(idx, dtype=int)
+    if not len(idx):
+        return
+    gencost = ppc['gencost'][idx]
+    # the gencost lines of reactive power costs follow the lines of all generators
+    gen_idx = idx - len(gen_lookup) if type == 'q' else idx
+    element = gen_lookup.element.values[gen_idx].astype(float)
+    element_type = gen_lookup.element_type.values[gen_idx]
+    n = gencost.shape[1] - 4
+    for i in idx[(gencost[:, 0] != 1) & (gencost[:, 0] != 2)]:
+        logger.info("Cost mode of gencost line %s is unknown." % i)
+
+    # --- piecewise linear costs
+    for i in flatnonzero(gencost[:, 0] == 1):
+        if not n == 2*gencost[i, 3]:
             logger.error("In gencost line %s, the number n does not fit to the number of values" %
-                         idx)
-        pp.create_polynomial_cost(net, gen_lookup.element.at[idx], gen_lookup.element_type.at[idx],
-                                  - values, type)
-    else:
-        logger.info("Cost mode of gencost line %s is unknown." % idx)
-
-
-def _gen_bus_info(ppc, idx_gen):
-    bus_name = int(ppc["gen"][idx_gen, 0])
+                         idx[i])
+        pp.create_piecewise_linear_cost(net, element[i], element_type[i], - gencost[i, 4:], type)
+
+    # --- polynomial costs
+    is_poly = gencost[:, 0] == 2
+    fits = gencost[:, 3] == n
+    for i in idx[is_poly & ~fits]:
+        logger.error("In gencost line %s, the number n does not fit to the number of values" % i)
+    is_poly &= fits & ~isnan(element)
+    if not is_poly.any():
+        return
+    values = -gencost[is_poly, 4:] / power(1e3, arange(n)[::-1])
+    c = empty(is_poly.sum(), dtype=object)
+    c[:] = [v.reshape(1, -1) for v in values]
+    index = _get_multiple_index_with_check(net, "polynomial_cost", None, len(c))
+    _add_multiple_elements(net, "polynomial_cost", index, {
+        "type": type, "element": element[is_poly].astype(int),
+        "element_type": element_type[is_poly], "c": c})
+
+
+def _gen_bus_info(ppc):
+    """
+    Returns the positions of the generator buses in ppc['bus'], the bus types, whether the
+    generators are the first in service generators at their buses and the indices of the last in
+    service generators at their buses (-1 if there is none).
+    """
+    gen_bus = ppc["gen"][:, 0].astype(int)
+    bus_names = ppc["bus"][:, 0].astype(int)
     # assumption: there is only one bus with this bus_name:
-    idx_bus = int(where(ppc["bus"][:, 0] == bus_name)[0][0])
-    current_bus_type = int(ppc["bus"][idx_bus, 1])
+    sorter = argsort(bus_names, kind="mergesort")
+    idx_bus = sorter[searchsorted(bus_names, gen_bus, sorter=sorter)]
+    bus_type = ppc["bus"][idx_bus, 1].astype(int)
 
-    same_bus_gen_idx = where(ppc["gen"][:, 0] == ppc["gen"][idx_gen, 0])[0].astype(int)
-    same_bus_in_service_gen_idx = same_bus_gen_idx[where(ppc["gen"][same_bus_gen_idx, 7] > 0)]
-    first_same_bus_in_service_gen_idx = same_bus_in_service_gen_idx[0] if len(
-        same_bus_in_service_gen_idx) else None
-    last_same_bus_in_service_gen_idx = same_bus_in_service_gen_idx[-1] if len(
-        same_bus_in_service_gen_idx) else None
-
-    return current_bus_type, idx_bus, same_bus_gen_idx, first_same_bus_in_service_gen_idx, \
-        last_same_bus_in_service_gen_idx
+    n_gen = len(gen_bus)
+    in_service = flatnonzero(ppc["gen"][:, 7] > 0)
+    first = full(len(bus_names), n_gen)
+    last = full(len(bus_names), -1)
+    minimum.at(first, idx_bus[in_service], in_service)
+    maximum.at(last, idx_bus[in_service], in_service)
+    return idx_bus, bus_type, first[idx_bus] == arange(n_gen), last[idx_bus]
 
 
 def from_ppc(ppc, f_hz=50, validate_conversion=False, **kwargs):
@@ -110,150 +138,135 @@ def from_ppc(ppc, f_hz=50, validate_conversion=False, **kwargs):
     net = pp.create_empty_network(f_hz=f_hz, sn_kva=baseMVA*1e3)
 
     # --- bus data -> create buses, sgen, load, shunt
-    for i in range(len(ppc['bus'])):
-        # create buses
-        pp.create_bus(net, name=int(ppc['bus'][i, 0]), vn_kv=ppc['bus'][i, 9], type="b",
-                      zone=ppc['bus'][i, 6], in_service=bool(ppc['bus'][i, 1] != 4),
-                      max_vm_pu=ppc['bus'][i, 11], min_vm_pu=ppc['bus'][i, 12])
-        # create sgen, load
-        if ppc['bus'][i, 2] > 0:
-            pp.create_load(net, i, p_kw=ppc['bus'][i, 2] * 1e3, q_kvar=ppc['bus'][i, 3] * 1e3,
-                           controllable=False)
-        elif ppc['bus'][i, 2] < 0:
-            pp.create_sgen(net, i, p_kw=ppc['bus'][i, 2] * 1e3, q_kvar=ppc['bus'][i, 3] * 1e3,
-                           type="", controllable=False)
-        elif ppc['bus'][i, 3] != 0:
-            pp.create_load(net, i, p_kw=ppc['bus'][i, 2] * 1e3, q_kvar=ppc['bus'][i, 3] * 1e3,
-                           controllable=False)
-        # create shunt
-        if ppc['bus'][i, 4] != 0 or ppc['bus'][i, 5] != 0:
-            pp.create_shunt(net, i, p_kw=ppc['bus'][i, 4] * 1e3,
-                            q_kvar=-ppc['bus'][i, 5] * 1e3)
+    bus = ppc['bus']
+    pp.create_buses(net, len(bus), vn_kv=bus[:, 9], name=bus[:, 0].astype(int), type="b",
+                    zone=bus[:, 6], in_service=bus[:, 1] != 4, max_vm_pu=bus[:, 11],
+                    min_vm_pu=bus[:, 12])
+    # create sgen, load
+    is_load = (bus[:, 2] > 0) | ((bus[:, 2] == 0) & (bus[:, 3] != 0))
+    if is_load.any():
+        pp.create_loads(net, flatnonzero(is_load), p_kw=bus[is_load, 2] * 1e3,
+                        q_kvar=bus[is_load, 3] * 1e3, controllable=False)
+    is_sgen = bus[:, 2] < 0
+    if is_sgen.any():
+        pp.create_sgens(net, flatnonzero(is_sgen), p_kw=bus[is_sgen, 2] * 1e3,
+                        q_kvar=bus[is_sgen, 3] * 1e3, type="", controllable=False)
+    # create shunt
+    is_shunt = (bus[:, 4] != 0) | (bus[:, 5] != 0)
+    if is_shunt.any():
+        index = _get_multiple_index_with_check(net, "shunt", None, is_shunt.sum())
+        _add_multiple_elements(net, "shunt", index, {
+            "bus": flatnonzero(is_shunt), "name": None, "p_kw": bus[is_shunt, 4] * 1e3,
+            "q_kvar": -bus[is_shunt, 5] * 1e3, "vn_kv": bus[is_shunt, 9], "step": 1,
+            "max_step": 1, "in_service": True})
     # unused data of ppc: Vm, Va (partwise: in ext_grid), zone
 
     # --- gen data -> create ext_grid, gen, sgen
-    gen_lookup = DataFrame(nan, columns=['element', 'element_type'],
-                           index=range(len(ppc['gen'][:, 0])))
     # if in ppc is only one gen -> numpy initially uses one dim array -> change to two dim array
     if len(ppc["gen"].shape) == 1:
         ppc["gen"] = array(ppc["gen"], ndmin=2)
-    for i in range(len(ppc['gen'][:, 0])):
-        current_bus_type, current_bus_idx, same_bus_gen_idx, first_same_bus_in_service_gen_idx, \
-            last_same_bus_in_service_gen_idx = _gen_bus_info(ppc, i)
-        # create ext_grid
-        if current_bus_type == 3:
-            if i == first_same_bus_in_service_gen_idx:
-                gen_lookup.element.loc[i] = pp.create_ext_grid(
-                    net, bus=current_bus_idx, vm_pu=ppc['gen'][last_same_bus_in_service_gen_idx, 5],
-                    va_degree=ppc['bus'][current_bus_idx, 8], in_service=bool(ppc['gen'][i, 7] > 0),
-                    max_p_kw=-ppc['gen'][i, 9] * 1e3, min_p_kw=-ppc['gen'][i, 8] * 1e3,
-                    max_q_kvar=-ppc['gen'][i, 4] * 1e3, min_q_kvar=-ppc['gen'][i, 3] * 1e3)
-                gen_lookup.element_type.loc[i] = 'ext_grid'
-                if ppc['gen'][i, 4] > ppc['gen'][i, 3]:
-                    logger.info('min_q_kvar of gen %d must be less than max_q_kvar but is not.' % i)
-                if -ppc['gen'][i, 9] < -ppc['gen'][i, 8]:
-                    logger.info('max_p_kw of gen %d must be less than min_p_kw but is not.' % i)
-            else:
-                current_bus_type = 1
-        # create gen
-        elif current_bus_type == 2:
-            if i == first_same_bus_in_service_gen_idx:
-                gen_lookup.element.loc[i] = pp.create_gen(
-                    net, bus=current_bus_idx, vm_pu=ppc['gen'][last_same_bus_in_service_gen_idx, 5],
-                    p_kw=-ppc['gen'][i, 1] * 1e3,
-                    in_service=bool(ppc['gen'][i, 7] > 0), controllable=True,
-                    max_p_kw=-ppc['gen'][i, 9] * 1e3, min_p_kw=-ppc['gen'][i, 8] * 1e3,
-                    max_q_kvar=-ppc['gen'][i, 4] * 1e3, min_q_kvar=-ppc['gen'][i, 3] * 1e3)
-                gen_lookup.element_type.loc[i] = 'gen'
-                if ppc['gen'][i, 1] < 0:
-                    logger.info('p_kw of gen %d must be less than zero but is not.' % i)
-                if ppc['gen'][i, 4] > ppc['gen'][i, 3]:
-                    logger.info('min_q_kvar of gen %d must be less than max_q_kvar but is not.' % i)
-                if -ppc['gen'][i, 9] < -ppc['gen'][i, 8]:
-                    logger.info('max_p_kw of gen %d must be less than min_p_kw but is not.' % i)
+    gen = ppc['gen']
+    gen_lookup = DataFrame(nan, columns=['element', 'element_type'], index=range(len(gen)))
+    idx_bus, bus_type, is_first, last_in_service = _gen_bus_info(ppc)
+    is_ext_grid = (bus_type == 3) & is_first
+    is_gen = (bus_type == 2) & is_first
+    # the first in service generators of ext_grid and gen buses are converted to these elements,
+    # all further generators of these buses and the generators of PQ buses to sgens
+    is_sgen = (bus_type == 1) | (((bus_type == 2) | (bus_type == 3)) & ~is_first)
+    for elm, mask in [("ext_grid", is_ext_grid), ("gen", is_gen), ("sgen", is_sgen)]:
+        if not mask.any():
+            continue
+        idx = flatnonzero(mask)
+        limits = [("min_p_kw", -gen[idx, 8] * 1e3), ("max_p_kw", -gen[idx, 9] * 1e3),
+                  ("min_q_kvar", -gen[idx, 3] * 1e3), ("max_q_kvar", -gen[idx, 4] * 1e3)]
+        if elm == "sgen":
+            gen_lookup.loc[idx, "element"] = pp.create_sgens(
+                net, idx_bus[idx], p_kw=-gen[idx, 1] * 1e3, q_kvar=-gen[idx, 2] * 1e3, type="",
+                in_service=gen[idx, 7] > 0, controllable=True, **dict(limits))
+        else:
+            entries = {"bus": idx_bus[idx], "name": None, "vm_pu": gen[last_in_service[idx], 5],
+                       "in_service": gen[idx, 7] > 0}
+            if elm == "ext_grid":
+                entries["va_degree"] = bus[idx_bus[idx], 8]
             else:
-                current_bus_type = 1
-        # create sgen
-        if current_bus_type == 1:
-            gen_lookup.element.loc[i] = pp.create_sgen(
-                net, bus=current_bus_idx, p_kw=-ppc['gen'][i, 1] * 1e3,
-                q_kvar=-ppc['gen'][i, 2] * 1e3, type="", in_service=bool(ppc['gen'][i, 7] > 0),
-                max_p_kw=-ppc['gen'][i, 9] * 1e3, min_p_kw=-ppc['gen'][i, 8] * 1e3,
-                max_q_kvar=-ppc['gen'][i, 4] * 1e3, min_q_kvar=-ppc['gen'][i, 3] * 1e3,
-                controllable=True)
-            gen_lookup.element_type.loc[i] = 'sgen'
-            if ppc['gen'][i, 1] < 0:
-                logger.info('p_kw of sgen %d must be less than zero but is not.' % i)
-            if ppc['gen'][i, 4] > ppc['gen'][i, 3]:
-                logger.info('min_q_kvar of gen %d must be less than max_q_kvar but is not.' % i)
-            if -ppc['gen'][i, 9] < -ppc['gen'][i, 8]:
-                logger.info('max_p_kw of gen %d must be less than min_p_kw but is not.' % i)
+                entries.update({"p_kw": -gen[idx, 1] * 1e3, "sn_kva": nan, "type": None,
+                                "scaling": 1.})
+            for column, values in limits:
+                _add_multiple_optional_entries(net, elm, entries, len(idx), column, values)
+            if elm == "gen":
+                entries["controllable"] = True
+            index = _get_multiple_index_with_check(net, elm, None, len(idx))
+            _add_multiple_elements(net, elm, index, entries)
+            gen_lookup.loc[idx, "element"] = index
+        gen_lookup.loc[idx, "element_type"] = elm
+        if elm != "ext_grid":
+            for i in idx[gen[idx, 1] < 0]:
+                logger.info('p_kw of %s %d must be less than zero but is not.' % (elm, i))
+        for i in idx[gen[idx, 4] > gen[idx, 3]]:
+            logger.info('min_q_kvar of gen %d must be less than max_q_kvar but is not.' % i)
+        for i in idx[-gen[idx, 9] < -gen[idx, 8]]:
+            logger.info('max_p_kw of gen %d must be less than min_p_kw but is not.' % i)
     # unused data of ppc: Vg (partwise: in ext_grid and gen), mBase, Pc1, Pc2, Qc1min, Qc1max,
     # Qc2min, Qc2max, ramp_agc, ramp_10, ramp_30,ramp_q, apf
 
     # --- branch data -> create line, trafo
-    for i in range(len(ppc['branch'])):
-        from_bus = pp.get_element_index(net, 'bus', name=int(ppc['branch'][i, 0]))
-        to_bus = pp.get_element_index(net, 'bus', name=int(ppc['branch'][i, 1]))
-
-        from_vn_kv = ppc['bus'][from_bus, 9]
-        to_vn_kv = ppc['bus'][to_bus, 9]
-        if (from_vn_kv == to_vn_kv) & ((ppc['branch'][i, 8] == 0) | (ppc['branch'][i, 8] == 1)) & \
-           (ppc['branch'][i, 9] == 0):  # create line
-            Zni = ppc['bus'][to_bus, 9]**2/baseMVA  # ohm
-            max_i_ka = ppc['branch'][i, 5]/ppc['bus'][to_bus, 9]/sqrt(3)
-            if max_i_ka == 0.0:
-                max_i_ka = MAX_VAL
-                logger.debug("ppc branch rateA is zero -> Using MAX_VAL instead to calculate " +
-                             "maximum branch flow")
-            pp.create_line_from_parameters(
-                net, from_bus=from_bus, to_bus=to_bus, length_km=1,
-                r_ohm_per_km=ppc['branch'][i, 2]*Zni, x_ohm_per_km=ppc['branch'][i, 3]*Zni,
-                c_nf_per_km=ppc['branch'][i, 4]/Zni/omega*1e9/2,
-                max_i_ka=max_i_ka, type='ol', max_loading_percent=100,
-                in_service=bool(ppc['branch'][i, 10]))
-
-        else:  # create transformer
-            if from_vn_kv >= to_vn_kv:
-                hv_bus = from_bus
-                vn_hv_kv = from_vn_kv
-                lv_bus = to_bus
-                vn_lv_kv = to_vn_kv
-                tp_side = 'hv'
-            else:
-                hv_bus = to_bus
-                vn_hv_kv = to_vn_kv
-                lv_bus = from_bus
-                vn_lv_kv = from_vn_kv
-                tp_side = 'lv'
-                if from_vn_kv == to_vn_kv:
-                    logger.warning('The pypower branch %d (from_bus, to_bus)=(%d, %d) is considered'
-                                   ' as a transformer because of a ratio != 0 | 1 but it connects '
-                                   'the same voltage level', i, ppc['branch'][i, 0],
-                                   ppc['branch'][i, 1])
-            rk = ppc['branch'][i, 2]
-            xk = ppc['branch'][i, 3]
-            zk = (rk ** 2 + xk ** 2) ** 0.5
-            sn = ppc['branch'][i, 5] * 1e3
-            if sn == 0.0:
-                sn = MAX_VAL
-                logger.debug("ppc branch rateA is zero -> Using MAX_VAL instead to calculate " +
-                             "apparent power")
-            ratio_1 = 0 if ppc['branch'][i, 8] == 0 else (ppc['branch'][i, 8] - 1) * 100
-            i0_percent = -ppc['branch'][i, 4] * 100 * baseMVA * 1e3 / sn
-            if i0_percent < 0:
-                logger.info('A transformer always behaves inductive consumpting but the '
-                            'susceptance of pypower branch %d (from_bus, to_bus)=(%d, %d) is '
-                            'positive.', i, ppc['branch'][i, 0], ppc['branch'][i, 1])
-
-            pp.create_transformer_from_parameters(
-                net, hv_bus=hv_bus, lv_bus=lv_bus, sn_kva=sn, vn_hv_kv=vn_hv_kv,
-                vn_lv_kv=vn_lv_kv, vsc_percent=sign(xk) * zk * sn / 1e3 * 100 / baseMVA,
-                vscr_percent=rk * sn / 1e3 * 100 / baseMVA, max_loading_percent=100,
-                pfe_kw=0, i0_percent=i0_percent, shift_degree=ppc['branch'][i, 9],
-                tp_st_percent=abs(ratio_1) if ratio_1 else nan,
-                tp_pos=sign(ratio_1) if ratio_1 else nan,
-                tp_side=tp_side if ratio_1 else None, tp_mid=0 if ratio_1 else nan)
+    branch = ppc['branch']
+    bus_lookup = Series(net.bus.index.values, index=net.bus.name.values)
+    from_bus = bus_lookup.loc[branch[:, 0].astype(int)].values
+    to_bus = bus_lookup.loc[branch[:, 1].astype(int)].values
+    from_vn_kv = bus[from_bus, 9]
+    to_vn_kv = bus[to_bus, 9]
+    ratio = branch[:, 8]
+    is_line = (from_vn_kv == to_vn_kv) & ((ratio == 0) | (ratio == 1)) & (branch[:, 9] == 0)
+
+    if is_line.any():  # create line
+        br = branch[is_line]
+        Zni = to_vn_kv[is_line]**2/baseMVA  # ohm
+        max_i_ka = br[:, 5]/to_vn_kv[is_line]/sqrt(3)
+        if (max_i_ka == 0.0).any():
+            max_i_ka[max_i_ka == 0.0] = MAX_VAL
+            logger.debug("ppc branch rateA is zero -> Using MAX_VAL instead to calculate " +
+                         "maximum branch flow")
+        pp.create_lines_from_parameters(
+            net, from_buses=from_bus[is_line], to_buses=to_bus[is_line], length_km=1,
+            r_ohm_per_km=br[:, 2]*Zni, x_ohm_per_km=br[:, 3]*Zni,
+            c_nf_per_km=br[:, 4]/Zni/omega*1e9/2, max_i_ka=max_i_ka, type='ol',
+            max_loading_percent=100, in_service=br[:, 10].astype(bool))
+
+    is_trafo = ~is_line
+    if is_trafo.any():  # create transformer
+        br = branch[is_trafo]
+        hv_is_from = from_vn_kv[is_trafo] >= to_vn_kv[is_trafo]
+        hv_bus = where(hv_is_from, from_bus[is_trafo], to_bus[is_trafo])
+        lv_bus = where(hv_is_from, to_bus[is_trafo], from_bus[is_trafo])
+        for i in flatnonzero(is_trafo & (from_vn_kv == to_vn_kv)):
+            logger.debug('The pypower branch %d (from_bus, to_bus)=(%d, %d) is considered'
+                         ' as a transformer because of a ratio != 0 | 1 but it connects '
+                         'the same voltage level', i, branch[i, 0], branch[i, 1])
+        rk = br[:, 2]
+        xk = br[:, 3]
+        zk = (rk ** 2 + xk ** 2) ** 0.5
+        sn = br[:, 5] * 1e3
+        if (sn == 0.0).any():
+            sn[sn == 0.0] = MAX_VAL
+            logger.debug("ppc branch rateA is zero -> Using MAX_VAL instead to calculate " +
+                         "apparent power")
+        ratio_1 = where(br[:, 8] == 0, 0, (br[:, 8] - 1) * 100)
+        i0_percent = -br[:, 4] * 100 * baseMVA * 1e3 / sn
+        for i in flatnonzero(is_trafo)[i0_percent < 0]:
+            logger.info('A transformer always behaves inductive consumpting but the '
+                        'susceptance of pypower branch %d (from_bus, to_bus)=(%d, %d) is '
+                        'positive.', i, branch[i, 0], branch[i, 1])
+        has_tap = ratio_1 != 0
+        pp.create_transformers_from_parameters(
+            net, hv_buses=hv_bus, lv_buses=lv_bus, sn_kva=sn, vn_hv_kv=bus[hv_bus, 9],
+            vn_lv_kv=bus[lv_bus, 9], vsc_percent=sign(xk) * zk * sn / 1e3 * 100 / baseMVA,
+            vscr_percent=rk * sn / 1e3 * 100 / baseMVA, max_loading_percent=100,
+            pfe_kw=0, i0_percent=i0_percent, shift_degree=br[:, 9],
+            tp_st_percent=where(has_tap, abs(ratio_1), nan),
+            tp_pos=where(has_tap, sign(ratio_1), nan),
+            tp_side=where(has_tap, where(hv_is_from, 'hv', 'lv'), None),
+            tp_mid=where(has_tap, 0, nan))
     # unused data of ppc: rateB, rateC
 
     # --- gencost -> create polynomial_cost, piecewise_cost
@@ -270,10 +283,8 @@ def from_ppc(ppc, f_hz=50, validate_conversion=False, **kwargs):
         if ppc['gencost'].shape[0] >= 2*gen_lookup.shape[0]:
             idx_p = range(gen_lookup.shape[0])
             idx_q = range(gen_lookup.shape[0], 2*gen_lookup.shape[0])
-        for idx in idx_p:
-            _create_costs(net, ppc, gen_lookup, 'p', idx)
-        for idx in idx_q:
-            _create_costs(net, ppc, gen_lookup, 'q', idx)
+        _create_costs(net, ppc, gen_lookup, 'p', idx_p)
+        _create_costs(net, ppc, gen_lookup, 'q', idx_q)
 
     # areas are unconverted
 
@@ -285,6 +296,30 @@ def from_ppc(ppc, f_hz=50, validate_conversion=False, **kwargs):
     return net
 
 
+def _nth_parallel_results(element, bus_columns, res, res_columns, buses, nth):
+    """
+    Returns the res_columns results of the nth elements (in table order) connecting the given
+    buses. Results of elements which do not exist are nan.
+    """
+    results = full((len(nth), len(res_columns)), nan)
+    if not len(element) or not len(nth):
+        return results
+    keys = [element[c].values for c in bus_columns] + [
+        element.groupby(bus_columns).cumcount().values]
+    position = Series(arange(len(element)), index=MultiIndex.from_arrays(keys))
+    position = position.reindex(MultiIndex.from_arrays(list(buses) + [nth])).values
+    found = ~isnan(position)
+    results[found] = res.loc[element.index, res_columns].values[position[found].astype(int)]
+    return results
+
+
+def _count_parallel(buses):
+    """
+    Returns for each entry the number of preceding entries which connect the same buses.
+    """
+    return DataFrame(dict(enumerate(buses))).groupby(list(range(len(buses)))).cumcount().values
+
+
 def _validate_diff_res(diff_res, max_diff_values):
     to_iterate = set(max_diff_values.keys()) & {'gen_q_kvar', 'branch_p_kw', 'branch_q_kvar',
                                                 'gen_p_kw', 'bus_va_degree', 'bus_vm_pu'}
@@ -456,100 +491,49 @@ def validate_from_ppc(ppc_net, pp_net, pf_type="runpp", max_diff_values={
     pp_res["bus"] = array(pp_net.res_bus.sort_index()[['vm_pu', 'va_degree']])
 
     # --- pandapower gen result table
-    pp_res["gen"] = zeros([1, 2])
-    # consideration of parallel generators via storing how much generators have been considered
-    # each node
     # if in ppc is only one gen -> numpy initially uses one dim array -> change to two dim array
     if len(ppc_net["gen"].shape) == 1:
         ppc_net["gen"] = array(ppc_net["gen"], ndmin=2)
-    GENS = DataFrame(ppc_net['gen'][:, [0]].astype(int))
-    GEN_uniq = GENS.drop_duplicates()
-    already_used_gen = Series(zeros(GEN_uniq.shape[0]).astype(int),
-                              index=[int(v) for v in GEN_uniq.values])
-    change_q_compare = []
-    for i, j in GENS.iterrows():
-        current_bus_type, current_bus_idx, same_bus_gen_idx, first_same_bus_in_service_gen_idx, \
-            last_same_bus_in_service_gen_idx = _gen_bus_info(ppc_net, i)
-        if current_bus_type == 3 and i == first_same_bus_in_service_gen_idx:
-            pp_res["gen"] = append(pp_res["gen"], array(pp_net.res_ext_grid[
-                    pp_net.ext_grid.bus == current_bus_idx][['p_kw', 'q_kvar']]).reshape((1, 2)), 0)
-        elif current_bus_type == 2 and i == first_same_bus_in_service_gen_idx:
-            pp_res["gen"] = append(pp_res["gen"], array(pp_net.res_gen[
-                    pp_net.gen.bus == current_bus_idx][['p_kw', 'q_kvar']]).reshape((1, 2)), 0)
-        else:
-            pp_res["gen"] = append(pp_res["gen"], array(pp_net.res_sgen[
-                pp_net.sgen.bus == current_bus_idx][['p_kw', 'q_kvar']])[
-                already_used_gen.at[int(j)]].reshape((1, 2)), 0)
-            already_used_gen.at[int(j)] += 1
-            change_q_compare += [int(j)]
-    pp_res["gen"] = pp_res["gen"][1:, :]  # delete initial zero row
+    idx_bus, bus_type, is_first, _ = _gen_bus_info(ppc_net)
+    is_ext_grid = (bus_type == 3) & is_first
+    is_gen = (bus_type == 2) & is_first
+    is_sgen = ~(is_ext_grid | is_gen)
+    pp_res["gen"] = zeros([len(idx_bus), 2])
+    for elm, mask in [("ext_grid", is_ext_grid), ("gen", is_gen), ("sgen", is_sgen)]:
+        # consideration of parallel generators via counting the generators already considered
+        # at each node
+        pp_res["gen"][mask] = _nth_parallel_results(
+            pp_net[elm], ["bus"], pp_net["res_" + elm], ['p_kw', 'q_kvar'], [idx_bus[mask]],
+            _count_parallel([idx_bus[mask]]))
 
     # --- pandapower branch result table
-    pp_res["branch"] = zeros([1, 4])
-    # consideration of parallel branches via storing how often branches were considered
-    # each node-to-node-connection
-    try:
-        init1 = concat([pp_net.line.from_bus, pp_net.line.to_bus], axis=1,
-                       sort=True).drop_duplicates()
-        init2 = concat([pp_net.trafo.hv_bus, pp_net.trafo.lv_bus], axis=1,
-                       sort=True).drop_duplicates()
-    except TypeError:
-        # legacy pandas < 0.21
-        init1 = concat([pp_net.line.from_bus, pp_net.line.to_bus], axis=1).drop_duplicates()
-        init2 = concat([pp_net.trafo.hv_bus, pp_net.trafo.lv_bus], axis=1).drop_duplicates()
-    init1['hv_bus'] = nan
-    init1['lv_bus'] = nan
-    init2['from_bus'] = nan
-    init2['to_bus'] = nan
-    try:
-        already_used_branches = concat([init1, init2], axis=0, sort=True)
-    except TypeError:
-        # pandas < 0.21 legacy
-        already_used_branches = concat([init1, init2], axis=0)
-    already_used_branches['number'] = zeros([already_used_branches.shape[0], 1]).astype(int)
-    BRANCHES = DataFrame(ppc_net['branch'][:, [0, 1, 8, 9]])
-    for i in BRANCHES.index:
-        from_bus = pp.get_element_index(pp_net, 'bus', name=int(ppc_net['branch'][i, 0]))
-        to_bus = pp.get_element_index(pp_net, 'bus', name=int(ppc_net['branch'][i, 1]))
-        from_vn_kv = ppc_net['bus'][from_bus, 9]
-        to_vn_kv = ppc_net['bus'][to_bus, 9]
-        ratio = BRANCHES[2].at[i]
-        angle = BRANCHES[3].at[i]
-        # from line results
-        if (from_vn_kv == to_vn_kv) & ((ratio == 0) | (ratio == 1)) & (angle == 0):
-            pp_res["branch"] = append(pp_res["branch"], array(pp_net.res_line[
-                (pp_net.line.from_bus == from_bus) &
-                (pp_net.line.to_bus == to_bus)]
-                [['p_from_kw', 'q_from_kvar', 'p_to_kw', 'q_to_kvar']])[
-                int(already_used_branches.number.loc[
-                   (already_used_branches.from_bus == from_bus) &
-                   (already_used_branches.to_bus == to_bus)].values)].reshape(1, 4), 0)
-            already_used_branches.number.loc[(already_used_branches.from_bus == from_bus) &
-                                             (already_used_branches.to_bus == to_bus)] += 1
-        # from trafo results
-        else:
-            if from_vn_kv >= to_vn_kv:
-                pp_res["branch"] = append(pp_res["branch"], array(pp_net.res_trafo[
-                    (pp_net.trafo.hv_bus == from_bus) &
-                    (pp_net.trafo.lv_bus == to_bus)]
-                    [['p_hv_kw', 'q_hv_kvar', 'p_lv_kw', 'q_lv_kvar']])[
-                    int(already_used_branches.number.loc[
-                        (already_used_branches.hv_bus == from_bus) &
-                        (already_used_branches.lv_bus == to_bus)].values)].reshape(1, 4), 0)
-                already_used_branches.number.loc[(already_used_branches.hv_bus == from_bus) &
-                                                 (already_used_branches.lv_bus == to_bus)] += 1
-            else:  # switch hv-lv-connection of pypower connection buses
-                pp_res["branch"] = append(pp_res["branch"], array(pp_net.res_trafo[
-                    (pp_net.trafo.hv_bus == to_bus) &
-                    (pp_net.trafo.lv_bus == from_bus)]
-                    [['p_lv_kw', 'q_lv_kvar', 'p_hv_kw', 'q_hv_kvar']])[
-                    int(already_used_branches.number.loc[
-                        (already_used_branches.hv_bus == to_bus) &
-                        (already_used_branches.lv_bus == from_bus)].values)].reshape(1, 4), 0)
-                already_used_branches.number.loc[
-                    (already_used_branches.hv_bus == to_bus) &
-                    (already_used_branches.lv_bus == from_bus)] += 1
-    pp_res["branch"] = pp_res["branch"][1:, :]  # delete initial zero row
+    branch = ppc_net['branch']
+    bus_lookup = Series(pp_net.bus.index.values, index=pp_net.bus.name.values)
+    from_bus = bus_lookup.loc[branch[:, 0].astype(int)].values
+    to_bus = bus_lookup.loc[branch[:, 1].astype(int)].values
+    from_vn_kv = ppc_net['bus'][from_bus, 9]
+    to_vn_kv = ppc_net['bus'][to_bus, 9]
+    ratio = branch[:, 8]
+    is_line = (from_vn_kv == to_vn_kv) & ((ratio == 0) | (ratio == 1)) & (branch[:, 9] == 0)
+    is_trafo = ~is_line
+    pp_res["branch"] = zeros([len(branch), 4])
+    # consideration of parallel branches via counting the branches already considered at each
+    # node-to-node-connection
+    # from line results
+    buses = [from_bus[is_line], to_bus[is_line]]
+    pp_res["branch"][is_line] = _nth_parallel_results(
+        pp_net.line, ["from_bus", "to_bus"], pp_net.res_line,
+        ['p_from_kw', 'q_from_kvar', 'p_to_kw', 'q_to_kvar'], buses, _count_parallel(buses))
+    # from trafo results
+    hv_is_from = from_vn_kv[is_trafo] >= to_vn_kv[is_trafo]
+    buses = [where(hv_is_from, from_bus[is_trafo], to_bus[is_trafo]),
+             where(hv_is_from, to_bus[is_trafo], from_bus[is_trafo])]
+    res_trafo = _nth_parallel_results(
+        pp_net.trafo, ["hv_bus", "lv_bus"], pp_net.res_trafo,
+        ['p_hv_kw', 'q_hv_kvar', 'p_lv_kw', 'q_lv_kvar'], buses, _count_parallel(buses))
+    # switch hv-lv-connection of pypower connection buses
+    res_trafo[~hv_is_from] = res_trafo[~hv_is_from][:, [2, 3, 0, 1]]
+    pp_res["branch"][is_trafo] = res_trafo
 
     # --- do the powerflow result comparison
     diff_res = dict.fromkeys(ppc_elms)
@@ -558,14 +542,10 @@ def validate_from_ppc(ppc_net, pp_net, pf_type="runpp", max_diff_values={
     diff_res["branch"] = ppc_res["branch"] - pp_res["branch"] * 1e-3
     diff_res["gen"] = ppc_res["gen"] + pp_res["gen"] * 1e-3
     # comparison of buses with several generator units only as q sum
-    for i in GEN_uniq.loc[GEN_uniq[0].isin(change_q_compare)].index:
-        next_is = GEN_uniq.index[GEN_uniq.index > i]
-        if len(next_is) > 0:
-            next_i = next_is[0]
-        else:
-            next_i = GENS.index[-1] + 1
-        if (next_i - i) > 1:
-            diff_res["gen"][i:next_i, 1] = sum(diff_res["gen"][i:next_i, 1])
+    gen_bus = ppc_net['gen'][:, 0].astype(int)
+    several = isin(gen_bus, gen_bus[is_sgen])
+    diff_res["gen"][several, 1] = Series(diff_res["gen"][:, 1]).groupby(gen_bus).transform(
+        "sum").values[several]
     # logger info
     logger.debug("Maximum voltage magnitude difference between pypower and pandapower: "
                  "%.2e pu" % max_(abs(diff_res["bus"][:, 0])))
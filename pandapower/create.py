@@ -5,7 +5,7 @@
 
 
 import pandas as pd
-from numpy import nan, isnan, arange, dtype, zeros
+from numpy import nan, isnan, arange, dtype, zeros, isin, asarray, where, isscalar
 
 from pandapower.auxiliary import pandapowerNet, get_free_id, _preserve_dtypes
 from pandapower.results import reset_results
@@ -319,6 +319,97 @@ def create_empty_network(name="", f_hz=50., sn_kva=1e3):
     return net
 
 
+def _get_multiple_index_with_check(net, table, index, number, name=None):
+    """
+    Returns the indices of number new elements in net[table]. Given indices are checked in bulk,
+    otherwise the indices following the highest existing index are used.
+    """
+    if index is None:
+        bid = get_free_id(net[table])
+        return arange(bid, bid + number, 1)
+    index = asarray(index)
+    contained = isin(index, net[table].index.values)
+    if contained.any():
+        raise UserWarning("%s with indexes %s already exist" % (name or table, index[contained]))
+    return index
+
+
+def _check_multiple_node_elements(net, buses, name="elements"):
+    """
+    Raises a UserWarning if any of the buses does not exist.
+    """
+    missing = ~isin(buses, net["bus"].index.values)
+    if missing.any():
+        raise UserWarning("Cannot attach %s to buses %s, buses do not exist"
+                          % (name, asarray(buses)[missing]))
+
+
+def _to_values(values, number):
+    """
+    Returns array-like parameters of the bulk create functions as arrays and broadcasts scalars.
+    """
+    if isscalar(values) or values is None:
+        return [values] * number
+    values = asarray(values)
+    if len(values) != number:
+        raise UserWarning("Parameters must be scalar or have the length of the elements (%u)"
+                          % number)
+    return values
+
+
+def _add_multiple_optional_entries(net, table, entries, number, column, values, dtyp=float,
+                                   default_val=nan):
+    """
+    Adds an optional column (e.g. OPF limits) to the entries if any value is given or the column
+    already exists in net[table].
+    """
+    values = _to_values(values, number)
+    if column not in net[table].columns and pd.isnull(values).all():
+        return
+    values = pd.Series(values)
+    if not pd.isnull(default_val):
+        values = values.fillna(default_val)
+    entries[column] = values.values.astype(dtyp)
+
+
+def _add_multiple_elements(net, table, index, entries):
+    """
+    Appends the elements defined by entries (column -> scalar or array) to net[table] at once and
+    preserves the dtypes of the existing columns. Columns which are not yet part of the table
+    are appended.
+    """
+    dtypes = net[table].dtypes
+    entries = {column: _to_values(values, len(index)) for column, values in entries.items()}
+    dd = pd.DataFrame(entries, index=index)
+    columns = net[table].columns.tolist() + [c for c in dd.columns if c not in net[table].columns]
+    if len(net[table]) == 0:
+        # new columns of an empty table get the dtypes of the new elements
+        dtypes = dtypes.append(dd.dtypes[~dd.columns.isin(dtypes.index)])
+    net[table] = pd.concat([net[table].reindex(columns=columns), dd.reindex(columns=columns)])
+    _preserve_dtypes(net[table], dtypes)
+
+
+def _std_type_parameters(net, std_type, element, number):
+    """
+    Returns the standard type parameters of all elements as a DataFrame with one row per element.
+    """
+    std_types = pd.Series(_to_values(std_type, number))
+    library = pd.DataFrame(net.std_types[element]).T
+    unknown = ~std_types.isin(library.index)
+    if unknown.any():
+        raise UserWarning("Unknown standard %s types %s" % (element, std_types[unknown].unique()))
+    return library.loc[std_types.values].reset_index(drop=True)
+
+
+def _std_type_column(parameters, column, default_val=nan, dtyp=float):
+    if column not in parameters.columns:
+        return zeros(len(parameters), dtype=dtyp) + default_val
+    values = parameters[column]
+    if not pd.isnull(default_val):
+        values = values.fillna(default_val)
+    return values.values.astype(dtyp)
+
+
 def create_bus(net, vn_kv, name=None, index=None, geodata=None, type="b",
                zone=None, in_service=True, max_vm_pu=nan,
                min_vm_pu=nan, **kwargs):
@@ -399,7 +490,9 @@ def create_buses(net, nr_buses, vn_kv, index=None, name=None, type="b", geodata=
                     zone=None, in_service=True, max_vm_pu=nan, min_vm_pu=nan)
     Adds several buses in table net["bus"] at once.
 
-    Busses are the nodal points of the network that all other elements connect to.
+    Busses are the nodal points of the network that all other elements connect to. All
+    parameters except geodata can be given as scalars, which are used for all buses, or as arrays
+    with one value per bus.
 
     Input:
         **net** (pandapowerNet) - The pandapower network in which the element is created
@@ -433,44 +526,19 @@ def create_buses(net, nr_buses, vn_kv, index=None, name=None, type="b", geodata=
     EXAMPLE:
         create_bus(net, name = "bus1")
     """
-    if index is not None:
-        for idx in index:
-            if idx in net.bus.index:
-                raise UserWarning("A bus with index %s already exists" % index)
-    else:
-        bid = get_free_id(net["bus"])
-        index = arange(bid, bid + nr_buses, 1)
+    index = _get_multiple_index_with_check(net, "bus", index, nr_buses, "Buses")
 
-    # TODO: not needed when concating anyways?
-    # store dtypes
-    # dtypes = net.bus.dtypes
-
-    dd = pd.DataFrame(index=index, columns=net.bus.columns)
-    dd["vn_kv"] = vn_kv
-    dd["type"] = type
-    dd["zone"] = zone
-    dd["in_service"] = in_service
-    dd["name"] = name
-    net["bus"] = net["bus"].append(dd)[net["bus"].columns.tolist()]
-    # and preserve dtypes
-    # _preserve_dtypes(net.bus, dtypes)
+    entries = {"name": name, "vn_kv": vn_kv, "type": type, "zone": zone,
+               "in_service": asarray(_to_values(in_service, nr_buses), bool)}
+    for column, values in (("min_vm_pu", min_vm_pu), ("max_vm_pu", max_vm_pu)):
+        _add_multiple_optional_entries(net, "bus", entries, nr_buses, column, values)
+    _add_multiple_elements(net, "bus", index, entries)
 
     if geodata is not None:
         # works with a 2-tuple or a matching array
         net.bus_geodata = net.bus_geodata.append(pd.DataFrame(index=index,
                                                               columns=net.bus_geodata.columns))
         net.bus_geodata.loc[index, ["x", "y"]] = geodata
-    if not isnan(min_vm_pu):
-        if "min_vm_pu" not in net.bus.columns:
-            net.bus.loc[:, "min_vm_pu"] = pd.Series()
-
-        net.bus.loc[index, "min_vm_pu"] = float(min_vm_pu)
-
-    if not isnan(max_vm_pu):
-        if "max_vm_pu" not in net.bus.columns:
-            net.bus.loc[:, "max_vm_pu"] = pd.Series()
-
-        net.bus.loc[index, "max_vm_pu"] = float(max_vm_pu)
 
     return index
 
@@ -598,6 +666,57 @@ def create_load(net, bus, p_kw, q_kvar=0, const_z_percent=0, const_i_percent=0,
     return index
 
 
+def create_loads(net, buses, p_kw, q_kvar=0, const_z_percent=0, const_i_percent=0, sn_kva=nan,
+                 name=None, scaling=1., index=None, in_service=True, type=None, max_p_kw=nan,
+                 min_p_kw=nan, max_q_kvar=nan, min_q_kvar=nan, controllable=nan):
+    """create_loads(net, buses, p_kw, q_kvar=0, const_z_percent=0, const_i_percent=0, sn_kva=nan, \
+                    name=None, scaling=1., index=None, in_service=True, type=None, max_p_kw=nan, \
+                    min_p_kw=nan, max_q_kvar=nan, min_q_kvar=nan, controllable=nan)
+    Adds several loads in table net["load"] at once.
+
+    All parameters can be given as scalars, which are used for all loads, or as arrays with one
+    value per load. See create_load for the description of the parameters.
+
+    INPUT:
+        **net** - The net within this load should be created
+
+        **buses** (list of int) - The bus ids to which the loads are connected
+
+        **p_kw** (list of float) - The real power of the loads
+
+    OPTIONAL:
+        **q_kvar**, **const_z_percent**, **const_i_percent**, **sn_kva**, **name**, \
+            **scaling**, **in_service**, **type**, **max_p_kw**, **min_p_kw**, **max_q_kvar**, \
+            **min_q_kvar**, **controllable** - see create_load
+
+        **index** (list of int, None) - Force the specified IDs if they are available. If None, \
+            the indices higher than the highest already existing index are selected.
+
+    OUTPUT:
+        **index** (array of int) - The unique IDs of the created elements
+
+    EXAMPLE:
+        create_loads(net, buses=[0, 1], p_kw=[10., 20.], q_kvar=2.)
+
+    """
+    buses = asarray(buses)
+    _check_multiple_node_elements(net, buses, "loads")
+    index = _get_multiple_index_with_check(net, "load", index, len(buses), "Loads")
+
+    entries = {"name": name, "bus": buses, "p_kw": p_kw, "const_z_percent": const_z_percent,
+               "const_i_percent": const_i_percent, "scaling": scaling, "q_kvar": q_kvar,
+               "sn_kva": sn_kva, "in_service": asarray(_to_values(in_service, len(buses)), bool),
+               "type": type}
+    for column, values in (("min_p_kw", min_p_kw), ("max_p_kw", max_p_kw),
+                           ("min_q_kvar", min_q_kvar), ("max_q_kvar", max_q_kvar)):
+        _add_multiple_optional_entries(net, "load", entries, len(buses), column, values)
+    _add_multiple_optional_entries(net, "load", entries, len(buses), "controllable", controllable,
+                                   dtyp=bool, default_val=False)
+
+    _add_multiple_elements(net, "load", index, entries)
+    return index
+
+
 def create_load_from_cosphi(net, bus, sn_kva, cos_phi, mode, **kwargs):
     """
     Creates a load element from rated power and power factor cos(phi).
@@ -762,6 +881,59 @@ def create_sgen(net, bus, p_kw, q_kvar=0, sn_kva=nan, name=None, index=None,
     return index
 
 
+def create_sgens(net, buses, p_kw, q_kvar=0, sn_kva=nan, name=None, index=None, scaling=1.,
+                 type=None, in_service=True, max_p_kw=nan, min_p_kw=nan, max_q_kvar=nan,
+                 min_q_kvar=nan, controllable=nan, k=nan, rx=nan):
+    """create_sgens(net, buses, p_kw, q_kvar=0, sn_kva=nan, name=None, index=None, scaling=1., \
+                    type=None, in_service=True, max_p_kw=nan, min_p_kw=nan, max_q_kvar=nan, \
+                    min_q_kvar=nan, controllable=nan, k=nan, rx=nan)
+    Adds several static generators in table net["sgen"] at once.
+
+    All parameters can be given as scalars, which are used for all static generators, or as
+    arrays with one value per static generator. See create_sgen for the description of the
+    parameters.
+
+    INPUT:
+        **net** - The net within this static generator should be created
+
+        **buses** (list of int) - The bus ids to which the static generators are connected
+
+        **p_kw** (list of float) - The real power of the static generators (negative for \
+            generation!)
+
+    OPTIONAL:
+        **q_kvar**, **sn_kva**, **name**, **scaling**, **type**, **in_service**, **max_p_kw**, \
+            **min_p_kw**, **max_q_kvar**, **min_q_kvar**, **controllable**, **k**, **rx** - see \
+            create_sgen
+
+        **index** (list of int, None) - Force the specified IDs if they are available. If None, \
+            the indices higher than the highest already existing index are selected.
+
+    OUTPUT:
+        **index** (array of int) - The unique IDs of the created elements
+
+    EXAMPLE:
+        create_sgens(net, buses=[1, 2], p_kw=-120)
+
+    """
+    buses = asarray(buses)
+    _check_multiple_node_elements(net, buses, "static generators")
+    index = _get_multiple_index_with_check(net, "sgen", index, len(buses), "Static generators")
+
+    entries = {"name": name, "bus": buses, "p_kw": p_kw, "scaling": scaling, "q_kvar": q_kvar,
+               "sn_kva": sn_kva, "in_service": asarray(_to_values(in_service, len(buses)), bool),
+               "type": type}
+    for column, values in (("min_p_kw", min_p_kw), ("max_p_kw", max_p_kw),
+                           ("min_q_kvar", min_q_kvar), ("max_q_kvar", max_q_kvar),
+                           ("k", k), ("rx", rx)):
+        _add_multiple_optional_entries(net, "sgen", entries, len(buses), column, values)
+    _add_multiple_optional_entries(net, "sgen", entries, len(buses), "controllable", controllable,
+                                   dtyp=bool, default_val=False)
+
+    _add_multiple_elements(net, "sgen", index, entries)
+    return index
+
+
 def create_sgen_from_cosphi(net, bus, sn_kva, cos_phi, mode, **kwargs):
     """
     Creates an sgen element from rated power and power factor cos(phi).
@@ -1268,6 +1440,79 @@ def create_line(net, from_bus, to_bus, length_km, std_type, name=None, index=Non
     return index
 
 
+def create_lines(net, from_buses, to_buses, length_km, std_type, name=None, index=None,
+                 geodata=None, df=1., parallel=1, in_service=True, max_loading_percent=nan):
+    """create_lines(net, from_buses, to_buses, length_km, std_type, name=None, index=None, \
+                    geodata=None, df=1., parallel=1, in_service=True, max_loading_percent=nan)
+    Creates several line elements in net["line"] at once.
+    The line parameters are defined through the standard type library, all standard types are
+    resolved in one step.
+
+    All parameters can be given as scalars, which are used for all lines, or as arrays with one
+    value per line. See create_line for the description of the parameters.
+
+    INPUT:
+        **net** - The net within this line should be created
+
+        **from_buses** (list of int) - IDs of the buses on one side which the lines will be \
+            connected with
+
+        **to_buses** (list of int) - IDs of the buses on the other side which the lines will be \
+            connected with
+
+        **length_km** (list of float) - The line lengths in km
+
+        **std_type** (string or list of string) - The linetypes of the lines
+
+    OPTIONAL:
+        **name**, **df**, **parallel**, **in_service**, **max_loading_percent** - see \
+            create_line
+
+        **index** (list of int, None) - Force the specified IDs if they are available. If None, \
+            the indices higher than the highest already existing index are selected.
+
+        **geodata** (list of arrays, default None) - The linegeodata of each line
+
+    OUTPUT:
+        **index** (array of int) - The unique IDs of the created lines
+
+    EXAMPLE:
+        create_lines(net, from_buses=[0, 1], to_buses=[1, 2], length_km=0.1, \
+            std_type="NAYY 4x50 SE")
+
+    """
+    from_buses, to_buses = asarray(from_buses), asarray(to_buses)
+    _check_multiple_node_elements(net, from_buses, "lines")
+    _check_multiple_node_elements(net, to_buses, "lines")
+    index = _get_multiple_index_with_check(net, "line", index, len(from_buses), "Lines")
+
+    lineparam = _std_type_parameters(net, std_type, "line", len(from_buses))
+    entries = {"name": name, "length_km": length_km, "from_bus": from_buses, "to_bus": to_buses,
+               "in_service": asarray(_to_values(in_service, len(from_buses)), bool),
+               "std_type": std_type, "df": df, "parallel": parallel,
+               "r_ohm_per_km": _std_type_column(lineparam, "r_ohm_per_km"),
+               "x_ohm_per_km": _std_type_column(lineparam, "x_ohm_per_km"),
+               "c_nf_per_km": _std_type_column(lineparam, "c_nf_per_km"),
+               "max_i_ka": _std_type_column(lineparam, "max_i_ka"),
+               "g_us_per_km": _std_type_column(lineparam, "g_us_per_km", default_val=0.)}
+    if "type" in lineparam.columns:
+        entries["type"] = lineparam["type"].values
+    _add_multiple_optional_entries(net, "line", entries, len(from_buses), "max_loading_percent",
+                                   max_loading_percent)
+
+    _add_multiple_elements(net, "line", index, entries)
+    _add_multiple_line_geodata(net, index, geodata)
+    return index
+
+
+def _add_multiple_line_geodata(net, index, geodata):
+    if geodata is None:
+        return
+    geo = pd.DataFrame(index=index, columns=net["line_geodata"].columns)
+    geo["coords"] = pd.Series([list(coords) for coords in geodata], index=index)
+    net["line_geodata"] = pd.concat([net["line_geodata"], geo])
+
+
 def create_line_from_parameters(net, from_bus, to_bus, length_km, r_ohm_per_km, x_ohm_per_km,
                                 c_nf_per_km, max_i_ka, name=None, index=None, type=None,
                                 geodata=None, in_service=True, df=1., parallel=1, g_us_per_km=0.,
@@ -1370,6 +1615,66 @@ def create_line_from_parameters(net, from_bus, to_bus, length_km, r_ohm_per_km,
     return index
 
 
+def create_lines_from_parameters(net, from_buses, to_buses, length_km, r_ohm_per_km,
+                                 x_ohm_per_km, c_nf_per_km, max_i_ka, name=None, index=None,
+                                 type=None, geodata=None, in_service=True, df=1., parallel=1,
+                                 g_us_per_km=0., max_loading_percent=nan):
+    """create_lines_from_parameters(net, from_buses, to_buses, length_km, r_ohm_per_km, \
+                                    x_ohm_per_km, c_nf_per_km, max_i_ka, name=None, index=None, \
+                                    type=None, geodata=None, in_service=True, df=1., parallel=1, \
+                                    g_us_per_km=0., max_loading_percent=nan)
+    Creates several line elements in net["line"] from line parameters at once.
+
+    All parameters can be given as scalars, which are used for all lines, or as arrays with one
+    value per line. See create_line_from_parameters for the description of the parameters.
+
+    INPUT:
+        **net** - The net within this line should be created
+
+        **from_buses** (list of int) - IDs of the buses on one side which the lines will be \
+            connected with
+
+        **to_buses** (list of int) - IDs of the buses on the other side which the lines will be \
+            connected with
+
+        **length_km**, **r_ohm_per_km**, **x_ohm_per_km**, **c_nf_per_km**, **max_i_ka** - see \
+            create_line_from_parameters
+
+    OPTIONAL:
+        **name**, **type**, **in_service**, **df**, **parallel**, **g_us_per_km**, \
+            **max_loading_percent** - see create_line_from_parameters
+
+        **index** (list of int, None) - Force the specified IDs if they are available. If None, \
+            the indices higher than the highest already existing index are selected.
+
+        **geodata** (list of arrays, default None) - The linegeodata of each line
+
+    OUTPUT:
+        **index** (array of int) - The unique IDs of the created lines
+
+    EXAMPLE:
+        create_lines_from_parameters(net, from_buses=[0, 1], to_buses=[1, 2], length_km=0.1, \
+            r_ohm_per_km=.01, x_ohm_per_km=0.05, c_nf_per_km=10, max_i_ka=0.4)
+
+    """
+    from_buses, to_buses = asarray(from_buses), asarray(to_buses)
+    _check_multiple_node_elements(net, from_buses, "lines")
+    _check_multiple_node_elements(net, to_buses, "lines")
+    index = _get_multiple_index_with_check(net, "line", index, len(from_buses), "Lines")
+
+    entries = {"name": name, "length_km": length_km, "from_bus": from_buses, "to_bus": to_buses,
+               "in_service": asarray(_to_values(in_service, len(from_buses)), bool),
+               "std_type": None, "df": df, "r_ohm_per_km": r_ohm_per_km,
+               "x_ohm_per_km": x_ohm_per_km, "c_nf_per_km": c_nf_per_km, "max_i_ka": max_i_ka,
+               "parallel": parallel, "type": type, "g_us_per_km": g_us_per_km}
+    _add_multiple_optional_entries(net, "line", entries, len(from_buses), "max_loading_percent",
+                                   max_loading_percent)
+
+    _add_multiple_elements(net, "line", index, entries)
+    _add_multiple_line_geodata(net, index, geodata)
+    return index
+
+
 def create_transformer(net, hv_bus, lv_bus, std_type, name=None, tp_pos=nan, in_service=True,
                        index=None, max_loading_percent=nan, parallel=1, df=1.):
     """create_transformer(net, hv_bus, lv_bus, std_type, name=None, tp_pos=nan, in_service=True, \
@@ -1477,6 +1782,73 @@ def create_transformer(net, hv_bus, lv_bus, std_type, name=None, tp_pos=nan, in_
     return index
 
 
+def create_transformers(net, hv_buses, lv_buses, std_type, name=None, tp_pos=nan,
+                        in_service=True, index=None, max_loading_percent=nan, parallel=1, df=1.):
+    """create_transformers(net, hv_buses, lv_buses, std_type, name=None, tp_pos=nan, \
+                           in_service=True, index=None, max_loading_percent=nan, parallel=1, df=1.)
+    Creates several two-winding transformers in table net["trafo"] at once.
+    The trafo parameters are defined through the standard type library, all standard types are
+    resolved in one step.
+
+    All parameters can be given as scalars, which are used for all transformers, or as arrays
+    with one value per transformer. See create_transformer for the description of the
+    parameters.
+
+    INPUT:
+        **net** - The net within this transformer should be created
+
+        **hv_buses** (list of int) - The buses on the high-voltage side on which the \
+            transformers will be connected to
+
+        **lv_buses** (list of int) - The buses on the low-voltage side on which the \
+            transformers will be connected to
+
+        **std_type** (string or list of string) -  The used standard types from the standard \
+            type library
+
+    OPTIONAL:
+        **name**, **tp_pos**, **in_service**, **max_loading_percent**, **parallel**, **df** - \
+            see create_transformer
+
+        **index** (list of int, None) - Force the specified IDs if they are available. If None, \
+            the indices higher than the highest already existing index are selected.
+
+    OUTPUT:
+        **index** (array of int) - The unique IDs of the created transformers
+
+    EXAMPLE:
+        create_transformers(net, hv_buses=[0, 0], lv_buses=[1, 2], \
+            std_type="0.4 MVA 10/0.4 kV")
+    """
+    hv_buses, lv_buses = asarray(hv_buses), asarray(lv_buses)
+    _check_multiple_node_elements(net, hv_buses, "transformers")
+    _check_multiple_node_elements(net, lv_buses, "transformers")
+    if (asarray(df) <= 0).any():
+        raise UserWarning("raiting factor df must be positive: df = %s" % df)
+    index = _get_multiple_index_with_check(net, "trafo", index, len(hv_buses), "Transformers")
+
+    ti = _std_type_parameters(net, std_type, "trafo", len(hv_buses))
+    entries = {"name": name, "hv_bus": hv_buses, "lv_bus": lv_buses,
+               "in_service": asarray(_to_values(in_service, len(hv_buses)), bool),
+               "std_type": std_type, "parallel": parallel, "df": df,
+               "shift_degree": _std_type_column(ti, "shift_degree", default_val=0.),
+               "tp_phase_shifter": _std_type_column(ti, "tp_phase_shifter", default_val=False,
+                                                    dtyp=bool)}
+    for column in ("sn_kva", "vn_hv_kv", "vn_lv_kv", "vsc_percent", "vscr_percent", "pfe_kw",
+                   "i0_percent", "tp_mid", "tp_max", "tp_min", "tp_st_percent", "tp_st_degree"):
+        if column in ti.columns:
+            entries[column] = _std_type_column(ti, column)
+    if "tp_side" in ti.columns:
+        entries["tp_side"] = ti["tp_side"].values
+    tp_pos = asarray(_to_values(tp_pos, len(hv_buses)), dtype=float)
+    entries["tp_pos"] = where(isnan(tp_pos), entries.get("tp_mid", nan), tp_pos)
+    _add_multiple_optional_entries(net, "trafo", entries, len(hv_buses), "max_loading_percent",
+                                   max_loading_percent)
+
+    _add_multiple_elements(net, "trafo", index, entries)
+    return index
+
+
 def create_transformer_from_parameters(net, hv_bus, lv_bus, sn_kva, vn_hv_kv, vn_lv_kv,
                                        vscr_percent, vsc_percent, pfe_kw, i0_percent,
                                        shift_degree=0, tp_side=None, tp_mid=nan, tp_max=nan,
@@ -1613,6 +1985,79 @@ def create_transformer_from_parameters(net, hv_bus, lv_bus, sn_kva, vn_hv_kv, vn
     return index
 
 
+def create_transformers_from_parameters(net, hv_buses, lv_buses, sn_kva, vn_hv_kv, vn_lv_kv,
+                                        vscr_percent, vsc_percent, pfe_kw, i0_percent,
+                                        shift_degree=0, tp_side=None, tp_mid=nan, tp_max=nan,
+                                        tp_min=nan, tp_st_percent=nan, tp_st_degree=nan,
+                                        tp_pos=nan, tp_phase_shifter=False, in_service=True,
+                                        name=None, index=None, max_loading_percent=nan,
+                                        parallel=1, df=1.):
+    """create_transformers_from_parameters(net, hv_buses, lv_buses, sn_kva, vn_hv_kv, vn_lv_kv, \
+                                           vscr_percent, vsc_percent, pfe_kw, i0_percent, \
+                                           shift_degree=0, tp_side=None, tp_mid=nan, \
+                                           tp_max=nan, tp_min=nan, tp_st_percent=nan, \
+                                           tp_st_degree=nan, tp_pos=nan, tp_phase_shifter=False, \
+                                           in_service=True, name=None, index=None, \
+                                           max_loading_percent=nan, parallel=1, df=1.)
+    Creates several two-winding transformers in table net["trafo"] from parameters at once.
+
+    All parameters can be given as scalars, which are used for all transformers, or as arrays
+    with one value per transformer. See create_transformer_from_parameters for the description
+    of the parameters.
+
+    INPUT:
+        **net** - The net within this transformer should be created
+
+        **hv_buses** (list of int) - The buses on the high-voltage side on which the \
+            transformers will be connected to
+
+        **lv_buses** (list of int) - The buses on the low-voltage side on which the \
+            transformers will be connected to
+
+        **sn_kva**, **vn_hv_kv**, **vn_lv_kv**, **vscr_percent**, **vsc_percent**, **pfe_kw**, \
+            **i0_percent** - see create_transformer_from_parameters
+
+    OPTIONAL:
+        **shift_degree**, **tp_side**, **tp_mid**, **tp_max**, **tp_min**, **tp_st_percent**, \
+            **tp_st_degree**, **tp_pos**, **tp_phase_shifter**, **in_service**, **name**, \
+            **max_loading_percent**, **parallel**, **df** - see \
+            create_transformer_from_parameters
+
+        **index** (list of int, None) - Force the specified IDs if they are available. If None, \
+            the indices higher than the highest already existing index are selected.
+
+    OUTPUT:
+        **index** (array of int) - The unique IDs of the created transformers
+
+    EXAMPLE:
+        create_transformers_from_parameters(net, hv_buses=[0, 0], lv_buses=[1, 2], sn_kva=40, \
+            vn_hv_kv=110, vn_lv_kv=10, vsc_percent=10, vscr_percent=0.3, pfe_kw=30, \
+            i0_percent=0.1)
+    """
+    hv_buses, lv_buses = asarray(hv_buses), asarray(lv_buses)
+    _check_multiple_node_elements(net, hv_buses, "transformers")
+    _check_multiple_node_elements(net, lv_buses, "transformers")
+    if (asarray(df) <= 0).any():
+        raise UserWarning("derating factor df must be positive: df = %s" % df)
+    index = _get_multiple_index_with_check(net, "trafo", index, len(hv_buses), "Transformers")
+
+    tp_mid = asarray(_to_values(tp_mid, len(hv_buses)), dtype=float)
+    tp_pos = asarray(_to_values(tp_pos, len(hv_buses)), dtype=float)
+    entries = {"name": name, "hv_bus": hv_buses, "lv_bus": lv_buses,
+               "in_service": asarray(_to_values(in_service, len(hv_buses)), bool),
+               "std_type": None, "sn_kva": sn_kva, "vn_hv_kv": vn_hv_kv, "vn_lv_kv": vn_lv_kv,
+               "vsc_percent": vsc_percent, "vscr_percent": vscr_percent, "pfe_kw": pfe_kw,
+               "i0_percent": i0_percent, "tp_mid": tp_mid, "tp_max": tp_max, "tp_min": tp_min,
+               "shift_degree": shift_degree, "tp_side": tp_side, "tp_st_percent": tp_st_percent,
+               "tp_st_degree": tp_st_degree, "tp_phase_shifter": tp_phase_shifter,
+               "parallel": parallel, "df": df, "tp_pos": where(isnan(tp_pos), tp_mid, tp_pos)}
+    _add_multiple_optional_entries(net, "trafo", entries, len(hv_buses), "max_loading_percent",
+                                   max_loading_percent)
+
+    _add_multiple_elements(net, "trafo", index, entries)
+    return index
+
+
 def create_transformer3w(net, hv_bus, mv_bus, lv_bus, std_type, name=None, tp_pos=nan,
                          in_service=True, index=None, max_loading_percent=nan,
                          tap_at_star_point=False):
@@ -1959,6 +2404,68 @@ def create_switch(net, bus, element, et, closed=True, type=None, name=None, inde
     return index
 
 
+def create_switches(net, buses, elements, et, closed=True, type=None, name=None, index=None):
+    """
+    Adds several switches in the net["switch"] table at once.
+
+    All parameters can be given as scalars, which are used for all switches, or as arrays with one
+    value per switch. The buses and elements are checked in bulk, see create_switch for the
+    description of the parameters.
+
+    INPUT:
+        **net** (pandapowerNet) - The net within this switches should be created
+
+        **buses** (list of int) - The buses that the switches are connected to
+
+        **elements** (list of int) - indices of the elements: bus id if et == "b", line id if \
+            et == "l", trafo id if et == "t"
+
+        **et** - (string or list of string) element types: "l" = switch between bus and line, \
+            "t" = switch between bus and transformer, "b" = switch between two buses
+
+    OPTIONAL:
+        **closed**, **type**, **name** - see create_switch
+
+        **index** (list of int, None) - Force the specified IDs if they are available. If None, \
+            the indices higher than the highest already existing index are selected.
+
+    OUTPUT:
+        **index** (array of int) - The unique IDs of the created switches
+
+    EXAMPLE:
+        create_switches(net, buses=[0, 1], elements=[1, 0], et="l")
+
+    """
+    buses, elements = asarray(buses), asarray(elements)
+    et = asarray(_to_values(et, len(buses)))
+    if not isin(buses, net["bus"].index.values).all():
+        raise UserWarning("Unknown bus index")
+    if (et == "t3").any():
+        raise NotImplementedError("Switches for three winding transformers are not implemented")
+    if not isin(et, ["l", "t", "b"]).all():
+        raise UserWarning("Unknown element type")
+    if not isin(elements[et == "b"], net["bus"].index.values).all():
+        raise UserWarning("Unknown bus index")
+    for elm_tab, elm_et, bus_columns in (("line", "l", ("from_bus", "to_bus")),
+                                         ("trafo", "t", ("hv_bus", "lv_bus"))):
+        is_elm = et == elm_et
+        if not is_elm.any():
+            continue
+        if not isin(elements[is_elm], net[elm_tab].index.values).all():
+            raise UserWarning("Unknown %s index" % elm_tab)
+        connected = (net[elm_tab][bus_columns[0]].loc[elements[is_elm]].values == buses[is_elm]) |\
+                    (net[elm_tab][bus_columns[1]].loc[elements[is_elm]].values == buses[is_elm])
+        if not connected.all():
+            raise UserWarning("%s %s not connected to buses %s" % (
+                elm_tab.capitalize(), elements[is_elm][~connected], buses[is_elm][~connected]))
+    index = _get_multiple_index_with_check(net, "switch", index, len(buses), "Switches")
+
+    entries = {"bus": buses, "element": elements, "et": et, "closed": closed, "type": type,
+               "name": name}
+    _add_multiple_elements(net, "switch", index, entries)
+    return index
+
+
 def create_shunt(net, bus, q_kvar, p_kw=0., vn_kv=None, step=1, max_step=1, name=None,
                  in_service=True, index=None):
     """create_shunt(net, bus, q_kvar, p_kw=0., vn_kv=None, step=1, max_step=nan, name=None,
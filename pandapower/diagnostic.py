@@ -7,6 +7,9 @@
 
 
 import copy
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
 import pandas as pd
 import numpy as np
 import pandapower as pp
@@ -18,7 +21,6 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-import pandapower.topology as top
 from pandapower.run import runpp
 from pandapower.diagnostic_reports import diagnostic_report
 from pandapower.toolbox import get_connected_elements
@@ -30,10 +32,16 @@ log_message_sep = ("\n --------\n")
 
 def diagnostic(net, report_style='detailed', warnings_only=False, return_result_dict=True,
                overload_scaling_factor=0.001, min_r_ohm=0.001, min_x_ohm=0.001, min_r_pu=1e-05,
-               min_x_pu=1e-05, nom_voltage_tolerance=0.3, numba_tolerance=1e-05):
+               min_x_pu=1e-05, nom_voltage_tolerance=0.3, numba_tolerance=1e-05, fast=False,
+               n_workers=None):
     """
     Tool for diagnosis of pandapower networks. Identifies possible reasons for non converging loadflows.
 
+    The graph of the network and one base case power flow are computed once in a
+    DiagnosticContext, which is shared by all checks. The checks without power flow calculations
+    run concurrently in a thread pool, the checks that modify the net (overload,
+    wrong_switch_configuration, impedance_values_close_to_zero, numba_comparison) run afterwards.
+
     INPUT:
      **net** (pandapowerNet) : pandapower network
 
@@ -70,6 +78,12 @@ def diagnostic(net, report_style='detailed', warnings_only=False, return_result_
      - **nom_voltage_tolerance** (float, 0.3): highest allowed relative deviation between nominal \
      voltages and bus voltages
 
+     - **fast** (boolean, False): pre-flight profile, the base case power flow and the power flow \
+     checks are only run if none of the other checks found an issue. numba_comparison is skipped.
+
+     - **n_workers** (int, None): number of threads for the checks without power flow \
+     calculations. If None, the number of CPUs is used, 1 runs all checks sequentially.
+
     OUTPUT:
      - **diag_results** (dict): dict that contains the indices of all elements where errors were found
 
@@ -79,33 +93,9 @@ def diagnostic(net, report_style='detailed', warnings_only=False, return_result_
 
     <<< pandapower.diagnostic(net, report_style='compact', warnings_only=True)
 
-    """
-    diag_functions = ["missing_bus_indices(net)",
-                      "disconnected_elements(net)",
-                      "different_voltage_levels_connected(net)",
-                      "impedance_values_close_to_zero(net, min_r_ohm, min_x_ohm, min_r_pu, min_x_pu)",
-                      "nominal_voltages_dont_match(net, nom_voltage_tolerance)",
-                      "invalid_values(net)",
-                      "overload(net, overload_scaling_factor)",
-                      "wrong_switch_configuration(net)",
-                      "multiple_voltage_controlling_elements_per_bus(net)",
-                      "no_ext_grid(net)",
-                      "wrong_reference_system(net)",
-                      "deviation_from_std_type(net)",
-                      "numba_comparison(net, numba_tolerance)",
-                      "parallel_switches(net)"]
-
-    diag_results = {}
-    diag_errors = {}
-    for diag_function in diag_functions:
-        try:
-            diag_result = eval(diag_function)
-            if not diag_result == None:
-                diag_results[diag_function.split("(")[0]] = diag_result
-        except Exception as e:
-            diag_errors[diag_function.split("(")[0]] = e
-
+    <<< pandapower.diagnostic(net, report_style=None, fast=True)
 
+    """
     diag_params = {
         "overload_scaling_factor": overload_scaling_factor,
         "min_r_ohm": min_r_ohm,
@@ -115,6 +105,46 @@ def diagnostic(net, report_style='detailed', warnings_only=False, return_result_
         "nom_voltage_tolerance": nom_voltage_tolerance,
         "numba_tolerance": numba_tolerance
     }
+    context = DiagnosticContext(net, power_flow=False)
+    # checks without power flow calculations, which do not modify the net
+    static_checks = [(missing_bus_indices, (net,)),
+                     (disconnected_elements, (net, context)),
+                     (different_voltage_levels_connected, (net,)),
+                     (nominal_voltages_dont_match, (net, nom_voltage_tolerance)),
+                     (invalid_values, (net,)),
+                     (multiple_voltage_controlling_elements_per_bus, (net,)),
+                     (no_ext_grid, (net,)),
+                     (wrong_reference_system, (net,)),
+                     (deviation_from_std_type, (net,)),
+                     (parallel_switches, (net,))]
+    # checks which run power flows on the net
+    power_flow_checks = [(impedance_values_close_to_zero,
+                          (net, min_r_ohm, min_x_ohm, min_r_pu, min_x_pu, context)),
+                         (overload, (net, overload_scaling_factor, context)),
+                         (wrong_switch_configuration, (net, context))]
+    if not fast:
+        power_flow_checks.append((numba_comparison, (net, numba_tolerance, context)))
+
+    diag_results = {}
+    diag_errors = {}
+    if n_workers is None:
+        n_workers = multiprocessing.cpu_count()
+    n_workers = max(1, min(n_workers, len(static_checks)))
+    if n_workers == 1:
+        check_results = [_run_check(check) for check in static_checks]
+    else:
+        pool = ThreadPool(n_workers)
+        try:
+            check_results = pool.map(_run_check, static_checks)
+        finally:
+            pool.terminate()
+    _collect_check_results(check_results, diag_results, diag_errors)
+
+    if not (fast and (diag_results or diag_errors)):
+        context.run_power_flow(net)
+        _collect_check_results([_run_check(check) for check in power_flow_checks],
+                               diag_results, diag_errors)
+
     if warnings_only:
         logger.setLevel(logging.WARNING)
     else:
@@ -129,6 +159,83 @@ def diagnostic(net, report_style='detailed', warnings_only=False, return_result_
         return diag_results
 
 
+class DiagnosticContext(object):
+    """
+    Analysis data which is shared by the diagnostic checks: the graph of the network with its
+    connected components and the base case power flow. The power flow results are kept as
+    copies of the result tables.
+    """
+
+    def __init__(self, net, power_flow=True):
+        import pandapower.topology as top
+        try:
+            self.graph = top.create_nxgraph(net)
+            self.sections = list(top.connected_components(self.graph))
+            self.graph_error = None
+        except Exception as e:
+            # raised again by the checks which use the graph
+            self.graph, self.sections, self.graph_error = None, None, e
+        self.pf_error = None
+        self.pf_results = None
+        if power_flow:
+            self.run_power_flow(net)
+
+    def run_power_flow(self, net):
+        try:
+            runpp(net)
+            self.pf_results = _result_tables(net)
+        except Exception as e:
+            self.pf_error = e
+
+    def power_flow_converges(self, catch=Exception):
+        """
+        Returns if the base case power flow converged. Errors which are not an instance of catch
+        are raised again, like for a power flow which is run by the check itself.
+        """
+        if self.pf_error is None:
+            return True
+        if not isinstance(self.pf_error, catch):
+            raise self.pf_error
+        return False
+
+
+def _run_check(check):
+    function, args = check
+    try:
+        return function.__name__, function(*args), None
+    except Exception as e:
+        return function.__name__, None, e
+
+
+def _collect_check_results(check_results, diag_results, diag_errors):
+    for name, result, error in check_results:
+        if error is not None:
+            diag_errors[name] = error
+        elif result is not None:
+            diag_results[name] = result
+
+
+def _base_power_flow_converges(net, context, catch=Exception):
+    """
+    Returns if the power flow of the unchanged net converges. The base case power flow of the
+    context is used if given.
+    """
+    if context is not None:
+        return context.power_flow_converges(catch)
+    try:
+        runpp(net)
+    except catch:
+        return False
+    return True
+
+
+def _result_tables(net):
+    return {key: net[key].copy() for key in ['res_bus', 'res_ext_grid', 'res_gen',
+                                             'res_impedance', 'res_line', 'res_load', 'res_sgen',
+                                             'res_shunt', 'res_trafo', 'res_trafo3w', 'res_ward',
+                                             'res_xward'] if key in net}
+
+
 def check_greater_zero(element, element_index, column):
     """
      functions that check, if a certain input type restriction for attribute values of a pandapower
@@ -360,7 +467,7 @@ def multiple_voltage_controlling_elements_per_bus(net):
         return check_results
 
 
-def overload(net, overload_scaling_factor):
+def overload(net, overload_scaling_factor, context=None):
     """
     Checks, if a loadflow calculation converges. If not, checks, if an overload is the reason for
     that by scaling down the loads, gens and sgens to 0.1%.
@@ -368,6 +475,8 @@ def overload(net, overload_scaling_factor):
      INPUT:
         **net** (pandapowerNet)         - pandapower network
 
+        **context** (DiagnosticContext, None) - reuses the base case power flow of the context
+
 
      OUTPUT:
         **check_results** (dict)        - dict with the results of the overload check
@@ -380,9 +489,7 @@ def overload(net, overload_scaling_factor):
     gen_scaling = copy.deepcopy(net.gen.scaling)
     sgen_scaling = copy.deepcopy(net.sgen.scaling)
 
-    try:
-        runpp(net)
-    except LoadflowNotConverged:
+    if not _base_power_flow_converges(net, context, LoadflowNotConverged):
         check_result['load'] = False
         check_result['generation'] = False
         try:
@@ -415,7 +522,7 @@ def overload(net, overload_scaling_factor):
         return check_result
 
 
-def wrong_switch_configuration(net):
+def wrong_switch_configuration(net, context=None):
     """
     Checks, if a loadflow calculation converges. If not, checks, if the switch configuration is
     the reason for that by closing all switches
@@ -423,14 +530,14 @@ def wrong_switch_configuration(net):
      INPUT:
         **net** (pandapowerNet)         - pandapower network
 
+        **context** (DiagnosticContext, None) - reuses the base case power flow of the context
+
      OUTPUT:
         **check_result** (boolean)
 
     """
     switch_configuration = copy.deepcopy(net.switch.closed)
-    try:
-        runpp(net)
-    except:
+    if not _base_power_flow_converges(net, context):
         try:
             net.switch.closed = True
             runpp(net)
@@ -509,13 +616,15 @@ def different_voltage_levels_connected(net):
         return check_results
 
 
-def impedance_values_close_to_zero(net, min_r_ohm, min_x_ohm, min_r_pu, min_x_pu):
+def impedance_values_close_to_zero(net, min_r_ohm, min_x_ohm, min_r_pu, min_x_pu, context=None):
     """
     Checks, if there are lines, xwards or impedances with an impedance value close to zero.
 
      INPUT:
         **net** (pandapowerNet)         - pandapower network
 
+        **context** (DiagnosticContext, None) - reuses the base case power flow of the context
+
 
      OUTPUT:
         **implausible_lines** (list)    - list that contains the indices of all lines with an
@@ -548,9 +657,7 @@ def impedance_values_close_to_zero(net, min_r_ohm, min_x_ohm, min_r_pu, min_x_pu
         switch_copy = copy.deepcopy(net.switch)
         line_copy = copy.deepcopy(net.line)
         impedance_copy = copy.deepcopy(net.impedance)
-        try:
-            runpp(net)
-        except:
+        if not _base_power_flow_converges(net, context):
             try:
                 for key in implausible_elements:
                     if key == 'xward':
@@ -693,7 +800,7 @@ def nominal_voltages_dont_match(net, nom_voltage_tolerance):
         return results
 
 
-def disconnected_elements(net):
+def disconnected_elements(net, context=None):
     """
     Checks, if there are network sections without a connection to an ext_grid. Returns all network
     elements in these sections, that are in service. Elements belonging to the same disconnected
@@ -704,6 +811,8 @@ def disconnected_elements(net):
      INPUT:
         **net** (pandapowerNet)         - pandapower network
 
+        **context** (DiagnosticContext, None) - reuses the connected components of the context
+
      OUTPUT:
         **disc_elements** (dict)        - list that contains all network elements, without a
                                           connection to an ext_grid.
@@ -718,8 +827,13 @@ def disconnected_elements(net):
 
     """
 
-    mg = top.create_nxgraph(net)
-    sections = top.connected_components(mg)
+    if context is None:
+        import pandapower.topology as top
+        sections = top.connected_components(top.create_nxgraph(net))
+    elif context.graph_error is not None:
+        raise context.graph_error
+    else:
+        sections = context.sections
     disc_elements = []
 
     for section in sections:
@@ -815,7 +929,7 @@ def wrong_reference_system(net):
         return check_results
 
 
-def numba_comparison(net, numba_tolerance):
+def numba_comparison(net, numba_tolerance, context=None):
     """
         Compares the results of loadflows with numba=True vs. numba=False.
 
@@ -826,22 +940,22 @@ def numba_comparison(net, numba_tolerance):
             **tol** (float, 1e-5)      - Maximum absolute deviation allowed between
                                          numba=True/False results.
 
+            **context** (DiagnosticContext, None) - the base case power flow of the context is
+                                         used as numba=True result
+
          OUTPUT:
             **check_result** (dict)    - Absolute deviations between numba=True/False results.
     """
     check_results = {}
-    runpp(net, numba=True)
-    result_numba_true = copy.deepcopy(net)
+    if context is not None:
+        context.power_flow_converges(catch=())
+        result_numba_true = context.pf_results
+    else:
+        runpp(net, numba=True)
+        result_numba_true = _result_tables(net)
     runpp(net, numba=False)
-    result_numba_false = copy.deepcopy(net)
-    res_keys = [key for key in result_numba_true.keys() if
-                (key in ['res_bus', 'res_ext_grid',
-                         'res_gen', 'res_impedance',
-                         'res_line', 'res_load',
-                         'res_sgen', 'res_shunt',
-                         'res_trafo', 'res_trafo3w',
-                         'res_ward', 'res_xward'])]
-    for key in res_keys:
+    result_numba_false = _result_tables(net)
+    for key in result_numba_true.keys():
         diffs = abs(result_numba_true[key] - result_numba_false[key]) > numba_tolerance
         if any(diffs.any()):
             if (key not in check_results.keys()):
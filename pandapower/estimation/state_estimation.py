@@ -4,8 +4,8 @@
 # and Energy System Technology (IEE), Kassel. All rights reserved.
 import numpy as np
 
-from scipy.sparse import csr_matrix
-from scipy.sparse.linalg import spsolve
+from scipy.sparse import diags
+from scipy.sparse.linalg import splu
 from scipy.stats import chi2
 
 from pandapower.estimation.wls_ppc_conversions import _add_measurements_to_ppc, \
@@ -25,6 +25,9 @@ except ImportError:
     import logging
 std_logger = logging.getLogger(__name__)
 
+# maximum number of entries of the dense blocks of H^T that are solved at once in the rN_max test
+OMEGA_BLOCK_ENTRIES = 2000000
+
 
 def estimate(net, init='flat', tolerance=1e-6, maximum_iterations=10,
              calculate_voltage_angles=True, ref_power=1e6):
@@ -181,6 +184,7 @@ class state_estimation(object):
         self.H = None
         self.Ht = None
         self.Gm = None
+        self.Gm_fact = None
         self.r = None
         self.V = None
         self.pp_meas_indices = None
@@ -274,12 +278,12 @@ class state_estimation(object):
         # state vector
         E = np.concatenate((delta_masked.compressed(), v_m))
 
-        # invert covariance matrix
-        r_inv = csr_matrix(np.linalg.inv(np.diagflat(r_cov) ** 2))
+        # inverse of the diagonal covariance matrix
+        r_inv = diags(1. / r_cov ** 2, format="csr")
 
         current_error = 100.
         cur_it = 0
-        G_m, r, H, h_x = None, None, None, None
+        G_m, G_m_fact, r, H, h_x = None, None, None, None, None
 
         while current_error > self.tolerance and cur_it < self.max_iterations:
             self.logger.debug(" Starting iteration %d" % (1 + cur_it))
@@ -288,18 +292,21 @@ class state_estimation(object):
                 h_x = sem.create_hx(v_m, delta)
 
                 # residual r
-                r = csr_matrix(z - h_x).T
+                r = z - h_x
 
                 # jacobian matrix H
-                H = csr_matrix(sem.create_jacobian(v_m, delta))
+                H = sem.create_jacobian(v_m, delta)
 
                 # gain matrix G_m
                 # G_m = H^t * R^-1 * H
-                G_m = H.T * (r_inv * H)
+                G_m = (H.T * (r_inv * H)).tocsc()
 
                 # state vector difference d_E
                 # d_E = G_m^-1 * (H' * R^-1 * r)
-                d_E = spsolve(G_m, H.T * (r_inv * r))
+                # G_m is symmetric, the factorization uses a symmetric fill-reducing ordering
+                G_m_fact = splu(G_m, permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.,
+                                options=dict(SymmetricMode=True))
+                d_E = G_m_fact.solve(H.T * (r_inv * r))
                 E += d_E
 
                 # update V/delta
@@ -311,7 +318,7 @@ class state_estimation(object):
                 current_error = np.max(np.abs(d_E))
                 self.logger.debug("Current error: %.7f" % current_error)
 
-            except np.linalg.linalg.LinAlgError:
+            except (np.linalg.linalg.LinAlgError, RuntimeError):
                 self.logger.error("A problem appeared while using the linear algebra methods."
                                   "Check and change the measurement set.")
                 return False
@@ -328,9 +335,7 @@ class state_estimation(object):
         # store results for all elements
         # calculate bus power injections
         v_cpx = v_m * np.exp(1j * delta)
-        bus_powers_conj = np.zeros(len(v_cpx), dtype=np.complex128)
-        for i in range(len(v_cpx)):
-            bus_powers_conj[i] = np.dot(sem.Y_bus[i, :], v_cpx) * np.conjugate(v_cpx[i])
+        bus_powers_conj = (sem.Y_bus * v_cpx) * np.conjugate(v_cpx)
 
         ppci["bus"][:, 2] = bus_powers_conj.real  # saved in per unit
         ppci["bus"][:, 3] = - bus_powers_conj.imag  # saved in per unit
@@ -370,11 +375,13 @@ class state_estimation(object):
                                                    mapping_table) * self.s_ref / 1e3
 
         # store variables required for chi^2 and r_N_max test:
-        self.R_inv = r_inv.toarray()
-        self.Gm = G_m.toarray()
-        self.r = r.toarray()
-        self.H = H.toarray()
-        self.Ht = self.H.T
+        # (R_inv, Gm and H are sparse matrices)
+        self.R_inv = r_inv
+        self.Gm = G_m
+        self.Gm_fact = G_m_fact
+        self.r = r.reshape(-1, 1)
+        self.H = H
+        self.Ht = H.T
         self.hx = h_x
         self.V = v_m
         self.delta = delta
@@ -387,6 +394,23 @@ class state_estimation(object):
 
         return successful
 
+    def _residual_covariance_diagonal(self):
+        """
+        Returns the diagonal of the covariance matrix of the residuals
+        Omega = R - H*G^(-1)*H^T. The entries H_i*G^(-1)*H_i^T are calculated with the
+        factorization of the gain matrix from the last iteration, for blocks of measurements so
+        that neither G^(-1) nor Omega are built.
+        """
+        H = self.H.tocsr()
+        m, n_states = H.shape
+        omega = 1. / self.R_inv.diagonal()
+        block_size = max(1, int(OMEGA_BLOCK_ENTRIES // max(n_states, 1)))
+        for start in range(0, m, block_size):
+            Ht_block = H[start: start + block_size].T.toarray()
+            omega[start: start + block_size] -= \
+                np.sum(Ht_block * self.Gm_fact.solve(Ht_block), axis=0)
+        return omega
+
     def perform_chi2_test(self, v_in_out=None, delta_in_out=None,
                           calculate_voltage_angles=True, chi2_prob_false=0.05):
         """
@@ -431,7 +455,7 @@ class state_estimation(object):
         self.estimate(v_in_out, delta_in_out, calculate_voltage_angles)
 
         # Performance index J(hx)
-        J = np.dot(self.r.T, np.dot(self.R_inv, self.r))
+        J = np.dot(self.r.T, self.R_inv * self.r)
 
         # Number of measurements
         m = len(self.net.measurement)
@@ -511,33 +535,17 @@ class state_estimation(object):
         while num_iterations <= 10:
             # Estimate the state with bad data identified in previous iteration
             # removed from set of measurements:
-            _ = self.estimate(v_in, delta_in, calculate_voltage_angles)
+            successful = self.estimate(v_in, delta_in, calculate_voltage_angles)
 
             # Try to remove the bad data
             try:
-                # Error covariance matrix:
-                R = np.linalg.inv(self.R_inv)
-
-                # for future debugging: this line's results have changed with the ppc
-                # overhaul in April 2017 after commit 9ae5b8f42f69ae39f8c8cf (which still works)
-                # there are differences of < 1e-10 for the Omega entries which cause
-                # the function to work far worse. As of now it is unclear if it's just numerical
-                # accuracy to blame or an error in the code. a sort in the ppc creation function
-                # was removed which caused this issue
-                # Covariance matrix of the residuals: \Omega = S*R = R - H*G^(-1)*H^T
-                # (S is the sensitivity matrix: r = S*e):
-                Omega = R - np.dot(self.H, np.dot(np.linalg.inv(self.Gm), self.Ht))
+                # Diagonal of the covariance matrix of the residuals:
+                # \Omega = S*R = R - H*G^(-1)*H^T (S is the sensitivity matrix: r = S*e)
+                omega = self._residual_covariance_diagonal()
 
-                # Diagonalize \Omega:
-                Omega = np.diag(np.diag(Omega))
-
-                # Compute squareroot (|.| since some -0.0 produced nans):
-                Omega = np.sqrt(np.absolute(Omega))
-
-                OmegaInv = np.linalg.inv(Omega)
-
-                # Compute normalized residuals (r^N_i = |r_i|/sqrt{Omega_ii}):
-                rN = np.dot(OmegaInv, np.absolute(self.r))
+                # Compute normalized residuals (r^N_i = |r_i|/sqrt{Omega_ii})
+                # (|.| since some -0.0 produced nans):
+                rN = np.abs(self.r.ravel()) / np.sqrt(np.abs(omega))
 
                 if max(rN) <= rn_max_threshold:
                     self.logger.debug("Largest normalized residual test passed. "
@@ -549,7 +557,7 @@ class state_estimation(object):
                         % (max(rN), rn_max_threshold))
 
                     # Identify bad data: Determine index corresponding to max(rN):
-                    idx_rN = np.argsort(rN, axis=0)[-1]
+                    idx_rN = np.argmax(rN)
 
                     # Determine pandapower index of measurement to be removed:
                     meas_idx = self.pp_meas_indices[idx_rN]
@@ -560,7 +568,12 @@ class state_estimation(object):
                     self.net.measurement.drop(meas_idx, inplace=True)
                     self.logger.debug("Bad data removed from the set of measurements.")
 
-            except np.linalg.linalg.LinAlgError:
+                    # the next estimation starts from the current state
+                    if successful:
+                        v_in = self.net.res_bus_est.vm_pu.values
+                        delta_in = self.net.res_bus_est.va_degree.values
+
+            except (np.linalg.linalg.LinAlgError, RuntimeError):
                 self.logger.error("A problem appeared while using the linear algebra methods."
                                   "Check and change the measurement set.")
                 return False
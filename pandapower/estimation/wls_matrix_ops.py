@@ -6,10 +6,12 @@
 
 import warnings
 import numpy as np
+from scipy.sparse import csr_matrix, vstack, hstack
 from pandapower.estimation.idx_bus import *
 from pandapower.estimation.idx_brch import *
 from pandapower.idx_brch import branch_cols
 from pandapower.idx_bus import bus_cols
+from pandapower.pf.dSbus_dV_pypower import dSbus_dV
 try:
     from pandapower.pf.makeYbus import makeYbus
 except ImportError:
@@ -17,6 +19,11 @@ except ImportError:
 
 
 class wls_matrix_ops:
+    """
+    Builds h(x) and the Jacobian H of the WLS state estimation from the sparse admittance
+    matrices. Bus injections are calculated from Ybus, branch flows and currents only for the
+    measured branches from the rows of Yf and Yt, so that no dense n x n matrices are created.
+    """
     def __init__(self, ppc, slack_buses, non_slack_buses, s_ref):
         np.seterr(divide='ignore', invalid='ignore')
         self.ppc = ppc
@@ -28,18 +35,13 @@ class wls_matrix_ops:
         self.Yt = None
         self.G = None
         self.B = None
-        self.G_series = None
-        self.B_series = None
-        self.G_shunt = None
-        self.B_shunt = None
-        self.keep_ix = None
         self.i_ij = None
         self.fb = None
         self.tb = None
         self.create_y()
+        self._init_measurement_indices()
 
-    # Function which builds a node admittance matrix out of the topology data
-    # In addition, it provides the series admittances of lines as G_series and B_series
+    # Function which builds the sparse node and branch admittance matrices out of the topology
     def create_y(self):
         self.fb = self.ppc["branch"][:, 0].real.astype(int)
         self.tb = self.ppc["branch"][:, 1].real.astype(int)
@@ -48,259 +50,125 @@ class wls_matrix_ops:
             warnings.simplefilter("ignore")
             y_bus, y_f, y_t = makeYbus(self.baseMVA, self.ppc["bus"], self.ppc["branch"])
 
-        # create relevant matrices
-        self.Y_bus = y_bus.toarray()
-        self.Yf = y_f
-        self.Yt = y_t
+        self.Y_bus = y_bus.tocsr()
+        self.Yf = y_f.tocsr()
+        self.Yt = y_t.tocsr()
         self.G = self.Y_bus.real
         self.B = self.Y_bus.imag
-        n = len(self.ppc["bus"])
-        self.G_series = - self.G
-        np.fill_diagonal(self.G_series, 0.)
-        self.B_series = - self.B
-        np.fill_diagonal(self.B_series, 0.)
-        # In case that's becoming relevant later, G_shunt will not be removed
-        self.G_shunt = np.zeros_like(self.G)
-        self.B_shunt = np.zeros((n, n))
-        from_to = np.concatenate((self.fb, self.tb))
-        to_from = np.concatenate((self.tb, self.fb))
-        self.B_shunt[from_to, to_from] = np.tile(0.5 * self.ppc["branch"][:, 4].real, 2)
 
-    # Get Y as tuple (real, imaginary)
+    # Get Y as tuple (real, imaginary) of sparse matrices
     def get_y(self):
         return self.G, self.B
 
+    def _init_measurement_indices(self):
+        bus = self.ppc["bus"]
+        branch = self.ppc["branch"]
+        self.p_bus = np.flatnonzero(~np.isnan(bus[:, bus_cols + P]))
+        self.q_bus = np.flatnonzero(~np.isnan(bus[:, bus_cols + Q]))
+        self.v_bus = np.flatnonzero(~np.isnan(bus[:, bus_cols + VM]))
+        # measured branches at the from and at the to end
+        self.p_br = (np.flatnonzero(~np.isnan(branch[:, branch_cols + P_FROM])),
+                     np.flatnonzero(~np.isnan(branch[:, branch_cols + P_TO])))
+        self.q_br = (np.flatnonzero(~np.isnan(branch[:, branch_cols + Q_FROM])),
+                     np.flatnonzero(~np.isnan(branch[:, branch_cols + Q_TO])))
+        self.i_br = (np.flatnonzero(~np.isnan(branch[:, branch_cols + IM_FROM])),
+                     np.flatnonzero(~np.isnan(branch[:, branch_cols + IM_TO])))
+
+    def _branch_ends(self):
+        """
+        Yields the end (0 for from, 1 for to), the branch admittance matrix and the buses of both
+        branch ends.
+        """
+        yield 0, self.Yf, self.fb
+        yield 1, self.Yt, self.tb
+
     # Creates h(x), depending on the current U and delta and the static topology data
     def create_hx(self, v, delta):
-        deltas = delta[:, np.newaxis] - delta
-        cos_delta = np.cos(deltas)
-        sin_delta = np.sin(deltas)
-        vi_vj = np.outer(v, v)
-
-        # Power flow from node i to node j
-        # p_ij = (np.multiply((self.G_series + self.G_shunt).T, v ** 2).T - vi_vj *
-        #         (self.G_series * cos_delta + self.B_series * sin_delta))
-        # q_ij = (-1 * np.multiply((self.B_series + self.B_shunt).T, v ** 2).T - vi_vj *
-        #         (self.G_series * sin_delta - self.B_series * cos_delta))
-
         V = v * np.exp(1j * delta)
-        s_ij = np.zeros_like(deltas, dtype=complex)
-        s_ij[self.fb, self.tb] = V[self.fb] * np.conj(self.Yf * V)
-        s_ij[self.tb, self.fb] = V[self.tb] * np.conj(self.Yt * V)
 
         # Bus powers:
-        p_i = np.sum(vi_vj * (self.G * cos_delta + self.B * sin_delta), axis=1)
-        q_i = np.sum(vi_vj * (self.G * sin_delta - self.B * cos_delta), axis=1)
-        self.i_ij = np.divide(np.sqrt(np.float64(s_ij.real ** 2 + s_ij.imag ** 2)).T, v).T
+        s_i = V * np.conj(self.Y_bus * V)
+
+        # Branch powers and current magnitudes at the from and to end of the measured branches
+        s_ij, i_ij = [], []
+        for end, Y_br, buses in self._branch_ends():
+            rows = np.unique(np.concatenate((self.p_br[end], self.q_br[end], self.i_br[end])))
+            s = np.zeros(len(self.fb), dtype=np.complex128)
+            s[rows] = V[buses[rows]] * np.conj(Y_br[rows, :] * V)
+            s_ij.append(s)
+            i_ij.append(np.abs(s) / v[buses])
+        self.i_ij = i_ij
 
         # Build h(x) from measurements
         # [p_i p_ij q_i q_ij U i_ij]
-
-        # P line
-        not_nan = ~np.isnan(self.ppc["branch"][:, branch_cols + P_FROM])
-        p_first_ix = self.ppc["branch"][not_nan, 0].real.astype(int)
-        p_second_ix = self.ppc["branch"][not_nan, 1].real.astype(int)
-        not_nan = ~np.isnan(self.ppc["branch"][:, branch_cols + P_TO])
-        p_first_ix = np.append(p_first_ix, self.ppc["branch"][not_nan, 1].real.astype(int))
-        p_second_ix = np.append(p_second_ix, self.ppc["branch"][not_nan, 0].real.astype(int))
-
-        # Q line
-        not_nan = ~np.isnan(self.ppc["branch"][:, branch_cols + Q_FROM])
-        q_first_ix = self.ppc["branch"][not_nan, 0].real.astype(int)
-        q_second_ix = self.ppc["branch"][not_nan, 1].real.astype(int)
-        not_nan = ~np.isnan(self.ppc["branch"][:, branch_cols + Q_TO])
-        q_first_ix = np.append(q_first_ix, self.ppc["branch"][not_nan, 1].real.astype(int))
-        q_second_ix = np.append(q_second_ix, self.ppc["branch"][not_nan, 0].real.astype(int))
-
-        # I line
-        not_nan = ~np.isnan(self.ppc["branch"][:, branch_cols + IM_FROM])
-        i_first_ix = self.ppc["branch"][not_nan, 0].real.astype(int)
-        i_second_ix = self.ppc["branch"][not_nan, 1].real.astype(int)
-        not_nan = ~np.isnan(self.ppc["branch"][:, branch_cols + IM_TO])
-        i_first_ix = np.append(i_first_ix, self.ppc["branch"][not_nan, 1].real.astype(int))
-        i_second_ix = np.append(i_second_ix, self.ppc["branch"][not_nan, 0].real.astype(int))
-
-        v_bus_not_nan = ~np.isnan(self.ppc["bus"][:, bus_cols + VM])
-        p_bus_not_nan = ~np.isnan(self.ppc["bus"][:, bus_cols + P])
-        q_bus_not_nan = ~np.isnan(self.ppc["bus"][:, bus_cols + Q])
-
-        hx = np.hstack((p_i[p_bus_not_nan],
-                        s_ij.real[p_first_ix, p_second_ix],
-                        q_i[q_bus_not_nan],
-                        s_ij.imag[q_first_ix, q_second_ix],
-                        v[v_bus_not_nan],
-                        self.i_ij[i_first_ix, i_second_ix]))
+        hx = np.hstack((s_i.real[self.p_bus],
+                        s_ij[0].real[self.p_br[0]], s_ij[1].real[self.p_br[1]],
+                        s_i.imag[self.q_bus],
+                        s_ij[0].imag[self.q_br[0]], s_ij[1].imag[self.q_br[1]],
+                        v[self.v_bus],
+                        i_ij[0][self.i_br[0]], i_ij[1][self.i_br[1]]))
 
         return hx
 
-    # Create Jacobian matrix
+    # Create sparse Jacobian matrix
     def create_jacobian(self, v, delta):
         n = len(self.ppc["bus"])
-        G = self.G
-        B = self.B
-        G_series = self.G_series
-        B_series = self.B_series
-        G_shunt = self.G_shunt
-        B_shunt = self.B_shunt
-
-        # Create Jacobi Matrix
-        # Source: p.23; Power System State Estimation by Ali Abur
-
-        deltas = delta[:, np.newaxis] - delta  # delta_i - delta_j
-        cos_delta = np.cos(deltas)  # cos(delta_i - delta_j)
-        sin_delta = np.sin(deltas)  # sin(delta_i - delta_j)
-        vi_vj = np.outer(v, v)  # Ui * Uj
-        diag_n = np.arange(n)  # Used for indexing the diagonal of a n x n matrix
-
-        # Submatrices d(Pinj)/d(theta) and d(Pinj)/d(V)
-        H_dPinj_dth = vi_vj * (G * sin_delta - B * cos_delta)
-        H_dPinj_dth[diag_n, diag_n] = np.sum(vi_vj * (-G * sin_delta + B * cos_delta), axis=1) \
-                                      - (v ** 2 * B.diagonal())
-
-        H_dPinj_dU = np.multiply((G * cos_delta + B * sin_delta).T, v).T
-        H_dPinj_dU[diag_n, diag_n] = np.sum(v * (G * cos_delta + B * sin_delta), axis=1) \
-                                     + (v * G.diagonal())
-
-        # Submatrices d(Qinj)/d(theta) and d(Qinj)/d(V)
-        H_dQinj_dth = vi_vj * (-G * cos_delta - B * sin_delta)
-        H_dQinj_dth[diag_n, diag_n] = np.sum(vi_vj * (G * cos_delta + B * sin_delta), axis=1) \
-                                      - (v ** 2 * G.diagonal())
-
-        H_dQinj_dU = np.multiply((G * sin_delta - B * cos_delta).T, v).T
-        H_dQinj_dU[diag_n, diag_n] = np.sum(v * (G * sin_delta - B * cos_delta), axis=1) \
-                                     - (v * B.diagonal())
-
-        # Submatrices d(Pij)/d(theta) and d(Pij)/d(V)
-        # d(P01)/d(theta0) is at position H_dPij_dth_i[0,1]
-        # d(P23)/d(theta3) is at position H_dPij_dth_j[2,3]
-        # d(P23)/d(theta1) is 0 and not stored in the matrix
-
-        H_dPij_dth_i = vi_vj * (G_series * sin_delta - B_series * cos_delta)
-        H_dPij_dth_j = - H_dPij_dth_i
-
-        H_dPij_dU_i = (G_series * cos_delta + B_series * sin_delta) * -v + \
-                      2 * np.multiply((G_series+G_shunt).T, v).T
-        H_dPij_dU_j = np.multiply((G_series * cos_delta + B_series * sin_delta).T, -v).T
-
-        # Submatrices d(Qij)/d(theta) and d(Qij)/d(V)
-        # two columns, two derivatives (theta1, theta2) per line
-        # d(Q12)/d(theta_1) | d(Q12)/d(theta_2)
-        H_dQij_dth_i = -vi_vj * (G_series * cos_delta + B_series * sin_delta)
-        H_dQij_dth_j = -H_dQij_dth_i
-
-        H_dQij_dU_i = (G_series * sin_delta - B_series * cos_delta) * -v - \
-                      2 * np.multiply((B_series+B_shunt).T, v).T
-        H_dQij_dU_j = np.multiply((G_series * sin_delta - B_series * cos_delta).T, -v).T
-
-        # h_dPij_dth_i = v[self.fb] * v[self.tb] * np.exp(
-        #     1j * (delta[self.fb] - delta[self.tb] + np.pi / 2)) * self.Y_bus[
-        #                    self.fb, self.tb].conj()
-        # h_dPij_dth_j = v[self.fb] * v[self.tb] * np.exp(
-        #     1j * (delta[self.fb] - delta[self.tb] - np.pi / 2)) \
-        #                * self.Y_bus[self.fb, self.tb].conj()
-
-        # Submatrices d(Vi)/d(Vi..j)
-        H_dU_dU = np.eye(n)  # diagonally 1, otherwise 0
-        H_dU_dth = np.zeros((n, n))  # always 0
-
-        # Submatrices d(Iij)/d(theta) and d(Iij)/d(V)
-        # two columns, two derivatives (theta1, theta2) per line
-        # d(I12)/d(theta_1) | d(I12)/d(theta_2)
-        if not np.all(self.i_ij == 0.):
-            H_dIij_dth_i = np.divide((G_series**2 + B_series**2) * vi_vj * sin_delta, self.i_ij)
-            H_dIij_dth_j = -H_dIij_dth_i
-            H_dIij_dU_i = np.divide(G_series ** 2 + B_series ** 2, self.i_ij) * \
-                          (v - (v * cos_delta).T).T
-            H_dIij_dU_j = np.divide(G_series ** 2 + B_series ** 2, self.i_ij) * \
-                          (v - np.multiply(cos_delta.T, v).T)
-
-        # Build H dynamically from submatrices and measurements
-        columns = 2 * n - len(self.slack_buses)
-        range_theta = self.non_slack_buses
-        range_v = list(range(n))
-
-        h_mat = np.zeros((1, columns))  # create matrix with dummy line so that we can append to it
-
-        # if P bus measurements exist
-        p_bus_not_nan = ~np.isnan(self.ppc["bus"][:, bus_cols + 2])
-        if True in p_bus_not_nan:
-            nodes = np.arange(n)[p_bus_not_nan]
-            h_t = H_dPinj_dth[np.tile(nodes, len(range_theta)), np.repeat(range_theta, len(nodes))]\
-                .reshape(len(range_theta), len(nodes)).T
-            h__u = H_dPinj_dU[np.tile(nodes, len(range_v)), np.repeat(range_v, len(nodes))]\
-                .reshape(len(range_v), len(nodes)).T
-            h_ = np.hstack((h_t, h__u))
-            h_mat = np.vstack((h_mat, h_))
-
-        # if P line measurements exist
-        # and so on ..
-        p_line_not_nan = ~np.isnan(self.ppc["branch"][:, branch_cols + 4])
-        node1 = self.ppc["branch"][p_line_not_nan, 0].real.astype(int)
-        node2 = self.ppc["branch"][p_line_not_nan, 1].real.astype(int)
-        p_line_not_nan = ~np.isnan(self.ppc["branch"][:, branch_cols + 6])
-        node1 = np.append(node1, self.ppc["branch"][p_line_not_nan, 1].real.astype(int))
-        node2 = np.append(node2, self.ppc["branch"][p_line_not_nan, 0].real.astype(int))
-        if len(node1):
-            nr = range(0, len(node1))
-            h_ = np.zeros((len(node1), columns + len(self.slack_buses)))
-            h_[nr, node1] = H_dPij_dth_i[node1, node2]
-            h_[nr, node2] = H_dPij_dth_j[node1, node2]
-            h_[nr, n+node1] = H_dPij_dU_i[node1, node2]
-            h_[nr, n+node2] = H_dPij_dU_j[node1, node2]
-            h_ = np.delete(h_, self.slack_buses, 1)
-            h_mat = np.vstack((h_mat, h_))
-
-        q_bus_not_nan = ~np.isnan(self.ppc["bus"][:, bus_cols + 4])
-        if True in q_bus_not_nan:
-            nodes = np.arange(n)[q_bus_not_nan]
-            h_t = H_dQinj_dth[np.tile(nodes, len(range_theta)), np.repeat(range_theta, len(nodes))]\
-                .reshape(len(range_theta), len(nodes)).T
-            h__u = H_dQinj_dU[np.tile(nodes, len(range_v)), np.repeat(range_v, len(nodes))]\
-                .reshape(len(range_v), len(nodes)).T
-            h_ = np.hstack((h_t, h__u))
-            h_mat = np.vstack((h_mat, h_))
-
-        q_line_not_nan = ~np.isnan(self.ppc["branch"][:, branch_cols + 8])
-        node1 = self.ppc["branch"][q_line_not_nan, 0].real.astype(int)
-        node2 = self.ppc["branch"][q_line_not_nan, 1].real.astype(int)
-        q_line_not_nan = ~np.isnan(self.ppc["branch"][:, branch_cols + 10])
-        node1 = np.append(node1, self.ppc["branch"][q_line_not_nan, 1].real.astype(int))
-        node2 = np.append(node2, self.ppc["branch"][q_line_not_nan, 0].real.astype(int))
-        if len(node1):
-            nr = range(0, len(node1))
-            h_ = np.zeros((len(node1), columns + len(self.slack_buses)))
-            h_[nr, node1] = H_dQij_dth_i[node1, node2]
-            h_[nr, node2] = H_dQij_dth_j[node1, node2]
-            h_[nr, n+node1] = H_dQij_dU_i[node1, node2]
-            h_[nr, n+node2] = H_dQij_dU_j[node1, node2]
-            h_ = np.delete(h_, self.slack_buses, 1)
-            h_mat = np.vstack((h_mat, h_))
-
-        v_bus_not_nan = ~np.isnan(self.ppc["bus"][:, bus_cols + 0])
-        if True in v_bus_not_nan:
-            nodes = np.arange(n)[v_bus_not_nan]
-            h_t = H_dU_dth[np.repeat(range_theta, len(nodes)), np.tile(nodes, len(range_theta))]\
-                .reshape(len(range_theta), len(nodes)).T
-            h__u = H_dU_dU[np.repeat(range_v, len(nodes)), np.tile(nodes, len(range_v))]\
-                .reshape(len(range_v), len(nodes)).T
-            h_ = np.hstack((h_t, h__u))
-            h_mat = np.vstack((h_mat, h_))
-
-        i_line_not_nan = ~np.isnan(self.ppc["branch"][:, branch_cols + 0])
-        node1 = self.ppc["branch"][i_line_not_nan, 0].real.astype(int)
-        node2 = self.ppc["branch"][i_line_not_nan, 1].real.astype(int)
-        i_line_not_nan = ~np.isnan(self.ppc["branch"][:, branch_cols + 2])
-        node1 = np.append(node1, self.ppc["branch"][i_line_not_nan, 1].real.astype(int))
-        node2 = np.append(node2, self.ppc["branch"][i_line_not_nan, 0].real.astype(int))
-        if len(node1):
-            nr = range(0, len(node1))
-            h_ = np.zeros((len(node1), columns + len(self.slack_buses)))
-            if not np.all(self.i_ij == 0.):
-                h_[nr, node1] = H_dIij_dth_i[node1, node2]
-                h_[nr, node2] = H_dIij_dth_j[node1, node2]
-                h_[nr, n+node1] = H_dIij_dU_i[node1, node2]
-                h_[nr, n+node2] = H_dIij_dU_j[node1, node2]
-            h_ = np.delete(h_, self.slack_buses, 1)
-            h_mat = np.vstack((h_mat, h_))
-
-        return h_mat[1:, :]  # delete dummy line
+        V = v * np.exp(1j * delta)
+        diagV = _diag(V)
+        diagVnorm = _diag(V / np.abs(V))
+
+        # Submatrices d(Sinj)/d(theta) and d(Sinj)/d(V)
+        dSbus_dVm, dSbus_dVa = dSbus_dV(self.Y_bus, V)
+        dSbus_dVm, dSbus_dVa = dSbus_dVm.tocsr(), dSbus_dVa.tocsr()
+
+        # Submatrices d(Sij)/d(theta), d(Sij)/d(V), d(|Iij|)/d(theta) and d(|Iij|)/d(V) of the
+        # measured branches at both ends
+        dS_dth, dS_dU, dI_dth, dI_dU = [], [], [], []
+        for end, Y_br, buses in self._branch_ends():
+            rows = np.unique(np.concatenate((self.p_br[end], self.q_br[end], self.i_br[end])))
+            # position of the branch rows in the submatrices
+            pos = np.zeros(len(self.fb), dtype=int)
+            pos[rows] = np.arange(len(rows))
+            Y_rows = Y_br[rows, :]
+            I = Y_rows * V
+            # connection matrix of the measured branch ends
+            C = csr_matrix((np.ones(len(rows)), (np.arange(len(rows)), buses[rows])),
+                           shape=(len(rows), n))
+            diagVb = _diag(V[buses[rows]])
+            diagI = _diag(I)
+            dS_dth.append((1j * (np.conj(diagI) * C * diagV - diagVb * np.conj(Y_rows * diagV)),
+                           pos))
+            dS_dU.append((diagVb * np.conj(Y_rows * diagVnorm) + np.conj(diagI) * C * diagVnorm,
+                          pos))
+            # d|I| = Re(conj(I) * dI) / |I|, zero for branches without current
+            abs_I = np.abs(I)
+            scale = _diag(np.divide(np.conj(I), abs_I, out=np.zeros_like(I), where=abs_I > 0))
+            dI_dth.append(((scale * (Y_rows * (1j * diagV))).real, pos))
+            dI_dU.append(((scale * (Y_rows * diagVnorm)).real, pos))
+
+        blocks = [(dSbus_dVa.real[self.p_bus], dSbus_dVm.real[self.p_bus])]
+        for end in (0, 1):
+            pos = dS_dth[end][1][self.p_br[end]]
+            blocks.append((dS_dth[end][0].real[pos], dS_dU[end][0].real[pos]))
+        blocks.append((dSbus_dVa.imag[self.q_bus], dSbus_dVm.imag[self.q_bus]))
+        for end in (0, 1):
+            pos = dS_dth[end][1][self.q_br[end]]
+            blocks.append((dS_dth[end][0].imag[pos], dS_dU[end][0].imag[pos]))
+        # Submatrices d(Vi)/d(theta) and d(Vi)/d(V)
+        blocks.append((csr_matrix((len(self.v_bus), n)),
+                       csr_matrix((np.ones(len(self.v_bus)),
+                                   (np.arange(len(self.v_bus)), self.v_bus)),
+                                  shape=(len(self.v_bus), n))))
+        for end in (0, 1):
+            pos = dI_dth[end][1][self.i_br[end]]
+            blocks.append((dI_dth[end][0][pos], dI_dU[end][0][pos]))
+
+        # Build H from the submatrices, the slack bus angles are not part of the state vector
+        H_th = vstack([b[0] for b in blocks]).tocsc()[:, self.non_slack_buses]
+        H_U = vstack([b[1] for b in blocks])
+        return hstack((H_th, H_U)).tocsr()
+
+
+def _diag(x):
+    ix = np.arange(len(x))
+    return csr_matrix((x, (ix, ix)), shape=(len(x), len(x)))
@@ -11,15 +11,6 @@ import pickle
 import sys
 from warnings import warn
 
-try:
-    from fiona.crs import from_epsg
-    from geopandas import GeoDataFrame, GeoSeries
-    from shapely.geometry import Point, LineString
-
-    GEOPANDAS_INSTALLED = True
-except ImportError:
-    GEOPANDAS_INSTALLED = False
-
 import pandas as pd
 
 import numpy
@@ -28,7 +19,8 @@ from pandapower.auxiliary import pandapowerNet
 from pandapower.create import create_empty_network
 from pandapower.toolbox import convert_format
 from pandapower.io_utils import to_dict_of_dfs, dicts_to_pandas, from_dict_of_dfs, \
-    PPJSONEncoder, PPJSONDecoder
+    PPJSONEncoder, PPJSONDecoder, NPY_MANIFEST, npy_store, save_npy_table, LazyTable, \
+    GEOPANDAS_INSTALLED
 
 
 def to_pickle(net, filename):
@@ -146,6 +138,45 @@ def to_json(net, filename=None):
         text_file.write(json_string)
 
 
+def to_npy(net, filename, include_results=True):
+    """
+    Saves a pandapower Network in a columnar binary format: every column of the element tables
+    is stored as a NumPy .npy block and the remaining attributes (parameters, std_types, ...)
+    in a small json manifest. If the filename ends with ".zip", the blocks are stored in an
+    uncompressed zip file, otherwise in a directory. net elements which name begins with "_"
+    (internal elements) will not be saved.
+
+    INPUT:
+        **net** (dict) - The pandapower format network
+
+        **filename** (string) - The absolute or relative path to the output directory or zip file
+
+    OPTIONAL:
+        **include_results** (bool, True) - the result tables (res_*) are saved
+
+    EXAMPLE:
+
+        >>> pp.to_npy(net, "example")  # directory
+        >>> pp.to_npy(net, "example.zip", include_results=False)  # zip file
+
+    """
+    from pandapower import __version__
+    manifest = {"format": "pandapower_npy", "version": __version__, "tables": dict(),
+                "items": dict()}
+    store = npy_store(filename, mode="w")
+    try:
+        for key, item in net.items():
+            if key.startswith("_") or (key.startswith("res") and not include_results):
+                continue
+            if isinstance(item, pd.DataFrame):
+                manifest["tables"][key] = save_npy_table(store, key, item)
+            else:
+                manifest["items"][key] = item
+        store.save_text(NPY_MANIFEST, json.dumps(manifest, cls=PPJSONEncoder, indent=2))
+    finally:
+        store.close()
+
+
 def to_sql(net, con, include_results=True):
     dodfs = to_dict_of_dfs(net, include_results=include_results)
     for name, data in dodfs.items():
@@ -207,6 +238,9 @@ def from_pickle(filename, convert=True):
                     df_index = df_dict['index']
                 if GEOPANDAS_INSTALLED and "geometry" in df_dict["columns"] \
                         and epsg is not None:
+                    from fiona.crs import from_epsg
+                    from geopandas import GeoDataFrame
+                    from shapely.geometry import Point, LineString
                     # convert primitive data-types to shapely-objects
                     if key == "bus_geodata":
                         data = {"x": [row[0] for row in df_dict["data"]],
@@ -411,6 +445,51 @@ def from_json_dict(json_dict, convert=True):
     return net
 
 
+def from_npy(filename, convert=True, lazy=True, mmap=True):
+    """
+    Load a pandapower network which was saved with to_npy from a directory or zip file. With
+    lazy=True, element tables are only read from the file when they are accessed for the first
+    time, e.g. geodata or measurements are never read for a power flow. convert_format is only
+    applied to networks which were saved with a different pandapower version.
+
+    INPUT:
+        **filename** (string) - The absolute or relative path to the input directory or zip file
+
+    OPTIONAL:
+        **convert** (bool, True) - use the convert format function for networks saved with
+        another pandapower version. All tables are loaded in this case.
+
+        **lazy** (bool, True) - load the element tables on their first access
+
+        **mmap** (bool, True) - memory map the numeric columns instead of reading them into
+        memory first (only for directories)
+
+    OUTPUT:
+        **net** (dict) - The pandapower format network
+
+    EXAMPLE:
+
+        >>> net = pp.from_npy("example")
+        >>> net = pp.from_npy("example.zip", lazy=False)
+
+    """
+    from pandapower import __version__
+    store = npy_store(filename)
+    if not store.exists():
+        raise UserWarning("File %s does not exist!!" % filename)
+    manifest = json.loads(store.load_text(NPY_MANIFEST), cls=PPJSONDecoder)
+    net = create_empty_network()
+    for key, item in manifest["items"].items():
+        net[key] = item
+    for key, table in manifest["tables"].items():
+        net._defer(key, LazyTable(store, table, mmap))
+    if not lazy:
+        net._load_deferred()
+    if convert and manifest["version"] != __version__:
+        convert_format(net)
+    return net
+
+
 def from_sql(con):
     cursor = con.cursor()
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
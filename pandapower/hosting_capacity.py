@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import copy
+
+import numpy as np
+import pandas as pd
+from scipy.sparse.linalg import splu
+
+from pandapower.create import create_sgen
+from pandapower.idx_bus import PD, QD
+from pandapower.pd2ppc import _ppc2ppci_index
+from pandapower.powerflow import LoadflowNotConverged
+from pandapower.probabilistic import _init_system, _jacobian, _newton_batch, \
+    _get_sample_results, _get_limit
+from pandapower.run import runpp, _run_base_case
+
+try:
+    import pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+CONSTRAINTS = np.array(["voltage", "line", "trafo", "convergence", "max_p_kw"])
+
+
+def calc_hosting_capacity(net, buses=None, max_vm_pu=1.05, max_loading_percent=100.,
+                          cos_phi=1., max_p_kw=1e4, tolerance_kw=1., verify=True, **kwargs):
+    """
+    Calculates the hosting capacity of buses for distributed generation, i.e. the largest active
+    power of a static generator at the bus that does not lead to a voltage above the limit or to
+    an overloaded line or transformer. The hosting capacity of every bus is determined for the
+    load situation in net with the generator as the only additional injection.
+
+    The limits of all candidate buses are bracketed together: A first estimate is obtained from
+    the Jacobian of the base case power flow (linear voltage rise and branch currents). The
+    brackets are then narrowed by a vectorized regula falsi (Illinois) search in which the power
+    flows of all candidate buses are solved together by a batched Newton-Raphson power flow on
+    the admittance matrix of the base case. Finally, the hosting capacities can be confirmed
+    with one runpp per bus.
+
+    INPUT:
+        **net** - The pandapower format network
+
+    OPTIONAL:
+        **buses** (list, None) - candidate buses, all in service buses without external grid if
+        None
+
+        **max_vm_pu** (float, 1.05) - voltage limit of buses without max_vm_pu in net.bus
+
+        **max_loading_percent** (float, 100.) - loading limit of lines and transformers without
+        max_loading_percent in net.line / net.trafo
+
+        **cos_phi** (float, 1.) - power factor of the generator, which absorbs reactive power
+        (underexcited operation) for cos_phi < 1
+
+        **max_p_kw** (float, 1e4) - upper bound of the hosting capacity
+
+        **tolerance_kw** (float, 1.) - accuracy of the hosting capacity
+
+        **verify** (bool, True) - confirms the hosting capacity of every bus with runpp
+
+        **kwargs** - power flow options that are passed to runpp (e.g. trafo_loading,
+        tolerance_kva)
+
+    OUTPUT:
+        **hosting_capacity** (DataFrame) - indexed by the candidate buses with the columns
+
+            - max_p_kw - hosting capacity as a positive value in kW
+            - constraint - binding constraint: "voltage", "line", "trafo", "convergence" or
+              "max_p_kw" if the hosting capacity is limited by max_p_kw
+            - element - index of the bus, line or transformer that limits the hosting capacity
+            - verified - whether runpp confirms that no limit is violated (only if verify is
+              True)
+
+        Candidate buses which are not supplied have the hosting capacity NaN.
+
+    EXAMPLE:
+        net = pandapower.networks.create_kerber_landnetz_kabel_1()
+
+        hc = calc_hosting_capacity(net, max_vm_pu=1.03)
+    """
+    ppc, ppci = _run_base_case(net, **kwargs)
+    system = _init_system(ppci, ppci["bus"][:, PD], ppci["bus"][:, QD])
+
+    if buses is None:
+        buses = net.bus.index[net.bus.in_service.values & ~net.bus.index.isin(net.ext_grid.bus)]
+    buses = pd.Index(buses)
+    bus_idx = net["_pd2ppc_lookups"]["bus"][buses.values]
+    supplied = (bus_idx >= 0) & (bus_idx < ppci["bus"].shape[0])
+    candidates = bus_idx[supplied]
+    limits = {"bus": _get_limit(net, "bus", "max_vm_pu", max_vm_pu),
+              "line": _get_limit(net, "line", "max_loading_percent", max_loading_percent),
+              "trafo": _get_limit(net, "trafo", "max_loading_percent", max_loading_percent)}
+    q_factor = np.tan(np.arccos(cos_phi))
+    options = {"tol": net["_options"]["tolerance_kva"] * 1e-3,
+               "max_iteration": net["_options"]["max_iteration"]}
+
+    def evaluate(index, p_kw):
+        return _evaluate(net, ppci, system, candidates[index], p_kw, q_factor, limits, options)
+
+    p_estimate = _linear_estimate(net, ppci, system, candidates, q_factor, limits)
+    p_kw, constraint, element = _search(evaluate, len(candidates), max_p_kw, tolerance_kw,
+                                        p_estimate)
+
+    hosting_capacity = pd.DataFrame(index=buses)
+    hosting_capacity["max_p_kw"] = np.nan
+    hosting_capacity.loc[supplied, "max_p_kw"] = p_kw
+    hosting_capacity["constraint"] = None
+    hosting_capacity.loc[supplied, "constraint"] = CONSTRAINTS[constraint]
+    hosting_capacity["element"] = np.nan
+    hosting_capacity.loc[supplied, "element"] = element
+    if verify:
+        hosting_capacity["verified"] = _verify(net, hosting_capacity, limits, q_factor,
+                                               **kwargs)
+    return hosting_capacity
+
+
+def _search(evaluate, n, max_p_kw, tolerance_kw, p_estimate):
+    """
+    Brackets the hosting capacity of all candidates between a feasible power lo and an
+    infeasible power hi and narrows the brackets by the Illinois method. In each step, only the
+    candidates whose bracket is wider than the tolerance are evaluated.
+    """
+    lo, hi = np.zeros(n), np.full(n, float(max_p_kw))
+    constraint = np.full(n, 4, dtype=int)
+    element = np.full(n, np.nan)
+    all_candidates = np.arange(n)
+    g_lo, c, e = evaluate(all_candidates, lo)
+    # limits which are already violated without generation
+    violated = g_lo > 0
+    hi[violated] = 0.
+    constraint[violated], element[violated] = c[violated], e[violated]
+    g_hi = np.full(n, np.inf)
+
+    # first estimate, the bracket is widened until the upper end is infeasible
+    p = np.clip(p_estimate, tolerance_kw, max_p_kw)
+    active = np.flatnonzero(~violated)
+    while len(active):
+        g, c, e = evaluate(active, p[active])
+        feasible = g <= 0
+        _update_bracket(active, p[active], g, c, e, feasible, lo, hi, g_lo, g_hi, constraint,
+                        element)
+        expand = active[feasible & (p[active] < max_p_kw)]
+        p[expand] = np.minimum(2 * p[expand], max_p_kw)
+        active = expand
+
+    side = np.zeros(n, dtype=int)
+    for _ in range(100):
+        active = np.flatnonzero(hi - lo > tolerance_kw)
+        if not len(active):
+            break
+        a, b, ga, gb = lo[active], hi[active], g_lo[active], g_hi[active]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            p = b - gb * (b - a) / (gb - ga)
+        # bisection if the upper end did not converge
+        p = np.where(np.isfinite(p), p, (a + b) / 2.)
+        p = np.clip(p, a + tolerance_kw / 2., b - tolerance_kw / 2.)
+        g, c, e = evaluate(active, p)
+        feasible = g <= 0
+        _update_bracket(active, p, g, c, e, feasible, lo, hi, g_lo, g_hi, constraint, element)
+        # Illinois modification: the function value of an end which is kept twice is halved
+        new_side = np.where(feasible, -1, 1)
+        kept_hi = active[(new_side == -1) & (side[active] == -1)]
+        kept_lo = active[(new_side == 1) & (side[active] == 1)]
+        g_hi[kept_hi] /= 2.
+        g_lo[kept_lo] /= 2.
+        side[active] = new_side
+    return lo, constraint, element
+
+
+def _update_bracket(index, p, g, c, e, feasible, lo, hi, g_lo, g_hi, constraint, element):
+    lo[index[feasible]] = p[feasible]
+    g_lo[index[feasible]] = g[feasible]
+    infeasible = index[~feasible]
+    hi[infeasible] = p[~feasible]
+    g_hi[infeasible] = g[~feasible]
+    constraint[infeasible] = c[~feasible]
+    element[infeasible] = e[~feasible]
+
+
+def _evaluate(net, ppci, system, candidates, p_kw, q_factor, limits, options):
+    """
+    Solves the power flows with a generator of p_kw at each of the candidate buses and returns
+    the largest relative limit violation (negative if the limits are kept), the binding
+    constraint and the binding element of each candidate.
+    """
+    n = len(candidates)
+    Sbus = np.repeat(system["Sbus"][:, np.newaxis], n, axis=1)
+    Sbus[candidates, np.arange(n)] += p_kw * (1 - 1j * q_factor) * 1e-3 / system["baseMVA"]
+    V0 = np.repeat(system["V0"][:, np.newaxis], n, axis=1)
+    V, converged, _ = _newton_batch(system, Sbus, V0, options["tol"], options["max_iteration"])
+    results = _get_sample_results(net, ppci, system, V)
+
+    margins, elements = [], []
+    for table, index in [("bus", net.bus.index), ("line", net.line.index),
+                         ("trafo", net.trafo.index)]:
+        margin = results[table] / limits[table] - 1
+        margin[np.isnan(margin)] = -np.inf
+        if not margin.shape[1]:
+            margins.append(np.full(n, -np.inf))
+            elements.append(np.full(n, np.nan))
+            continue
+        worst = np.argmax(margin, axis=1)
+        margins.append(margin[np.arange(n), worst])
+        elements.append(index.values[worst].astype(float))
+    margins, elements = np.array(margins), np.array(elements)
+    constraint = np.argmax(margins, axis=0)
+    g = margins[constraint, np.arange(n)]
+    element = elements[constraint, np.arange(n)]
+    g[~converged] = np.inf
+    constraint[~converged] = 3
+    element[~converged] = np.nan
+    return g, constraint, element
+
+
+def _linear_estimate(net, ppci, system, candidates, q_factor, limits):
+    """
+    Estimates the hosting capacity from the Jacobian of the base case. The bus voltages rise
+    linearly with the generation, the branch currents are linearized as complex values, so that
+    the reversal of the power flow is taken into account.
+    """
+    n_bus, n = len(system["V0"]), len(candidates)
+    V0 = system["V0"]
+    pvpq, pq = system["pvpq"], system["pq"]
+    lu = splu(_jacobian(system, V0[:, np.newaxis]))
+    columns = np.arange(n)
+    rows_p = np.full(n_bus, -1, dtype=int)
+    rows_p[pvpq] = np.arange(len(pvpq))
+    rows_q = np.full(n_bus, -1, dtype=int)
+    rows_q[pq] = np.arange(len(pq)) + len(pvpq)
+    rhs = np.zeros((system["dim"], n))
+    has_p, has_q = rows_p[candidates] >= 0, rows_q[candidates] >= 0
+    # change of the specified injections for 1 kW of generation
+    rhs[rows_p[candidates[has_p]], columns[has_p]] = 1e-3 / system["baseMVA"]
+    rhs[rows_q[candidates[has_q]], columns[has_q]] = -q_factor * 1e-3 / system["baseMVA"]
+    dx = lu.solve(rhs)
+    dva, dvm = np.zeros((n_bus, n)), np.zeros((n_bus, n))
+    dva[pvpq], dvm[pq] = dx[:len(pvpq)], dx[len(pvpq):]
+
+    # voltage rise
+    vm_limit = np.full(n_bus, np.inf)
+    bus_idx = net["_pd2ppc_lookups"]["bus"][net.bus.index.values]
+    in_ppci = (bus_idx >= 0) & (bus_idx < n_bus)
+    vm_limit[bus_idx[in_ppci]] = limits["bus"][in_ppci]
+    headroom = np.maximum(vm_limit - np.abs(V0), 0)[:, np.newaxis]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p_kw = np.nanmin(np.where(dvm > 0, headroom / dvm, np.inf), axis=0)
+
+    # branch currents, the rating of each branch end is converted to a per unit current
+    dV = V0[:, np.newaxis] * (1j * dva + dvm / np.abs(V0)[:, np.newaxis])
+    branch_lookup = _ppc2ppci_index(ppci["internal"]["branch_is"])
+    sqrt3 = np.sqrt(3)
+    for table in ["line", "trafo"]:
+        if table not in net["_pd2ppc_lookups"]["branch"]:
+            continue
+        f, t = net["_pd2ppc_lookups"]["branch"][table]
+        ppci_idx = branch_lookup[f:t]
+        is_br = ppci_idx >= 0
+        br = ppci_idx[is_br]
+        df = net[table]
+        limit = limits[table][is_br] / 100.
+        if table == "line":
+            rating_ka = (df["max_i_ka"].values * df["df"].values * df["parallel"].values)[is_br]
+            ratings = [rating_ka * limit, rating_ka * limit]
+        else:
+            rating_kva = (df["sn_kva"].values * df["df"].values * df["parallel"].values)[is_br]
+            ratings = [rating_kva * limit / (df[vn].values[is_br] * sqrt3 * 1e3)
+                       for vn in ["vn_hv_kv", "vn_lv_kv"]]
+        for Y, bus, rating_ka in [(system["Yf"], system["f_bus"], ratings[0]),
+                                  (system["Yt"], system["t_bus"], ratings[1])]:
+            i_max = (rating_ka * sqrt3 * system["base_kv"][bus[br]] / system["baseMVA"])
+            I0 = (Y * V0)[br][:, np.newaxis]
+            dI = (Y * dV)[br]
+            # |I0 + dI * p| = i_max
+            a = np.abs(dI) ** 2
+            b = 2 * np.real(np.conj(I0) * dI)
+            c = np.abs(I0) ** 2 - i_max[:, np.newaxis] ** 2
+            with np.errstate(invalid="ignore", divide="ignore"):
+                root = (-b + np.sqrt(b ** 2 - 4 * a * c)) / (2 * a)
+            root[np.broadcast_to(c > 0, root.shape)] = 0.
+            root[~np.isfinite(root)] = np.inf
+            if len(root):
+                p_kw = np.minimum(p_kw, np.min(root, axis=0))
+    return p_kw
+
+
+def _verify(net, hosting_capacity, limits, q_factor, tol=1e-6, **kwargs):
+    """
+    Runs one power flow per candidate bus with a static generator of the hosting capacity and
+    checks the limits.
+    """
+    kwargs.pop("recycle", None)
+    kwargs["voltage_depend_loads"] = False
+    net = copy.deepcopy(net)
+    sgen = create_sgen(net, net.bus.index[0], p_kw=0., name="hosting capacity")
+    verified = np.zeros(len(hosting_capacity), dtype=bool)
+    for i, (bus, p_kw) in enumerate(hosting_capacity["max_p_kw"].items()):
+        if np.isnan(p_kw):
+            continue
+        net.sgen.at[sgen, "bus"] = bus
+        net.sgen.at[sgen, "p_kw"] = -p_kw
+        net.sgen.at[sgen, "q_kvar"] = p_kw * q_factor
+        try:
+            runpp(net, **kwargs)
+        except LoadflowNotConverged:
+            continue
+        with np.errstate(invalid="ignore"):
+            verified[i] = not np.any(net.res_bus.vm_pu.values > limits["bus"] + tol) and \
+                          not np.any(net.res_line.loading_percent.values >
+                                     limits["line"] + tol) and \
+                          not np.any(net.res_trafo.loading_percent.values >
+                                     limits["trafo"] + tol)
+    return verified
@@ -6,12 +6,15 @@
 
 import pandas as pd
 from pandapower.create import create_empty_network
-from pandapower.auxiliary import pandapowerNet
+from pandapower.auxiliary import pandapowerNet, _DeferredTable
 import numpy
 import numbers
 import json
 import copy
 import importlib
+import io
+import os
+import zipfile
 
 try:
     from functools import singledispatch
@@ -20,12 +23,13 @@ except ImportError:
     from singledispatch import singledispatch
 
 try:
-    import fiona
-    import geopandas as gpd
-
-    GEOPANDAS_INSTALLED = True
+    from importlib.util import find_spec
 except ImportError:
-    GEOPANDAS_INSTALLED = False
+    # Python 2.7
+    from pkgutil import find_loader as find_spec
+
+# geopandas and fiona are slow to import, they are only imported when geodata is converted
+GEOPANDAS_INSTALLED = find_spec("geopandas") is not None and find_spec("fiona") is not None
 
 try:
     import pplog as logging
@@ -52,8 +56,7 @@ def to_dict_of_dfs(net, include_results=False, fallback_to_pickle=True):
         elif isinstance(value, (int, float, bool, str)):
             # attributes of primitive types are just stored in a DataFrame "parameters"
             dodfs["parameters"].loc[item] = net[item]
-        elif not isinstance(value, pd.DataFrame) and \
-                (GEOPANDAS_INSTALLED and not isinstance(value, gpd.GeoDataFrame)):
+        elif not isinstance(value, pd.DataFrame) and GEOPANDAS_INSTALLED:
             logger.warning("Could not serialize net.%s" % item)
         elif item == "bus_geodata":
             dodfs[item] = pd.DataFrame(value[["x", "y"]])
@@ -75,7 +78,7 @@ def collect_all_dtypes_df(net):
     for element, table in net.items():
         if not hasattr(table, "dtypes"):
             continue
-        for item, dtype in table.dtypes.iteritems():
+        for item, dtype in table.dtypes.items():
             dtypes.append((element, item, str(dtype)))
     return pd.DataFrame(dtypes, columns=["element", "column", "dtype"])
 
@@ -135,6 +138,172 @@ def restore_all_dtypes(net, dtypes):
         except KeyError:
             pass
 
+
+NPY_MANIFEST = "manifest.json"
+
+
+class NpyDirectory(object):
+    """
+    Container of the columnar network format which stores every .npy block as a file in a
+    directory. Numeric blocks can be loaded as memory maps.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def save_array(self, name, array):
+        filename = os.path.join(self.path, name)
+        folder = os.path.dirname(filename)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        numpy.save(filename, array, allow_pickle=False)
+
+    def load_array(self, name, mmap=False):
+        return numpy.load(os.path.join(self.path, name), mmap_mode="r" if mmap else None,
+                          allow_pickle=False)
+
+    def save_text(self, name, text):
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        with open(os.path.join(self.path, name), "w") as f:
+            f.write(text)
+
+    def load_text(self, name):
+        with open(os.path.join(self.path, name)) as f:
+            return f.read()
+
+    def exists(self):
+        return os.path.isfile(os.path.join(self.path, NPY_MANIFEST))
+
+    def close(self):
+        pass
+
+
+class NpyZip(object):
+    """
+    Container of the columnar network format which stores every .npy block uncompressed in a
+    zip file. The archive is only opened while blocks are read, memory maps are not supported.
+    """
+    def __init__(self, path, mode="r"):
+        self.path = path
+        self.zip = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) if mode == "w" else None
+
+    def save_array(self, name, array):
+        buffer = io.BytesIO()
+        numpy.save(buffer, array, allow_pickle=False)
+        self.zip.writestr(name, buffer.getvalue())
+
+    def load_array(self, name, mmap=False):
+        with zipfile.ZipFile(self.path) as archive:
+            return numpy.load(io.BytesIO(archive.read(name)), allow_pickle=False)
+
+    def save_text(self, name, text):
+        self.zip.writestr(name, text)
+
+    def load_text(self, name):
+        with zipfile.ZipFile(self.path) as archive:
+            return archive.read(name).decode("utf-8")
+
+    def exists(self):
+        return zipfile.is_zipfile(self.path)
+
+    def close(self):
+        if self.zip is not None:
+            self.zip.close()
+            self.zip = None
+
+
+def npy_store(filename, mode="r"):
+    """
+    Returns the container for a columnar network file: a zip file if the filename ends with
+    ".zip", a directory otherwise.
+    """
+    if filename.endswith(".zip"):
+        return NpyZip(filename, mode)
+    return NpyDirectory(filename)
+
+
+def save_npy_table(store, key, table):
+    """
+    Saves every column and the index of a DataFrame as a separate .npy block and returns the
+    manifest entry of the table.
+    """
+    columns = []
+    for i, (column, dtype) in enumerate(table.dtypes.items()):
+        entry = {"name": column, "dtype": str(dtype)}
+        _save_npy_block(store, "%s/%u.npy" % (key, i), table.iloc[:, i].values, entry)
+        columns.append(entry)
+    index = {"name": table.index.name, "dtype": str(table.index.dtype)}
+    _save_npy_block(store, "%s/index.npy" % key, table.index.values, index)
+    return {"columns": columns, "index": index}
+
+
+def load_npy_table(store, table, mmap=True):
+    """
+    Builds a DataFrame from the .npy blocks of a table. Numeric blocks are memory mapped if
+    the container supports it, pandas copies them into its own blocks.
+    """
+    index = pd.Index(numpy.array(_load_npy_block(store, table["index"], mmap)),
+                     name=table["index"]["name"])
+    values = dict()
+    for i, column in enumerate(table["columns"]):
+        values[i] = _load_npy_block(store, column, mmap)
+    df = pd.DataFrame(values, index=index, columns=range(len(values)))
+    df.columns = [column["name"] for column in table["columns"]]
+    for column in table["columns"]:
+        if str(df[column["name"]].dtype) != column["dtype"]:
+            df[column["name"]] = df[column["name"]].astype(column["dtype"])
+    return df
+
+
+def _save_npy_block(store, name, values, entry):
+    """
+    Saves the values of a column or an index and adds their location to the manifest entry.
+    Nothing is pickled: strings are stored as fixed-width unicode block, all other objects
+    (e.g. geodata coordinates) in the json manifest itself.
+    """
+    values = numpy.asarray(values)
+    if values.dtype != object:
+        store.save_array(name, values)
+        entry["file"] = name
+        return
+    is_none = numpy.array([v is None for v in values], dtype=bool)
+    is_nan = pd.isnull(values) & ~is_none
+    is_str = numpy.array([isinstance(v, (str, type(u""))) for v in values], dtype=bool)
+    if (is_str | is_none | is_nan).all():
+        store.save_array(name, numpy.where(is_str, values, u"").astype(numpy.unicode_))
+        entry.update({"file": name, "none": numpy.flatnonzero(is_none).tolist(),
+                      "nan": numpy.flatnonzero(is_nan).tolist()})
+    else:
+        entry["values"] = values.tolist()
+
+
+def _load_npy_block(store, entry, mmap):
+    if "values" in entry:
+        values = numpy.empty(len(entry["values"]), dtype=object)
+        for i, value in enumerate(entry["values"]):
+            values[i] = value
+        return values
+    if "none" not in entry:
+        return store.load_array(entry["file"], mmap=mmap)
+    values = store.load_array(entry["file"]).astype(object)
+    values[entry["none"]] = None
+    values[entry["nan"]] = numpy.nan
+    return values
+
+
+class LazyTable(_DeferredTable):
+    """
+    Placeholder of a table in a lazily loaded network, which is read from the columnar file
+    on the first access.
+    """
+    def __init__(self, store, table, mmap=True):
+        self.store = store
+        self.table = table
+        self.mmap = mmap
+
+    def load(self):
+        return load_npy_table(self.store, self.table, self.mmap)
+
 from json.encoder import _make_iterencode
 from json.encoder import *
 
@@ -228,6 +397,8 @@ def pp_hook(d):
                 logger.debug("failed setting int64 index")
             return df
         elif GEOPANDAS_INSTALLED and class_name == 'GeoDataFrame':
+            import fiona
+            import geopandas as gpd
             df = gpd.GeoDataFrame.from_features(fiona.Collection(obj), crs=d['crs'])
             df.set_index(df['id'].values.astype(numpy.int64), inplace=True)
             # coords column is not handled properly when using from_features
@@ -271,22 +442,21 @@ def json_net(obj):
 
 @to_serializable.register(pd.DataFrame)
 def json_dataframe(obj):
+    if type(obj).__name__ == "GeoDataFrame":
+        # GeoDataFrames are dispatched here since geopandas is not imported on registration
+        return json_geodataframe(obj)
     logger.debug('DataFrame')
     d = with_signature(obj, obj.to_json(orient='split',
                                         default_handler=to_serializable, double_precision=14))
     d.update({'dtype': obj.dtypes.astype('str').to_dict(), 'orient': 'split'})
     return d
 
-try:
-    @to_serializable.register(gpd.GeoDataFrame)
-    def json_geodataframe(obj):
-        logger.debug('GeoDataFrame')
-        d = with_signature(obj, obj.to_json())
-        d.update({'dtype': obj.dtypes.astype('str').to_dict(),
-                  'crs': obj.crs, 'columns': obj.columns})
-        return d
-except NameError:
-    pass
+def json_geodataframe(obj):
+    logger.debug('GeoDataFrame')
+    d = with_signature(obj, obj.to_json())
+    d.update({'dtype': obj.dtypes.astype('str').to_dict(),
+              'crs': obj.crs, 'columns': obj.columns})
+    return d
 
 @to_serializable.register(pd.Series)
 def json_series(obj):
@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import warnings
+
+import numpy as np
+from scipy.sparse import block_diag, coo_matrix, csr_matrix, hstack, identity, kron, vstack
+
+from pandapower.auxiliary import _clean_up
+from pandapower.idx_brch import PF, PT, QF, QT
+from pandapower.idx_bus import PD, VA
+from pandapower.idx_gen import PG
+from pandapower.optimal_powerflow import _init_opf, OPFNotConverged
+from pandapower.pd2ppc import _ppc2ppci_index
+from pandapower.run import _init_rundcopp_options
+from pandapower.timeseries import _get_profile_values, _get_injection_incidence, \
+    _init_result_arrays, _write_time_step_results
+
+try:
+    import pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+GEN_ELEMENTS = ["ext_grid", "gen", "sgen", "load", "storage"]
+
+
+def rundcopp_multiperiod(net, profiles, n_steps=None, time_step_h=0.25, keep_final_soc=True,
+                         verbose=False, check_connectivity=True, suppress_warnings=True,
+                         r_switch=0.0, delta=1e-10, trafo3w_losses="hv", **kwargs):
+    """
+    Runs a DC optimal power flow over n_steps time steps as one optimization problem, e.g. a
+    day-ahead dispatch with 96 quarter hours.
+
+    The DC OPF model of rundcopp is built once. Its linear constraints, variable bounds and costs
+    are stacked block-diagonally over all time steps, which only differ in the right hand side of
+    the power balance (loads and generation that are not controllable) and in the power limits of
+    the controllable elements. The time steps are coupled by:
+
+        - the energy content of the controllable storages, which is limited by min_e_kwh and
+          max_e_kwh and starts at soc_percent of max_e_kwh (min_e_kwh if soc_percent is NaN)
+        - ramping limits given in an optional column max_ramp_kw of net.ext_grid, net.gen,
+          net.sgen, net.load and net.storage, which limits the change of the active power of a
+          controllable element from one time step to the next
+
+    The stacked problem is solved with a single call of the QP solver of the DC OPF (see
+    OPF_ALG_DC). The storages are modelled without losses and a positive p_kw charges a storage.
+    The costs of all time steps are added up as in rundcopp, i.e. they are not weighted with the
+    time step length.
+
+    INPUT:
+        **net** - The pandapower format network
+
+        **profiles** (dict) - values of the time series, the keys are tuples (element, variable):
+
+            - ("load" / "sgen" / "storage", "p_kw") - active power of the elements that are not
+              controllable
+            - ("gen" / "sgen" / "load" / "storage", "min_p_kw" / "max_p_kw") - power limits of
+              the controllable elements
+
+        The values are either numpy arrays of shape (n_steps, len(net[element])) with the columns
+        in the order of net[element] or pandas DataFrames with the element indices as columns
+        (see run_timeseries). Values that are not given in profiles are taken from net.
+
+    OPTIONAL:
+        **n_steps** (int, None) - number of time steps, only the first n_steps rows of the
+        profiles are used. Defaults to the length of the profiles.
+
+        **time_step_h** (float, 0.25) - length of a time step in hours
+
+        **keep_final_soc** (bool, True) - the energy content of the storages at the end of the
+        last time step must at least equal the initial energy content
+
+        **verbose**, **check_connectivity**, **suppress_warnings**, **r_switch**, **delta**,
+        **trafo3w_losses** - see rundcopp
+
+        **kwargs** - pypower OPF options, e.g. OPF_ALG_DC
+
+    OUTPUT:
+        **results** (dict) - contains
+
+            - "converged" (n_steps, bool) - True if the optimization converged
+            - "iterations" (int) - number of iterations of the QP solver
+            - "cost" (n_steps) - cost of each time step
+
+        and a dict for each of "res_bus" (vm_pu, va_degree, lam_p), "res_line", "res_trafo",
+        "res_ext_grid", "res_gen", "res_sgen", "res_load" (p_kw) and "res_storage" (p_kw,
+        soc_percent) with one (n_steps x n_elements) array per result variable, as in
+        run_timeseries. The res_* tables of net are not changed. Raises OPFNotConverged if the
+        optimization does not converge.
+
+    EXAMPLE:
+        profiles = {("load", "p_kw"): p_load, ("sgen", "max_p_kw"): p_pv_available}
+
+        results = rundcopp_multiperiod(net, profiles)
+
+        soc_percent = results["res_storage"]["soc_percent"]
+    """
+    from pandapower.opf.dcopf_solver import _dc_cost_matrices, _qps_options
+    from pandapower.opf.opf import _add_multiplier_columns
+    from pandapower.opf.opf_setup import opf_setup
+    from pypower.qps_pypower import qps_pypower
+
+    if (not net.sgen.empty) & (not "controllable" in net.sgen.columns):
+        logger.warning('Warning: Please specify sgen["controllable"]\n')
+
+    if (not net.load.empty) & (not "controllable" in net.load.columns):
+        logger.warning('Warning: Please specify load["controllable"]\n')
+
+    # the auxiliary gens of dclines are appended to net.gen by _init_opf
+    n_elements = {element: len(net[element]) for element in GEN_ELEMENTS}
+    values, n_steps = _get_multiperiod_values(net, profiles, n_steps)
+    _init_rundcopp_options(net, check_connectivity=check_connectivity, r_switch=r_switch,
+                           delta=delta, trafo3w_losses=trafo3w_losses)
+    ppc, ppci, ppopt = _init_opf(net, verbose, **kwargs)
+    try:
+        with warnings.catch_warnings():
+            if suppress_warnings:
+                warnings.simplefilter("ignore")
+            _add_multiplier_columns(ppci)
+            om = opf_setup(ppci, ppopt)
+            om.build_cost_params()
+            HH, CC, C0 = _dc_cost_matrices(om)
+            qp = _stack_time_steps(net, om, HH, CC, values, n_steps, time_step_h,
+                                   keep_final_soc)
+            x, f, info, output, lmbda = qps_pypower(qp["HH"], qp["CC"], qp["A"], qp["l"],
+                                                    qp["u"], qp["xmin"], qp["xmax"], qp["x0"],
+                                                    _qps_options(ppopt))
+        if info != 1:
+            raise OPFNotConverged("Multi-period DC Optimal Power Flow did not converge!")
+        results = _multiperiod_results(net, om, qp, x, lmbda, HH, CC, C0, values, n_elements)
+        results["iterations"] = output.get("iterations", 0)
+    finally:
+        _clean_up(net, res=False)
+    return results
+
+
+def _get_multiperiod_values(net, profiles, n_steps):
+    values = dict()
+    if len(profiles):
+        values, n_profile_steps = _get_profile_values(
+            net, profiles, elements=("load", "sgen", "storage", "gen"),
+            variables=("p_kw", "min_p_kw", "max_p_kw"))
+        if ("gen", "p_kw") in values:
+            raise ValueError("the active power of gens is optimized, only min_p_kw and max_p_kw "
+                             "profiles are supported for gens")
+        if n_steps is None:
+            n_steps = n_profile_steps
+        elif n_steps > n_profile_steps:
+            raise ValueError("n_steps is %i, but the profiles only contain %i time steps"
+                             % (n_steps, n_profile_steps))
+        values = {key: val[:n_steps] for key, val in values.items()}
+    elif n_steps is None:
+        raise ValueError("no profiles given, the number of time steps has to be specified")
+    return values, n_steps
+
+
+def _controllable_gen_rows(net, element, gen_lookup, n=None):
+    """
+    Returns the ppci gen rows of the controllable elements of net[element] and their positions
+    in the first n rows of net[element].
+    """
+    n = len(net[element]) if n is None else n
+    is_elements = net["_is_elements"]
+    if element in ["ext_grid", "gen"]:
+        key = element
+        mask = is_elements[element][:n]
+    else:
+        key = element + "_controllable"
+        if key not in is_elements or not len(is_elements[key]):
+            return np.array([], dtype=int), np.array([], dtype=int)
+        mask = net[element].index[:n].isin(is_elements[key].index)
+    cols = np.flatnonzero(mask)
+    if not len(cols):
+        return np.array([], dtype=int), cols
+    rows = gen_lookup[net["_pd2ppc_lookups"][key][net[element].index.values[cols]]]
+    in_ppci = rows >= 0
+    return rows[in_ppci], cols[in_ppci]
+
+
+def _stack_time_steps(net, om, HH, CC, values, n_steps, time_step_h, keep_final_soc):
+    """
+    Stacks the DC OPF model om over n_steps time steps and adds the storage energy and ramping
+    constraints. The variables are [x_0, ..., x_n_steps-1, e_0, ..., e_n_steps-1] with the
+    variables x of the DC OPF model and the energy content e of the controllable storages.
+    """
+    from pandapower.opf.dcopf_solver import _interior_point
+
+    ppci = om.get_ppc()
+    baseMVA = ppci["baseMVA"]
+    vv, ll, _, _ = om.get_idx()
+    A, l, u = om.linear_constraints()
+    _, xmin, xmax = om.getv()
+    nx = len(xmin)
+    pg = vv["i1"]["Pg"]
+    gen_lookup = _ppc2ppci_index(ppci["internal"]["gen_is"])
+    delta = net["_options"]["delta"]
+
+    L = np.tile(l, (n_steps, 1))
+    U = np.tile(u, (n_steps, 1))
+    XMIN = np.tile(xmin, (n_steps, 1))
+    XMAX = np.tile(xmax, (n_steps, 1))
+
+    # power balance: loads and generation that are not controllable
+    p_values = {key: val for key, val in values.items() if key[1] == "p_kw"}
+    if len(p_values):
+        incidence, pd_fixed, _ = _get_injection_incidence(net, ppci, p_values)
+        pd = np.tile(pd_fixed, (n_steps, 1))
+        for (element, _), val in p_values.items():
+            pd += (incidence[element] * val.T).T
+        mis = slice(ll["i1"]["Pmis"], ll["iN"]["Pmis"])
+        delta_bmis = (pd - ppci["bus"][:, PD]) / baseMVA
+        L[:, mis] -= delta_bmis
+        U[:, mis] -= delta_bmis
+
+    # power limits of the controllable elements (see _build_gen_ppc)
+    for (element, variable), val in values.items():
+        if variable == "p_kw":
+            continue
+        rows, cols = _controllable_gen_rows(net, element, gen_lookup, val.shape[1])
+        if variable == "max_p_kw":
+            limit = -(val[:, cols] * 1e-3 + delta) / baseMVA
+            bound = XMIN
+        else:
+            limit = -(val[:, cols] * 1e-3 - delta) / baseMVA
+            bound = XMAX
+        bound[:, pg + rows] = np.where(np.isnan(limit), bound[:, pg + rows], limit)
+
+    # energy content of the storages: e_t = e_t-1 - Pg_t * time_step_h
+    st_rows, st_cols = _controllable_gen_rows(net, "storage", gen_lookup)
+    ns = len(st_rows)
+    storage = net["storage"].iloc[st_cols]
+    max_e = storage["max_e_kwh"].values.astype(float)
+    if np.any(np.isnan(max_e)):
+        raise ValueError("max_e_kwh has to be given for all controllable storages")
+    min_e = np.nan_to_num(storage["min_e_kwh"].values.astype(float))
+    soc = storage["soc_percent"].values.astype(float)
+    e_init = np.where(np.isnan(soc), min_e, soc / 100. * max_e)
+    to_pu = 1e-3 / baseMVA
+    e_offset = n_steps * nx
+    steps = np.repeat(np.arange(n_steps), ns)
+    st = np.tile(np.arange(ns), n_steps)
+    row = np.arange(n_steps * ns)
+    prev = steps > 0
+    A_storage = coo_matrix(
+        (np.r_[np.ones(n_steps * ns), -np.ones(np.sum(prev)), np.full(n_steps * ns, time_step_h)],
+         (np.r_[row, row[prev], row],
+          np.r_[e_offset + row, e_offset + row[prev] - ns, steps * nx + pg + st_rows[st]])),
+        shape=(n_steps * ns, e_offset + n_steps * ns))
+    b_storage = np.where(prev, 0., e_init[st] * to_pu)
+    constraints = [(A_storage, b_storage, b_storage)]
+    if keep_final_soc and ns:
+        A_final = coo_matrix((np.ones(ns), (np.arange(ns), e_offset + (n_steps - 1) * ns +
+                                            np.arange(ns))),
+                             shape=(ns, e_offset + n_steps * ns))
+        constraints.append((A_final, e_init * to_pu, np.full(ns, np.inf)))
+
+    # ramping limits: -max_ramp <= Pg_t - Pg_t-1 <= max_ramp
+    ramp_rows, ramp = [], []
+    for element in GEN_ELEMENTS:
+        if "max_ramp_kw" not in net[element].columns:
+            continue
+        rows, cols = _controllable_gen_rows(net, element, gen_lookup)
+        max_ramp = net[element]["max_ramp_kw"].values[cols].astype(float)
+        is_limited = ~np.isnan(max_ramp)
+        ramp_rows.append(rows[is_limited])
+        ramp.append(max_ramp[is_limited] * to_pu)
+    if len(ramp_rows) and n_steps > 1:
+        ramp_rows = np.concatenate(ramp_rows)
+        ramp = np.tile(np.concatenate(ramp), n_steps - 1)
+        nr = len(ramp_rows)
+        steps = np.repeat(np.arange(1, n_steps), nr)
+        cols = pg + np.tile(ramp_rows, n_steps - 1)
+        row = np.arange(len(steps))
+        A_ramp = coo_matrix((np.r_[np.ones(len(row)), -np.ones(len(row))],
+                             (np.r_[row, row], np.r_[steps * nx + cols, (steps - 1) * nx + cols])),
+                            shape=(len(row), e_offset + n_steps * ns))
+        constraints.append((A_ramp, -ramp, ramp))
+
+    A_steps = hstack([kron(identity(n_steps), A), csr_matrix((A.shape[0] * n_steps, n_steps * ns))])
+    A_all = vstack([A_steps] + [c[0] for c in constraints], "csr")
+    l_all = np.concatenate([L.ravel()] + [c[1] for c in constraints])
+    u_all = np.concatenate([U.ravel()] + [c[2] for c in constraints])
+
+    e_min, e_max = np.tile(min_e * to_pu, n_steps), np.tile(max_e * to_pu, n_steps)
+    x0 = np.concatenate([_interior_point(om, XMIN[t], XMAX[t]) for t in range(n_steps)] +
+                        [(e_min + e_max) / 2])
+
+    return {"HH": block_diag([kron(identity(n_steps), HH), csr_matrix((n_steps * ns,) * 2)],
+                             "csr"),
+            "CC": np.r_[np.tile(CC, n_steps), np.zeros(n_steps * ns)],
+            "A": A_all, "l": l_all, "u": u_all, "x0": x0,
+            "xmin": np.r_[XMIN.ravel(), e_min], "xmax": np.r_[XMAX.ravel(), e_max],
+            "n_steps": n_steps, "nx": nx, "nA": A.shape[0], "storage": st_cols}
+
+
+def _multiperiod_results(net, om, qp, x, lmbda, HH, CC, C0, values, n_elements):
+    ppci = om.get_ppc()
+    baseMVA = ppci["baseMVA"]
+    vv, ll, _, _ = om.get_idx()
+    n_steps, nx = qp["n_steps"], qp["nx"]
+    X = x[:n_steps * nx].reshape(n_steps, nx)
+    Va = X[:, vv["i1"]["Va"]:vv["iN"]["Va"]]
+    Pg = X[:, vv["i1"]["Pg"]:vv["iN"]["Pg"]] * baseMVA
+    Bf = om.userdata('Bf')
+    Pfinj = om.userdata('Pfinj')
+    Pf = (Bf * Va.T).T * baseMVA + Pfinj * baseMVA
+
+    results = _init_result_arrays(net, n_steps)
+    results["converged"][:] = True
+    results["cost"] = 0.5 * np.sum(X * (HH * X.T).T, axis=1) + X.dot(CC) + C0
+    step_ppci = {"bus": ppci["bus"].copy(), "branch": ppci["branch"].copy(),
+                 "gen": ppci["gen"].copy(), "internal": ppci["internal"]}
+    step_ppci["branch"][:, [QF, QT]] = 0.
+    for step in range(n_steps):
+        step_ppci["bus"][:, VA] = Va[step] * 180. / np.pi
+        step_ppci["gen"][:, PG] = Pg[step]
+        step_ppci["branch"][:, PF] = Pf[step]
+        step_ppci["branch"][:, PT] = -Pf[step]
+        _write_time_step_results(net, step_ppci, results, step)
+
+    # locational marginal prices of the power balance constraints
+    mis = qp["nA"] * np.arange(n_steps)[:, np.newaxis] + \
+          np.arange(ll["i1"]["Pmis"], ll["iN"]["Pmis"])
+    lam_p = (lmbda["mu_u"][mis] - lmbda["mu_l"][mis]) / baseMVA
+    bus_idx = net["_pd2ppc_lookups"]["bus"][net["bus"].index.values]
+    in_ppci = (bus_idx >= 0) & (bus_idx < ppci["bus"].shape[0])
+    results["res_bus"]["lam_p"] = np.full((n_steps, len(net["bus"])), np.nan)
+    results["res_bus"]["lam_p"][:, in_ppci] = lam_p[:, bus_idx[in_ppci]]
+
+    # active power of gens, sgens, loads and storages
+    gen_lookup = _ppc2ppci_index(ppci["internal"]["gen_is"])
+    for element in GEN_ELEMENTS[1:]:
+        n = n_elements[element]
+        if element == "gen":
+            p_kw = np.zeros((n_steps, n))
+        else:
+            df = net[element]
+            p_kw = values.get((element, "p_kw"), np.tile(df["p_kw"].values, (n_steps, 1)))
+            p_kw = p_kw * net["_is_elements"][element] * df["scaling"].values
+        rows, cols = _controllable_gen_rows(net, element, gen_lookup, n)
+        p_kw[:, cols] = -Pg[:, rows] * 1e3
+        results["res_" + element] = {"p_kw": p_kw}
+
+    st_cols = qp["storage"]
+    e_kwh = x[n_steps * nx:].reshape(n_steps, len(st_cols)) * baseMVA * 1e3
+    soc_percent = np.full((n_steps, n_elements["storage"]), np.nan)
+    soc_percent[:, st_cols] = e_kwh / net["storage"]["max_e_kwh"].values[st_cols] * 100.
+    results["res_storage"]["soc_percent"] = soc_percent
+    return results
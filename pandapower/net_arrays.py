@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+from contextlib import contextmanager
+from functools import wraps
+
+import numpy as np
+
+
+class ElementArrays(object):
+    """
+    Columnar view of an element table. Each column is extracted from the DataFrame once as a
+    contiguous numpy array on first access and cached afterwards.
+
+    INPUT:
+        **df** (DataFrame) - the element table
+
+    OPTIONAL:
+        **element** (str, None) - name of the element table
+    """
+
+    def __init__(self, df, element=None):
+        self.element = element
+        self.index = df.index.values
+        self._df = df
+        self._columns = dict()
+        self._index_map = None
+
+    def __getitem__(self, column):
+        try:
+            return self._columns[column]
+        except KeyError:
+            values = np.ascontiguousarray(self._df[column].values)
+            self._columns[column] = values
+            return values
+
+    def __contains__(self, column):
+        return column in self._columns or column in self._df.columns
+
+    def __len__(self):
+        return len(self.index)
+
+    def positions(self, indices):
+        """
+        Returns the positions of the given element indices in the columns. The dense index map
+        from indices to positions is built on the first call.
+        """
+        if self._index_map is None:
+            max_index = self.index.max() if len(self.index) else -1
+            self._index_map = -np.ones(max_index + 1, dtype=int)
+            self._index_map[self.index] = np.arange(len(self.index))
+        return self._index_map[indices]
+
+    def invalidate(self, column=None):
+        """
+        Drops the cached arrays of the given column or of all columns, so that they are extracted
+        from the DataFrame again on the next access.
+        """
+        if column is None:
+            self._columns.clear()
+        else:
+            self._columns.pop(column, None)
+
+
+class NetArrays(object):
+    """
+    Columnar representation of the element tables of a pandapower network for the conversion to
+    the internal pypower format. The ElementArrays of each table are created on first access.
+
+    The arrays are a snapshot of the network: the DataFrames of the network must not be changed
+    while a NetArrays object is used, unless the changed tables are invalidated. The conversion
+    functions therefore only keep the snapshot in net["_arrays"] while they run (see
+    _with_net_arrays), so that it is neither stored with the network nor used after the tables
+    were changed.
+
+    INPUT:
+        **net** - The pandapower format network
+
+    EXAMPLE:
+        arrays = NetArrays(net)
+
+        r_ohm_per_km = arrays["line"]["r_ohm_per_km"]
+
+        vn_kv = arrays["bus"]["vn_kv"][arrays["bus"].positions(from_bus)]
+    """
+
+    def __init__(self, net):
+        self._net = net
+        self._elements = dict()
+
+    def __getitem__(self, element):
+        try:
+            return self._elements[element]
+        except KeyError:
+            arrays = ElementArrays(self._net[element], element)
+            self._elements[element] = arrays
+            return arrays
+
+    def invalidate(self, element=None, column=None):
+        """
+        Drops the cached arrays of an element table (or of one of its columns) or of all tables.
+        This has to be called after an element table was changed.
+        """
+        if element is None:
+            self._elements.clear()
+        elif element in self._elements:
+            if column is None:
+                del self._elements[element]
+            else:
+                self._elements[element].invalidate(column)
+
+
+@contextmanager
+def _net_arrays(net):
+    """
+    Provides a NetArrays snapshot of the network in net["_arrays"] and removes it afterwards. If
+    the snapshot of the network is already provided by an enclosing conversion, it is reused.
+    """
+    arrays = net.get("_arrays", None)
+    if isinstance(arrays, NetArrays) and arrays._net is net:
+        yield arrays
+        return
+    net["_arrays"] = NetArrays(net)
+    try:
+        yield net["_arrays"]
+    finally:
+        net.pop("_arrays", None)
+
+
+def _with_net_arrays(func):
+    """
+    Decorator for conversion functions with the network as first argument, which read the
+    element tables from net["_arrays"].
+    """
+    @wraps(func)
+    def wrapper(net, *args, **kwargs):
+        with _net_arrays(net):
+            return func(net, *args, **kwargs)
+    return wrapper
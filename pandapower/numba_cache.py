@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import importlib
+
+import pandas as pd
+
+from pandapower.auxiliary import _check_if_numba_is_installed
+
+try:
+    import pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+# modules which define the numba kernels of the power flow
+KERNEL_MODULES = ["pandapower.auxiliary", "pandapower.build_bus", "pandapower.pf.makeYbus",
+                  "pandapower.pf.create_jacobian_numba", "pandapower.pf.dSbus_dV_numba",
+                  "pandapower.pf.pfsoln"]
+
+
+def precompile(check_cache=True):
+    """
+    Compiles the numba kernels of the power flow for the signatures which are used by runpp and
+    writes them to the numba on-disk cache. Later processes load the compiled kernels from the
+    cache instead of compiling them again, so that the first power flow of a new process (e.g. of
+    a worker in a parallel time series or Monte Carlo simulation) is not slowed down by the jit
+    compilation.
+
+    The kernels are compiled by running power flows of small example networks with the
+    Newton-Raphson and the backward/forward sweep algorithm. Helper functions which are only
+    called from other kernels are compiled into these kernels and are not listed separately.
+
+    OPTIONAL:
+
+        **check_cache** (bool, True) - checks for each compiled signature if it can be loaded
+            from the on-disk cache
+
+    OUTPUT:
+
+        **kernels** (DataFrame) - one row per compiled numba kernel with the number of
+            signatures, the cache hits and misses of this process, the cache directory and, if
+            check_cache is True, whether all signatures can be loaded from the cache
+
+    EXAMPLE:
+
+        import pandapower as pp
+
+        kernels = pp.precompile()
+        assert kernels.cached.all()
+
+    """
+    columns = ["signatures", "cache_hits", "cache_misses", "cache_path"]
+    if check_cache:
+        columns.append("cached")
+    if not _check_if_numba_is_installed(True):
+        return pd.DataFrame(columns=columns)
+
+    _warm_up_kernels()
+    names, rows = [], []
+    for name, dispatcher in _numba_kernels():
+        if not len(dispatcher.signatures):
+            continue
+        cache = getattr(dispatcher, "_cache", None)
+        row = {"signatures": len(dispatcher.signatures),
+               "cache_hits": sum(dispatcher.stats.cache_hits.values()),
+               "cache_misses": sum(dispatcher.stats.cache_misses.values()),
+               "cache_path": getattr(cache, "cache_path", None)}
+        if check_cache:
+            row["cached"] = _signatures_cached(dispatcher)
+        names.append(name)
+        rows.append(row)
+    kernels = pd.DataFrame(rows, index=names, columns=columns)
+    if not check_cache:
+        return kernels
+    not_cached = kernels.index[~kernels.cached]
+    if len(not_cached):
+        logger.warning("The numba kernels %s could not be loaded from the on-disk cache. Check if "
+                       "the cache directory is writable or set NUMBA_CACHE_DIR."
+                       % ", ".join(not_cached))
+    return kernels
+
+
+def _warm_up_kernels():
+    """
+    Runs the power flows which compile the numba kernels. Networks with and without PV buses are
+    calculated since the Jacobian is built by different kernels.
+    """
+    from pandapower.run import runpp
+    from pandapower.networks import example_simple, example_multivoltage
+
+    nets = [example_simple(), example_multivoltage()]
+    no_pv = example_simple()
+    no_pv.gen.in_service = False
+    nets.append(no_pv)
+    for net in nets:
+        runpp(net, numba=True)
+    try:
+        runpp(example_simple(), algorithm="bfsw", numba=True)
+    except Exception as e:
+        logger.debug("backward/forward sweep warm-up failed: %s" % e)
+
+
+def _numba_kernels():
+    """
+    Yields the name and dispatcher of all numba kernels in the kernel modules.
+    """
+    try:
+        from numba.core.dispatcher import Dispatcher
+    except ImportError:
+        # numba < 0.49
+        from numba.dispatcher import Dispatcher
+
+    for module_name in KERNEL_MODULES:
+        module = importlib.import_module(module_name)
+        for name in sorted(vars(module)):
+            obj = getattr(module, name)
+            if isinstance(obj, Dispatcher) and obj.__module__ == module_name:
+                yield "%s.%s" % (module_name, name), obj
+
+
+def _signatures_cached(dispatcher):
+    """
+    Returns True if all compiled signatures of the dispatcher are in the index of its on-disk
+    cache. Kernels without cache are reported as not cached.
+    """
+    cache = getattr(dispatcher, "_cache", None)
+    if cache is None or cache.cache_path is None:
+        return False
+    try:
+        # the index is read instead of loading the overloads, since loading a kernel which is
+        # already compiled in this process is not supported by numba
+        index = cache._cache_file._load_index()
+        codegen = dispatcher.targetctx.codegen()
+        return all(cache._index_key(sig, codegen) in index for sig in dispatcher.signatures)
+    except Exception as e:
+        logger.debug("checking the numba cache failed: %s" % e)
+        return False
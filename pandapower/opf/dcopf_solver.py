@@ -74,44 +74,107 @@ def dcopf_solver(om, ppopt, out_opt=None):
     if out_opt is None:
         out_opt = {}
 
-    ## options
-    verbose = ppopt['VERBOSE']
-    alg     = ppopt['OPF_ALG_DC']
-
-    if alg == 0:
-        if have_fcn('cplex'):        ## use CPLEX by default, if available
-            alg = 500
-        elif have_fcn('mosek'):      ## if not, then MOSEK, if available
-            alg = 600
-        elif have_fcn('gurobi'):     ## if not, then Gurobi, if available
-            alg = 700
-        else:                        ## otherwise PIPS
-            alg = 200
-
     ## unpack data
     ppc = om.get_ppc()
-    baseMVA, bus, gen, branch, gencost = \
-        ppc["baseMVA"], ppc["bus"], ppc["gen"], ppc["branch"], ppc["gencost"]
-    cp = om.get_cost_params()
-    N, H, Cw = cp["N"], cp["H"], cp["Cw"]
-    fparm = array(c_[cp["dd"], cp["rh"], cp["kk"], cp["mm"]])
+    baseMVA, bus, gen, branch = ppc["baseMVA"], ppc["bus"], ppc["gen"], ppc["branch"]
     Bf = om.userdata('Bf')
     Pfinj = om.userdata('Pfinj')
     vv, ll, _, _ = om.get_idx()
 
     ## problem dimensions
-    ipol = find(gencost[:, MODEL] == POLYNOMIAL) ## polynomial costs
-    ipwl = find(gencost[:, MODEL] == PW_LINEAR)  ## piece-wise linear costs
     nb = bus.shape[0]              ## number of buses
     nl = branch.shape[0]           ## number of branches
-    nw = N.shape[0]                ## number of general cost vars, w
     ny = om.getN('var', 'y')       ## number of piece-wise linear costs
-    nxyz = om.getN('var')          ## total number of control vars of all types
 
     ## linear constraints & variable bounds
     A, l, u = om.linear_constraints()
     x0, xmin, xmax = om.getv()
 
+    ## objective function f = 1/2 * X'*HH*X + CC'*X + C0
+    HH, CC, C0 = _dc_cost_matrices(om)
+
+    ## set up input for QP solver
+    opt = _qps_options(ppopt)
+    if (opt['alg'] == 200) or (opt['alg'] == 250):
+        x0 = _interior_point(om, xmin, xmax)
+
+    ##-----  run opf  -----
+    x, f, info, output, lmbda = \
+            qps_pypower(HH, CC, A, l, u, xmin, xmax, x0, opt)
+    success = (info == 1)
+
+    ##-----  calculate return values  -----
+    if not any(isnan(x)):
+        ## update solution data
+        Va = x[vv["i1"]["Va"]:vv["iN"]["Va"]]
+        Pg = x[vv["i1"]["Pg"]:vv["iN"]["Pg"]]
+        f = f + C0
+
+        ## update voltages & generator outputs
+        bus[:, VA] = Va * 180 / pi
+        gen[:, PG] = Pg * baseMVA
+
+        ## compute branch flows
+        branch[:, [QF, QT]] = zeros((nl, 2))
+        branch[:, PF] = (Bf * Va + Pfinj) * baseMVA
+        branch[:, PT] = -branch[:, PF]
+
+    ## package up results
+    mu_l = lmbda["mu_l"]
+    mu_u = lmbda["mu_u"]
+    muLB = lmbda["lower"]
+    muUB = lmbda["upper"]
+
+    ## update Lagrange multipliers
+    il = find((branch[:, RATE_A] != 0) & (branch[:, RATE_A] < 1e10))
+    bus[:, [LAM_P, LAM_Q, MU_VMIN, MU_VMAX]] = zeros((nb, 4))
+    gen[:, [MU_PMIN, MU_PMAX, MU_QMIN, MU_QMAX]] = zeros((gen.shape[0], 4))
+    branch[:, [MU_SF, MU_ST]] = zeros((nl, 2))
+    bus[:, LAM_P]       = (mu_u[ll["i1"]["Pmis"]:ll["iN"]["Pmis"]] -
+                           mu_l[ll["i1"]["Pmis"]:ll["iN"]["Pmis"]]) / baseMVA
+    branch[il, MU_SF]   = mu_u[ll["i1"]["Pf"]:ll["iN"]["Pf"]] / baseMVA
+    branch[il, MU_ST]   = mu_u[ll["i1"]["Pt"]:ll["iN"]["Pt"]] / baseMVA
+    gen[:, MU_PMIN]     = muLB[vv["i1"]["Pg"]:vv["iN"]["Pg"]] / baseMVA
+    gen[:, MU_PMAX]     = muUB[vv["i1"]["Pg"]:vv["iN"]["Pg"]] / baseMVA
+
+    pimul = r_[
+      mu_l - mu_u,
+     -ones((ny)), ## dummy entry corresponding to linear cost row in A
+      muLB - muUB
+    ]
+
+    mu = { 'var': {'l': muLB, 'u': muUB},
+           'lin': {'l': mu_l, 'u': mu_u} }
+
+    results = deepcopy(ppc)
+    results["bus"], results["branch"], results["gen"], \
+        results["om"], results["x"], results["mu"], results["f"] = \
+            bus, branch, gen, om, x, mu, f
+
+    raw = {'xr': x, 'pimul': pimul, 'info': info, 'output': output}
+
+    return results, success, raw
+
+
+def _dc_cost_matrices(om):
+    """Builds the objective function of the DC OPF model C{om} in the form
+    C{f = 1/2 * X'*HH*X + CC'*X + C0}.
+
+    Returns C{HH}, C{CC} and the constant term C{C0}.
+    """
+    ppc = om.get_ppc()
+    baseMVA, gencost = ppc["baseMVA"], ppc["gencost"]
+    cp = om.get_cost_params()
+    N, H, Cw = cp["N"], cp["H"], cp["Cw"]
+    fparm = array(c_[cp["dd"], cp["rh"], cp["kk"], cp["mm"]])
+    vv, _, _, _ = om.get_idx()
+
+    ## problem dimensions
+    ipol = find(gencost[:, MODEL] == POLYNOMIAL) ## polynomial costs
+    nw = N.shape[0]                ## number of general cost vars, w
+    ny = om.getN('var', 'y')       ## number of piece-wise linear costs
+    nxyz = om.getN('var')          ## total number of control vars of all types
+
     ## set up objective function of the form: f = 1/2 * X'*HH*X + CC'*X
     ## where X = [x;y;z]. First set up as quadratic function of w,
     ## f = 1/2 * w'*HHw*w + CCw'*w, where w = diag(M) * (N*X - Rhat). We
@@ -180,26 +243,29 @@ def dcopf_solver(om, ppopt, out_opt=None):
     HH = MN.T * HHw * MN
     CC = MN.T * (CCw - HMR)
     C0 = 0.5 * dot(MR, HMR) + sum(polycf[:, 2])  # Constant term of cost.
+    return HH, CC, C0
+
+
+def _qps_options(ppopt):
+    """Selects the QP solver and sets up its options from the PYPOWER options C{ppopt}.
+
+    Returns the C{opt} dict of L{qps_pypower}.
+    """
+    verbose = ppopt['VERBOSE']
+    alg     = ppopt['OPF_ALG_DC']
+
+    if alg == 0:
+        if have_fcn('cplex'):        ## use CPLEX by default, if available
+            alg = 500
+        elif have_fcn('mosek'):      ## if not, then MOSEK, if available
+            alg = 600
+        elif have_fcn('gurobi'):     ## if not, then Gurobi, if available
+            alg = 700
+        else:                        ## otherwise PIPS
+            alg = 200
 
-    ## set up input for QP solver
     opt = {'alg': alg, 'verbose': verbose}
     if (alg == 200) or (alg == 250):
-        ## try to select an interior initial point
-        Varefs = bus[bus[:, BUS_TYPE] == REF, VA] * (pi / 180.0)
-
-        lb, ub = xmin.copy(), xmax.copy()
-        lb[xmin == -Inf] = -1e10   ## replace Inf with numerical proxies
-        ub[xmax ==  Inf] =  1e10
-        x0 = (lb + ub) / 2;
-        # angles set to first reference angle
-        x0[vv["i1"]["Va"]:vv["iN"]["Va"]] = Varefs[0]
-        if ny > 0:
-            ipwl = find(gencost[:, MODEL] == PW_LINEAR)
-            # largest y-value in CCV data
-            c = gencost.flatten('F')[sub2ind(gencost.shape, ipwl,
-                                NCOST + 2 * gencost[ipwl, NCOST])]
-            x0[vv["i1"]["y"]:vv["iN"]["y"]] = max(c) + 0.1 * abs(max(c))
-
         ## set up options
         feastol = ppopt['PDIPM_FEASTOL']
         gradtol = ppopt['PDIPM_GRADTOL']
@@ -226,60 +292,30 @@ def dcopf_solver(om, ppopt, out_opt=None):
         opt['grb_opt'] = gurobi_options([], ppopt)
     else:
         raise ValueError("Unrecognised solver [%d]." % alg)
+    return opt
 
-    ##-----  run opf  -----
-    x, f, info, output, lmbda = \
-            qps_pypower(HH, CC, A, l, u, xmin, xmax, x0, opt)
-    success = (info == 1)
-
-    ##-----  calculate return values  -----
-    if not any(isnan(x)):
-        ## update solution data
-        Va = x[vv["i1"]["Va"]:vv["iN"]["Va"]]
-        Pg = x[vv["i1"]["Pg"]:vv["iN"]["Pg"]]
-        f = f + C0
-
-        ## update voltages & generator outputs
-        bus[:, VA] = Va * 180 / pi
-        gen[:, PG] = Pg * baseMVA
-
-        ## compute branch flows
-        branch[:, [QF, QT]] = zeros((nl, 2))
-        branch[:, PF] = (Bf * Va + Pfinj) * baseMVA
-        branch[:, PT] = -branch[:, PF]
-
-    ## package up results
-    mu_l = lmbda["mu_l"]
-    mu_u = lmbda["mu_u"]
-    muLB = lmbda["lower"]
-    muUB = lmbda["upper"]
-
-    ## update Lagrange multipliers
-    il = find((branch[:, RATE_A] != 0) & (branch[:, RATE_A] < 1e10))
-    bus[:, [LAM_P, LAM_Q, MU_VMIN, MU_VMAX]] = zeros((nb, 4))
-    gen[:, [MU_PMIN, MU_PMAX, MU_QMIN, MU_QMAX]] = zeros((gen.shape[0], 4))
-    branch[:, [MU_SF, MU_ST]] = zeros((nl, 2))
-    bus[:, LAM_P]       = (mu_u[ll["i1"]["Pmis"]:ll["iN"]["Pmis"]] -
-                           mu_l[ll["i1"]["Pmis"]:ll["iN"]["Pmis"]]) / baseMVA
-    branch[il, MU_SF]   = mu_u[ll["i1"]["Pf"]:ll["iN"]["Pf"]] / baseMVA
-    branch[il, MU_ST]   = mu_u[ll["i1"]["Pt"]:ll["iN"]["Pt"]] / baseMVA
-    gen[:, MU_PMIN]     = muLB[vv["i1"]["Pg"]:vv["iN"]["Pg"]] / baseMVA
-    gen[:, MU_PMAX]     = muUB[vv["i1"]["Pg"]:vv["iN"]["Pg"]] / baseMVA
-
-    pimul = r_[
-      mu_l - mu_u,
-     -ones((ny)), ## dummy entry corresponding to linear cost row in A
-      muLB - muUB
-    ]
-
-    mu = { 'var': {'l': muLB, 'u': muUB},
-           'lin': {'l': mu_l, 'u': mu_u} }
 
-    results = deepcopy(ppc)
-    results["bus"], results["branch"], results["gen"], \
-        results["om"], results["x"], results["mu"], results["f"] = \
-            bus, branch, gen, om, x, mu, f
-
-    raw = {'xr': x, 'pimul': pimul, 'info': info, 'output': output}
-
-    return results, success, raw
+def _interior_point(om, xmin, xmax):
+    """Tries to select an interior initial point of the DC OPF model C{om} for the variable
+    bounds C{xmin}, C{xmax}.
+    """
+    ppc = om.get_ppc()
+    bus, gencost = ppc["bus"], ppc["gencost"]
+    vv, _, _, _ = om.get_idx()
+    ny = om.getN('var', 'y')
+
+    Varefs = bus[bus[:, BUS_TYPE] == REF, VA] * (pi / 180.0)
+
+    lb, ub = xmin.copy(), xmax.copy()
+    lb[xmin == -Inf] = -1e10   ## replace Inf with numerical proxies
+    ub[xmax ==  Inf] =  1e10
+    x0 = (lb + ub) / 2;
+    # angles set to first reference angle
+    x0[vv["i1"]["Va"]:vv["iN"]["Va"]] = Varefs[0]
+    if ny > 0:
+        ipwl = find(gencost[:, MODEL] == PW_LINEAR)
+        # largest y-value in CCV data
+        c = gencost.flatten('F')[sub2ind(gencost.shape, ipwl,
+                            NCOST + 2 * gencost[ipwl, NCOST])]
+        x0[vv["i1"]["y"]:vv["iN"]["y"]] = max(c) + 0.1 * abs(max(c))
+    return x0
@@ -153,17 +153,7 @@ def opf(*args):
     ppc, ppopt = opf_args2(*args)
 
     ## add zero columns to bus, gen, branch for multipliers, etc if needed
-    nb   = shape(ppc['bus'])[0]    ## number of buses
-    nl   = shape(ppc['branch'])[0] ## number of branches
-    ng   = shape(ppc['gen'])[0]    ## number of dispatchable injections
-    if shape(ppc['bus'])[1] < MU_VMIN + 1:
-        ppc['bus'] = c_[ppc['bus'], zeros((nb, MU_VMIN + 1 - shape(ppc['bus'])[1]))]
-
-    if shape(ppc['gen'])[1] < MU_QMIN + 1:
-        ppc['gen'] = c_[ppc['gen'], zeros((ng, MU_QMIN + 1 - shape(ppc['gen'])[1]))]
-
-    if shape(ppc['branch'])[1] < MU_ANGMAX + 1:
-        ppc['branch'] = c_[ppc['branch'], zeros((nl, MU_ANGMAX + 1 - shape(ppc['branch'])[1]))]
+    _add_multiplier_columns(ppc)
 
     ##-----  convert to internal numbering, remove out-of-service stuff  -----
     # ppc = ext2int(ppc)
@@ -192,3 +182,19 @@ def opf(*args):
     results['raw'] = raw
 
     return results
+
+
+def _add_multiplier_columns(ppc):
+    """Adds zero columns to bus, gen, branch for multipliers, etc if needed.
+    """
+    nb   = shape(ppc['bus'])[0]    ## number of buses
+    nl   = shape(ppc['branch'])[0] ## number of branches
+    ng   = shape(ppc['gen'])[0]    ## number of dispatchable injections
+    if shape(ppc['bus'])[1] < MU_VMIN + 1:
+        ppc['bus'] = c_[ppc['bus'], zeros((nb, MU_VMIN + 1 - shape(ppc['bus'])[1]))]
+
+    if shape(ppc['gen'])[1] < MU_QMIN + 1:
+        ppc['gen'] = c_[ppc['gen'], zeros((ng, MU_QMIN + 1 - shape(ppc['gen'])[1]))]
+
+    if shape(ppc['branch'])[1] < MU_ANGMAX + 1:
+        ppc['branch'] = c_[ppc['branch'], zeros((nl, MU_ANGMAX + 1 - shape(ppc['branch'])[1]))]
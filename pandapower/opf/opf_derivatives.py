@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+"""Evaluates the nonlinear constraints of the AC OPF, their Jacobian and the Hessian of the
+Lagrangian on sparsity patterns which are built once per OPF model.
+"""
+
+from numpy import arange, argsort, bincount, conj, cumsum, diff, empty, exp, full, int32, int64, \
+    ones, r_, repeat, searchsorted, vstack as np_vstack, zeros, complex128, Inf, \
+    flatnonzero as find
+from pypower.makeSbus import makeSbus
+from pypower.polycost import polycost
+from scipy.sparse import csr_matrix as sparse, eye
+
+from pandapower.idx_brch import RATE_A
+from pandapower.idx_cost import MODEL, POLYNOMIAL
+from pandapower.idx_gen import GEN_BUS, PG, QG
+
+try:
+    # numba functions
+    from pandapower.opf.opf_derivatives_numba import power_balance_jacobian, \
+        power_balance_hessian, branch_current_jacobian, branch_current_hessian
+except ImportError:
+    pass
+
+
+def _make_derivative_patterns(om, Ybus, Yf, Yt, ppopt, il):
+    """
+    Builds the sparsity patterns of the constraint Jacobian and of the Hessian of the Lagrangian
+    and the positions of their entries in the CSR data arrays, which the numba kernels fill in
+    each iteration. The Va/Vm blocks of the Hessian use the union of the patterns of Ybus,
+    Ybus.T and of Yf.T * Yf and Yt.T * Yt, so the patterns do not depend on the voltages or the
+    multipliers and the KKT matrix of pips keeps its structure during the solve.
+
+    Returns None if the model is not supported (no numba, flow limits other than current
+    magnitudes, generalized costs or a non standard order of the variables). In this case, the
+    pypower functions opf_consfcn and opf_hessfcn have to be used.
+    """
+    if not ppopt.get("NUMBA", False) or ppopt['OPF_FLOW_LIM'] != 2:
+        return None
+    try:
+        power_balance_jacobian
+    except NameError:
+        return None
+    ppc = om.get_ppc()
+    baseMVA, gen, branch = ppc["baseMVA"], ppc["gen"], ppc["branch"]
+    vv, _, _, _ = om.get_idx()
+    nb = Ybus.shape[0]
+    ng = gen.shape[0]
+    nx = om.getN('var')
+    N = om.get_cost_params()["N"]
+    if N is not None and N.shape[0] and N.nnz > 0:
+        return None
+    if [vv["i1"][name] for name in ["Va", "Vm", "Pg", "Qg"]] != [0, nb, 2 * nb, 2 * nb + ng]:
+        return None
+
+    Ybus, Yf, Yt = [_canonical(Y) for Y in (Ybus, Yf, Yt)]
+    Sf, St = _structure(Yf), _structure(Yt)
+    S = _structure(Ybus)
+    S = _canonical(S + S.T + eye(nb, format="csr") + Sf.T * Sf + St.T * St)
+    Sp, Sj = S.indptr, S.indices
+    nnz = S.nnz
+    row = repeat(arange(nb), diff(Sp))
+    k = arange(nnz)
+    d = {"Sp": Sp, "Sj": Sj,
+         "YS": _values_on_pattern(S, Ybus), "YSt": _values_on_pattern(S, _canonical(Ybus.T)),
+         "diag_pos": _positions(S, eye(nb, format="csr")).astype(int32)}
+
+    # Hessian: rows Va and Vm with the pattern S in the Va and the Vm columns, diagonal Pg/Qg rows
+    d["H_pos"] = np_vstack([Sp[row] + k, Sp[row + 1] + k,
+                            2 * nnz + Sp[row] + k, 2 * nnz + Sp[row + 1] + k]).astype(int32)
+    Hj = empty(4 * nnz + 2 * ng, dtype=int32)
+    Hj[d["H_pos"][0]] = Hj[d["H_pos"][2]] = Sj
+    Hj[d["H_pos"][1]] = Hj[d["H_pos"][3]] = nb + Sj
+    Hj[4 * nnz:] = 2 * nb + arange(2 * ng)
+    d["Hj"] = Hj
+    d["Hp"] = r_[2 * Sp, 2 * nnz + 2 * Sp[1:], 4 * nnz + arange(1, 2 * ng + 1),
+                 full(nx - 2 * nb - 2 * ng, 4 * nnz + 2 * ng)].astype(int32)
+
+    # Jacobian of the power balance: rows P and Q with the pattern S in the Va and the Vm
+    # columns followed by the connected gens
+    gbus = gen[:, GEN_BUS].astype(int64)
+    order = argsort(gbus, kind="mergesort")
+    gptr = r_[0, cumsum(bincount(gbus, minlength=nb))]
+    q0 = 2 * nnz + ng
+    d["G_pos"] = np_vstack([Sp[row] + gptr[row] + k, Sp[row + 1] + gptr[row] + k,
+                            q0 + Sp[row] + gptr[row] + k,
+                            q0 + Sp[row + 1] + gptr[row] + k]).astype(int32)
+    Gj = empty(2 * q0, dtype=int32)
+    Gj[d["G_pos"][0]] = Gj[d["G_pos"][2]] = Sj
+    Gj[d["G_pos"][1]] = Gj[d["G_pos"][3]] = nb + Sj
+    gen_pos = 2 * Sp[gbus[order] + 1] + arange(ng)
+    Gj[gen_pos] = 2 * nb + order
+    Gj[q0 + gen_pos] = 2 * nb + ng + order
+    Gx = zeros(2 * q0)
+    Gx[gen_pos] = Gx[q0 + gen_pos] = -1
+    d["Gj"], d["Gx"] = Gj, Gx
+    d["Gp"] = r_[2 * Sp + gptr, q0 + 2 * Sp[1:] + gptr[1:]].astype(int32)
+
+    # Jacobian of the branch flow limits: "from" and "to" rows with the pattern of Yf and Yt in
+    # the Va and the Vm columns
+    nl2 = len(il)
+    d["nl2"] = nl2
+    if nl2:
+        flow_max = (branch[il, RATE_A].real / baseMVA) ** 2
+        flow_max[flow_max == 0] = Inf
+        d["flow_max"] = flow_max
+        d["Yf"], d["Yt"] = Yf, Yt
+        d["F_pos"], d["F_pair_pos"] = _branch_positions(Yf, S, 0)
+        d["T_pos"], d["T_pair_pos"] = _branch_positions(Yt, S, 2 * Yf.nnz)
+        Fj = empty(2 * (Yf.nnz + Yt.nnz), dtype=int32)
+        for Y, pos in [(Yf, d["F_pos"]), (Yt, d["T_pos"])]:
+            Fj[pos[0]] = Y.indices
+            Fj[pos[1]] = nb + Y.indices
+        d["Fj"] = Fj
+        d["Fp"] = r_[2 * Yf.indptr, 2 * Yf.nnz + 2 * Yt.indptr[1:]].astype(int32)
+    d["shape"] = (nb, ng, nx)
+    return d
+
+
+def opf_consfcn_numba(x, om, d):
+    """
+    Evaluates the nonlinear constraints and their Jacobian like pypower's opf_consfcn with
+    current magnitude flow limits (OPF_FLOW_LIM = 2) on the patterns of
+    _make_derivative_patterns.
+    """
+    ppc = om.get_ppc()
+    baseMVA, bus, gen = ppc["baseMVA"], ppc["bus"], ppc["gen"]
+    nb, ng, nx = d["shape"]
+
+    ## put Pg & Qg back in gen
+    gen[:, PG] = x[2 * nb:2 * nb + ng] * baseMVA
+    gen[:, QG] = x[2 * nb + ng:2 * nb + 2 * ng] * baseMVA
+    Sbus = makeSbus(baseMVA, bus, gen)
+    Vm = x[nb:2 * nb]
+    V = Vm * exp(1j * x[:nb])
+
+    ## power balance
+    Ibus = empty(nb, dtype=complex128)
+    Gx = d["Gx"].copy()
+    power_balance_jacobian(d["Sp"], d["Sj"], d["YS"], V, Vm, Ibus, d["G_pos"], Gx)
+    mis = V * conj(Ibus) - Sbus
+    g = r_[mis.real, mis.imag]
+    dg = sparse((Gx, d["Gj"], d["Gp"]), (2 * nb, nx)).T
+
+    ## branch current limits
+    nl2 = d["nl2"]
+    if not nl2:
+        return zeros(0), g, None, dg
+    If, It = empty(nl2, dtype=complex128), empty(nl2, dtype=complex128)
+    Fx = empty(len(d["Fj"]))
+    for Y, I, pos in [(d["Yf"], If, d["F_pos"]), (d["Yt"], It, d["T_pos"])]:
+        branch_current_jacobian(Y.indptr, Y.indices, Y.data, V, Vm, I, pos, Fx)
+    h = r_[(If * conj(If)).real - d["flow_max"], (It * conj(It)).real - d["flow_max"]]
+    dh = sparse((Fx, d["Fj"], d["Fp"]), (2 * nl2, nx)).T
+    return h, g, dh, dg
+
+
+def opf_hessfcn_numba(x, lmbda, om, d, cost_mult=1.0):
+    """
+    Evaluates the Hessian of the Lagrangian like opf_hessfcn with current magnitude flow limits
+    (OPF_FLOW_LIM = 2) on the pattern of _make_derivative_patterns.
+    """
+    ppc = om.get_ppc()
+    baseMVA, gencost = ppc["baseMVA"], ppc["gencost"]
+    nb, ng, nx = d["shape"]
+    Pg = x[2 * nb:2 * nb + ng]
+    Qg = x[2 * nb + ng:2 * nb + 2 * ng]
+    Vm = x[nb:2 * nb]
+    V = Vm * exp(1j * x[:nb])
+    Hx = empty(len(d["Hj"]))
+
+    ## second derivatives of the polynomial costs w.r.t. p.u. Pg and Qg
+    d2f = zeros(2 * ng)
+    pcost = gencost[:ng, :]
+    ipolp = find(pcost[:, MODEL] == POLYNOMIAL)
+    d2f[ipolp] = baseMVA ** 2 * polycost(pcost[ipolp, :], Pg[ipolp] * baseMVA, 2)
+    if gencost.shape[0] > ng:
+        qcost = gencost[ng:2 * ng, :]
+        ipolq = find(qcost[:, MODEL] == POLYNOMIAL)
+        d2f[ng + ipolq] = baseMVA ** 2 * polycost(qcost[ipolq, :], Qg[ipolq] * baseMVA, 2)
+    Hx[len(Hx) - 2 * ng:] = d2f * cost_mult
+
+    ## power balance constraints
+    lamP = lmbda["eqnonlin"][:nb]
+    lamQ = lmbda["eqnonlin"][nb:2 * nb]
+    power_balance_hessian(d["Sp"], d["Sj"], d["YS"], d["YSt"], V, Vm, lamP - 1j * lamQ,
+                          d["H_pos"], Hx)
+
+    ## branch current limits
+    nl2 = d["nl2"]
+    if nl2:
+        muF = lmbda["ineqnonlin"][:nl2]
+        muT = lmbda["ineqnonlin"][nl2:2 * nl2]
+        for Y, mu, pair_pos in [(d["Yf"], muF, d["F_pair_pos"]), (d["Yt"], muT, d["T_pair_pos"])]:
+            branch_current_hessian(Y.indptr, Y.indices, Y.data, V, Vm, Y * V, mu, pair_pos,
+                                   d["diag_pos"], d["H_pos"], Hx)
+    Lxx = sparse((Hx, d["Hj"], d["Hp"]), (nx, nx))
+    Lxx.has_sorted_indices = True
+    return Lxx
+
+
+def _canonical(Y):
+    """
+    Returns a copy of Y in CSR format with sorted indices and without duplicate entries.
+    """
+    Y = sparse(Y, copy=True)
+    Y.sum_duplicates()
+    Y.sort_indices()
+    return Y
+
+
+def _structure(Y):
+    """
+    Returns a CSR matrix with ones at the stored entries of Y, so that sums and products of
+    structures cannot cancel out.
+    """
+    return sparse((ones(Y.nnz), Y.indices, Y.indptr), Y.shape)
+
+
+def _keys(Y):
+    """
+    Returns row * ncol + col of the stored entries of a canonical CSR matrix (in ascending order).
+    """
+    rows = repeat(arange(Y.shape[0], dtype=int64), diff(Y.indptr))
+    return rows * Y.shape[1] + Y.indices
+
+
+def _positions(S, Y):
+    """
+    Returns the positions of the stored entries of Y in the data of the pattern S. The pattern
+    of Y has to be contained in S.
+    """
+    return searchsorted(_keys(S), _keys(Y))
+
+
+def _values_on_pattern(S, Y):
+    values = zeros(S.nnz, dtype=complex128)
+    values[_positions(S, Y)] = Y.data
+    return values
+
+
+def _branch_positions(Y, S, offset):
+    """
+    Returns the positions of the Va and Vm entries of the rows of Y in the data of the branch
+    flow Jacobian and the positions in S of all pairs of entries of each row of Y in the order in
+    which branch_current_hessian visits them.
+    """
+    Yp, Yj = Y.indptr, Y.indices
+    counts = diff(Yp)
+    row = repeat(arange(Y.shape[0]), counts)
+    k = arange(Y.nnz)
+    pos = np_vstack([offset + Yp[row] + k, offset + Yp[row + 1] + k]).astype(int32)
+    reps = counts[row]
+    a = repeat(k, reps)
+    b = Yp[row[a]] + arange(len(a)) - repeat(cumsum(reps) - reps, reps)
+    pair_keys = Yj[a].astype(int64) * S.shape[1] + Yj[b]
+    return pos, searchsorted(_keys(S), pair_keys).astype(int32)
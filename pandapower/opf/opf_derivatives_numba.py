@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+from numba import jit
+from numpy import conj, zeros, complex128
+
+
+@jit(nopython=True, cache=True)
+def power_balance_jacobian(Sp, Sj, YS, V, Vm, Ibus, pos, Jx):  # pragma: no cover
+    """Calculates the bus injection currents and the derivatives of the power balance constraints
+    w.r.t. the voltage angles and magnitudes and writes them into the data of the constraint
+    Jacobian.
+
+    Input: sparsity pattern of the Hessian blocks in CSR form (Sp = indptr, Sj = indices), the
+    values of Ybus on this pattern (YS), V, Vm = abs(V) and the positions of the entries of
+    dP_dVa, dP_dVm, dQ_dVa, dQ_dVm in the data of the constraint Jacobian (pos[0..3])
+
+    OUTPUT: Ibus and the voltage dependent entries of the constraint Jacobian (Jx)
+
+    Translation of: dS_dVm = diagV * conj(Ybus * diagVnorm) + conj(diagIbus) * diagVnorm
+                    dS_dVa = 1j * diagV * conj(diagIbus - Ybus * diagV)
+    """
+    nb = len(Sp) - 1
+    for r in range(nb):
+        Ibus[r] = 0
+        for k in range(Sp[r], Sp[r + 1]):
+            Ibus[r] += YS[k] * V[Sj[k]]
+
+    for r in range(nb):
+        for k in range(Sp[r], Sp[r + 1]):
+            c = Sj[k]
+            dVa = -1j * V[r] * conj(YS[k] * V[c])
+            dVm = V[r] * conj(YS[k] * V[c] * (1. / Vm[c]))
+            if r == c:
+                # diagonal elements
+                dVa += 1j * V[r] * conj(Ibus[r])
+                dVm += conj(Ibus[r]) * V[r] * (1. / Vm[r])
+            Jx[pos[0, k]] = dVa.real
+            Jx[pos[1, k]] = dVm.real
+            Jx[pos[2, k]] = dVa.imag
+            Jx[pos[3, k]] = dVm.imag
+
+
+@jit(nopython=True, cache=True)
+def power_balance_hessian(Sp, Sj, YS, YSt, V, Vm, lam, pos, Hx):  # pragma: no cover
+    """Calculates the second derivatives of the power balance constraints weighted with their
+    Lagrange multipliers and writes them into the data of the Hessian of the Lagrangian.
+
+    Input: sparsity pattern of the Hessian blocks in CSR form (Sp = indptr, Sj = indices), the
+    values of Ybus (YS) and of Ybus.T (YSt) on this pattern, V, Vm = abs(V), the multipliers
+    lam = lamP - 1j * lamQ and the positions of the entries of the Va/Va, Va/Vm, Vm/Va and Vm/Vm
+    blocks in the data of the Hessian (pos[0..3])
+
+    OUTPUT: the voltage blocks of the Hessian (Hx), which are overwritten
+
+    Since d2Sbus_dV2 is linear in lam, real(d2Sbus_dV2(lamP)) + imag(d2Sbus_dV2(lamQ)) equals
+    real(d2Sbus_dV2(lamP - 1j * lamQ)). The entries are calculated per element (i, k) of the
+    pattern from:
+
+        C = diag(lam * V) * conj(Ybus * diagV)
+        E = conj(diagV) * (Ybus.H * diagV * diaglam - diag(Ybus.H * (V * lam)))
+        F = C - diag(lam * V * conj(Ibus))
+        Gaa = E + F
+        Gva = 1j * diag(1 / Vm) * (E - F)
+        Gav = Gva.T
+        Gvv = diag(1 / Vm) * (C + C.T) * diag(1 / Vm)
+    """
+    nb = len(Sp) - 1
+    Ibus = zeros(nb, dtype=complex128)
+    w = zeros(nb, dtype=complex128)
+    for r in range(nb):
+        for k in range(Sp[r], Sp[r + 1]):
+            c = Sj[k]
+            Ibus[r] += YS[k] * V[c]
+            # Ybus.H * (V * lam)
+            w[r] += conj(YSt[k]) * V[c] * lam[c]
+
+    for r in range(nb):
+        for k in range(Sp[r], Sp[r + 1]):
+            c = Sj[k]
+            C_rc = lam[r] * V[r] * conj(YS[k] * V[c])
+            C_cr = lam[c] * V[c] * conj(YSt[k] * V[r])
+            E_rc = conj(V[r]) * conj(YSt[k]) * V[c] * lam[c]
+            E_cr = conj(V[c]) * conj(YS[k]) * V[r] * lam[r]
+            F_rc = C_rc
+            F_cr = C_cr
+            if r == c:
+                E_rc -= conj(V[r]) * w[r]
+                F_rc -= lam[r] * V[r] * conj(Ibus[r])
+                E_cr = E_rc
+                F_cr = F_rc
+            Hx[pos[0, k]] = (E_rc + F_rc).real
+            Hx[pos[1, k]] = (1j * (E_cr - F_cr) * (1. / Vm[c])).real
+            Hx[pos[2, k]] = (1j * (E_rc - F_rc) * (1. / Vm[r])).real
+            Hx[pos[3, k]] = ((C_rc + C_cr) * (1. / (Vm[r] * Vm[c]))).real
+
+
+@jit(nopython=True, cache=True)
+def branch_current_jacobian(Yp, Yj, Yx, V, Vm, I, pos, Jx):  # pragma: no cover
+    """Calculates the branch currents and the derivatives of the squared current magnitudes
+    w.r.t. the voltage angles and magnitudes and writes them into the data of the constraint
+    Jacobian.
+
+    Input: Yf or Yt of the constrained branches in CSR form (Yx = data, Yp = indptr,
+    Yj = indices), V, Vm = abs(V) and the positions of the Va and Vm entries in the data of the
+    constraint Jacobian (pos[0..1])
+
+    OUTPUT: branch currents I and the entries of the constraint Jacobian (Jx)
+
+    Translation of: dAbr_dVa = 2 * real(diag(conj(Ibr)) * Ybr * diag(1j * V))
+                    dAbr_dVm = 2 * real(diag(conj(Ibr)) * Ybr * diag(V / abs(V)))
+    """
+    for r in range(len(Yp) - 1):
+        I[r] = 0
+        for k in range(Yp[r], Yp[r + 1]):
+            I[r] += Yx[k] * V[Yj[k]]
+        for k in range(Yp[r], Yp[r + 1]):
+            c = Yj[k]
+            Jx[pos[0, k]] = 2 * (conj(I[r]) * 1j * Yx[k] * V[c]).real
+            Jx[pos[1, k]] = 2 * (conj(I[r]) * Yx[k] * V[c] * (1. / Vm[c])).real
+
+
+@jit(nopython=True, cache=True)
+def branch_current_hessian(Yp, Yj, Yx, V, Vm, I, mu, pair_pos, diag_pos, pos,
+                           Hx):  # pragma: no cover
+    """Adds the second derivatives of the squared branch current magnitudes weighted with their
+    Kuhn-Tucker multipliers to the data of the Hessian of the Lagrangian.
+
+    Input: Yf or Yt of the constrained branches in CSR form (Yx = data, Yp = indptr,
+    Yj = indices), V, Vm = abs(V), the branch currents I, the multipliers mu, the positions in
+    the pattern of the Hessian blocks of all pairs of entries in a row of Ybr (pair_pos) and of
+    the diagonal (diag_pos) and the positions of the blocks in the data of the Hessian
+    (pos[0..3])
+
+    OUTPUT: the voltage blocks of the Hessian (Hx), to which the entries are added
+
+    Translation of: Haa = 2 * real(Iaa + dIbr_dVa.T * diaglam * conj(dIbr_dVa))
+                    Hva = 2 * real(Iva + dIbr_dVm.T * diaglam * conj(dIbr_dVa))
+                    Hav = 2 * real(Iav + dIbr_dVa.T * diaglam * conj(dIbr_dVm))
+                    Hvv = 2 * real(dIbr_dVm.T * diaglam * conj(dIbr_dVm))
+    with Iaa = diag(-(Ybr.T * (conj(Ibr) * lam)) * V) and Iva = Iav = -1j * Iaa * diag(1 / Vm)
+    """
+    q = 0
+    for r in range(len(Yp) - 1):
+        if mu[r] == 0:
+            q += (Yp[r + 1] - Yp[r]) ** 2
+            continue
+        for a in range(Yp[r], Yp[r + 1]):
+            ca = Yj[a]
+            dIa_a = 1j * Yx[a] * V[ca]
+            dIv_a = Yx[a] * V[ca] * (1. / Vm[ca])
+            for b in range(Yp[r], Yp[r + 1]):
+                cb = Yj[b]
+                dIa_b = conj(1j * Yx[b] * V[cb])
+                dIv_b = conj(Yx[b] * V[cb] * (1. / Vm[cb]))
+                p = pair_pos[q]
+                q += 1
+                Hx[pos[0, p]] += 2 * mu[r] * (dIa_a * dIa_b).real
+                Hx[pos[1, p]] += 2 * mu[r] * (dIa_a * dIv_b).real
+                Hx[pos[2, p]] += 2 * mu[r] * (dIv_a * dIa_b).real
+                Hx[pos[3, p]] += 2 * mu[r] * (dIv_a * dIv_b).real
+            # second derivatives of the branch current
+            t = -V[ca] * Yx[a] * conj(I[r]) * mu[r]
+            p = diag_pos[ca]
+            Hx[pos[0, p]] += 2 * t.real
+            Hx[pos[1, p]] += 2 * (-1j * t * (1. / Vm[ca])).real
+            Hx[pos[2, p]] += 2 * (-1j * t * (1. / Vm[ca])).real
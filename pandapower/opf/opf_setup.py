@@ -96,18 +96,7 @@ def opf_setup(ppc, ppopt):
                 ppc['N'] = ppc['N'].tolil()[:, bcc].tocsr()               ## delete Vm and Qg columns
 
     ## convert single-block piecewise-linear costs into linear polynomial cost
-    pwl1 = find((ppc['gencost'][:, MODEL] == PW_LINEAR) & (ppc['gencost'][:, NCOST] == 2))
-    # p1 = array([])
-    if len(pwl1) > 0:
-        x0 = ppc['gencost'][pwl1, COST]
-        y0 = ppc['gencost'][pwl1, COST + 1]
-        x1 = ppc['gencost'][pwl1, COST + 2]
-        y1 = ppc['gencost'][pwl1, COST + 3]
-        m = (y1 - y0) / (x1 - x0)
-        b = y0 - m * x0
-        ppc['gencost'][pwl1, MODEL] = POLYNOMIAL
-        ppc['gencost'][pwl1, NCOST] = 2
-        ppc['gencost'][pwl1, COST:COST + 2] = r_['1',m.reshape(len(m),1), b.reshape(len(b),1)] # changed from ppc['gencost'][pwl1, COST:COST + 2] = r_[m, b] because we need to make sure, that m and b have the same shape, resulted in a value error due to shape mismatch before
+    pwl1 = _convert_single_block_pwl(ppc['gencost'])
 
     ## create (read-only) copies of individual fields for convenience
     baseMVA, bus, gen, branch, gencost, _, lbu, ubu, ppopt, \
@@ -267,3 +256,22 @@ def opf_setup(ppc, ppopt):
     run_userfcn(userfcn, 'formulation', om)
 
     return om
+
+
+def _convert_single_block_pwl(gencost):
+    """Converts single-block piecewise-linear costs into linear polynomial costs (in place).
+
+    Returns the indices of the converted rows of gencost.
+    """
+    pwl1 = find((gencost[:, MODEL] == PW_LINEAR) & (gencost[:, NCOST] == 2))
+    if len(pwl1) > 0:
+        x0 = gencost[pwl1, COST]
+        y0 = gencost[pwl1, COST + 1]
+        x1 = gencost[pwl1, COST + 2]
+        y1 = gencost[pwl1, COST + 3]
+        m = (y1 - y0) / (x1 - x0)
+        b = y0 - m * x0
+        gencost[pwl1, MODEL] = POLYNOMIAL
+        gencost[pwl1, NCOST] = 2
+        gencost[pwl1, COST:COST + 2] = r_['1',m.reshape(len(m),1), b.reshape(len(b),1)] # changed from gencost[pwl1, COST:COST + 2] = r_[m, b] because we need to make sure, that m and b have the same shape, resulted in a value error due to shape mismatch before
+    return pwl1
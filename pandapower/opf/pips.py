@@ -11,12 +11,14 @@
 """Python Interior Point Solver (PIPS).
 """
 
-from numpy import array, Inf, any, isnan, ones, r_, finfo, \
-    zeros, dot, absolute, log, flatnonzero as find
+from numpy import array, Inf, any, isnan, ones, r_, finfo, nan, \
+    zeros, dot, absolute, log, maximum, minimum, array_equal, bincount, cumsum, int32, int64, \
+    searchsorted, union1d, all as np_all, flatnonzero as find
 from numpy.linalg import norm
 from pypower.pipsver import pipsver
-from scipy.sparse import vstack, hstack, eye, csr_matrix as sparse
-from scipy.sparse.linalg import spsolve
+from scipy.sparse import vstack, hstack, eye, csr_matrix as sparse, csc_matrix
+
+from pandapower.pf.newtonpf import _factorize_jacobian, _solve_factorized
 
 
 EPS = finfo(float).eps
@@ -143,6 +145,15 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
                     value is also passed as the 3rd argument to the Hessian
                     evaluation function so that it can appropriately scale the
                     objective function term in the Hessian of the Lagrangian.
+                  - C{warm_start} (None) - C{warm_start} dict of the output of
+                    a previous solve of a problem with the same constraint
+                    structure. The multipliers of the previous optimum are
+                    used as starting point and the barrier coefficient is
+                    initialized from their complementarity gap instead of 1.
+                  - C{kkt} (None) - dict in which the sparsity pattern and the
+                    column ordering of the LU factorization of the KKT matrix
+                    are kept. It can be passed to further solves of problems
+                    with the same structure.
     @type opt: dict
 
     @rtype: dict
@@ -159,6 +170,10 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
                      following: feascond, gradcond, compcond, costcond, gamma,
                      stepsize, obj, alphap, alphad
                    - C{message} - exit message
+                   - C{warm_start} - solution vector, final (scaled)
+                     multipliers M{lambda}, M{mu} and slacks M{z} together
+                     with the constraint partition, to warm start a
+                     subsequent solve
                - C{lmbda} - dictionary containing the Langrange and Kuhn-Tucker
                  multipliers on the constraints, with keys:
                    - C{eqnonlin} - nonlinear equality constraints
@@ -221,6 +236,7 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
         opt["cost_mult"] = 1
     if "verbose" not in opt:
         opt["verbose"] = 0
+    kkt = opt["kkt"] if "kkt" in opt else {}
 
     # initialize history
     hist = []
@@ -229,6 +245,7 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
     xi = 0.99995
     sigma = 0.1
     z0 = 1
+    z0_warm = 1e-2
     alpha_min = 1e-8
     rho_min = 0.95
     rho_max = 1.05
@@ -313,6 +330,21 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
     mu[k] = gamma / z[k]
     e = ones(niq)
 
+    # warm start from the multipliers of a previous optimum of a problem with the same constraint
+    # partition. The slacks are kept away from zero and the multipliers of inactive constraints
+    # are raised to z * mu >= z0_warm. The barrier coefficient starts from the resulting
+    # complementarity gap instead of 1; starting closer to the boundary makes the iterations stall
+    # if costs or bounds changed.
+    warm_start = opt.get("warm_start")
+    if warm_start and len(warm_start["lam"]) == neq and len(warm_start["mu"]) == niq and \
+            all(array_equal(warm_start[key], idx) for key, idx in
+                (("ieq", ieq), ("igt", igt), ("ilt", ilt), ("ibx", ibx))):
+        lam = warm_start["lam"].copy()
+        z = maximum(-h, z0_warm)
+        mu = maximum(warm_start["mu"], z0_warm / z)
+        if niq:
+            gamma = sigma * dot(z, mu) / niq
+
     # check tolerance
     f0 = f
     if opt["step_control"]:
@@ -385,13 +417,14 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
         M = Lxx if dh is None else Lxx + dh_zinv * mudiag * dh.T
         N = Lx if dh is None else Lx + dh_zinv * (mudiag * h + gamma * e)
 
-        Ab = sparse(M) if dg is None else vstack([
-            hstack([M, dg]),
-            hstack([dg.T, sparse((neq, neq))])
-        ])
+        Ab = _kkt_matrix(M, dg, neq, kkt)
         bb = r_[-N, -g]
 
-        dxdlam = spsolve(Ab.tocsr(), bb)
+        try:
+            dxdlam = _solve_factorized(_factorize_jacobian(Ab, kkt), bb)
+        except RuntimeError:
+            # singular KKT matrix
+            dxdlam = array([nan])
 
         if any(isnan(dxdlam)):
             if opt["verbose"]:
@@ -603,7 +636,9 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
     else:
         raise
 
-    output = {"iterations": i, "hist": hist, "message": message}
+    output = {"iterations": i, "hist": hist, "message": message,
+              "warm_start": {"x": x.copy(), "lam": lam.copy(), "mu": mu.copy(), "z": z.copy(),
+                             "ieq": ieq, "igt": igt, "ilt": ilt, "ibx": ibx}}
 
     # zero out multipliers on non-binding constraints
     mu[find( (h < -opt["feastol"]) & (mu < mu_threshold) )] = 0.0
@@ -645,3 +680,45 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
                  "output": output, "lmbda": lmbda}
 
     return solution
+
+
+def _kkt_matrix(M, dg, neq, kkt):
+    """Assembles the KKT matrix [[M, dg], [dg.T, 0]] in CSC form on the
+    sparsity pattern kept in C{kkt}.
+
+    scipy drops entries which are zero from the results of sums and products,
+    so the pattern of M changes between iterations, e.g. when multipliers
+    become zero. The values are therefore added to a cached pattern, which is
+    only extended (and its column ordering computed again) if M or dg have
+    entries outside of it.
+    """
+    nx = M.shape[0]
+    n = nx + neq
+    M = M.tocoo()
+    if dg is None:
+        rows, cols, data = M.row, M.col, M.data
+    else:
+        dg = dg.tocoo()
+        rows = r_[M.row, dg.row, dg.col + nx]
+        cols = r_[M.col, dg.col + nx, dg.row]
+        data = r_[M.data, dg.data, dg.data]
+    keys = cols.astype(int64) * n + rows
+
+    pattern = kkt.get("keys")
+    if pattern is not None and kkt["n"] == n and len(pattern):
+        pos = searchsorted(pattern, keys)
+        if not np_all(pattern[minimum(pos, len(pattern) - 1)] == keys):
+            pattern = union1d(pattern, keys)
+            pos = None
+    else:
+        pattern = union1d(keys, keys)
+        pos = None
+    if pos is None:
+        kkt.clear()
+        kkt["keys"] = pattern
+        kkt["n"] = n
+        kkt["indices"] = (pattern % n).astype(int32)
+        kkt["indptr"] = r_[0, cumsum(bincount(pattern // n, minlength=n))].astype(int32)
+        pos = searchsorted(pattern, keys)
+    values = bincount(pos, weights=data, minlength=len(pattern))
+    return csc_matrix((values, kkt["indices"], kkt["indptr"]), (n, n))
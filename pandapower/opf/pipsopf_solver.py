@@ -11,7 +11,7 @@
 """Solves AC optimal power flow using PIPS.
 """
 
-from numpy import flatnonzero as find, ones, zeros, Inf, pi, exp, conj, r_
+from numpy import flatnonzero as find, ones, zeros, Inf, pi, exp, conj, r_, minimum, maximum
 from pandapower.idx_brch import F_BUS, T_BUS, RATE_A, PF, QF, PT, QT, MU_SF, MU_ST
 from pandapower.idx_bus import BUS_TYPE, REF, VM, VA, MU_VMAX, MU_VMIN, LAM_P, LAM_Q
 from pandapower.idx_cost import MODEL, PW_LINEAR, NCOST
@@ -21,6 +21,8 @@ from pypower.opf_consfcn import opf_consfcn
 from pypower.opf_costfcn import opf_costfcn
 from pypower.util import sub2ind
 
+from pandapower.opf.opf_derivatives import _make_derivative_patterns, opf_consfcn_numba, \
+    opf_hessfcn_numba
 from pandapower.opf.opf_hessfcn import opf_hessfcn #temporary changed import to match bugfix path
 from pandapower.opf.pips import pips
 
@@ -110,11 +112,20 @@ def pipsopf_solver(om, ppopt, out_opt=None):
     ## bounds on optimization vars
     x0, xmin, xmax = om.getv()
 
-    ## build admittance matrices
-    Ybus, Yf, Yt = makeYbus(baseMVA, bus, branch)
-
+    ## build admittance matrices, unless they are kept with the model by an OPF session
+    admittances = om.userdata('admittances')
+    if len(admittances):
+        Ybus, Yf, Yt = admittances
+    else:
+        Ybus, Yf, Yt = makeYbus(baseMVA, bus, branch)
+
+    ## warm start from a previous optimum of the same model, clipped to the current bounds
+    warm_start = om.userdata('warm_start')
+    if len(warm_start):
+        x0 = minimum(maximum(warm_start["x"], xmin), xmax)
+        opt["warm_start"] = warm_start
     ## try to select an interior initial point if init is not available from a previous powerflow
-    if init != "pf":
+    elif init != "pf":
         ll, uu = xmin.copy(), xmax.copy()
         ll[xmin == -Inf] = -1e10   ## replace Inf with numerical proxies
         uu[xmax ==  Inf] =  1e10
@@ -135,10 +146,29 @@ def pipsopf_solver(om, ppopt, out_opt=None):
     il = find((branch[:, RATE_A] != 0) & (branch[:, RATE_A] < 1e10))
     nl2 = len(il)           ## number of constrained lines
 
+    ## admittances of the constrained branches are sliced once, not in every iteration
+    Yf_il, Yt_il = Yf[il, :], Yt[il, :]
+
+    ## sparsity patterns of the constraint Jacobian and the Hessian for the numba evaluation,
+    ## kept with the model for further solves (e.g. by an OPF session)
+    derivatives = om.userdata('derivatives')
+    if not len(derivatives):
+        derivatives = _make_derivative_patterns(om, Ybus, Yf_il, Yt_il, ppopt, il)
+        if derivatives is not None:
+            om.userdata('derivatives', derivatives)
+    ## the pattern and the column ordering of the KKT matrix are kept with the model as well
+    if 'kkt' not in om.user_data:
+        om.userdata('kkt', {})
+    opt["kkt"] = om.userdata('kkt')
+
     ##-----  run opf  -----
     f_fcn = lambda x, return_hessian=False: opf_costfcn(x, om, return_hessian)
-    gh_fcn = lambda x: opf_consfcn(x, om, Ybus, Yf[il, :], Yt[il,:], ppopt, il)
-    hess_fcn = lambda x, lmbda, cost_mult: opf_hessfcn(x, lmbda, om, Ybus, Yf[il, :], Yt[il, :], ppopt, il, cost_mult)
+    if derivatives is not None:
+        gh_fcn = lambda x: opf_consfcn_numba(x, om, derivatives)
+        hess_fcn = lambda x, lmbda, cost_mult: opf_hessfcn_numba(x, lmbda, om, derivatives, cost_mult)
+    else:
+        gh_fcn = lambda x: opf_consfcn(x, om, Ybus, Yf_il, Yt_il, ppopt, il)
+        hess_fcn = lambda x, lmbda, cost_mult: opf_hessfcn(x, lmbda, om, Ybus, Yf_il, Yt_il, ppopt, il, cost_mult)
 
     solution = pips(f_fcn, x0, A, l, u, xmin, xmax, gh_fcn, hess_fcn, opt)
     x, f, info, lmbda, output = solution["x"], solution["f"], \
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import warnings
+from time import time
+
+import numpy as np
+
+from pandapower.auxiliary import _clean_up
+from pandapower.build_bus import _calc_pq_elements_and_add_on_ppc
+from pandapower.build_gen import _build_gen_ppc
+from pandapower.idx_bus import PD, QD
+from pandapower.idx_cost import MODEL, NCOST
+from pandapower.idx_gen import PMAX, PMIN, QMAX, QMIN
+from pandapower.net_arrays import _net_arrays
+from pandapower.optimal_powerflow import _init_opf, _extract_opf
+from pandapower.opf.make_objective import _make_objective
+from pandapower.opf.validate_opf_input import _check_necessary_opf_parameters
+from pandapower.pd2ppc import _ppc2ppci_index
+from pandapower.powerflow import _add_auxiliary_elements
+from pandapower.results import reset_results, _reset_deferred_results
+from pandapower.run import _init_runopp_options
+
+try:
+    import pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+GEN_LIMITS = [PMAX, PMIN, QMAX, QMIN]
+
+
+class OPFSession(object):
+    """
+    AC optimal power flow session for sequences of OPF calculations in which only loads, costs and
+    the power limits of the controllable elements change, e.g. a rolling-horizon dispatch.
+
+    runopp converts the network, builds the OPF model (variables, linear constraints and their
+    sparsity patterns) and the admittance matrices in every call and starts the interior point
+    solver from the middle of the variable bounds. A session does this once. Before each run only
+    the following values are taken from net and written to the model in place:
+
+        - p_kw / q_kvar / scaling of the loads, sgens and storages that are not controllable
+        - min_p_kw / max_p_kw / min_q_kvar / max_q_kvar of ext_grids, gens and the controllable
+          sgens, loads and storages
+        - net.polynomial_cost / net.piecewise_linear_cost values
+
+    Each run is warm started from the primal and dual solution of the previous optimum. If the
+    warm started solver does not converge, the run is repeated from the default initial point.
+
+    The topology, the in_service and controllable flags, the voltage and loading limits and the
+    structure of the costs (cost type and number of coefficients of each element) are fixed when
+    the session is created. If the cost structure changes, the model is built again; after all
+    other structural changes, a new session has to be created.
+
+    INPUT:
+        **net** - The pandapower format network
+
+    OPTIONAL:
+        **warm_start** (bool, True) - start each run from the previous optimum
+
+        **kwargs** - the parameters of runopp (verbose, calculate_voltage_angles,
+        check_connectivity, suppress_warnings, r_switch, delta, init, numba, trafo3w_losses) and
+        pypower OPF options
+
+    EXAMPLE:
+        session = OPFSession(net)
+
+        for p_kw in load_profile:
+            net.load["p_kw"] = p_kw
+
+            session.run()
+
+            p_sgen.append(net.res_sgen.p_kw.values)
+    """
+
+    def __init__(self, net, warm_start=True, verbose=False, calculate_voltage_angles=False,
+                 check_connectivity=False, suppress_warnings=True, r_switch=0.0, delta=1e-10,
+                 init="flat", numba=True, trafo3w_losses="hv", **kwargs):
+        self.net = net
+        self.warm_start = warm_start
+        self.verbose = verbose
+        self.suppress_warnings = suppress_warnings
+        self.iterations = None
+        self._opf_kwargs = kwargs
+        _check_necessary_opf_parameters(net, logger)
+        _init_runopp_options(net, calculate_voltage_angles=calculate_voltage_angles,
+                             check_connectivity=check_connectivity, r_switch=r_switch,
+                             delta=delta, init=init, numba=numba, trafo3w_losses=trafo3w_losses)
+        self._options = net["_options"]
+        self._setup()
+
+    def _setup(self):
+        """
+        Converts the network and builds the OPF model and the admittance matrices.
+        """
+        from pypower.makeYbus import makeYbus
+        from pandapower.opf.opf import _add_multiplier_columns
+        from pandapower.opf.opf_setup import opf_setup
+
+        net = self.net
+        ppc, ppci, ppopt = _init_opf(net, self.verbose, **self._opf_kwargs)
+        _add_multiplier_columns(ppci)
+        self._gencost = ppci["gencost"].copy()
+        om = opf_setup(ppci, ppopt)
+        om.userdata('admittances', makeYbus(ppci["baseMVA"], ppci["bus"], ppci["branch"]))
+
+        self.ppc = ppc
+        self.om = om
+        self.ppopt = ppopt
+        self._lookups = net["_pd2ppc_lookups"]
+        self._is_elements = net["_is_elements"]
+        self._gen_index = _ppc2ppci_index(ppci["internal"]["gen_is"])[_gen_positions(net)]
+        _clean_up(net, res=False)
+
+    def run(self):
+        """
+        Updates the model from net, solves the OPF and writes the results to the result tables of
+        net like runopp. Raises OPFNotConverged if the OPF does not converge. The number of
+        interior point iterations of the run is stored in the attribute iterations.
+        """
+        from pandapower.opf.opf_execute import opf_execute
+
+        t0 = time()
+        net = self.net
+        net["_options"] = self._options
+        net["_pd2ppc_lookups"] = self._lookups
+        net["_is_elements"] = self._is_elements
+        net["OPF_converged"] = False
+        net["converged"] = False
+        _reset_deferred_results(net)
+        _add_auxiliary_elements(net)
+        reset_results(net)
+        with _net_arrays(net):
+            updated = self._update()
+        if not updated:
+            _clean_up(net, res=False)
+            logger.info("the cost structure changed, the OPF model is built again")
+            self._setup()
+            return self.run()
+
+        om = self.om
+        if not self.warm_start:
+            om.user_data.pop('warm_start', None)
+        with warnings.catch_warnings():
+            if self.suppress_warnings:
+                warnings.simplefilter("ignore")
+            result, success, raw = opf_execute(om, self.ppopt)
+            iterations = raw["output"]["iterations"]
+            if not success and 'warm_start' in om.user_data:
+                logger.info("the warm started OPF did not converge, starting from the initial "
+                            "point")
+                del om.user_data['warm_start']
+                result, success, raw = opf_execute(om, self.ppopt)
+                iterations += raw["output"]["iterations"]
+        self.iterations = iterations
+        if success and self.warm_start:
+            om.userdata('warm_start', raw["output"]["warm_start"])
+
+        result["et"] = time() - t0
+        result["success"] = success
+        result["raw"] = raw
+        _extract_opf(net, result, self.ppc)
+
+    def _update(self):
+        """
+        Writes loads, power limits and costs from net to the OPF model. Returns False if the cost
+        structure changed, so that the model has to be built again.
+        """
+        from pypower.makeAy import makeAy
+        from pandapower.opf.opf_setup import _convert_single_block_pwl
+
+        net = self.net
+        om = self.om
+        ppci = om.get_ppc()
+        baseMVA = ppci["baseMVA"]
+        nb, ng = ppci["bus"].shape[0], ppci["gen"].shape[0]
+
+        # costs (the model has to be built again if the cost structure changes)
+        gencost = _make_objective({"gen": ppci["gen"]}, net)["gencost"]
+        if gencost.shape != self._gencost.shape or \
+                not np.array_equal(gencost[:, [MODEL, NCOST]], self._gencost[:, [MODEL, NCOST]]):
+            return False
+        self._gencost = gencost.copy()
+        _convert_single_block_pwl(gencost)
+        ppci["gencost"] = gencost
+        if om.getN('var', 'y'):
+            # basin constraints of the piecewise linear costs
+            Ay, by = makeAy(baseMVA, ng, gencost, 1, ng, 1 + 2 * ng)
+            om.lin["data"]["A"]["ycon"] = Ay
+            om.lin["data"]["u"]["ycon"] = by
+
+        # active and reactive power of the elements which are not controllable
+        bus = {"bus": np.zeros_like(self.ppc["bus"])}
+        _calc_pq_elements_and_add_on_ppc(net, bus)
+        ppci["bus"][:, PD] = bus["bus"][:nb, PD]
+        ppci["bus"][:, QD] = bus["bus"][:nb, QD]
+
+        # power limits of ext_grids, gens and the controllable elements
+        gen = {"bus": self.ppc["bus"].copy()}
+        _build_gen_ppc(net, gen)
+        is_ppci = self._gen_index >= 0
+        ppci["gen"][np.ix_(self._gen_index[is_ppci], GEN_LIMITS)] = \
+            gen["gen"][np.ix_(is_ppci, GEN_LIMITS)]
+        data = om.var["data"]
+        data["vl"]["Pg"][:] = ppci["gen"][:, PMIN] / baseMVA
+        data["vu"]["Pg"][:] = ppci["gen"][:, PMAX] / baseMVA
+        data["vl"]["Qg"][:] = ppci["gen"][:, QMIN] / baseMVA
+        data["vu"]["Qg"][:] = ppci["gen"][:, QMAX] / baseMVA
+        return True
+
+
+def _gen_positions(net):
+    """
+    Returns the ppc gen rows of the gens in the order of _build_gen_ppc (ext_grids, gens and the
+    controllable sgens, loads and storages).
+    """
+    lookups = net["_pd2ppc_lookups"]
+    _is_elements = net["_is_elements"]
+    positions = [np.array([], dtype=int)]
+    for element in ["ext_grid", "gen"]:
+        index = net[element].index.values[_is_elements[element]]
+        if len(index):
+            positions.append(lookups[element][index])
+    for element in ["sgen_controllable", "load_controllable", "storage_controllable"]:
+        if element in _is_elements and len(_is_elements[element]):
+            positions.append(lookups[element][_is_elements[element].index.values])
+    return np.concatenate(positions)
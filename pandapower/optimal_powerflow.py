@@ -6,18 +6,15 @@
 
 import warnings
 
-from pypower.add_userfcn import add_userfcn
-from pypower.ppoption import ppoption
 from scipy.sparse import csr_matrix as sparse
 
 from pandapower.auxiliary import ppException, _clean_up
 from pandapower.idx_bus import VM
-from pandapower.opf.opf import opf
 from pandapower.pd2ppc import _pd2ppc
 from pandapower.pf.run_newton_raphson_pf import _run_newton_raphson_pf
 from pandapower.powerflow import _add_auxiliary_elements
 from pandapower.results import _copy_results_ppci_to_ppc, reset_results, \
-    _extract_results_opf
+    _extract_results_opf, _reset_deferred_results
 
 
 class OPFNotConverged(ppException):
@@ -28,12 +25,34 @@ class OPFNotConverged(ppException):
 
 
 def _optimal_powerflow(net, verbose, suppress_warnings, **kwargs):
+    # the pypower opf is imported on the first call to keep 'import pandapower' fast
+    from pandapower.opf.opf import opf
+
+    ppc, ppci, ppopt = _init_opf(net, verbose, **kwargs)
+    if suppress_warnings:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            result = opf(ppci, ppopt)
+    else:
+        result = opf(ppci, ppopt)
+    _extract_opf(net, result, ppc)
+
+
+def _init_opf(net, verbose, **kwargs):
+    """
+    Converts net to the ppc / ppci and builds the pypower options of an optimal power flow.
+    """
+    from pypower.add_userfcn import add_userfcn
+    from pypower.ppoption import ppoption
+
     ac = net["_options"]["ac"]
     init = net["_options"]["init"]
 
-    ppopt = ppoption(VERBOSE=verbose, OPF_FLOW_LIM=2, PF_DC=not ac, INIT=init, **kwargs)
+    ppopt = ppoption(VERBOSE=verbose, OPF_FLOW_LIM=2, PF_DC=not ac, INIT=init,
+                     NUMBA=net["_options"].get("numba", False), **kwargs)
     net["OPF_converged"] = False
     net["converged"] = False
+    _reset_deferred_results(net)
     _add_auxiliary_elements(net)
     reset_results(net)
 
@@ -46,12 +65,13 @@ def _optimal_powerflow(net, verbose, suppress_warnings, **kwargs):
 
     if init == "pf":
         ppci = _run_pf_before_opf(net, ppci)
-    if suppress_warnings:
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            result = opf(ppci, ppopt)
-    else:
-        result = opf(ppci, ppopt)
+    return ppc, ppci, ppopt
+
+
+def _extract_opf(net, result, ppc):
+    """
+    Writes the results of a solved optimal power flow to net or raises OPFNotConverged.
+    """
     net["_ppc_opf"] = result
 
     if not result["success"]:
@@ -26,10 +26,12 @@ from pandapower.build_bus import _build_bus_ppc, _calc_pq_elements_and_add_on_pp
     _calc_shunts_and_add_on_ppc, _add_gen_impedances_ppc, _add_motor_impedances_ppc
 from pandapower.build_gen import _build_gen_ppc, _update_gen_ppc, _check_voltage_setpoints_at_same_bus, \
                                  _check_voltage_angles_at_same_bus
+from pandapower.net_arrays import _with_net_arrays
 from pandapower.opf.make_objective import _make_objective
 
 
 
+@_with_net_arrays
 def _pd2ppc(net):
     """
     Converter Flow:
@@ -254,6 +256,15 @@ def _ppc2ppci(ppc, ppci, net):
     return ppci
 
 
+def _ppc2ppci_index(is_mask):
+    """
+    Returns the positions of ppc rows in the ppci, -1 for rows that are not in the ppci.
+    """
+    lookup = np.cumsum(is_mask) - 1
+    lookup[~is_mask] = -1
+    return lookup
+
+
 def _update_lookup_entries(net, lookup, e2i, element):
     valid_bus_lookup_entries = lookup >= 0
     # update entries
@@ -278,6 +289,7 @@ def _build_gen_lookups(net, element, ppc_start_index, ppc_end_index, sort_gens):
     aux._write_lookup_to_net(net, element, lookup)
 
 
+@_with_net_arrays
 def _update_ppc(net):
     """
     Updates P, Q values of the ppc with changed values from net
@@ -288,7 +300,6 @@ def _update_ppc(net):
     # select elements in service (time consuming, so we do it once)
     net["_is_elements"] = aux._select_is_elements_numba(net)
 
-    recycle = net["_options"]["recycle"]
     # get the old ppc and lookup
     ppc = net["_ppc"]
     ppci = copy.deepcopy(ppc)
@@ -301,9 +312,9 @@ def _update_ppc(net):
     # check if any generators connected to the same bus have different voltage setpoints
     _check_voltage_setpoints_at_same_bus(ppc)
 
-    if not recycle["Ybus"]:
-        # updates trafo and trafo3w values
-        _update_trafo_trafo3w_ppc(net, ppc)
+    # updates trafo and trafo3w values. A recycled Ybus is updated incrementally for the changed
+    # branches in the power flow
+    _update_trafo_trafo3w_ppc(net, ppc)
 
     # get OOS buses and place them at the end of the bus array (so that: 3
     # (REF), 2 (PV), 1 (PQ), 4 (OOS))
@@ -15,7 +15,9 @@ from pandapower.idx_brch import BR_B, BR_R, BR_X, F_BUS, T_BUS, branch_cols, BR_
 from pandapower.idx_bus import BASE_KV, BS, GS
 from pandapower.build_branch import _calc_tap_from_dataframe, _transformer_correction_factor, _calc_nominal_ratio_from_dataframe
 from pandapower.build_branch import _switch_branches, _branches_with_oos_buses, _initialize_branch_lookup
+from pandapower.net_arrays import ElementArrays, _with_net_arrays
 
+@_with_net_arrays
 def _pd2ppc_zero(net):
     """
     Builds the ppc data structure for zero impedance system. Includes the impedance values of
@@ -116,9 +118,10 @@ def _add_trafo_sc_impedance_zero(net, ppc, trafo_df=None):
         ppc["branch"][ppc_idx, F_BUS] = hv_buses_ppc
         ppc["branch"][ppc_idx, T_BUS] = lv_buses_ppc
 
-        vn_trafo_hv, vn_trafo_lv, shift = _calc_tap_from_dataframe(net, trafos)
+        trafo_arrays = ElementArrays(trafos, "trafo")
+        vn_trafo_hv, vn_trafo_lv, shift = _calc_tap_from_dataframe(net, trafo_arrays)
         vn_lv = ppc["bus"][lv_buses_ppc, BASE_KV]
-        ratio = _calc_nominal_ratio_from_dataframe(ppc, trafos, vn_trafo_hv, vn_trafo_lv,
+        ratio = _calc_nominal_ratio_from_dataframe(ppc, trafo_arrays, vn_trafo_hv, vn_trafo_lv,
                                                    bus_lookup)
         ppc["branch"][ppc_idx, TAP] = ratio
         ppc["branch"][ppc_idx, SHIFT] = shift
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+"""Builds the DC PTDF and LODF matrices.
+"""
+
+from numpy import zeros, arange, setdiff1d, errstate, abs, nan, real, diag_indices
+from scipy.sparse.linalg import splu
+
+from pandapower.idx_brch import F_BUS, T_BUS
+from pandapower.pf.makeBdc import makeBdc
+
+
+def makePTDF(bus, branch, ref):
+    """Builds the DC PTDF matrix for the given reference buses.
+
+    Returns the (nl x nb) matrix of power transfer distribution factors, i.e. the change of
+    the active power flow at the from end of each branch for a unit injection at each bus that is
+    withdrawn at the reference bus. The columns of the reference buses are zero.
+
+    Contrary to the dense inversion in pypower's makePTDF, the reduced B matrix is factorized
+    with a sparse LU decomposition and solved for all branches at once.
+    """
+    nb = bus.shape[0]
+    nl = branch.shape[0]
+    Bbus, Bf, _, _ = makeBdc(bus, branch)
+    Bbus, Bf = Bbus.real, Bf.real
+    noref = setdiff1d(arange(nb), ref)
+
+    PTDF = zeros((nl, nb))
+    if len(noref) and nl:
+        lu = splu(Bbus[noref, :][:, noref].tocsc())
+        # Bbus is symmetric -> PTDF[:, noref] = Bf[:, noref] * inv(Bred) = (inv(Bred) * Bf[:, noref].T).T
+        PTDF[:, noref] = lu.solve(Bf[:, noref].T.toarray()).T
+    return PTDF
+
+
+def makeLODF(branch, PTDF):
+    """Builds the DC line outage distribution factors.
+
+    Returns the (nl x nl) matrix LODF, where LODF[l, k] is the change of the active power flow
+    on branch l in relation to the pre-outage flow on branch k, if branch k is switched off. The
+    columns of branches whose outage splits the network into islands (bridges) are NaN.
+    """
+    f = real(branch[:, F_BUS]).astype(int)
+    t = real(branch[:, T_BUS]).astype(int)
+    H = PTDF[:, f] - PTDF[:, t]
+    h = H.diagonal().copy()
+    islanding = abs(1. - h) < 1e-8
+    with errstate(divide='ignore', invalid='ignore'):
+        LODF = H / (1. - h)
+    LODF[diag_indices(len(h))] = -1.
+    LODF[:, islanding] = nan
+    return LODF
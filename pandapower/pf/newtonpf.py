@@ -11,8 +11,9 @@
 """Solves the power flow using a full Newton's method.
 """
 
-from numpy import angle, exp, linalg, conj, r_, Inf, arange, zeros, max, zeros_like, column_stack
-from scipy.sparse.linalg import spsolve
+from numpy import angle, exp, linalg, conj, r_, Inf, arange, zeros, max, zeros_like, column_stack, \
+    empty_like, array_equal
+from scipy.sparse.linalg import spsolve, splu
 
 from pandapower.pf.iwamoto_multiplier import _iwamoto_step
 from pandapower.pf.makeSbus import makeSbus
@@ -37,6 +38,11 @@ def newtonpf(Ybus, Sbus, V0, pv, pq, ppci, options):
     @author: Richard Lincoln
 
     Modified by University of Kassel (Florian Schaefer) to use numba
+
+    If options["lu_reuse"] is True, the linear systems are solved with a sparse LU factorization
+    whose fill-reducing column ordering is computed only once and cached in ppci["internal"]. If
+    options["jacobian_reuse"] > 1, a factorized Jacobian is used for up to this number of
+    iterations ("dishonest" Newton method).
     """
 
     ## options
@@ -46,6 +52,8 @@ def newtonpf(Ybus, Sbus, V0, pv, pq, ppci, options):
     iwamoto = options["algorithm"] == "iwamoto_nr"
     voltage_depend_loads = options["voltage_depend_loads"]
     v_debug = options["v_debug"]
+    jacobian_reuse = options.get("jacobian_reuse", 1)
+    lu_reuse = options.get("lu_reuse", False) or jacobian_reuse > 1
 
     baseMVA = ppci['baseMVA']
     bus = ppci['bus']
@@ -91,15 +99,28 @@ def newtonpf(Ybus, Sbus, V0, pv, pq, ppci, options):
 
     Ybus = Ybus.tocsr()
     J = None
+    J_lu, lu_age = None, 0
 
     ## do Newton iterations
     while (not converged and i < max_it):
         ## update iteration counter
         i = i + 1
 
-        J = create_jacobian_matrix(Ybus, V, pvpq, pq, createJ, pvpq_lookup, npv, npq, numba)
-
-        dx = -1 * spsolve(J, F)
+        if not lu_reuse:
+            J = create_jacobian_matrix(Ybus, V, pvpq, pq, createJ, pvpq_lookup, npv, npq, numba)
+            dx = -1 * spsolve(J, F)
+        else:
+            if J_lu is None or lu_age >= jacobian_reuse:
+                J = create_jacobian_matrix(Ybus, V, pvpq, pq, createJ, pvpq_lookup, npv, npq,
+                                           numba)
+                try:
+                    J_lu = _factorize_jacobian(J, ppci["internal"])
+                except RuntimeError:
+                    # singular Jacobian -> power flow did not converge
+                    break
+                lu_age = 0
+            dx = -1 * _solve_factorized(J_lu, F)
+            lu_age += 1
         ## update voltage
         if npv and not iwamoto:
             Va[pv] = Va[pv] + dx[j1:j2]
@@ -139,6 +160,35 @@ def _evaluate_Fx(Ybus, V, Sbus, pv, pq):
     return F
 
 
+def _factorize_jacobian(J, internal):
+    """
+    LU factorization of the Jacobian with a cached column ordering. The ordering is only computed
+    again if the sparsity pattern of the Jacobian differs from the one it was computed for.
+    """
+    J = J.tocsc()
+    pattern = internal.get("J_pattern", None)
+    if pattern is not None and array_equal(pattern[0], J.indptr) and \
+            array_equal(pattern[1], J.indices):
+        col_order = internal["J_col_order"]
+        return splu(J[:, col_order], permc_spec="NATURAL"), col_order
+    lu = splu(J, permc_spec="COLAMD")
+    # J * Pc = Pr * L * U with Pc[i, perm_c[i]] = 1, i.e. the columns are ordered by inv(perm_c)
+    col_order = empty_like(lu.perm_c)
+    col_order[lu.perm_c] = arange(len(lu.perm_c))
+    internal["J_pattern"] = (J.indptr.copy(), J.indices.copy())
+    internal["J_col_order"] = col_order
+    return lu, None
+
+
+def _solve_factorized(J_lu, F):
+    lu, col_order = J_lu
+    if col_order is None:
+        return lu.solve(F)
+    dx = empty_like(F)
+    dx[col_order] = lu.solve(F)
+    return dx
+
+
 def _check_for_convergence(F, tol):
     # calc infinity norm
     return linalg.norm(F, Inf) < tol
@@ -16,7 +16,7 @@ from pandapower.pf.makeSbus import makeSbus
 from scipy.sparse import csr_matrix, csgraph
 from six import iteritems
 
-from pandapower.auxiliary import ppException
+from pandapower.auxiliary import ppException, subtree_ranges
 from pandapower.pf.bustypes import bustypes
 from pandapower.pf.newtonpf import _evaluate_Fx, _check_for_convergence
 from pandapower.pf.pfsoln import pfsoln
@@ -32,11 +32,40 @@ class LoadflowNotConverged(ppException):
     pass
 
 
+def _branch_index(branch_keys, branch_keys_order, nobus, f, t):
+    """
+    returns the branch indices for the buses f and t regardless of the branch direction
+    (for parallel branches the last branch is returned)
+    """
+    keys = np.minimum(f, t) * nobus + np.maximum(f, t)
+    sorted_keys = branch_keys[branch_keys_order]
+    return branch_keys_order[np.searchsorted(sorted_keys, keys, side="right") - 1]
+
+
+def _tree_path(bus_a, bus_b, predecs_bfs, depth):
+    """
+    returns the path from bus_b to bus_a in the bfs tree
+    """
+    path_b, path_a = [bus_b], [bus_a]
+    while depth[path_b[-1]] > depth[path_a[-1]]:
+        path_b.append(predecs_bfs[path_b[-1]])
+    while depth[path_a[-1]] > depth[path_b[-1]]:
+        path_a.append(predecs_bfs[path_a[-1]])
+    while path_a[-1] != path_b[-1]:
+        path_b.append(predecs_bfs[path_b[-1]])
+        path_a.append(predecs_bfs[path_a[-1]])
+    return path_b + path_a[-2::-1]
+
+
 def _make_bibc_bcbv(bus, branch, graph):
     """
     performs depth-first-search bus ordering and creates Direct Load Flow (DLF) matrix
     which establishes direct relation between bus current injections and voltage drops from each bus to the root bus
 
+    The tree part of BIBC and BCBV is built in one pass over the breadth-first-search tree: every tree branch
+    carries the current of all buses in the subtree below it, which is a contiguous range of the depth-first
+    ordering of the tree.
+
     :param ppc: matpower-type case data
     :return: DLF matrix DLF = BIBC * BCBV where
                     BIBC - Bus Injection to Branch-Current
@@ -49,21 +78,20 @@ def _make_bibc_bcbv(bus, branch, graph):
     nobranch = branch.shape[0]
 
     # reference bus is assumed as root bus for a radial network
-    refs = bus[bus[:, BUS_TYPE] == 3, BUS_I]
+    refs = bus[bus[:, BUS_TYPE] == 3, BUS_I].astype(int)
     norefs = len(refs)
+    # column indices of the buses without the root buses
+    bus_col = np.cumsum(bus[:, BUS_TYPE] != 3) - 1
 
     G = graph.copy()  # network graph
 
-    # dictionary with impedance values keyed by branch tuple (frombus, tobus)
-    # TODO use list or array, not both
-    branches_lst = list(zip(branch[:, F_BUS].real.astype(int), branch[:, T_BUS].real.astype(int)))
-    branches_arr = branch[:, F_BUS:T_BUS + 1].real.astype(int)
-    branches_ind_dict = dict(zip(zip(branches_arr[:, 0], branches_arr[:, 1]), range(0, nobranch)))
-    branches_ind_dict.update(dict(zip(zip(branches_arr[:, 1], branches_arr[:, 0]), range(0, nobranch))))
+    # branches keyed by the sorted tuple (frombus, tobus)
+    branches_arr = branch[:, F_BUS:T_BUS + 1].real.astype(np.int64)
+    branch_keys = branches_arr.min(axis=1) * nobus + branches_arr.max(axis=1)
+    branch_keys_order = np.argsort(branch_keys, kind="mergesort")
 
     tap = branch[:, TAP]  # * np.exp(1j * np.pi / 180 * branch[:, SHIFT])
     z_ser = (branch[:, BR_R].real + 1j * branch[:, BR_X].real) * tap  # series impedance
-    z_brch_dict = dict(zip(branches_lst, z_ser))
 
     # initialization of lists for building sparse BIBC and BCBV matrices
     rowi_BIBC = []
@@ -72,91 +100,68 @@ def _make_bibc_bcbv(bus, branch, graph):
     data_BCBV = []
 
     buses_ordered_bfs_nets = []
+    noloops = 0
     for ref in refs:
         # ordering buses according to breadth-first-search (bfs)
         buses_ordered_bfs, predecs_bfs = csgraph.breadth_first_order(G, ref, directed=False, return_predecessors=True)
         buses_ordered_bfs_nets.append(buses_ordered_bfs)
-        branches_ordered_bfs = list(zip(predecs_bfs[buses_ordered_bfs[1:]], buses_ordered_bfs[1:]))
-        G_tree = csgraph.breadth_first_tree(G, ref, directed=False)
+        buses_preorder, pos, size, depth = subtree_ranges(buses_ordered_bfs.astype(np.int64),
+                                                          predecs_bfs.astype(np.int64), nobus)
 
-        # if multiple networks get subnetwork branches
-        if norefs > 1:
-            branches_sub_mask = (np.in1d(branches_arr[:, 0], buses_ordered_bfs) &
-                                 np.in1d(branches_arr[:, 1], buses_ordered_bfs))
-            branches = np.sort(branches_arr[branches_sub_mask, :], axis=1)
-        else:
-            branches = np.sort(branches_arr, axis=1)
+        # #------ building BIBC and BCBV martrices ------
+        # branches in trees: each branch (predecessor, bus) carries the currents of the subtree of bus
+        buses_down = buses_ordered_bfs[1:]
+        brch_tree = _branch_index(branch_keys, branch_keys_order, nobus, predecs_bfs[buses_down], buses_down)
+        nodown = size[buses_down]
+        start = np.cumsum(nodown) - nodown
+        subtree_pos = (np.arange(nodown.sum()) - np.repeat(start, nodown) +
+                       np.repeat(pos[buses_down], nodown))
+        brch_rows = np.repeat(brch_tree, nodown)
+        rowi_BIBC.append(brch_rows)
+        coli_BIBC.append(bus_col[buses_preorder[subtree_pos]])
+        data_BIBC.append(np.ones(len(brch_rows)))
+        data_BCBV.append(z_ser[brch_rows])
 
         # identify loops if graph is not a tree
-        branches_loops = []
-        if G_tree.nnz < branches.shape[0]:
-            G_tree_nnzs = G_tree.nonzero()
-            branches_tree = np.sort(np.array([G_tree_nnzs[0], G_tree_nnzs[1]]).T, axis=1)
-            branches_loops = (set(zip(branches[:, 0], branches[:, 1])) -
-                              set(zip(branches_tree[:, 0], branches_tree[:, 1])))
-
-        # #------ building BIBC and BCBV martrices ------
-        # branches in trees
-        brchi = 0
-        for brch in branches_ordered_bfs:
-            tree_down, predecs = csgraph.breadth_first_order(G_tree, brch[1], directed=True, return_predecessors=True)
-            if len(tree_down) == 1:  # If at leaf
-                pass
-            if brch in z_brch_dict:
-                z_br = z_brch_dict[brch]
-            else:
-                z_br = z_brch_dict[brch[::-1]]
-            rowi_BIBC += [branches_ind_dict[brch]] * len(tree_down)
-            coli_BIBC += list(tree_down)
-            data_BCBV += [z_br] * len(tree_down)
-            data_BIBC += [1] * len(tree_down)
+        net_keys = branch_keys[np.in1d(branches_arr[:, 0], buses_ordered_bfs)]
+        branches_loops = np.setdiff1d(net_keys, branch_keys[brch_tree])
+        if not len(branches_loops):
+            continue
 
         # branches from loops
-        for loop_i, brch_loop in enumerate(branches_loops):
-            path_lens, path_preds = csgraph.shortest_path(G_tree, directed=False,
-                                                          indices=brch_loop, return_predecessors=True)
-            init, end = brch_loop
-            loop = [end]
-            while init != end:
-                end = path_preds[0, end]
-                loop.append(end)
-
-            loop_size = len(loop)
-            coli_BIBC += [nobus + loop_i] * loop_size
-            for i in range(len(loop)):
-                brch = (loop[i - 1], loop[i])
-                if np.argwhere(buses_ordered_bfs == brch[0]) < np.argwhere(buses_ordered_bfs == brch[1]):
-                    brch_direct = 1
-                else:
-                    brch_direct = -1
-                data_BIBC.append(brch_direct)
-
-                if brch in branches_ind_dict:
-                    rowi_BIBC.append(branches_ind_dict[brch])
-                else:
-                    rowi_BIBC.append(branches_ind_dict[brch[::-1]])
-
-                if brch in z_brch_dict:
-                    data_BCBV.append(z_brch_dict[brch] * brch_direct)
-                else:
-                    data_BCBV.append(z_brch_dict[brch[::-1]] * brch_direct)
-
-                brchi += 1
+        bfs_pos = np.zeros(nobus, dtype=np.int64)
+        bfs_pos[buses_ordered_bfs] = np.arange(len(buses_ordered_bfs))
+        for loop_key in branches_loops:
+            init, end = divmod(loop_key, nobus)
+            # loop = [end, ..., init] closed by the branch (init, end)
+            loop = np.array(_tree_path(init, end, predecs_bfs, depth))
+            loop_prev = np.roll(loop, 1)
+            brch_direct = np.where(bfs_pos[loop_prev] < bfs_pos[loop], 1, -1)
+            brch_loop = _branch_index(branch_keys, branch_keys_order, nobus, loop_prev, loop)
+            rowi_BIBC.append(brch_loop)
+            coli_BIBC.append(np.full(len(loop), nobus - norefs + noloops))
+            data_BIBC.append(brch_direct)
+            data_BCBV.append(z_ser[brch_loop] * brch_direct)
+            noloops += 1
+
+    rowi_BIBC = np.concatenate(rowi_BIBC)
+    coli_BIBC = np.concatenate(coli_BIBC)
 
     # construction of the BIBC matrix
-    # column indices correspond to buses: assuming root bus is always 0 after ordering indices are subtracted by 1
-    BIBC = csr_matrix((data_BIBC, (rowi_BIBC, np.array(coli_BIBC) - norefs)),
+    # column indices correspond to buses without the root buses, followed by the loops
+    BIBC = csr_matrix((np.concatenate(data_BIBC), (rowi_BIBC, coli_BIBC)),
                       shape=(nobranch, nobranch))
-    BCBV = csr_matrix((data_BCBV, (rowi_BIBC, np.array(coli_BIBC) - norefs)),
+    BCBV = csr_matrix((np.concatenate(data_BCBV), (rowi_BIBC, coli_BIBC)),
                       shape=(nobranch, nobranch)).transpose()
 
-    if BCBV.shape[0] > nobus - 1:  # if nbrch > nobus - 1 -> network has loops
+    notree = nobus - norefs
+    if BCBV.shape[0] > notree:  # if nbrch > nobus - 1 -> network has loops
         DLF_loop = BCBV * BIBC
         # DLF = [A  M.T ]
         #       [M  N   ]
-        A = DLF_loop[0:nobus - 1, 0:nobus - 1]
-        M = DLF_loop[nobus - 1:, 0:nobus - 1]
-        N = DLF_loop[nobus - 1:, nobus - 1:].A
+        A = DLF_loop[0:notree, 0:notree]
+        M = DLF_loop[notree:, 0:notree]
+        N = DLF_loop[notree:, notree:].A
         # considering the fact that number of loops is relatively small, N matrix is expected to be small and dense
         # ...in that case dense version is more efficient, i.e. N is transformed to dense and
         # inverted using sp.linalg.inv(N)
@@ -256,7 +261,8 @@ def _bfswpf(DLF, bus, gen, branch, baseMVA, Ybus, Sbus, V0, ref, pv, pq, buses_o
     ngen = gen.shape[0]
 
     mask_root = ~ (bus[:, BUS_TYPE] == 3)  # mask for eliminating root bus
-    norefs = len(ref)
+    bus_col = np.cumsum(mask_root) - 1
+    DLF_diag = DLF.diagonal()
 
     Ysh = _makeYsh_bfsw(bus, branch, baseMVA)
 
@@ -290,11 +296,10 @@ def _bfswpf(DLF, bus, gen, branch, baseMVA, Ybus, Sbus, V0, ref, pv, pq, buses_o
         inner_loop_converged = False
         while not inner_loop_converged and len(pv) > 0:
 
-            pvi = pv - norefs  # internal PV buses indices, assuming reference node is always 0
+            pvi = bus_col[pv]  # internal PV buses indices without the root buses
 
             Vmis = (np.abs(gen[gen_pv, VG])) ** 2 - (np.abs(V[pv])) ** 2
-            # TODO improve getting values from sparse DLF matrix - DLF[pvi, pvi] is unefficient
-            dQ = (Vmis / (2 * DLF[pvi, pvi].A1.imag)).flatten()
+            dQ = Vmis / (2 * DLF_diag[pvi].imag)
 
             gen[gen_pv, QG] += dQ
 
@@ -353,7 +358,7 @@ def _bfswpf(DLF, bus, gen, branch, baseMVA, Ybus, Sbus, V0, ref, pv, pq, buses_o
         # updating injected currents
         Iinj = np.conj(Sbus / V) - Ysh * V
 
-    return V, converged
+    return V, converged, n_iter
 
 
 def _get_options(options):
@@ -405,8 +410,8 @@ def _run_bfswpf(ppci, options, **kwargs):
     for refbus in ref:
         G_trees.append(csgraph.breadth_first_tree(G, refbus, directed=False))
 
-        # depth-first-search bus ordering and generating Direct Load Flow matrix DLF = BCBV * BIBC
-        ppci, DLF, buses_ordered_bfs_nets = _get_bibc_bcbv(ppci, options, bus, branch, G)
+    # depth-first-search bus ordering and generating Direct Load Flow matrix DLF = BCBV * BIBC
+    ppci, DLF, buses_ordered_bfs_nets = _get_bibc_bcbv(ppci, options, bus, branch, G)
 
     # if there are trafos with phase-shift calculate Ybus without phase-shift for bfswpf
     any_trafo_shift = (branch[:, SHIFT] != 0).any()
@@ -418,9 +423,9 @@ def _run_bfswpf(ppci, options, **kwargs):
         Ybus_noshift = Ybus.copy()
 
     # #-----  run the power flow  -----
-    V_final, success = _bfswpf(DLF, bus, gen, branch, baseMVA, Ybus_noshift,
-                               Sbus, V0, ref, pv, pq, buses_ordered_bfs_nets,
-                               options, **kwargs)
+    V_final, success, iterations = _bfswpf(DLF, bus, gen, branch, baseMVA, Ybus_noshift,
+                                           Sbus, V0, ref, pv, pq, buses_ordered_bfs_nets,
+                                           options, **kwargs)
 
     # if phase-shifting trafos are present adjust final state vector angles accordingly
     if calculate_voltage_angles and any_trafo_shift:
@@ -456,6 +461,7 @@ def _run_bfswpf(ppci, options, **kwargs):
     # bus, gen, branch = pfsoln_bfsw(baseMVA, bus, gen, branch, V_final, ref, pv, pq, BIBC, ysh_f,ysh_t,Iinj, Sbus)
 
     ppci["success"] = success
+    ppci["iterations"] = iterations
 
     ppci["bus"], ppci["gen"], ppci["branch"] = bus, gen, branch
 
@@ -17,6 +17,7 @@ from pandapower.pf.makeYbus_pypower import makeYbus as makeYbus_pypower
 from pandapower.pf.newtonpf import newtonpf
 from pandapower.pf.pfsoln_pypower import pfsoln as pfsoln_pypower
 from pandapower.pf.run_dc_pf import _run_dc_pf
+from pandapower.pf.updateYbus import changed_branch_rows, updateYbus, updateYbusShunts
 from pandapower.pf.ppci_variables import _get_pf_variables_from_ppci, _store_results_from_pf_in_ppci
 
 try:
@@ -54,16 +55,37 @@ def _run_newton_raphson_pf(ppci, options):
 def _get_Y_bus(ppci, options, makeYbus, baseMVA, bus, branch):
     recycle = options["recycle"]
 
-    if recycle["Ybus"] and ppci["internal"]["Ybus"].size:
+    if recycle["Ybus"] and ppci["internal"]["Ybus"].size and \
+            _update_Y_bus(ppci, baseMVA, bus, branch):
         Ybus, Yf, Yt = ppci["internal"]['Ybus'], ppci["internal"]['Yf'], ppci["internal"]['Yt']
     else:
         ## build admittance matrices
         Ybus, Yf, Yt = makeYbus(baseMVA, bus, branch)
         ppci["internal"]['Ybus'], ppci["internal"]['Yf'], ppci["internal"]['Yt'] = Ybus, Yf, Yt
+    if recycle["Ybus"]:
+        # bus and branch data the admittance matrices are built from
+        ppci["internal"]["Ybus_bus"] = bus.copy()
+        ppci["internal"]["Ybus_branch"] = branch.copy()
 
     return ppci, Ybus, Yf, Yt
 
 
+def _update_Y_bus(ppci, baseMVA, bus, branch):
+    """
+    Applies changes of branch and shunt parameters since the last power flow to the recycled
+    admittance matrices. Returns False if they have to be rebuilt.
+    """
+    internal = ppci["internal"]
+    if "Ybus_branch" not in internal or internal["Ybus_branch"].shape != branch.shape or \
+            internal["Ybus_bus"].shape != bus.shape:
+        return False
+    Ybus, Yf, Yt = internal['Ybus'], internal['Yf'], internal['Yt']
+    branch_old = internal["Ybus_branch"]
+    rows = changed_branch_rows(branch_old, branch)
+    return updateYbus(Ybus, Yf, Yt, branch_old, branch, rows) and \
+           updateYbusShunts(baseMVA, Ybus, internal["Ybus_bus"], bus)
+
+
 def _get_numba_functions(ppci, options):
     """
     pfsoln from pypower maybe slow in some cases. This function chooses the fastest for the given pf calculation
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+"""Updates the bus and branch admittance matrices for changed branches and shunts.
+"""
+
+from numpy import flatnonzero as find, any, array_equal, add, real, empty, int64
+
+from pandapower.idx_brch import F_BUS, T_BUS, BR_R, BR_X, BR_B, BR_STATUS, SHIFT, TAP, \
+    BR_R_ASYM, BR_X_ASYM
+from pandapower.idx_bus import GS, BS
+from pandapower.pf.makeYbus_pypower import branch_vectors
+
+# branch columns which change the admittance matrices
+YBUS_BRANCH_COLUMNS = [F_BUS, T_BUS, BR_R, BR_X, BR_B, BR_STATUS, SHIFT, TAP, BR_R_ASYM, BR_X_ASYM]
+
+
+def changed_branch_rows(branch_old, branch):
+    """Returns the rows of the branch matrix with changed admittance parameters.
+    """
+    return find(any(branch_old[:, YBUS_BRANCH_COLUMNS] != branch[:, YBUS_BRANCH_COLUMNS],
+                    axis=1))
+
+
+def updateYbus(Ybus, Yf, Yt, branch_old, branch, rows):
+    """Updates the admittance matrices in place for the given branch rows.
+
+    The contributions of the branches in rows are exchanged directly in the data arrays of
+    the CSR matrices Ybus, Yf and Yt: Yf and Yt get the new branch admittances, Ybus the
+    difference between the new and the old ones. branch_old must contain the branch data
+    that was used to build the matrices.
+
+    Returns False without changing the matrices if the sparsity pattern changes, i.e. if the
+    from or to bus of a branch changes or if an entry is not stored in the matrices. The
+    admittance matrices have to be rebuilt with makeYbus in this case.
+    """
+    if not len(rows):
+        return True
+    f = real(branch[rows, F_BUS]).astype(int64)
+    t = real(branch[rows, T_BUS]).astype(int64)
+    if not array_equal(f, real(branch_old[rows, F_BUS]).astype(int64)) or \
+            not array_equal(t, real(branch_old[rows, T_BUS]).astype(int64)):
+        return False
+
+    Yf_f, Yf_t = _csr_positions(Yf, rows, f), _csr_positions(Yf, rows, t)
+    Yt_f, Yt_t = _csr_positions(Yt, rows, f), _csr_positions(Yt, rows, t)
+    Y_ff, Y_ft = _csr_positions(Ybus, f, f), _csr_positions(Ybus, f, t)
+    Y_tf, Y_tt = _csr_positions(Ybus, t, f), _csr_positions(Ybus, t, t)
+    for pos in (Yf_f, Yf_t, Yt_f, Yt_t, Y_ff, Y_ft, Y_tf, Y_tt):
+        if any(pos < 0):
+            return False
+
+    Ytt_old, Yff_old, Yft_old, Ytf_old = branch_vectors(branch_old[rows], len(rows))
+    Ytt, Yff, Yft, Ytf = branch_vectors(branch[rows], len(rows))
+
+    Yf.data[Yf_f], Yf.data[Yf_t] = Yff, Yft
+    Yt.data[Yt_f], Yt.data[Yt_t] = Ytf, Ytt
+    # several changed branches can be connected to the same buses
+    add.at(Ybus.data, Y_ff, Yff - Yff_old)
+    add.at(Ybus.data, Y_ft, Yft - Yft_old)
+    add.at(Ybus.data, Y_tf, Ytf - Ytf_old)
+    add.at(Ybus.data, Y_tt, Ytt - Ytt_old)
+    return True
+
+
+def updateYbusShunts(baseMVA, Ybus, bus_old, bus):
+    """Updates the diagonal of Ybus in place for buses with changed shunt admittances.
+
+    Returns False without changing Ybus if a diagonal entry is not stored.
+    """
+    buses = find(any(bus_old[:, [GS, BS]] != bus[:, [GS, BS]], axis=1))
+    if not len(buses):
+        return True
+    pos = _csr_positions(Ybus, buses, buses)
+    if any(pos < 0):
+        return False
+    Ybus.data[pos] += ((bus[buses, GS] - bus_old[buses, GS]) +
+                       1j * (bus[buses, BS] - bus_old[buses, BS])) / baseMVA
+    return True
+
+
+def _csr_positions(A, rows, cols):
+    """Returns the positions of the entries (rows, cols) in the data array of the CSR matrix A.
+
+    Entries which are not stored get the position -1.
+    """
+    pos = empty(len(rows), dtype=int64)
+    for k in range(len(rows)):
+        start, stop = A.indptr[rows[k]], A.indptr[rows[k] + 1]
+        match = find(A.indices[start:stop] == cols[k])
+        pos[k] = start + match[0] if len(match) else -1
+    return pos
@@ -3,7 +3,7 @@
 # Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
 # and Energy System Technology (IEE), Kassel. All rights reserved.
 
-from pandapower.idx_bus import VM
+from pandapower.idx_bus import VM, VA
 from pandapower.auxiliary import ppException, _clean_up
 from pandapower.create import create_gen
 from pandapower.pd2ppc import _pd2ppc, _update_ppc
@@ -11,7 +11,8 @@ from pandapower.pf.run_bfswpf import _run_bfswpf
 from pandapower.pf.run_dc_pf import _run_dc_pf
 from pandapower.pf.run_newton_raphson_pf import _run_newton_raphson_pf
 from pandapower.pf.runpf_pypower import _runpf_pypower
-from pandapower.results import _extract_results, _copy_results_ppci_to_ppc, reset_results, verify_results
+from pandapower.results import _extract_results, _copy_results_ppci_to_ppc, reset_results, \
+    verify_results, _extract_results_on_demand, _reset_deferred_results
 from pandapower.pf.makeYbus_pypower import makeYbus as makeYbus_pypower
 from pandapower.pf.pfsoln_pypower import pfsoln as pfsoln_pypower
 from pandapower.pf.ppci_variables import _get_pf_variables_from_ppci
@@ -44,9 +45,12 @@ def _powerflow(net, **kwargs):
     mode = net["_options"]["mode"]
     algorithm = net["_options"]["algorithm"]
     max_iteration = net["_options"]["max_iteration"]
+    results = net["_options"]["results"]
 
     net["converged"] = False
     net["OPF_converged"] = False
+    # result tables of the last power flow which were not accessed are discarded
+    _reset_deferred_results(net, load=init_results)
     _add_auxiliary_elements(net)
 
     if not ac or init_results:
@@ -86,8 +90,11 @@ def _powerflow(net, **kwargs):
         net["_ppc"] = result
         net["converged"] = True
 
-    _extract_results(net, result)
-    _clean_up(net)
+    if isinstance(results, str) and results == "all":
+        _extract_results(net, result)
+        _clean_up(net)
+    else:
+        _extract_results_on_demand(net, result, [] if results == "lazy" else results)
 
 
 def _run_pf_algorithm(ppci, options, **kwargs):
@@ -112,6 +119,26 @@ def _run_pf_algorithm(ppci, options, **kwargs):
     return result
 
 
+def _init_ppci(net, result_ppc=None):
+    """
+    Converts the network into a ppc / ppci with the options of the last runpp call. Contrary to
+    the ppc which is stored in net after a power flow, the returned ppci does not contain any
+    results or bus type changes from enforce_q_lims and can be used as a starting point for
+    repeated power flow calculations. If the ppc of a converged power flow is given, its
+    voltages are used as initial voltages of the ppci.
+    """
+    _add_auxiliary_elements(net)
+    try:
+        ppc, ppci = _pd2ppc(net)
+    finally:
+        _clean_up(net, res=False)
+    if result_ppc is not None:
+        n_bus = ppci["bus"].shape[0]
+        ppci["bus"][:, VM] = result_ppc["bus"][:n_bus, VM]
+        ppci["bus"][:, VA] = result_ppc["bus"][:n_bus, VA]
+    return ppc, ppci
+
+
 def _pf_without_branches(ppci, options):
     Ybus, Yf, Yt = makeYbus_pypower(ppci["baseMVA"], ppci["bus"], ppci["branch"])
     baseMVA, bus, gen, branch, ref, _, pq, _, _, V0, ref_gens = _get_pf_variables_from_ppci(ppci)
@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csc_matrix
+from scipy.sparse.linalg import splu
+
+from pandapower.idx_brch import F_BUS, T_BUS
+from pandapower.idx_bus import PD, QD, BASE_KV
+from pandapower.pd2ppc import _ppc2ppci_index
+from pandapower.pf.makeSbus import makeSbus
+from pandapower.pf.ppci_variables import _get_pf_variables_from_ppci
+from pandapower.run import _run_base_case
+from pandapower.timeseries import _get_profile_values, _get_injection_incidence
+
+try:
+    from pandapower.pf.makeYbus import makeYbus
+except ImportError:
+    from pandapower.pf.makeYbus_pypower import makeYbus
+
+try:
+    import pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+
+def run_probabilistic(net, samples, method="newton", quantiles=(0.05, 0.5, 0.95),
+                      min_vm_pu=0.95, max_vm_pu=1.05, max_loading_percent=100., batch_size=100,
+                      margin_vm_pu=0.01, margin_loading_percent=5., **kwargs):
+    """
+    Probabilistic (Monte Carlo) power flow for samples of the active and reactive power of
+    loads, static generators and storages.
+
+    All samples are solved on the admittance matrix of the base case. With method "newton", the
+    samples are solved in batches by a Newton-Raphson power flow that evaluates the mismatches
+    and the Jacobians of all samples of a batch at once and factorizes them as one block
+    diagonal matrix. With method "linear", the voltages of all samples are linearized with the
+    factorized Jacobian of the base case. Samples whose linearized bus voltages or branch
+    loadings are within a margin of a limit are recalculated with the Newton-Raphson power flow.
+
+    No result tables are written for the samples. Instead, the statistics of the bus voltages
+    and the line and transformer loadings over all converged samples are returned.
+
+    INPUT:
+        **net** - The pandapower format network
+
+        **samples** (dict) - sampled values, the keys are tuples (element, variable) with element
+        in ["load", "sgen", "storage"] and variable in ["p_kw", "q_kvar"]. The values are numpy
+        arrays of shape (n_samples, len(net[element])) or pandas DataFrames with the element
+        indices as columns (see run_timeseries).
+
+    OPTIONAL:
+        **method** (str, "newton") - "newton" for an AC power flow of every sample or "linear"
+        for the linearized power flow with AC correction close to the limits
+
+        **quantiles** (iterable, (0.05, 0.5, 0.95)) - quantiles of the results
+
+        **min_vm_pu**, **max_vm_pu** (float, 0.95, 1.05) - voltage limits of buses without
+        min_vm_pu / max_vm_pu in net.bus
+
+        **max_loading_percent** (float, 100.) - loading limit of lines and transformers without
+        max_loading_percent in net.line / net.trafo
+
+        **batch_size** (int, 100) - number of samples which are solved together
+
+        **margin_vm_pu**, **margin_loading_percent** (float, 0.01, 5.) - samples whose linearized
+        voltages or loadings are closer to a limit than these margins are recalculated with the
+        AC power flow (only method "linear")
+
+        **kwargs** - power flow options that are passed to runpp for the base case (e.g.
+        calculate_voltage_angles, tolerance_kva, max_iteration)
+
+    OUTPUT:
+        **results** (dict) - contains the arrays
+
+            - "converged" (n_samples, bool) - convergence of each sample
+            - "iterations" (n_samples, int) - number of Newton-Raphson iterations, 0 for
+              samples which are only linearized
+
+        and the DataFrames "res_bus" (with the columns vm_pu_mean, vm_pu_min, vm_pu_max,
+        vm_pu_q<percent> for each quantile, p_undervoltage and p_overvoltage), "res_line" and
+        "res_trafo" (with the columns loading_percent_mean, loading_percent_max,
+        loading_percent_q<percent> and p_overload). The probabilities are the share of the
+        converged samples that violate the limit.
+
+    EXAMPLE:
+        samples = {("load", "p_kw"): p_load, ("sgen", "p_kw"): p_sgen}
+
+        results = run_probabilistic(net, samples, quantiles=[0.01, 0.99])
+
+        p_overload = results["res_line"]["p_overload"]
+    """
+    if method not in ["newton", "linear"]:
+        raise ValueError("method must be 'newton' or 'linear', not %s" % method)
+    ppc, ppci = _run_base_case(net, **kwargs)
+
+    values, n_samples = _get_profile_values(net, samples)
+    incidence, pd_fixed, qd_fixed = _get_injection_incidence(net, ppci, values)
+    system = _init_system(ppci, pd_fixed, qd_fixed)
+    tol = net["_options"]["tolerance_kva"] * 1e-3
+    max_iteration = net["_options"]["max_iteration"]
+
+    limits = {"bus": (_get_limit(net, "bus", "min_vm_pu", min_vm_pu),
+                      _get_limit(net, "bus", "max_vm_pu", max_vm_pu)),
+              "line": _get_limit(net, "line", "max_loading_percent", max_loading_percent),
+              "trafo": _get_limit(net, "trafo", "max_loading_percent", max_loading_percent)}
+    results = {"converged": np.zeros(n_samples, dtype=bool),
+               "iterations": np.zeros(n_samples, dtype=int)}
+    vm = np.full((n_samples, len(net.bus)), np.nan)
+    loading = {element: np.full((n_samples, len(net[element])), np.nan)
+               for element in ["line", "trafo"]}
+
+    if method == "linear":
+        lu_base = splu(_jacobian(system, system["V0"][:, np.newaxis]))
+    for start in range(0, n_samples, batch_size):
+        batch = np.arange(start, min(start + batch_size, n_samples))
+        Sbus = _get_sbus(system, incidence, values, batch)
+        V0 = np.repeat(system["V0"][:, np.newaxis], len(batch), axis=1)
+        if method == "linear":
+            V = _update_voltage(system, V0, lu_base.solve(-_mismatch(system, V0, Sbus)))
+            batch_results = _get_sample_results(net, ppci, system, V)
+            close = _close_to_limits(batch_results, limits, margin_vm_pu, margin_loading_percent)
+            converged = np.ones(len(batch), dtype=bool)
+            iterations = np.zeros(len(batch), dtype=int)
+            if np.any(close):
+                V[:, close], converged[close], iterations[close] = \
+                    _newton_batch(system, Sbus[:, close], V[:, close], tol, max_iteration)
+                corrected = _get_sample_results(net, ppci, system, V[:, close])
+                for key, val in corrected.items():
+                    batch_results[key][close] = val
+        else:
+            V, converged, iterations = _newton_batch(system, Sbus, V0, tol, max_iteration)
+            batch_results = _get_sample_results(net, ppci, system, V)
+        results["converged"][batch] = converged
+        results["iterations"][batch] = iterations
+        vm[batch[converged]] = batch_results["bus"][converged]
+        for element in ["line", "trafo"]:
+            loading[element][batch[converged]] = batch_results[element][converged]
+
+    n_failed = n_samples - np.sum(results["converged"])
+    if n_failed:
+        logger.warning("power flow did not converge in %i of %i samples" % (n_failed, n_samples))
+    n_converged = n_samples - n_failed
+    min_vm, max_vm = limits["bus"]
+    results["res_bus"] = _get_statistics(net.bus.index, "vm_pu", vm, quantiles, True)
+    results["res_bus"]["p_undervoltage"] = np.sum(vm < min_vm, axis=0) / max(n_converged, 1)
+    results["res_bus"]["p_overvoltage"] = np.sum(vm > max_vm, axis=0) / max(n_converged, 1)
+    for element in ["line", "trafo"]:
+        res = _get_statistics(net[element].index, "loading_percent", loading[element], quantiles)
+        res["p_overload"] = np.sum(loading[element] > limits[element], axis=0) / \
+                            max(n_converged, 1)
+        results["res_" + element] = res
+    return results
+
+
+def _get_limit(net, element, column, default):
+    if column not in net[element]:
+        return np.full(len(net[element]), float(default))
+    limit = net[element][column].values.astype(float)
+    limit[np.isnan(limit)] = default
+    return limit
+
+
+def _get_statistics(index, variable, val, quantiles, minimum=False):
+    statistics = pd.DataFrame(index=index)
+    with warnings.catch_warnings():
+        # elements which are out of service in all samples are NaN
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        statistics[variable + "_mean"] = np.nanmean(val, axis=0)
+        if minimum:
+            statistics[variable + "_min"] = np.nanmin(val, axis=0)
+        statistics[variable + "_max"] = np.nanmax(val, axis=0)
+        for q in quantiles:
+            statistics["%s_q%s" % (variable, format(100 * q, "g"))] = \
+                np.nanpercentile(val, 100 * q, axis=0)
+    return statistics
+
+
+def _init_system(ppci, pd_fixed, qd_fixed):
+    """
+    Builds the admittance matrices of the ppci and the sparsity pattern of the Jacobian, which
+    is the same for all samples.
+    """
+    baseMVA, bus, gen, branch, ref, pv, pq, _, _, V0, _ = _get_pf_variables_from_ppci(ppci)
+    Ybus, Yf, Yt = makeYbus(baseMVA, bus, branch)
+    Ybus, Yf, Yt = Ybus.tocsr(), Yf.tocsr(), Yt.tocsr()
+    bus = bus.copy()
+    bus[:, PD] = pd_fixed
+    bus[:, QD] = qd_fixed
+    n_bus = bus.shape[0]
+
+    # rows and columns of the entries of Ybus including the diagonal
+    rows = np.repeat(np.arange(n_bus), np.diff(Ybus.indptr))
+    cols = Ybus.indices
+    y = Ybus.data
+    no_diag = np.setdiff1d(np.arange(n_bus), rows[rows == cols])
+    rows = np.r_[rows, no_diag]
+    cols = np.r_[cols, no_diag]
+    y = np.r_[y, np.zeros(len(no_diag), dtype=y.dtype)]
+
+    # position of the buses in the rows / columns of the Jacobian
+    pvpq = np.r_[pv, pq]
+    pos_pvpq = np.full(n_bus, -1, dtype=int)
+    pos_pvpq[pvpq] = np.arange(len(pvpq))
+    pos_pq = np.full(n_bus, -1, dtype=int)
+    pos_pq[pq] = np.arange(len(pq)) + len(pvpq)
+    entries, jrows, jcols = [], [], []
+    for pos_row, pos_col in [(pos_pvpq, pos_pvpq), (pos_pvpq, pos_pq), (pos_pq, pos_pvpq),
+                             (pos_pq, pos_pq)]:
+        e = np.flatnonzero((pos_row[rows] >= 0) & (pos_col[cols] >= 0))
+        entries.append(e)
+        jrows.append(pos_row[rows[e]])
+        jcols.append(pos_col[cols[e]])
+    dim = len(pvpq) + len(pq)
+    # CSC structure of the Jacobian of one sample
+    jrows, jcols = np.concatenate(jrows), np.concatenate(jcols)
+    order = np.lexsort((jrows, jcols))
+    indptr = np.r_[0, np.cumsum(np.bincount(jcols, minlength=dim))]
+
+    return {"baseMVA": baseMVA, "Ybus": Ybus, "Yf": Yf, "Yt": Yt, "rows": rows, "cols": cols,
+            "y": y, "pv": pv, "pq": pq, "pvpq": pvpq, "V0": V0, "dim": dim, "entries": entries,
+            "order": order, "indices": jrows[order], "indptr": indptr,
+            "Sbus": makeSbus(baseMVA, bus, gen), "f_bus": branch[:, F_BUS].real.astype(int),
+            "t_bus": branch[:, T_BUS].real.astype(int), "base_kv": bus[:, BASE_KV]}
+
+
+def _get_sbus(system, incidence, values, batch):
+    """
+    Returns the complex bus power injections (n_bus x n_batch) of the samples in batch.
+    """
+    Sbus = np.repeat(system["Sbus"][:, np.newaxis], len(batch), axis=1)
+    for (element, variable), val in values.items():
+        # incidence maps kW / kvar of the elements to MW / Mvar of the buses
+        delta = incidence[element] * val[batch].T / system["baseMVA"]
+        if variable == "p_kw":
+            Sbus -= delta
+        else:
+            Sbus -= 1j * delta
+    return Sbus
+
+
+def _mismatch(system, V, Sbus):
+    mis = V * np.conj(system["Ybus"] * V) - Sbus
+    return np.r_[mis[system["pvpq"]].real, mis[system["pq"]].imag]
+
+
+def _jacobian(system, V):
+    """
+    Returns the block diagonal Jacobian of all columns of V in CSC format. The Jacobians are
+    assembled from the entries of dS/dVa and dS/dVm on the sparsity pattern of Ybus.
+    """
+    rows, cols, y = system["rows"], system["cols"], system["y"]
+    Ibus = system["Ybus"] * V
+    Vnorm = V / np.abs(V)
+    diag = (rows == cols)[:, np.newaxis]
+    V_r = V[rows]
+    dS_dVa = 1j * V_r * (np.conj(Ibus[rows]) * diag - np.conj(y[:, np.newaxis] * V[cols]))
+    dS_dVm = V_r * np.conj(y[:, np.newaxis] * Vnorm[cols]) + diag * np.conj(Ibus[rows]) * \
+             Vnorm[rows]
+    e11, e12, e21, e22 = system["entries"]
+    data = np.concatenate([dS_dVa[e11].real, dS_dVm[e12].real, dS_dVa[e21].imag,
+                           dS_dVm[e22].imag])[system["order"]]
+
+    n, dim = V.shape[1], system["dim"]
+    nnz = len(system["indices"])
+    indices = (system["indices"][np.newaxis, :] + dim * np.arange(n)[:, np.newaxis]).ravel()
+    indptr = np.r_[(system["indptr"][np.newaxis, :-1] + nnz * np.arange(n)[:, np.newaxis])
+                   .ravel(), nnz * n]
+    return csc_matrix((data.T.ravel(), indices, indptr), shape=(dim * n, dim * n))
+
+
+def _update_voltage(system, V, dx):
+    n_pvpq = len(system["pvpq"])
+    Va = np.angle(V)
+    Vm = np.abs(V)
+    Va[system["pvpq"]] += dx[:n_pvpq]
+    Vm[system["pq"]] += dx[n_pvpq:]
+    return Vm * np.exp(1j * Va)
+
+
+def _newton_batch(system, Sbus, V, tol, max_iteration):
+    """
+    Newton-Raphson power flow of all columns of Sbus. In every iteration, the Jacobians of the
+    samples that did not converge yet are factorized as one block diagonal matrix.
+    """
+    V = V.copy()
+    n = Sbus.shape[1]
+    converged = np.zeros(n, dtype=bool)
+    iterations = np.full(n, max_iteration, dtype=int)
+    active = np.arange(n)
+    for iteration in range(max_iteration + 1):
+        F = _mismatch(system, V[:, active], Sbus[:, active])
+        done = np.max(np.abs(F), axis=0) < tol
+        converged[active[done]] = True
+        iterations[active[done]] = iteration
+        active, F = active[~done], F[:, ~done]
+        if not len(active) or iteration == max_iteration:
+            break
+        J = _jacobian(system, V[:, active])
+        dx = splu(J).solve(-F.T.ravel()).reshape(len(active), -1).T
+        V[:, active] = _update_voltage(system, V[:, active], dx)
+    return V, converged, iterations
+
+
+def _get_sample_results(net, ppci, system, V):
+    """
+    Returns the bus voltage magnitudes and the line and transformer loadings of the samples
+    (n_samples x n_elements), the results of out of service buses are NaN.
+    """
+    n = V.shape[1]
+    Vm = np.abs(V)
+    bus_idx = net["_pd2ppc_lookups"]["bus"][net["bus"].index.values]
+    in_ppci = (bus_idx >= 0) & (bus_idx < V.shape[0])
+    vm = np.full((n, len(net.bus)), np.nan)
+    vm[:, in_ppci] = Vm[bus_idx[in_ppci]].T
+
+    # currents and apparent powers at both branch ends (2 x n_branch x n)
+    f_bus, t_bus = system["f_bus"], system["t_bus"]
+    s_ft = np.abs(np.array([V[f_bus] * np.conj(system["Yf"] * V),
+                            V[t_bus] * np.conj(system["Yt"] * V)])) * system["baseMVA"] * 1e3
+    u_ft = np.array([Vm[f_bus] * system["base_kv"][f_bus][:, np.newaxis],
+                     Vm[t_bus] * system["base_kv"][t_bus][:, np.newaxis]])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        i_ft = s_ft * 1e-3 / u_ft / np.sqrt(3)
+    branch_lookup = _ppc2ppci_index(ppci["internal"]["branch_is"])
+    branch_ranges = net["_pd2ppc_lookups"]["branch"]
+    results = {"bus": vm}
+
+    line = net["line"]
+    results["line"] = np.zeros((n, len(line)))
+    if "line" in branch_ranges:
+        f, t = branch_ranges["line"]
+        ppci_idx = branch_lookup[f:t]
+        is_br = ppci_idx >= 0
+        i_max = line["max_i_ka"].values * line["df"].values * line["parallel"].values
+        results["line"][:, is_br] = (np.max(i_ft[:, ppci_idx[is_br]], axis=0) /
+                                     i_max[is_br, np.newaxis] * 100).T
+
+    trafo = net["trafo"]
+    results["trafo"] = np.zeros((n, len(trafo)))
+    if "trafo" in branch_ranges:
+        f, t = branch_ranges["trafo"]
+        ppci_idx = branch_lookup[f:t]
+        is_br = ppci_idx >= 0
+        sn_kva = trafo["sn_kva"].values[is_br, np.newaxis]
+        if net["_options"]["trafo_loading"] == "current":
+            vns = np.array([trafo["vn_hv_kv"].values, trafo["vn_lv_kv"].values])[:, is_br]
+            lds_trafo = i_ft[:, ppci_idx[is_br]] * vns[:, :, np.newaxis] * 1000. * np.sqrt(3) \
+                        / sn_kva * 100.
+        else:
+            lds_trafo = s_ft[:, ppci_idx[is_br]] / sn_kva * 100.
+        results["trafo"][:, is_br] = (np.max(lds_trafo, axis=0) /
+                                      (trafo["parallel"].values * trafo["df"].values)
+                                      [is_br, np.newaxis]).T
+    return results
+
+
+def _close_to_limits(results, limits, margin_vm_pu, margin_loading_percent):
+    """
+    Returns a mask of the samples whose linearized results are closer to a limit than the
+    margins.
+    """
+    min_vm, max_vm = limits["bus"]
+    with np.errstate(invalid="ignore"):
+        close = np.any(results["bus"] < min_vm + margin_vm_pu, axis=1) | \
+                np.any(results["bus"] > max_vm - margin_vm_pu, axis=1)
+        for element in ["line", "trafo"]:
+            close |= np.any(results[element] > limits[element] - margin_loading_percent, axis=1)
+    # samples with implausible linearized results are recalculated as well
+    close |= ~np.all(np.isfinite(results["line"]), axis=1)
+    return close
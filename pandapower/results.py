@@ -9,7 +9,10 @@ import copy
 import numpy as np
 import pandas as pd
 
-from pandapower.results_branch import _get_branch_results
+from pandapower.auxiliary import pandapowerNet, _DeferredTable, _clean_up
+from pandapower.results_branch import _get_branch_results, _get_branch_flows, _get_line_results, \
+    _get_trafo_results, _get_trafo3w_results, _get_impedance_results, _get_xward_branch_results, \
+    _get_switch_results
 from pandapower.results_bus import _get_bus_results, _get_p_q_results, _set_buses_out_of_service, \
     _get_shunt_results, _get_p_q_results_opf, _get_bus_v_results
 from pandapower.results_gen import _get_gen_results
@@ -27,6 +30,116 @@ def _extract_results(net, ppc):
     _get_bus_results(net, ppc, bus_pq)
 
 
+# result tables which depend on the power balance of the buses and are extracted together
+INJECTION_RESULTS = ["bus", "ext_grid", "gen", "load", "sgen", "storage", "shunt", "ward",
+                     "xward", "dcline"]
+# result tables which are extracted from the branch flows independently of each other
+BRANCH_RESULTS = ["line", "trafo", "trafo3w", "impedance", "switch"]
+
+
+def _extract_results_on_demand(net, ppc, elements):
+    """
+    Extracts the results of the given elements and replaces all other result tables with
+    placeholders, which extract the results when the table is accessed for the first time.
+    The placeholders are discarded by the next power flow.
+    """
+    unknown = set(elements) - set(INJECTION_RESULTS + BRANCH_RESULTS)
+    if len(unknown):
+        raise ValueError("No results available for %s" % ", ".join(sorted(unknown)))
+    _set_buses_out_of_service(ppc)
+    extraction = _ResultExtraction(net, ppc)
+    _clean_up(net, res=False)
+    extraction.extract(elements)
+    # switch results only exist if bus-bus switches are modelled as branches
+    has_switch_results = "switch" in net["_pd2ppc_lookups"]["branch"]
+    for element in INJECTION_RESULTS + BRANCH_RESULTS:
+        if element in extraction.extracted or (element == "switch" and not has_switch_results):
+            continue
+        net._defer("res_" + element,
+                   _DeferredTable(lambda element=element: extraction.load(element)))
+
+
+def _reset_deferred_results(net, load=False):
+    """
+    Removes the placeholders of result tables which were not accessed since the last power flow
+    or extracts the results if load is True.
+    """
+    if not net._deferred:
+        return
+    for key, table in list(net._deferred.items()):
+        if table.__class__ is not _DeferredTable:
+            # other deferred tables, e.g. of a lazily loaded file, are kept
+            continue
+        if dict.__contains__(net, key):
+            # the table was already extracted together with another one
+            del net._deferred[key]
+        elif load:
+            net[key]
+        else:
+            del net._deferred[key]
+            if "_empty_" + key in net:
+                empty_res_element(net, key)
+
+
+class _ResultExtraction(object):
+    """
+    Extracts result tables of a power flow after the auxiliary elements are removed from the
+    network. The extraction works on a shallow copy of the network which keeps the auxiliary
+    buses and generators of the power flow.
+    """
+    def __init__(self, net, ppc):
+        self.net = net
+        self.ppc = ppc
+        self.view = pandapowerNet(net)
+        if len(net["trafo3w"]) or len(net["xward"]):
+            self.view["bus"] = net["bus"].copy(deep=False)
+        for element in ["trafo3w", "xward"]:
+            if len(net[element]):
+                self.view[element] = net[element].copy(deep=False)
+        if len(net["dcline"]):
+            self.view["gen"] = net["gen"].copy(deep=False)
+        self.extracted = set()
+        self.branch_flows = None
+
+    def load(self, element):
+        self.extract([element])
+        return self.net["res_" + element]
+
+    def extract(self, elements):
+        view, ppc = self.view, self.ppc
+        elements = set(elements) - self.extracted
+        if elements & set(INJECTION_RESULTS):
+            bus_lookup_aranged = _get_aranged_lookup(view)
+            _get_bus_v_results(view, ppc)
+            bus_pq = _get_p_q_results(view, bus_lookup_aranged)
+            _get_shunt_results(view, ppc, bus_lookup_aranged, bus_pq)
+            _get_xward_branch_results(view, ppc, bus_lookup_aranged, bus_pq)
+            _get_gen_results(view, ppc, bus_lookup_aranged, bus_pq)
+            _get_bus_results(view, ppc, bus_pq)
+            _clean_up(view)
+            elements |= set(INJECTION_RESULTS)
+        branches = elements & set(BRANCH_RESULTS)
+        if branches:
+            if self.branch_flows is None:
+                self.branch_flows = _get_branch_flows(ppc)
+            i_ft, s_ft = self.branch_flows
+            if "line" in branches:
+                _get_line_results(view, ppc, i_ft)
+            if "trafo" in branches:
+                _get_trafo_results(view, ppc, s_ft, i_ft)
+            if "trafo3w" in branches:
+                _get_trafo3w_results(view, ppc, s_ft, i_ft)
+            if "impedance" in branches:
+                _get_impedance_results(view, ppc, i_ft)
+            if "switch" in branches:
+                _get_switch_results(view, i_ft)
+        for element in elements:
+            res_element = "res_" + element
+            if res_element in view:
+                dict.__setitem__(self.net, res_element, dict.__getitem__(view, res_element))
+        self.extracted |= elements
+
+
 def _extract_results_opf(net, ppc):
     # get options
     bus_lookup_aranged = _get_aranged_lookup(net)
@@ -9,9 +9,8 @@ import numpy as np
 from pandapower.auxiliary import _add_pf_options, _add_ppc_options, _add_opf_options, \
     _check_if_numba_is_installed, _check_bus_index_and_print_warning_if_high, \
     _check_gen_index_and_print_warning_if_high
-from pandapower.optimal_powerflow import _optimal_powerflow
 from pandapower.opf.validate_opf_input import _check_necessary_opf_parameters
-from pandapower.powerflow import _powerflow
+from pandapower.powerflow import _powerflow, _init_ppci
 import inspect
 
 try:
@@ -39,7 +38,8 @@ def set_user_pf_options(net, overwrite=False, **kwargs):
                            'copy_constraints_to_ppc', 'r_switch', 'init', 'enforce_q_lims',
                            'recycle', 'voltage_depend_loads', 'delta', 'tolerance_kva',
                            'trafo_loading', 'numba', 'ac', 'algorithm', 'max_iteration',
-                           'trafo3w_losses', 'init_vm_pu', 'init_va_degree']
+                           'trafo3w_losses', 'init_vm_pu', 'init_va_degree', 'lu_reuse',
+                           'jacobian_reuse', 'results']
 
     if overwrite or 'user_pf_options' not in net.keys():
         net['user_pf_options'] = dict()
@@ -183,6 +183,12 @@ def runpp(net, algorithm='nr', calculate_voltage_angles="auto", init="auto",
 
         **v_debug** (bool, False) - if True, voltage values in each newton-raphson iteration are logged in the ppc
 
+        **lu_reuse** (bool, False) - if True, the Newton-Raphson solver factorizes the Jacobian with a sparse LU decomposition whose fill-reducing column ordering is only computed once and stored in net["_ppc"]["internal"]. All following factorizations with the same sparsity pattern reuse this ordering, which includes following power flows if the ppc is recycled (see recycle).
+
+        **jacobian_reuse** (int, 1) - number of Newton-Raphson iterations in which the same factorized Jacobian is used. Values greater than 1 activate the "dishonest" Newton method, which needs more but cheaper iterations (consider increasing max_iteration). Implies lu_reuse=True.
+
+        **results** (str/list, "all") - result tables which are extracted after the power flow. With "all", all result tables are filled. With "lazy" or a list of elements (e.g. ["bus", "line"]), only the results of the listed elements are extracted and the other result tables are extracted from the power flow results when they are accessed for the first time. Since the results of buses, ext_grids, gens, loads, sgens, storages, shunts, wards, xwards and dclines depend on each other, they are always extracted together. Result tables which are not accessed until the next power flow are discarded. The element tables must not be changed before the results are accessed, since the deferred extraction reads them.
+
         **init_vm_pu** (string/float/array/Series, None) - Allows to define initialization specifically for voltage magnitudes. Only works with init == "auto"!
 
             - "auto": all buses are initialized with the mean value of all voltage controlled elements in the grid
@@ -208,6 +214,7 @@ def runpp(net, algorithm='nr', calculate_voltage_angles="auto", init="auto",
             _is_elements: If True in service elements are not filtered again and are taken from the last result in net["_is_elements"]
             ppc: If True the ppc is taken from net["_ppc"] and gets updated instead of reconstructed entirely
             Ybus: If True the admittance matrix (Ybus, Yf, Yt) is taken from ppc["internal"] and not reconstructed
+            bfsw: If True the Direct Load Flow matrix of the backward/forward sweep is taken from ppc["internal"] and not reconstructed
 
     """
 
@@ -224,12 +231,15 @@ def runpp(net, algorithm='nr', calculate_voltage_angles="auto", init="auto",
 
     trafo3w_losses = kwargs.get("trafo3w_losses", "hv")
     v_debug = kwargs.get("v_debug", False)
+    lu_reuse = kwargs.get("lu_reuse", False)
+    jacobian_reuse = kwargs.get("jacobian_reuse", 1)
     delta_q = kwargs.get("delta_q", 0)
     r_switch = kwargs.get("r_switch", 0.0)
     numba = kwargs.get("numba", True)
     init_vm_pu = kwargs.get("init_vm_pu", None)
     init_va_degree = kwargs.get("init_va_degree", None)
     recycle = kwargs.get("recycle", None)
+    results = kwargs.get("results", "all")
     if "init" in overrule_options:
         init = overrule_options["init"]
 
@@ -290,13 +300,31 @@ def runpp(net, algorithm='nr', calculate_voltage_angles="auto", init="auto",
                      trafo3w_losses=trafo3w_losses)
     _add_pf_options(net, tolerance_kva=tolerance_kva, trafo_loading=trafo_loading,
                     numba=numba, ac=ac, algorithm=algorithm, max_iteration=max_iteration,
-                    v_debug=v_debug)
+                    v_debug=v_debug, lu_reuse=lu_reuse, jacobian_reuse=jacobian_reuse,
+                    results=results)
     net._options.update(overrule_options)
     _check_bus_index_and_print_warning_if_high(net)
     _check_gen_index_and_print_warning_if_high(net)
     _powerflow(net, **kwargs)
 
 
+def _run_base_case(net, constant_power_loads=True, **kwargs):
+    """
+    Runs the base case power flow of the functions which build the ppc once and reuse it for all
+    time steps, samples or steps (e.g. run_timeseries, run_probabilistic) and returns ppc and ppci.
+    A recycle option in kwargs is ignored. If constant_power_loads is True, voltage dependent
+    loads are considered as constant power loads.
+    """
+    if kwargs.pop("recycle", None) is not None:
+        logger.warning("the recycle option is ignored, the ppc of the base case is reused anyway")
+    if constant_power_loads:
+        if kwargs.pop("voltage_depend_loads", False):
+            logger.warning("voltage dependent loads are considered as constant power loads")
+        kwargs["voltage_depend_loads"] = False
+    runpp(net, recycle=dict(_is_elements=False, ppc=False, Ybus=False, bfsw=True), **kwargs)
+    return _init_ppci(net, net["_ppc"])
+
+
 def rundcpp(net, trafo_model="t", trafo_loading="current", recycle=None, check_connectivity=True,
             r_switch=0.0, trafo3w_losses="hv", **kwargs):
     """
@@ -359,7 +387,8 @@ def rundcpp(net, trafo_model="t", trafo_loading="current", recycle=None, check_c
                      enforce_q_lims=enforce_q_lims, recycle=recycle,
                      voltage_depend_loads=False, delta=0, trafo3w_losses=trafo3w_losses)
     _add_pf_options(net, tolerance_kva=tolerance_kva, trafo_loading=trafo_loading,
-                    numba=numba, ac=ac, algorithm=algorithm, max_iteration=max_iteration)
+                    numba=numba, ac=ac, algorithm=algorithm, max_iteration=max_iteration,
+                    results="all")
     _check_bus_index_and_print_warning_if_high(net)
     _check_gen_index_and_print_warning_if_high(net)
     _powerflow(net, **kwargs)
@@ -417,9 +446,24 @@ def runopp(net, verbose=False, calculate_voltage_angles=False, check_connectivit
             "flat" (default): starting vector is (upper bound - lower bound) / 2
             "pf": a power flow is executed prior to the opf and the pf solution is the starting vector. This may improve
             convergence, but takes a longer runtime (which are probably neglectible for opf calculations)
+
+        **numba** (bool, True) - Usage of numba JIT compiler in the AC OPF
+
+            If set to True, the constraint Jacobian and the Hessian of the Lagrangian are
+            calculated by numba kernels on sparsity patterns which are only built once per OPF.
+            If set to False, the pypower implementation is used.
     """
     logger.warning("The OPF cost definition has changed! Please check out the tutorial 'opf_changes-may18.ipynb' or the documentation!")
     _check_necessary_opf_parameters(net, logger)
+    _init_runopp_options(net, calculate_voltage_angles=calculate_voltage_angles,
+                         check_connectivity=check_connectivity, r_switch=r_switch, delta=delta,
+                         init=init, numba=numba, trafo3w_losses=trafo3w_losses)
+    from pandapower.optimal_powerflow import _optimal_powerflow
+    _optimal_powerflow(net, verbose, suppress_warnings, **kwargs)
+
+
+def _init_runopp_options(net, calculate_voltage_angles, check_connectivity, r_switch, delta, init,
+                         numba, trafo3w_losses):
     if numba:
         numba = _check_if_numba_is_installed(numba)
     mode = "opf"
@@ -440,7 +484,6 @@ def runopp(net, verbose=False, calculate_voltage_angles=False, check_connectivit
     _add_opf_options(net, trafo_loading=trafo_loading, ac=ac, init=init, numba=numba)
     _check_bus_index_and_print_warning_if_high(net)
     _check_gen_index_and_print_warning_if_high(net)
-    _optimal_powerflow(net, verbose, suppress_warnings, **kwargs)
 
 
 def rundcopp(net, verbose=False, check_connectivity=True, suppress_warnings=True, r_switch=0.0,
@@ -482,6 +525,13 @@ def rundcopp(net, verbose=False, check_connectivity=True, suppress_warnings=True
     if (not net.load.empty) & (not "controllable" in net.load.columns):
         logger.warning('Warning: Please specify load["controllable"]\n')
 
+    _init_rundcopp_options(net, check_connectivity=check_connectivity, r_switch=r_switch,
+                           delta=delta, trafo3w_losses=trafo3w_losses)
+    from pandapower.optimal_powerflow import _optimal_powerflow
+    _optimal_powerflow(net, verbose, suppress_warnings, **kwargs)
+
+
+def _init_rundcopp_options(net, check_connectivity, r_switch, delta, trafo3w_losses):
     mode = "opf"
     ac = False
     init = "flat"
@@ -503,4 +553,3 @@ def rundcopp(net, verbose=False, check_connectivity=True, suppress_warnings=True
     _add_opf_options(net, trafo_loading=trafo_loading, init=init, ac=ac)
     _check_bus_index_and_print_warning_if_high(net)
     _check_gen_index_and_print_warning_if_high(net)
-    _optimal_powerflow(net, verbose, suppress_warnings, **kwargs)
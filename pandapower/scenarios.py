@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import copy
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix, csgraph
+
+from pandapower.idx_brch import F_BUS, T_BUS, BR_STATUS
+from pandapower.idx_bus import PD, QD, CID, CZD
+from pandapower.pd2ppc import _ppc2ppci_index
+from pandapower.pf.bustypes import bustypes
+from pandapower.powerflow import LoadflowNotConverged, _init_ppci, _run_pf_algorithm
+from pandapower.run import runpp, _run_base_case
+from pandapower.timeseries import _init_result_arrays, _get_injection_incidence, \
+    _get_time_step_options, _write_time_step_results
+
+try:
+    import pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+# scenario columns which are applied to the ppci of the base case
+INJECTION_ELEMENTS = ("load", "sgen", "storage")
+INJECTION_COLUMNS = ("p_kw", "q_kvar", "scaling")
+BRANCH_ELEMENTS = ("line", "trafo")
+
+# network, ppci and options of a worker process, set once by _init_worker
+_worker_state = dict()
+
+
+def run_scenarios(net, scenarios, scenario_fn=None, n_workers=None, chunksize=1, **kwargs):
+    """
+    Runs independent power flows for a list of scenarios in a pool of worker processes.
+
+    The network is sent to every worker process only once when the pool is started (on systems
+    that fork new processes, the workers share the memory of the parent process until they write
+    to it). For each scenario, only the scenario deltas are sent to a worker, which applies them
+    to the ppci of the base case, runs the power flow and restores the original values afterwards.
+    The results are sent back as numpy arrays and collected in preallocated
+    (n_scenarios x n_elements) arrays while the remaining scenarios are still running.
+
+    The ppc of the base case is built only once. Scenarios which only change p_kw, q_kvar or
+    scaling of loads, sgens and storages or which switch lines and trafos out of service without
+    disconnecting any bus are applied directly to the bus and branch arrays of the ppci and solved
+    without runpp. All other scenarios, as well as the scenarios of a scenario_fn, are applied to
+    the network and calculated with runpp.
+
+    INPUT:
+        **net** - The pandapower format network
+
+        **scenarios** (list) - the scenarios. Without a scenario_fn, each scenario is a dict with
+        (element, column) tuples as keys and the new values as values. A value is either a
+        scalar, an array with one value per row of net[element] or a dict / pandas Series which
+        maps element indices to values, e.g.
+
+            {("load", "scaling"): 1.2, ("switch", "closed"): {3: False}}
+
+    OPTIONAL:
+        **scenario_fn** (function, None) - function scenario_fn(net, scenario) that applies a
+        scenario to the network in place. It must be defined at module level so that it can be
+        sent to the worker processes. All element tables are restored after the power flow, so
+        scenario_fn may change any values in net.
+
+        **n_workers** (int, None) - number of worker processes. If None, the number of CPUs is
+        used. With n_workers=1, all scenarios are calculated in the current process.
+
+        **chunksize** (int, 1) - number of scenarios that are sent to a worker at once
+
+        **kwargs** - power flow options that are passed to runpp
+
+    OUTPUT:
+        **results** (dict) - contains the arrays
+
+            - "converged" (n_scenarios, bool) - power flow convergence of each scenario
+
+        and a dict for each of "res_bus", "res_line", "res_trafo" and "res_ext_grid" with one
+        (n_scenarios x n_elements) array per result variable, as in run_timeseries. Scenarios that
+        did not converge are NaN.
+
+    EXAMPLE:
+        scenarios = [{("load", "scaling"): s} for s in np.linspace(0.5, 1.5, 100)]
+
+        results = run_scenarios(net, scenarios, n_workers=4)
+
+        vm_pu = results["res_bus"]["vm_pu"]
+    """
+    scenarios = list(scenarios)
+    n_scenarios = len(scenarios)
+    if n_workers is None:
+        n_workers = multiprocessing.cpu_count()
+    n_workers = max(1, min(n_workers, n_scenarios))
+    results = _init_result_arrays(net, n_scenarios)
+    del results["iterations"]
+
+    # the power flow results of the base case and the scenarios are not written to net
+    net = copy.deepcopy(net)
+    try:
+        ppc, ppci = _run_base_case(net, constant_power_loads=False, **kwargs)
+    except LoadflowNotConverged:
+        logger.warning("base case power flow did not converge - scenarios are initialized "
+                       "with the initial voltages of the power flow options")
+        ppc, ppci = _init_ppci(net, None)
+    kwargs.pop("recycle", None)
+
+    jobs = enumerate(scenarios)
+    if n_workers == 1:
+        _init_worker(net, ppci, scenario_fn, kwargs)
+        try:
+            for job in jobs:
+                _collect_scenario_results(results, *_run_scenario(job))
+        finally:
+            _worker_state.clear()
+    else:
+        pool = multiprocessing.Pool(n_workers, initializer=_init_worker,
+                                    initargs=(net, ppci, scenario_fn, kwargs))
+        try:
+            for scenario_results in pool.imap_unordered(_run_scenario, jobs, chunksize):
+                _collect_scenario_results(results, *scenario_results)
+        finally:
+            pool.terminate()
+
+    n_failed = n_scenarios - np.sum(results["converged"])
+    if n_failed:
+        logger.warning("power flow did not converge in %i of %i scenarios"
+                       % (n_failed, n_scenarios))
+    return results
+
+
+def _init_worker(net, ppci, scenario_fn, kwargs):
+    state = _worker_state
+    state["net"] = net
+    state["scenario_fn"] = scenario_fn
+    state["kwargs"] = kwargs
+    state["result_variables"] = {
+        res_element: list(variables)
+        for res_element, variables in _init_result_arrays(net, 0).items()
+        if isinstance(variables, dict)}
+    # lookups of the base case ppci, which are overwritten by runpp in _run_scenario_runpp
+    state["internal"] = {key: copy.deepcopy(net[key])
+                         for key in ["_options", "_is_elements", "_pd2ppc_lookups"]}
+
+    state["ppci"] = ppci
+    state["options"] = _get_time_step_options(net)
+    state["bus"] = ppci["bus"].copy()
+    state["gen"] = ppci["gen"].copy()
+    state["branch"] = ppci["branch"].copy()
+    elements = [element for element in INJECTION_ELEMENTS if len(net[element])]
+    if "load" in elements and net["_options"]["voltage_depend_loads"] and \
+            np.any(state["bus"][:, [CID, CZD]] != 0):
+        # the voltage dependency of the buses changes with the load values
+        elements.remove("load")
+    values = {(element, variable): None for element in elements for variable in ["p_kw", "q_kvar"]}
+    state["incidence"], state["pd_fixed"], state["qd_fixed"] = \
+        _get_injection_incidence(net, ppci, values, scaled=False)
+    branch_lookup = _ppc2ppci_index(ppci["internal"]["branch_is"])
+    state["branch_rows"] = {element: branch_lookup[f:t] for element, (f, t)
+                            in net["_pd2ppc_lookups"]["branch"].items()
+                            if element in BRANCH_ELEMENTS}
+
+
+def _run_scenario(job):
+    i, scenario = job
+    if _worker_state["scenario_fn"] is None:
+        arrays = _get_scenario_arrays(scenario)
+        if arrays is not None:
+            return _run_scenario_ppci(i, *arrays)
+    return _run_scenario_runpp(i, scenario)
+
+
+def _get_scenario_arrays(scenario):
+    """
+    Returns the bus and branch arrays of the ppci with the scenario deltas applied, or None if
+    the scenario changes the network in a way that requires a new ppc.
+    """
+    state = _worker_state
+    net = state["net"]
+    injections = {element: dict() for element in state["incidence"]}
+    branch = state["branch"]
+    for (element, column), value in scenario.items():
+        if element in injections and column in INJECTION_COLUMNS:
+            injections[element][column] = _get_delta_values(net[element], column, value)
+            if injections[element][column] is None:
+                return None
+        elif element in state["branch_rows"] and column == "in_service":
+            in_service = _get_delta_values(net[element], column, value)
+            if in_service is None:
+                return None
+            in_service = in_service.astype(bool)
+            changed = in_service != net[element]["in_service"].values.astype(bool)
+            if np.any(changed & in_service):
+                # branches which are switched on are not part of the ppci
+                return None
+            rows = state["branch_rows"][element][changed]
+            if branch is state["branch"]:
+                branch = branch.copy()
+            branch[rows[rows >= 0], BR_STATUS] = 0
+        else:
+            return None
+    if branch is not state["branch"] and not _all_buses_supplied(state["bus"], state["gen"],
+                                                                 branch):
+        return None
+
+    bus = state["bus"].copy()
+    bus[:, PD] = state["pd_fixed"]
+    bus[:, QD] = state["qd_fixed"]
+    for element, incidence in state["incidence"].items():
+        df = net[element]
+        columns = injections[element]
+        scaling = columns.get("scaling", df["scaling"].values)
+        bus[:, PD] += incidence * (columns.get("p_kw", df["p_kw"].values) * scaling)
+        bus[:, QD] += incidence * (columns.get("q_kvar", df["q_kvar"].values) * scaling)
+    return bus, branch
+
+
+def _get_delta_values(df, column, value):
+    """
+    Returns the values of a column with a scenario delta applied, or None if the delta refers to
+    unknown indices.
+    """
+    values = df[column].values.copy()
+    if isinstance(value, pd.Series):
+        value = value.to_dict()
+    if isinstance(value, dict):
+        idx = df.index.get_indexer(list(value.keys()))
+        if np.any(idx < 0):
+            return None
+        values[idx] = list(value.values())
+    else:
+        values[:] = value
+    return values
+
+
+def _all_buses_supplied(bus, gen, branch):
+    n_bus = bus.shape[0]
+    ref, _, _ = bustypes(bus, gen)
+    is_br = branch[:, BR_STATUS].real > 0
+    f = branch[is_br, F_BUS].real.astype(int)
+    t = branch[is_br, T_BUS].real.astype(int)
+    adj = csr_matrix((np.ones(len(f)), (f, t)), shape=(n_bus, n_bus))
+    _, labels = csgraph.connected_components(adj, directed=False)
+    return np.all(np.in1d(labels, labels[ref]))
+
+
+def _run_scenario_ppci(i, bus, branch):
+    state = _worker_state
+    ppci = state["ppci"]
+    ppci["bus"] = bus
+    ppci["gen"] = state["gen"].copy()
+    ppci["branch"] = branch.copy()
+    ppci = _run_pf_algorithm(ppci, state["options"], VERBOSE=0)
+    state["ppci"] = ppci
+    if not ppci["success"]:
+        return i, False, None
+    results = _init_result_arrays(state["net"], 1)
+    _write_time_step_results(state["net"], ppci, results, 0)
+    res = {res_element: {variable: results[res_element][variable][0] for variable in variables}
+           for res_element, variables in state["result_variables"].items()}
+    return i, True, res
+
+
+def _run_scenario_runpp(i, scenario):
+    net = _worker_state["net"]
+    scenario_fn = _worker_state["scenario_fn"]
+    if scenario_fn is None:
+        original = _apply_scenario_deltas(net, scenario)
+    else:
+        original = {element: net[element].copy() for element in net.keys()
+                    if isinstance(net[element], pd.DataFrame) and not element.startswith("res_")
+                    and not element.startswith("_")}
+        scenario_fn(net, scenario)
+    try:
+        runpp(net, **_worker_state["kwargs"])
+        res = {res_element: {variable: net[res_element][variable].values.copy()
+                             for variable in variables}
+               for res_element, variables in _worker_state["result_variables"].items()}
+        converged = True
+    except LoadflowNotConverged:
+        res = None
+        converged = False
+    finally:
+        if scenario_fn is None:
+            _apply_scenario_deltas(net, original)
+        else:
+            for element, df in original.items():
+                net[element] = df
+        for key, value in _worker_state["internal"].items():
+            net[key] = copy.deepcopy(value)
+    return i, converged, res
+
+
+def _apply_scenario_deltas(net, deltas):
+    """
+    Sets the values of the scenario deltas in net and returns the original values as deltas.
+    """
+    original = dict()
+    for (element, column), value in deltas.items():
+        df = net[element]
+        if isinstance(value, pd.Series):
+            value = value.to_dict()
+        if isinstance(value, dict):
+            idx = list(value.keys())
+            original[(element, column)] = df.loc[idx, column].to_dict()
+            df.loc[idx, column] = list(value.values())
+        else:
+            original[(element, column)] = df[column].values.copy()
+            df[column] = value
+    return original
+
+
+def _collect_scenario_results(results, i, converged, res):
+    results["converged"][i] = converged
+    if not converged:
+        return
+    for res_element, values in res.items():
+        for variable, val in values.items():
+            results[res_element][variable][i] = val
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csc_matrix
+from scipy.sparse.linalg import splu
+
+from pandapower.idx_brch import F_BUS, T_BUS
+from pandapower.idx_bus import VM, VA, BASE_KV, BUS_TYPE, NONE
+from pandapower.pf.bustypes import bustypes
+from pandapower.pf.create_jacobian import create_jacobian_matrix, get_fastest_jacobian_function
+from pandapower.pf.makeYbus_pypower import makeYbus as makeYbus_pypower
+from pandapower.pd2ppc import _ppc2ppci_index
+
+try:
+    import pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+
+def calc_sensitivities(net, buses=None, elements=None, branches=("line", "trafo")):
+    """
+    Calculates the linearized sensitivities of the bus voltages and the line and transformer
+    currents and loadings to the active and reactive power of single injections at the operating
+    point of the last power flow.
+
+    The Jacobian of the Newton-Raphson power flow is built at the converged voltages and
+    factorized once. All sensitivities are then obtained by solving the factorized Jacobian for
+    the selected injections, so that the change of the results for a change of the injections
+    can be estimated by a matrix multiplication instead of a power flow:
+
+        delta_vm_pu = results["res_bus"]["vm_pu"]["p_kw"].values.dot(delta_p_kw)
+
+    The injections are considered as constant power injections. Generators keep the voltage
+    magnitude at their buses and the slack is provided by the external grids.
+
+    INPUT:
+        **net** - The pandapower format network with the results of a converged AC power flow
+
+    OPTIONAL:
+        **buses** (list, None) - buses for which the voltage sensitivities are calculated, all
+        buses if None
+
+        **elements** (dict, None) - injections, the keys are element tables with a bus column
+        (e.g. "load", "sgen", "gen", "storage") and the values lists of element indices or None
+        for all elements of the table. If elements is None, the sensitivities to an injection at
+        each bus are calculated.
+
+        **branches** (tuple, ("line", "trafo")) - branch tables for which the current and
+        loading sensitivities are calculated
+
+    OUTPUT:
+        **results** (dict) - contains the dicts "res_bus" (variables vm_pu and va_degree),
+        "res_line" (i_ka and loading_percent) and "res_trafo" (i_hv_ka, i_lv_ka and
+        loading_percent) for the tables in branches. For each variable, there is a dict with the
+        sensitivities to "p_kw" and "q_kvar" as DataFrames with the elements as index and the
+        injections as columns. The injections have the sign convention of loads, i.e. the
+        sensitivities are the change of the result variable for an increase of the load p_kw or
+        q_kvar at the bus (elements None) or of the p_kw or q_kvar of the element by 1 kW or
+        1 kvar. The currents and loadings are those of the more loaded branch end. Results of
+        buses and branches which are out of service are NaN or 0 respectively.
+
+    EXAMPLE:
+        pp.runpp(net)
+
+        results = calc_sensitivities(net, elements={"sgen": None})
+
+        dvm_dp = results["res_bus"]["vm_pu"]["p_kw"]
+    """
+    if not net["converged"] or "_ppc" not in net or not net["_options"]["ac"]:
+        raise UserWarning("calc_sensitivities requires the results of a converged AC power flow")
+    buses = net.bus.index if buses is None else pd.Index(buses)
+    ppc = net["_ppc"]
+    system = _get_operating_point(net, ppc)
+    columns, inj_bus, inj_weight = _get_injections(net, system, elements)
+    lu = splu(_create_jacobian(net, system).tocsc())
+
+    # right hand sides for the active and the reactive power of all injections, an increase of
+    # the load reduces the specified power injection
+    dim = system["dim"]
+    rows_p = system["pos_pvpq"][inj_bus]
+    rows_q = system["pos_pq"][inj_bus]
+    rhs = {}
+    for variable, rows in [("p_kw", rows_p), ("q_kvar", rows_q)]:
+        has_row = rows >= 0
+        cols = np.flatnonzero(has_row)
+        rhs[variable] = csc_matrix((-inj_weight[has_row] / system["baseMVA"],
+                                    (rows[has_row], cols)), shape=(dim, len(inj_bus)))
+
+    branch_tables = [b for b in branches if b in ("line", "trafo") and len(net[b])]
+    bus_idx = net["_pd2ppc_lookups"]["bus"][buses.values]
+    in_ppci = (bus_idx >= 0) & (bus_idx < system["n_bus"])
+    results = {"res_bus": {"vm_pu": {}, "va_degree": {}}}
+    for table in branch_tables:
+        results["res_" + table] = {}
+    for variable in ["p_kw", "q_kvar"]:
+        dva, dvm, dv_all = _solve(lu, rhs[variable], system, bus_idx[in_ppci], not branch_tables)
+        for res_variable, dx in [("vm_pu", dvm), ("va_degree", np.rad2deg(dva))]:
+            sens = np.full((len(buses), len(columns)), np.nan)
+            sens[in_ppci] = dx
+            results["res_bus"][res_variable][variable] = pd.DataFrame(sens, index=buses,
+                                                                      columns=columns)
+        if not branch_tables:
+            continue
+        branch_sens = _branch_sensitivities(net, ppc, system, dv_all[0], dv_all[1],
+                                            branch_tables)
+        for table, table_sens in branch_sens.items():
+            for res_variable, sens in table_sens.items():
+                results["res_" + table].setdefault(res_variable, {})[variable] = \
+                    pd.DataFrame(sens, index=net[table].index, columns=columns)
+    return results
+
+
+def _get_operating_point(net, ppc):
+    """
+    Returns the admittance matrices, the bus types and the voltages of the converged power flow
+    for the in service buses and branches (ppci).
+    """
+    internal = ppc["internal"]
+    n_bus = int(np.sum(ppc["bus"][:, BUS_TYPE] != NONE))
+    bus = ppc["bus"][:n_bus]
+    gen = ppc["gen"][internal["gen_is"]]
+    branch = ppc["branch"][internal["branch_is"]]
+    if "Ybus" in internal and internal["Ybus"].shape[0] == n_bus:
+        Ybus, Yf, Yt = internal["Ybus"], internal["Yf"], internal["Yt"]
+    else:
+        Ybus, Yf, Yt = makeYbus_pypower(ppc["baseMVA"], bus, branch)
+    _, pv, pq = bustypes(bus, gen)
+    pvpq = np.r_[pv, pq]
+    pos_pvpq = np.full(n_bus, -1, dtype=int)
+    pos_pvpq[pvpq] = np.arange(len(pvpq))
+    pos_pq = np.full(n_bus, -1, dtype=int)
+    pos_pq[pq] = np.arange(len(pq)) + len(pvpq)
+    return {"baseMVA": ppc["baseMVA"], "n_bus": n_bus, "Ybus": Ybus.tocsr(), "Yf": Yf.tocsr(),
+            "Yt": Yt.tocsr(), "V": bus[:, VM] * np.exp(1j * np.deg2rad(bus[:, VA])),
+            "pv": pv, "pq": pq, "pvpq": pvpq, "pos_pvpq": pos_pvpq, "pos_pq": pos_pq,
+            "dim": len(pvpq) + len(pq), "base_kv": bus[:, BASE_KV],
+            "f_bus": branch[:, F_BUS].real.astype(int), "t_bus": branch[:, T_BUS].real.astype(int)}
+
+
+def _create_jacobian(net, system):
+    """
+    Builds the Jacobian at the converged voltages. The Jacobian stored by newtonpf belongs to
+    the voltages of the last iteration and does not exist for other power flow algorithms.
+    """
+    numba = net["_options"]["numba"]
+    pvpq, pq = system["pvpq"], system["pq"]
+    Ybus = system["Ybus"]
+    pvpq_lookup = np.zeros(np.max(Ybus.indices) + 1, dtype=int)
+    pvpq_lookup[pvpq] = np.arange(len(pvpq))
+    createJ = get_fastest_jacobian_function(pvpq, pq, numba)
+    return create_jacobian_matrix(Ybus, system["V"], pvpq, pq, createJ, pvpq_lookup,
+                                  len(system["pv"]), len(pq), numba)
+
+
+def _get_injections(net, system, elements):
+    """
+    Returns the column index, the ppci buses and the weights (MW per kW) of the injections.
+    Injections at out of service buses get the weight 0.
+    """
+    bus_lookup = net["_pd2ppc_lookups"]["bus"]
+    if elements is None:
+        columns = net.bus.index
+        bus = bus_lookup[columns.values]
+        weight = np.full(len(bus), 1e-3)
+    else:
+        tuples, bus, weight = [], [], []
+        for element, index in elements.items():
+            df = net[element] if index is None else net[element].loc[index]
+            tuples.extend((element, i) for i in df.index)
+            bus.append(bus_lookup[df["bus"].values])
+            scaling = df["scaling"].values if "scaling" in df else np.ones(len(df))
+            weight.append(df["in_service"].values * scaling * 1e-3)
+        columns = pd.MultiIndex.from_tuples(tuples, names=["element", "index"])
+        bus = np.concatenate(bus).astype(int) if len(bus) else np.array([], dtype=int)
+        weight = np.concatenate(weight).astype(float) if len(weight) else np.array([])
+    oos = (bus < 0) | (bus >= system["n_bus"])
+    bus[oos] = 0
+    weight[oos] = 0.
+    return columns, bus, weight
+
+
+def _solve(lu, rhs, system, bus_idx, only_buses):
+    """
+    Returns the angle and magnitude sensitivities of the buses in bus_idx and of all buses
+    (n_bus x n_injections). If only the buses in bus_idx are needed and there are fewer of them
+    than injections, the transposed system is solved for the selected buses instead and the
+    sensitivities of all buses are None.
+    """
+    n_bus, n_pvpq, dim = system["n_bus"], len(system["pvpq"]), system["dim"]
+    if only_buses and 2 * len(bus_idx) < rhs.shape[1]:
+        rows_va = system["pos_pvpq"][bus_idx]
+        rows_vm = system["pos_pq"][bus_idx]
+        selection = np.zeros((dim, 2 * len(bus_idx)))
+        for k, rows in enumerate([rows_va, rows_vm]):
+            has_row = np.flatnonzero(rows >= 0)
+            selection[rows[has_row], has_row + k * len(bus_idx)] = 1.
+        dx = np.asarray(rhs.T.dot(lu.solve(selection, trans="T"))).T
+        return dx[:len(bus_idx)], dx[len(bus_idx):], None
+    x = lu.solve(rhs.toarray())
+    dva = np.zeros((n_bus, rhs.shape[1]))
+    dvm = np.zeros((n_bus, rhs.shape[1]))
+    dva[system["pvpq"]] = x[:n_pvpq]
+    dvm[system["pq"]] = x[n_pvpq:]
+    return dva[bus_idx], dvm[bus_idx], (dva, dvm)
+
+
+def _branch_sensitivities(net, ppc, system, dva, dvm, tables):
+    """
+    Returns the current and loading sensitivities of the branch tables, based on the first order
+    change of the complex voltages dV = V * (j * dVa + dVm / Vm).
+    """
+    V = system["V"]
+    dV = V[:, np.newaxis] * (1j * dva + dvm / np.abs(V)[:, np.newaxis])
+    baseMVA = system["baseMVA"]
+    ends = {}
+    for end, Y, buses in [("from", system["Yf"], system["f_bus"]),
+                          ("to", system["Yt"], system["t_bus"])]:
+        I = Y * V
+        dI = Y * dV
+        S = V[buses] * np.conj(I)
+        dS = dV[buses] * np.conj(I)[:, np.newaxis] + V[buses][:, np.newaxis] * np.conj(dI)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            di_abs = np.nan_to_num(np.real(np.conj(I)[:, np.newaxis] * dI) /
+                                   np.abs(I)[:, np.newaxis])
+            ds_abs = np.nan_to_num(np.real(np.conj(S)[:, np.newaxis] * dS) /
+                                   np.abs(S)[:, np.newaxis])
+        i_factor = baseMVA / np.sqrt(3) / system["base_kv"][buses]
+        ends[end] = {"i_ka": np.abs(I) * i_factor, "di_ka": di_abs * i_factor[:, np.newaxis],
+                     "s_kva": np.abs(S) * baseMVA * 1e3, "ds_kva": ds_abs * baseMVA * 1e3}
+
+    branch_lookup = _ppc2ppci_index(ppc["internal"]["branch_is"])
+    n_inj = dva.shape[1]
+    results = {}
+    for table in tables:
+        f, t = net["_pd2ppc_lookups"]["branch"][table]
+        ppci_idx = branch_lookup[f:t]
+        is_br = np.flatnonzero(ppci_idx >= 0)
+        br = ppci_idx[is_br]
+        df = net[table]
+        sens = {}
+        if table == "line":
+            value = np.array([ends["from"]["i_ka"][br], ends["to"]["i_ka"][br]])
+            delta = np.array([ends["from"]["di_ka"][br], ends["to"]["di_ka"][br]])
+            rating = (df["max_i_ka"].values * df["df"].values * df["parallel"].values)[is_br]
+            di_ka = _more_loaded_end(value / rating, delta)
+            sens["i_ka"] = _fill(len(df), is_br, di_ka, n_inj)
+            sens["loading_percent"] = _fill(len(df), is_br, di_ka / rating[:, np.newaxis] * 100.,
+                                            n_inj)
+        else:
+            sens["i_hv_ka"] = _fill(len(df), is_br, ends["from"]["di_ka"][br], n_inj)
+            sens["i_lv_ka"] = _fill(len(df), is_br, ends["to"]["di_ka"][br], n_inj)
+            sn_kva = df["sn_kva"].values[is_br]
+            factor = 100. / (df["parallel"].values * df["df"].values)[is_br] / sn_kva
+            if net["_options"]["trafo_loading"] == "current":
+                vn_kv = np.array([df["vn_hv_kv"].values, df["vn_lv_kv"].values])[:, is_br]
+                value = np.array([ends["from"]["i_ka"][br], ends["to"]["i_ka"][br]]) * vn_kv
+                delta = np.array([ends["from"]["di_ka"][br], ends["to"]["di_ka"][br]]) * \
+                        vn_kv[:, :, np.newaxis]
+                factor = factor * 1000. * np.sqrt(3)
+            else:
+                value = np.array([ends["from"]["s_kva"][br], ends["to"]["s_kva"][br]])
+                delta = np.array([ends["from"]["ds_kva"][br], ends["to"]["ds_kva"][br]])
+            sens["loading_percent"] = _fill(len(df), is_br, _more_loaded_end(value, delta) *
+                                            factor[:, np.newaxis], n_inj)
+        results[table] = sens
+    return results
+
+
+def _more_loaded_end(value, delta):
+    # value: (2 x n_branch), delta: (2 x n_branch x n_injections)
+    end = np.argmax(value, axis=0)
+    return delta[end, np.arange(value.shape[1])]
+
+
+def _fill(n, rows, val, n_inj):
+    # out of service branches have no current and therefore no sensitivity
+    sens = np.zeros((n, n_inj))
+    sens[rows] = val
+    return sens
@@ -18,14 +18,14 @@ from pandapower.pd2ppc_zero import _pd2ppc_zero
 from pandapower.powerflow import _add_auxiliary_elements
 from pandapower.results import _copy_results_ppci_to_ppc
 from pandapower.shortcircuit.currents import _calc_ikss, _calc_ikss_1ph, _calc_ip, _calc_ith, _calc_branch_currents
-from pandapower.shortcircuit.impedance import _calc_zbus, _calc_ybus, _calc_rx
+from pandapower.shortcircuit.impedance import _calc_zbus, _calc_ybus, _calc_rx, _get_sc_buses
 from pandapower.shortcircuit.kappa import _add_kappa_to_ppc
 from pandapower.shortcircuit.results import _extract_results
 
 
 def calc_sc(net, fault="3ph", case='max', lv_tol_percent=10, topology="auto", ip=False,
             ith=False, tk_s=1., kappa_method="C", r_fault_ohm=0., x_fault_ohm=0.,
-            branch_results=False):
+            branch_results=False, bus=None):
     """
     Calculates minimal or maximal symmetrical short-circuit currents.
     The calculation is based on the method of the equivalent voltage source
@@ -38,6 +38,9 @@ def calc_sc(net, fault="3ph", case='max', lv_tol_percent=10, topology="auto", ip
     The output is stored in the net.res_bus_sc table as a short_circuit current
     for each bus.
 
+    Ybus is factorized with a sparse LU decomposition and only the required columns of the bus
+    impedance matrix are solved, the dense bus impedance matrix is never built.
+
     INPUT:
         **net** (pandapowerNet) pandapower Network
 
@@ -81,6 +84,8 @@ def calc_sc(net, fault="3ph", case='max', lv_tol_percent=10, topology="auto", ip
 
         **consider_sgens** (bool, True) defines if short-circuit contribution of static generators should be considered or not
 
+        **bus** (list, None) indices of the faulted buses. If None, short-circuits are calculated at all buses. Only the required columns of the bus impedance matrix are calculated, so that a subset of buses is much faster in large networks. Branch results are the extreme values for faults at the given buses.
+
 
     OUTPUT:
 
@@ -117,7 +122,7 @@ def calc_sc(net, fault="3ph", case='max', lv_tol_percent=10, topology="auto", ip
     _add_sc_options(net, fault=fault, case=case, lv_tol_percent=lv_tol_percent, tk_s=tk_s,
                     topology=topology, r_fault_ohm=r_fault_ohm, kappa_method=kappa_method,
                     x_fault_ohm=x_fault_ohm, kappa=kappa, ip=ip, ith=ith,
-                    consider_sgens=False, branch_results=branch_results)
+                    consider_sgens=False, branch_results=branch_results, bus=bus)
     if fault == "3ph":
         _calc_sc(net)
     if fault == "2ph":
@@ -132,6 +137,7 @@ def _calc_sc(net):
     #    t0 = time.perf_counter()
     _add_auxiliary_elements(net)
     ppc, ppci = _pd2ppc(net)
+    ppci["internal"]["sc_bus"] = _get_sc_buses(net, ppci)
 #    t1 = time.perf_counter()
     _calc_ybus(ppci)
 #    t2 = time.perf_counter()
@@ -166,6 +172,7 @@ def _calc_sc_1ph(net):
     _add_auxiliary_elements(net)
 # pos. seq bus impedance
     ppc, ppci = _pd2ppc(net)
+    ppci["internal"]["sc_bus"] = _get_sc_buses(net, ppci)
     _calc_ybus(ppci)
     try:
         _calc_zbus(ppci)
@@ -176,6 +183,7 @@ def _calc_sc_1ph(net):
     _add_kappa_to_ppc(net, ppci)
 # zero seq bus impedance
     ppc_0, ppci_0 = _pd2ppc_zero(net)
+    ppci_0["internal"]["sc_bus"] = _get_sc_buses(net, ppci_0)
     _calc_ybus(ppci_0)
     try:
         _calc_zbus(ppci_0)
@@ -4,6 +4,8 @@
 # and Energy System Technology (IEE), Kassel. All rights reserved.
 
 
+import warnings
+
 import numpy as np
 from pandapower.idx_bus import BASE_KV
 import pandas as pd
@@ -11,6 +13,7 @@ import pandas as pd
 from pandapower.shortcircuit.idx_brch import IKSS_F, IKSS_T, IP_F, IP_T, ITH_F, ITH_T
 from pandapower.shortcircuit.idx_bus import C_MIN, C_MAX, KAPPA, R_EQUIV, IKSS1, IP, ITH, X_EQUIV, IKSS2, IKCV, M
 from pandapower.auxiliary import _sum_by_group
+from pandapower.shortcircuit.impedance import _calc_zbus_columns, _solve_zbus, _zbus_blocks
 
 
 def _calc_ikss(net, ppc):
@@ -62,12 +65,14 @@ def _current_source_current(net, ppc):
     baseI = ppc["internal"]["baseI"]
     sgen_buses = sgen.bus.values
     sgen_buses_ppc = bus_lookup[sgen_buses]
-    Zbus = ppc["internal"]["Zbus"]
+    sc_bus = ppc["internal"]["sc_bus"]
     i_sgen_pu = sgen.sn_kva.values / net.sn_kva * sgen.k.values
     buses, ikcv_pu, _ = _sum_by_group(sgen_buses_ppc, i_sgen_pu, i_sgen_pu)
     ppc["bus"][buses, IKCV] = ikcv_pu
-    ppc["bus"][:, IKSS2] = abs(
-        1 / np.diag(Zbus) * np.dot(Zbus, ppc["bus"][:, IKCV] * -1j) / baseI)
+    i_source = ppc["bus"][:, IKCV] * -1j
+    v_source = _solve_zbus(ppc, i_source) + ppc["internal"]["z_fault"] * i_source
+    z_equiv = ppc["bus"][sc_bus, R_EQUIV] + ppc["bus"][sc_bus, X_EQUIV] * 1j
+    ppc["bus"][sc_bus, IKSS2] = abs(1 / z_equiv * v_source[sc_bus] / baseI[sc_bus])
     ppc["bus"][buses, IKCV] /= baseI[buses]
 
 
@@ -92,56 +97,80 @@ def _calc_ith(net, ppc):
 
 def _calc_branch_currents(net, ppc):
     case = net._options["case"]
-    Zbus = ppc["internal"]["Zbus"]
     Yf = ppc["internal"]["Yf"]
     Yt = ppc["internal"]["Yf"]
     baseI = ppc["internal"]["baseI"]
-    n = ppc["bus"].shape[0]
+    sc_bus = ppc["internal"]["sc_bus"]
     fb = np.real(ppc["branch"][:, 0]).astype(int)
     tb = np.real(ppc["branch"][:, 1]).astype(int)
-    minmax = np.nanmin if case == "min" else np.nanmax
-    # calculate voltage source branch current
-    V_ikss = (ppc["bus"][:, IKSS1] * baseI) * Zbus
-    ikss1_all_f = np.conj(Yf.dot(V_ikss))
-    ikss1_all_t = np.conj(Yt.dot(V_ikss))
-    ikss1_all_f[abs(ikss1_all_f) < 1e-10] = np.nan
-    ikss1_all_t[abs(ikss1_all_t) < 1e-10] = np.nan
-
-    # add current source branch current if there is one
+    # the extreme values over all faulted buses are accumulated block by block
+    minmax = np.fmin if case == "min" else np.fmax
+    n_br = ppc["branch"].shape[0]
+    ikss_f, ikss_t = np.full(n_br, np.nan), np.full(n_br, np.nan)
+    ip_f, ip_t = np.full(n_br, np.nan), np.full(n_br, np.nan)
+    ith_f, ith_t = np.full(n_br, np.nan), np.full(n_br, np.nan)
+
     current_sources = any(ppc["bus"][:, IKCV]) > 0
     if current_sources:
-        current = np.tile(-ppc["bus"][:, IKCV], (n, 1))
-        np.fill_diagonal(current, current.diagonal() + ppc["bus"][:, IKSS2])
-        V = np.dot((current * baseI), Zbus).T
-        fb = np.real(ppc["branch"][:, 0]).astype(int)
-        tb = np.real(ppc["branch"][:, 1]).astype(int)
-        ikss2_all_f = np.conj(Yf.dot(V))
-        ikss2_all_t = np.conj(Yt.dot(V))
-        ikss_all_f = abs(ikss1_all_f + ikss2_all_f)
-        ikss_all_t = abs(ikss1_all_t + ikss2_all_t)
-    else:
-        ikss_all_f = abs(ikss1_all_f)
-        ikss_all_t = abs(ikss1_all_t)
-
-    ppc["branch"][:, IKSS_F] = minmax(ikss_all_f, axis=1) / baseI[fb]
-    ppc["branch"][:, IKSS_T] = minmax(ikss_all_t, axis=1) / baseI[tb]
-
-    if net._options["ip"]:
-        kappa = ppc["bus"][:, KAPPA]
+        # bus voltages caused by the current sources
+        i_source = ppc["bus"][:, IKCV] * baseI
+        v_source = _solve_zbus(ppc, i_source, transpose=True) + \
+                   ppc["internal"]["z_fault"] * i_source
+
+    for buses in _zbus_blocks(ppc, sc_bus):
+        # calculate voltage source branch current
+        V_ikss = (ppc["bus"][buses, IKSS1] * baseI[buses]) * _calc_zbus_columns(ppc, buses)
+        ikss1_all_f = np.conj(Yf.dot(V_ikss))
+        ikss1_all_t = np.conj(Yt.dot(V_ikss))
+        ikss1_all_f[abs(ikss1_all_f) < 1e-10] = np.nan
+        ikss1_all_t[abs(ikss1_all_t) < 1e-10] = np.nan
+
+        # add current source branch current if there is one
         if current_sources:
-            ip_all_f = np.sqrt(2) * (ikss1_all_f * kappa + ikss2_all_f)
-            ip_all_t = np.sqrt(2) * (ikss1_all_t * kappa + ikss2_all_t)
+            V = ppc["bus"][buses, IKSS2] * baseI[buses] * \
+                _calc_zbus_columns(ppc, buses, transpose=True) - v_source[:, np.newaxis]
+            ikss2_all_f = np.conj(Yf.dot(V))
+            ikss2_all_t = np.conj(Yt.dot(V))
+            ikss_all_f = abs(ikss1_all_f + ikss2_all_f)
+            ikss_all_t = abs(ikss1_all_t + ikss2_all_t)
         else:
-            ip_all_f = np.sqrt(2) * ikss1_all_f * kappa
-            ip_all_t = np.sqrt(2) * ikss1_all_t * kappa
+            ikss_all_f = abs(ikss1_all_f)
+            ikss_all_t = abs(ikss1_all_t)
+
+        ikss_f = minmax(ikss_f, _nan_minmax(case, ikss_all_f))
+        ikss_t = minmax(ikss_t, _nan_minmax(case, ikss_all_t))
+
+        if net._options["ip"]:
+            kappa = ppc["bus"][buses, KAPPA]
+            if current_sources:
+                ip_all_f = np.sqrt(2) * (ikss1_all_f * kappa + ikss2_all_f)
+                ip_all_t = np.sqrt(2) * (ikss1_all_t * kappa + ikss2_all_t)
+            else:
+                ip_all_f = np.sqrt(2) * ikss1_all_f * kappa
+                ip_all_t = np.sqrt(2) * ikss1_all_t * kappa
+            ip_f = minmax(ip_f, _nan_minmax(case, abs(ip_all_f)))
+            ip_t = minmax(ip_t, _nan_minmax(case, abs(ip_all_t)))
+
+        if net._options["ith"]:
+            n = 1
+            m = ppc["bus"][buses, M]
+            ith_f = minmax(ith_f, _nan_minmax(case, ikss_all_f * np.sqrt(m + n)))
+            ith_t = minmax(ith_t, _nan_minmax(case, ikss_all_t * np.sqrt(m + n)))
+
+    ppc["branch"][:, IKSS_F] = ikss_f / baseI[fb]
+    ppc["branch"][:, IKSS_T] = ikss_t / baseI[tb]
+    if net._options["ip"]:
+        ppc["branch"][:, IP_F] = ip_f / baseI[fb]
+        ppc["branch"][:, IP_T] = ip_t / baseI[tb]
+    if net._options["ith"]:
+        ppc["branch"][:, ITH_F] = ith_f / baseI[fb]
+        ppc["branch"][:, ITH_T] = ith_t / baseI[fb]
 
-        ppc["branch"][:, IP_F] = minmax(abs(ip_all_f), axis=1) / baseI[fb]
-        ppc["branch"][:, IP_T] = minmax(abs(ip_all_t), axis=1) / baseI[tb]
 
-    if net._options["ith"]:
-        n = 1
-        m = ppc["bus"][:, M]
-        ith_all_f = ikss_all_f * np.sqrt(m + n)
-        ith_all_t = ikss_all_t * np.sqrt(m + n)
-        ppc["branch"][:, ITH_F] = minmax(ith_all_f, axis=1) / baseI[fb]
-        ppc["branch"][:, ITH_T] = minmax(ith_all_t, axis=1) / baseI[fb]
+def _nan_minmax(case, a):
+    """
+    Minimum or maximum of each row of a, ignoring NaN values. Rows with only NaN values are NaN.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return np.nanmin(a, axis=1) if case == "min" else np.nanmax(a, axis=1)
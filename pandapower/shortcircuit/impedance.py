@@ -4,11 +4,8 @@
 # and Energy System Technology (IEE), Kassel. All rights reserved.
 
 
-import warnings
-
 import numpy as np
-from scipy.sparse.linalg import inv as inv_sparse
-from scipy.linalg import inv
+from scipy.sparse.linalg import splu
 
 
 from pandapower.shortcircuit.idx_bus import R_EQUIV, X_EQUIV
@@ -18,16 +15,22 @@ try:
 except ImportError:
     from pandapower.pf.makeYbus_pypower import makeYbus
 
+# maximum number of entries of the dense blocks of Zbus columns that are solved at once
+ZBUS_BLOCK_ENTRIES = 2000000
+
 
 def _calc_rx(net, ppc):
-    Zbus = ppc["internal"]["Zbus"]
+    sc_bus = ppc["internal"]["sc_bus"]
     r_fault = net["_options"]["r_fault_ohm"]
     x_fault = net["_options"]["x_fault_ohm"]
+    z_fault = np.zeros(ppc["bus"].shape[0], dtype=np.complex128)
     if r_fault > 0 or x_fault > 0:
         base_r = np.square(ppc["bus"][:, BASE_KV]) / ppc["baseMVA"]
-        fault_impedance = (r_fault + x_fault * 1j) / base_r
-        np.fill_diagonal(Zbus, Zbus.diagonal() + fault_impedance)
-    z_equiv = np.diag(Zbus)
+        z_fault += (r_fault + x_fault * 1j) / base_r
+    ppc["internal"]["z_fault"] = z_fault
+    z_equiv = np.full(ppc["bus"].shape[0], np.nan, dtype=np.complex128)
+    for buses in _zbus_blocks(ppc, sc_bus):
+        z_equiv[buses] = _calc_zbus_columns(ppc, buses)[buses, np.arange(len(buses))]
     ppc["bus"][:, R_EQUIV] = z_equiv.real
     ppc["bus"][:, X_EQUIV] = z_equiv.imag
 
@@ -38,11 +41,59 @@ def _calc_ybus(ppc):
     ppc["internal"]["Ybus"] = Ybus
 
 def _calc_zbus(ppc):
+    """
+    Factorizes Ybus with a sparse LU decomposition. The bus impedance matrix Zbus = inv(Ybus)
+    is never built, the required columns are solved with the factorization instead.
+    """
     Ybus = ppc["internal"]["Ybus"]
-    sparsity = Ybus.nnz / Ybus.shape[0]**2
-    if sparsity < 0.002:
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            ppc["internal"]["Zbus"] = inv_sparse(Ybus).toarray()
-    else:
-        ppc["internal"]["Zbus"] = inv(Ybus.toarray())
+    ppc["internal"]["ybus_fact"] = splu(Ybus.tocsc())
+
+
+def _get_sc_buses(net, ppc):
+    """
+    Returns the ppc indices of the faulted buses, which are all buses if no buses are specified
+    in calc_sc. Buses which are in service but not supplied are skipped.
+    """
+    n_bus = ppc["bus"].shape[0]
+    bus = net["_options"]["sc_bus"]
+    if bus is None:
+        return np.arange(n_bus)
+    bus = np.atleast_1d(bus)
+    unknown = bus[~np.isin(bus, net.bus.index.values)]
+    if len(unknown):
+        raise UserWarning("buses %s are not in net.bus" % list(unknown))
+    out_of_service = bus[~net.bus.in_service.loc[bus].values.astype(bool)]
+    if len(out_of_service):
+        raise UserWarning("buses %s are out of service" % list(out_of_service))
+    ppc_bus = net["_pd2ppc_lookups"]["bus"][bus]
+    return np.unique(ppc_bus[ppc_bus < n_bus])
+
+
+def _zbus_blocks(ppc, buses):
+    """
+    Splits the buses into blocks so that the dense Zbus columns of a block stay below
+    ZBUS_BLOCK_ENTRIES entries.
+    """
+    n_bus = ppc["bus"].shape[0]
+    block_size = max(1, int(ZBUS_BLOCK_ENTRIES // max(n_bus, 1)))
+    for start in range(0, len(buses), block_size):
+        yield buses[start: start + block_size]
+
+
+def _calc_zbus_columns(ppc, buses, transpose=False):
+    """
+    Returns the columns of Zbus (or of Zbus.T) for the given buses, including the fault
+    impedance on the diagonal.
+    """
+    rhs = np.zeros((ppc["bus"].shape[0], len(buses)), dtype=np.complex128)
+    rhs[buses, np.arange(len(buses))] = 1.
+    Z = _solve_zbus(ppc, rhs, transpose)
+    Z[buses, np.arange(len(buses))] += ppc["internal"]["z_fault"][buses]
+    return Z
+
+
+def _solve_zbus(ppc, rhs, transpose=False):
+    """
+    Returns Zbus * rhs (or Zbus.T * rhs) without the fault impedance.
+    """
+    return ppc["internal"]["ybus_fact"].solve(rhs, trans="T" if transpose else "N")
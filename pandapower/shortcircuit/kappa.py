@@ -1,11 +1,9 @@
 # -*- coding: utf-8 -*-
 
-# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
-# and Energy System Technology (IEE), Kassel. All rights reserved.
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
 
 
-import copy
-import networkx as nx
 import numpy as np
 
 from pandapower.idx_brch import F_BUS, T_BUS, BR_R, BR_X
@@ -36,7 +34,8 @@ def _kappa_method_c(net, ppc):
         fc = 24
     else:
         raise ValueError("Frequency has to be 50 Hz or 60 Hz according to the standard")
-    ppc_c = copy.deepcopy(ppc)
+    ppc_c = {"baseMVA": ppc["baseMVA"], "bus": ppc["bus"].copy(), "branch": ppc["branch"].copy(),
+             "internal": {"sc_bus": ppc["internal"]["sc_bus"]}}
     ppc_c["branch"][:, BR_X] *= fc / net.f_hz
 
     zero_conductance = np.where(ppc["bus"][:,GS] == 0)
@@ -68,6 +67,7 @@ def _kappa_method_b(net, ppc):
     else:
         kappa_korr = np.full(ppc["bus"].shape[0], 1.)
     if topology == "auto":
+        import networkx as nx
         kappa_korr = np.full(ppc["bus"].shape[0], 1.)
         mg = nxgraph_from_ppc(net, ppc)
         for bidx in ppc["bus"][:, BUS_I].astype(int):
@@ -84,6 +84,7 @@ def _kappa_method_b(net, ppc):
     return np.clip(kappa_korr * _kappa(rx_equiv), 1, kappa_max)
 
 def nxgraph_from_ppc(net, ppc):
+    import networkx as nx
     bus_lookup = net._pd2ppc_lookups["bus"]
     mg = nx.MultiGraph()
     mg.add_nodes_from(ppc["bus"][:, BUS_I].astype(int))
@@ -21,7 +21,8 @@ def _extract_results(net, ppc, ppc_0):
 
 
 def _initialize_result_tables(net):
-    net.res_bus_sc = pd.DataFrame(index=net.bus.index)
+    sc_bus = net["_options"]["sc_bus"]
+    net.res_bus_sc = pd.DataFrame(index=net.bus.index if sc_bus is None else sc_bus)
     net.res_line_sc = pd.DataFrame(index=net.line.index)
     net.res_trafo_sc = pd.DataFrame(index=net.trafo.index)
     net.res_trafo3w_sc = pd.DataFrame(index=net.trafo3w.index)
@@ -29,7 +30,7 @@ def _initialize_result_tables(net):
 
 def _get_bus_results(net, ppc, ppc_0):
     bus_lookup = net._pd2ppc_lookups["bus"]
-    ppc_index = bus_lookup[net.bus.index]
+    ppc_index = bus_lookup[net.res_bus_sc.index.values]
     if net["_options"]["fault"] == "1ph":
         net.res_bus_sc["ikss_ka"] = ppc_0["bus"][ppc_index,
                                                  IKSS1] + ppc["bus"][ppc_index, IKSS2]
@@ -5,6 +5,8 @@
 
 
 import numpy as np
+import pandas as pd
+import pandas.util.testing as pdt
 import pandapower as pp
 import pytest
 
@@ -157,5 +159,72 @@ def test_create_buses():
         pp.create_buses(net, 2, 110, geodata=geodata)
 
 
+def test_create_lines():
+    net = pp.create_empty_network()
+    b = pp.create_buses(net, 4, 20)
+    std_types = ["NA2XS2Y 1x95 RM/25 12/20 kV", "48-AL1/8-ST1A 20.0", "NA2XS2Y 1x95 RM/25 12/20 kV"]
+    geodata = [[(0, 0), (1, 1)], [(1, 1), (2, 2), (3, 3)], [(3, 3), (4, 4)]]
+    l = pp.create_lines(net, b[:3], b[1:], [1., 2., 3.], std_types, name=["a", "b", "c"],
+                        geodata=geodata, max_loading_percent=[np.nan, 50., np.nan])
+    for i, std_type in zip(l, std_types):
+        assert net.line.std_type.at[i] == std_type
+        for param in ["r_ohm_per_km", "x_ohm_per_km", "c_nf_per_km", "max_i_ka", "type"]:
+            assert net.line.at[i, param] == net.std_types["line"][std_type][param]
+    assert net.line.length_km.tolist() == [1., 2., 3.]
+    assert net.line.max_loading_percent.at[l[1]] == 50.
+    assert net.line_geodata.coords.at[l[1]] == geodata[1]
+    assert net.line.from_bus.dtype == np.uint32 and net.line.in_service.dtype == bool
+
+    l2 = pp.create_lines_from_parameters(net, b[:2], b[1:3], 1., 0.1, 0.2, 10., 0.4, df=0.8)
+    assert (net.line.r_ohm_per_km.loc[l2] == 0.1).all()
+    assert (net.line.df.loc[l2] == 0.8).all()
+    assert pd.isnull(net.line.max_loading_percent.loc[l2]).all()
+
+    with pytest.raises(UserWarning):
+        pp.create_lines(net, [0], [1], 1., "unknown type")
+    with pytest.raises(UserWarning):
+        pp.create_lines(net, [0, 10], [1, 2], 1., "48-AL1/8-ST1A 20.0")
+    with pytest.raises(UserWarning):
+        pp.create_lines(net, [0], [1], 1., "48-AL1/8-ST1A 20.0", index=l[:1])
+
+
+def test_create_bulk_elements_equal_single_elements():
+    def create_net():
+        net = pp.create_empty_network()
+        pp.create_bus(net, 110)
+        pp.create_buses(net, 3, 20)
+        pp.create_ext_grid(net, 0)
+        return net
+
+    net = create_net()
+    pp.create_transformers(net, [0, 0], [1, 2], "25 MVA 110/20 kV", tp_pos=[np.nan, 2])
+    pp.create_transformers_from_parameters(net, [0], [3], 25e3, 110, 20, 0.4, 12, 14, 0.07,
+                                           tp_mid=0, tp_max=9, tp_min=-9, tp_st_percent=1.5,
+                                           tp_side="hv")
+    pp.create_loads(net, [1, 2, 3], [100, 200, 300], q_kvar=[10, 20, 30], name="load")
+    pp.create_sgens(net, [2, 3], -100., k=1.2)
+    pp.create_switches(net, [0, 1, 3], [0, 0, 2], "t", closed=[True, False, True])
+
+    net1 = create_net()
+    pp.create_transformer(net1, 0, 1, "25 MVA 110/20 kV")
+    pp.create_transformer(net1, 0, 2, "25 MVA 110/20 kV", tp_pos=2)
+    pp.create_transformer_from_parameters(net1, 0, 3, 25e3, 110, 20, 0.4, 12, 14, 0.07, tp_mid=0,
+                                          tp_max=9, tp_min=-9, tp_st_percent=1.5, tp_side="hv")
+    for bus, p_kw, q_kvar in zip([1, 2, 3], [100, 200, 300], [10, 20, 30]):
+        pp.create_load(net1, bus, p_kw, q_kvar=q_kvar, name="load")
+    for bus in [2, 3]:
+        pp.create_sgen(net1, bus, -100., k=1.2)
+    for bus, element, closed in zip([0, 1, 3], [0, 0, 2], [True, False, True]):
+        pp.create_switch(net1, bus, element, "t", closed=closed)
+
+    for element in ["trafo", "load", "sgen", "switch"]:
+        pdt.assert_frame_equal(net[element], net1[element])
+
+    with pytest.raises(UserWarning):
+        pp.create_switches(net, [1], [1], "t")  # trafo 1 is not connected to bus 1
+    with pytest.raises(UserWarning):
+        pp.create_loads(net, [1, 5], 100.)
+
+
 if __name__ == '__main__':
     pytest.main(["test_create.py"])
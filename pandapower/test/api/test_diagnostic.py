@@ -1097,5 +1097,34 @@ def test_runpp_errors(test_net, diag_params, diag_errors, report_methods):
     net.load.p_kw *= 100
     diag = pp.diagnostic(net)
 
+
+def test_diagnostic_context(test_net):
+    net = copy.deepcopy(test_net)
+    net.load.p_kw *= 100
+    diag_results = pp.diagnostic(net, report_style=None)
+    assert diag_results == pp.diagnostic(copy.deepcopy(net), report_style=None, n_workers=1)
+
+    context = pp.DiagnosticContext(net)
+    assert not context.power_flow_converges(catch=pp.LoadflowNotConverged)
+    assert pp.overload(net, 0.001, context) == diag_results["overload"]
+    assert pp.wrong_switch_configuration(net, context) == \
+        diag_results["wrong_switch_configuration"]
+
+
+def test_diagnostic_fast(test_net):
+    net = copy.deepcopy(test_net)
+    net.load.p_kw *= 100
+    net.line.from_bus.iloc[0] = 10000
+    # the power flow checks are skipped if the other checks found issues
+    diag_results = pp.diagnostic(net, report_style=None, fast=True)
+    assert "missing_bus_indices" in diag_results
+    assert "overload" not in diag_results
+
+    net.line.from_bus.iloc[0] = test_net.line.from_bus.iloc[0]
+    diag_results = pp.diagnostic(net, report_style=None, fast=True)
+    assert "missing_bus_indices" not in diag_results
+    assert diag_results["overload"] == {'generation': False, 'load': True}
+
+
 if __name__ == "__main__":
     pytest.main(["test_diagnostic.py", "-xs"])
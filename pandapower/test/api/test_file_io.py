@@ -13,7 +13,7 @@ import pandapower as pp
 from pandapower.test.toolbox import assert_net_equal, create_test_network, tempdir, net_in
 from pandapower.io_utils import collect_all_dtypes_df, restore_all_dtypes
 import pandapower.networks as nw
-from pandapower.io_utils import PPJSONEncoder, PPJSONDecoder
+from pandapower.io_utils import PPJSONEncoder, PPJSONDecoder, LazyTable
 import json
 import numpy as np
 
@@ -86,6 +86,55 @@ def test_sqlite(net_in, tempdir):
     assert_net_equal(net_in, net_out)
 
 
+@pytest.mark.parametrize("extension", ["", ".zip"])
+def test_npy(net_in, tempdir, extension):
+    filename = os.path.join(tempdir, "testfile" + extension)
+    pp.runpp(net_in)
+    pp.to_npy(net_in, filename)
+    net_out = pp.from_npy(filename)
+    # tables are only loaded when they are accessed
+    assert isinstance(net_out._deferred["bus"], LazyTable)
+    assert not dict.__contains__(net_out, "bus") and "bus" in net_out
+    assert_net_equal(net_in, net_out)
+    assert "bus" not in net_out._deferred
+    assert net_out.std_types == net_in.std_types
+    assert net_out.line_geodata.coords.tolist() == net_in.line_geodata.coords.tolist()
+
+    net_out = pp.from_npy(filename, lazy=False, mmap=False)
+    assert not net_out._deferred
+    assert_net_equal(net_in, net_out)
+
+
+def test_npy_without_results(tempdir):
+    filename = os.path.join(tempdir, "testfile.zip")
+    net_in = create_test_network()
+    pp.runpp(net_in)
+    pp.to_npy(net_in, filename, include_results=False)
+    net_out = pp.from_npy(filename)
+    assert len(net_out.res_bus) == 0
+    pp.runpp(net_out)
+    assert_net_equal(net_in, net_out)
+
+
+def test_npy_object_columns(tempdir):
+    filename = os.path.join(tempdir, "testfile")
+    net_in = create_test_network()
+    net_in.bus["name"] = ["bus %u" % i if i % 3 else None for i in range(len(net_in.bus))]
+    net_in.bus.name.iat[1] = np.nan
+    pp.create_polynomial_cost(net_in, 0, "ext_grid", np.array([0.1, 1., 0.]))
+    pp.to_npy(net_in, filename)
+    # no block contains pickled objects
+    for folder, _, files in os.walk(filename):
+        for f in files:
+            if f.endswith(".npy"):
+                assert np.load(os.path.join(folder, f), allow_pickle=False).dtype != object
+    net_out = pp.from_npy(filename, lazy=False)
+    assert net_out.bus.name.iat[0] is None and net_out.bus.name.iat[2] == "bus 2"
+    assert np.isnan(net_out.bus.name.iat[1])
+    assert np.array_equal(net_out.polynomial_cost.c.iat[0], net_in.polynomial_cost.c.iat[0])
+    assert_net_equal(net_in, net_out)
+
+
 def test_convert_format():  # TODO what is this thing testing ?
     folder = os.path.abspath(os.path.dirname(pp.__file__))
     net = pp.from_pickle(os.path.join(folder, "test", "api", "old_net.p"))
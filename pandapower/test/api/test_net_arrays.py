@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import numpy as np
+import pytest
+
+import pandapower as pp
+import pandapower.networks as nw
+from pandapower.net_arrays import NetArrays
+
+
+def test_element_arrays():
+    net = nw.example_multivoltage()
+    arrays = NetArrays(net)
+    line = arrays["line"]
+    assert line.element == "line"
+    assert len(line) == len(net.line)
+    assert "r_ohm_per_km" in line
+    assert "foo" not in line
+    r = line["r_ohm_per_km"]
+    assert np.array_equal(r, net.line.r_ohm_per_km.values)
+    assert r.flags["C_CONTIGUOUS"]
+    # the arrays are cached until they are invalidated
+    assert line["r_ohm_per_km"] is r
+    assert arrays["line"] is line
+
+    net.line.r_ohm_per_km *= 2
+    assert np.array_equal(line["r_ohm_per_km"], r)
+    arrays.invalidate("line", "r_ohm_per_km")
+    assert np.array_equal(line["r_ohm_per_km"], net.line.r_ohm_per_km.values)
+    arrays.invalidate("line")
+    assert arrays["line"] is not line
+
+
+def test_element_arrays_positions():
+    net = nw.example_simple()
+    pp.drop_buses(net, [3])
+    bus = NetArrays(net)["bus"]
+    idx = net.bus.index.values[::-1]
+    assert np.array_equal(bus["vn_kv"][bus.positions(idx)], net.bus.vn_kv.loc[idx].values)
+
+
+def test_pd2ppc_uses_current_values():
+    net = nw.example_multivoltage()
+    pp.runpp(net)
+    vm_pu = net.res_bus.vm_pu.values.copy()
+    # a new snapshot is created for each conversion
+    net.line.length_km *= 2
+    pp.runpp(net)
+    assert not np.allclose(vm_pu, net.res_bus.vm_pu.values)
+    net.line.length_km /= 2
+    pp.runpp(net)
+    assert np.allclose(vm_pu, net.res_bus.vm_pu.values)
+
+
+def test_arrays_not_stored_with_net():
+    net = nw.example_simple()
+    pp.runpp(net)
+    assert "_arrays" not in net
+    pp.runpp(net, recycle=dict(_is_elements=True, ppc=True, Ybus=True, bfsw=False))
+    pp.runpp(net, recycle=dict(_is_elements=True, ppc=True, Ybus=True, bfsw=False))
+    assert "_arrays" not in net
+    # the snapshot is also removed if the conversion fails
+    net.bus.vn_kv = np.nan
+    net.line.from_bus.iat[0] = 100
+    with pytest.raises(Exception):
+        pp.runpp(net)
+    assert "_arrays" not in net
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, "-xs"])
@@ -231,6 +231,64 @@ def test_merge_and_split_nets():
     assert np.allclose(net4.res_bus.vm_pu.values, net2.res_bus.vm_pu.values)
 
 
+def test_split_by_feeder():
+    net = nw.mv_oberrhein()
+    pp.runpp(net)
+    feeder_buses = set(net.trafo.lv_bus) | set(net.ext_grid.bus)
+    subnets = pp.split_by_feeder(net, include_results=True)
+    assert len(subnets) > 1
+    feeder_of_bus = {}
+    for subnet in subnets:
+        for b in set(subnet.bus.index) - feeder_buses:
+            # every other bus belongs to exactly one feeder
+            assert b not in feeder_of_bus
+            feeder_of_bus[b] = subnet
+        ref = pp.select_subnet(net, subnet.bus.index, include_results=True)
+        for table in ["bus", "line", "trafo", "load", "sgen", "switch", "bus_geodata",
+                      "line_geodata", "res_bus", "res_line"]:
+            assert pp.dataframes_equal(subnet[table], ref[table])
+    assert set(feeder_of_bus) == set(net.bus.index[net.bus.in_service]) - feeder_buses
+
+    # feeders are only connected via open switches or feeder buses
+    for line in net.line.index[net.line.in_service]:
+        fb, tb = net.line.from_bus.at[line], net.line.to_bus.at[line]
+        if fb in feeder_buses or tb in feeder_buses:
+            continue
+        if feeder_of_bus[fb] is not feeder_of_bus[tb]:
+            assert not net.switch.closed[(net.switch.et == "l") &
+                                         (net.switch.element == line)].all()
+
+
+def test_select_subnet_switches():
+    net = pp.create_empty_network()
+    b0, b1, b2, b3 = [pp.create_bus(net, vn_kv=20.) for _ in range(4)]
+    l0 = pp.create_line(net, b0, b1, 1., "NA2XS2Y 1x240 RM/25 12/20 kV")
+    l1 = pp.create_line(net, b1, b2, 1., "NA2XS2Y 1x240 RM/25 12/20 kV")
+    pp.create_switch(net, b0, l0, et="l")
+    pp.create_switch(net, b2, l1, et="l", closed=False)
+    pp.create_switch(net, b2, b3, et="b")
+    pp.create_load(net, b3, p_kw=10.)
+
+    subnet = pp.select_subnet(net, [b1, b2])
+    assert list(subnet.line.index) == [l1]
+    assert list(subnet.switch.index) == [1]
+    # the switch bus of a line with a selected bus is added
+    subnet = pp.select_subnet(net, [b1, b2], include_switch_buses=True)
+    assert list(subnet.bus.index) == [b0, b1, b2]
+    assert list(subnet.line.index) == [l0, l1]
+    assert list(subnet.switch.index) == [0, 1]
+
+    subnet = pp.select_subnet(net, {b2, b3})
+    assert len(subnet.line) == 0
+    assert list(subnet.switch.index) == [2]
+    assert len(subnet.load) == 1
+
+    net["custom"] = {"a": 1}
+    subnet = pp.select_subnet(net, [b0, b1], keep_everything_else=True)
+    assert subnet.custom == {"a": 1} and subnet.custom is not net.custom
+    assert list(subnet.line.index) == [l0]
+
+
 def test_overloaded_lines():
     net = pp.create_empty_network()
 
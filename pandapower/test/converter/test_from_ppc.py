@@ -7,6 +7,7 @@
 import os
 import pickle
 
+import numpy as np
 import pytest
 
 import pandapower as pp
@@ -86,6 +87,32 @@ def test_pypower_cases():
     logger.debug('case9 has been checked successfully.')
 
 
+def test_validate_from_ppc_detects_differences():
+    ppc = get_testgrids('case30', 'pypower_cases.p')
+    net = from_ppc(ppc, f_hz=60)
+    assert validate_from_ppc(ppc, net, max_diff_values=max_diff_values1)
+    net.line.x_ohm_per_km.at[3] *= 2
+    assert not validate_from_ppc(ppc, net, max_diff_values=max_diff_values1)
+
+
+def test_from_ppc_costs():
+    ppc = get_testgrids('case30', 'pypower_cases.p')
+    n_gen = ppc["gen"].shape[0]
+    # active and reactive power costs
+    ppc["gencost"] = np.concatenate([ppc["gencost"], ppc["gencost"]])
+    ppc["gencost"][n_gen:, 4] = 0.1
+    net = from_ppc(ppc, f_hz=60)
+    assert len(net.polynomial_cost) == 2 * n_gen
+    assert list(net.polynomial_cost.type) == ["p"] * n_gen + ["q"] * n_gen
+    p_cost = net.polynomial_cost.iloc[:n_gen]
+    q_cost = net.polynomial_cost.iloc[n_gen:]
+    assert np.array_equal(p_cost.element.values, q_cost.element.values)
+    assert np.array_equal(p_cost.element_type.values, q_cost.element_type.values)
+    for i, c in enumerate(p_cost.c.values):
+        assert np.allclose(c, -ppc["gencost"][i, 4:] / np.array([1e6, 1e3, 1]))
+    assert np.allclose(np.concatenate(q_cost.c.values)[:, 0], -0.1 / 1e6)
+
+
 def test_case9_conversion():
     net = pn.case9()
     # set max_loading_percent to enable line limit conversion
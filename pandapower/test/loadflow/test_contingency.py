@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import copy
+
+import numpy as np
+import pytest
+
+import pandapower as pp
+import pandapower.networks as pn
+from pandapower.contingency import run_contingency
+from pandapower.idx_brch import PF
+from pandapower.pf.bustypes import bustypes
+from pandapower.pf.makePTDF import makePTDF, makeLODF
+from pandapower.powerflow import _init_ppci
+
+
+def _runpp_outage(net, element, idx):
+    net = copy.deepcopy(net)
+    net[element].in_service.at[idx] = False
+    pp.runpp(net)
+    return net
+
+
+def test_ptdf_lodf():
+    net = pn.case9()
+    pp.rundcpp(net)
+    pf_base = net._ppc["branch"][:, PF].real.copy()
+    ppc, ppci = _init_ppci(net)
+    ref, _, _ = bustypes(ppci["bus"], ppci["gen"])
+    PTDF = makePTDF(ppci["bus"], ppci["branch"], ref)
+    LODF = makeLODF(ppci["branch"], PTDF)
+
+    # lines 0, 3 and 6 connect the generators and are bridges
+    for k in [1, 2, 4]:
+        net_out = copy.deepcopy(net)
+        net_out.line.in_service.at[k] = False
+        pp.rundcpp(net_out)
+        pf_out = net_out._ppc["branch"][:, PF].real
+        expected = pf_base + LODF[:, k] * pf_base[k]
+        assert np.allclose(np.delete(expected, k), np.delete(pf_out, k))
+
+
+def test_contingency_case9():
+    net = pn.case9()
+    loading, outages = run_contingency(net, screening_threshold_percent=0.)
+    # the base case results are written to the net
+    assert net.converged
+    assert np.all(outages.critical)
+    assert np.all(outages.converged)
+    assert np.array_equal(outages.islanding.values, np.isin(net.line.index, [0, 3, 6]))
+    assert loading.shape == (len(net.line), len(net.line))
+
+    for idx in net.line.index[~outages.islanding.values]:
+        net_out = _runpp_outage(net, "line", idx)
+        res = loading.loc[("line", idx)]
+        assert np.allclose(res.loc["line"].values, net_out.res_line.loading_percent.values)
+
+
+def test_contingency_mv_islanding():
+    net = pn.example_simple()
+    # close the ring of the MV feeder
+    net.switch.closed.at[5] = True
+    loading, outages = run_contingency(net, screening_threshold_percent=0.)
+    assert np.all(outages.converged)
+    # only the MV ring lines can be switched off without islanding
+    assert np.array_equal(outages.islanding.values, [True, False, False, False, True])
+
+    for element, idx in outages.index:
+        # pandapower returns NaN instead of zero loading if only the slack bus remains supplied
+        net_out = _runpp_outage(net, element, idx)
+        res = loading.loc[(element, idx)]
+        assert np.allclose(res.loc["line"].values,
+                           np.nan_to_num(net_out.res_line.loading_percent.values))
+        assert np.allclose(res.loc["trafo"].values,
+                           np.nan_to_num(net_out.res_trafo.loading_percent.values))
+
+
+def test_contingency_screening():
+    net = pn.case9()
+    loading_ac, outages_ac = run_contingency(net, screening_threshold_percent=0.)
+    loading_dc, outages_dc = run_contingency(net, ac=False)
+    assert not np.any(outages_dc.critical)
+    # the DC estimates are close to the AC results
+    assert np.all(np.isnan(loading_dc.values[outages_dc.islanding.values]))
+    no_island = ~outages_dc.islanding.values
+    assert np.allclose(loading_ac.values[no_island], loading_dc.values[no_island], atol=20.)
+
+    loading, outages = run_contingency(net, screening_threshold_percent=80.)
+    assert 0 < np.sum(outages.critical) < len(outages)
+    critical = outages.index[outages.critical.values]
+    assert np.allclose(loading.loc[critical].values, loading_ac.loc[critical].values)
+
+    with pytest.raises(ValueError):
+        run_contingency(net, elements=("impedance",))
+
+
+if __name__ == "__main__":
+    pytest.main(["test_contingency.py"])
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import copy
+
+import numpy as np
+import pytest
+
+import pandapower as pp
+from pandapower.continuation import run_continuation
+from pandapower.networks import case30, create_cigre_network_mv
+from pandapower.powerflow import LoadflowNotConverged
+
+
+def _scaled_net(net, direction, lam):
+    net = copy.deepcopy(net)
+    for (element, variable), val in direction.items():
+        net[element][variable] = net[element][variable] + lam * np.asarray(val)
+    return net
+
+
+def _converges(net, direction, lam):
+    try:
+        pp.runpp(_scaled_net(net, direction, lam), max_iteration=30)
+        return True
+    except LoadflowNotConverged:
+        return False
+
+
+def test_continuation_case30():
+    net = case30()
+    directions = {"load": {("load", "p_kw"): net.load.p_kw, ("load", "q_kvar"): net.load.q_kvar},
+                  "transfer": {("load", "p_kw"): net.load.p_kw,
+                               ("gen", "p_kw"): -net.load.p_kw.sum() / len(net.gen)}}
+    results = run_continuation(copy.deepcopy(net), directions)
+    margins = results["margins"]
+    assert margins.nose.all()
+    assert margins.lambda_max["transfer"] > margins.lambda_max["load"]
+    pp.runpp(net)
+
+    for name, direction in directions.items():
+        curve = results["curves"][name]
+        lam = curve["lambda"]
+        assert lam[0] == 0
+        assert np.allclose(curve["vm_pu"][0], net.res_bus.vm_pu.values)
+        # the points of the upper part of the curve are power flow solutions
+        point = len(lam) // 2
+        scaled = _scaled_net(net, direction, lam[point])
+        pp.runpp(scaled)
+        assert np.allclose(curve["vm_pu"][point], scaled.res_bus.vm_pu.values, atol=1e-6)
+        # the power flow converges just below the nose point, but not above
+        lambda_max = margins.lambda_max[name]
+        assert _converges(net, direction, 0.999 * lambda_max)
+        assert not _converges(net, direction, 1.001 * lambda_max)
+
+
+def test_continuation_options():
+    net = create_cigre_network_mv(with_der="pv_wind")
+    direction = {("load", "p_kw"): net.load.p_kw, ("sgen", "p_kw"): 0.}
+    results = run_continuation(net, {"load": direction}, max_lambda=0.5)
+    assert not results["margins"].nose["load"]
+    assert results["margins"].lambda_max["load"] >= 0.5
+    assert results["curves"]["load"]["vm_pu"].shape[1] == len(net.bus)
+
+    results = run_continuation(net, {"load": direction}, stop_at="full")
+    lam = results["curves"]["load"]["lambda"]
+    assert results["margins"].nose["load"]
+    assert lam[-1] < results["margins"].lambda_max["load"]
+    vm = results["curves"]["load"]["vm_pu"]
+    critical_bus = results["margins"].critical_bus["load"]
+    assert np.nanargmin(vm[-1]) == net.bus.index.get_loc(critical_bus)
+
+    with pytest.raises(ValueError):
+        run_continuation(net, {"ext_grid": {("ext_grid", "p_kw"): 1.}})
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, "-xs"])
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import copy
+
+import numpy as np
+import pytest
+
+import pandapower as pp
+from pandapower.hosting_capacity import calc_hosting_capacity
+from pandapower.networks import create_kerber_landnetz_kabel_1
+
+
+def _within_limits(net, p_kw, bus, q_factor, max_vm_pu):
+    net = copy.deepcopy(net)
+    pp.create_sgen(net, bus, p_kw=-p_kw, q_kvar=p_kw * q_factor)
+    pp.runpp(net)
+    return net.res_bus.vm_pu.max() <= max_vm_pu and net.res_line.loading_percent.max() <= 100. \
+           and net.res_trafo.loading_percent.max() <= 100.
+
+
+@pytest.mark.parametrize("cos_phi", [1., 0.95])
+def test_hosting_capacity_kerber(cos_phi):
+    net = create_kerber_landnetz_kabel_1()
+    buses = net.bus.index[[1, 5, 9, 13]]
+    tolerance_kw = 1.
+    hc = calc_hosting_capacity(net, buses=buses, max_vm_pu=1.03, cos_phi=cos_phi,
+                               tolerance_kw=tolerance_kw)
+    assert hc.verified.all()
+    q_factor = np.tan(np.arccos(cos_phi))
+    for bus in buses:
+        p_kw = hc.max_p_kw.at[bus]
+        assert _within_limits(net, p_kw, bus, q_factor, 1.03)
+        assert not _within_limits(net, p_kw + tolerance_kw, bus, q_factor, 1.03)
+    # the transformer limits generation at the busbar, the voltage at the end of the feeder
+    assert hc.constraint.at[buses[0]] == "trafo"
+    assert hc.element.at[buses[0]] == net.trafo.index[0]
+    assert hc.constraint.at[buses[-1]] == "voltage"
+
+
+def test_hosting_capacity_limits():
+    net = create_kerber_landnetz_kabel_1()
+    end_bus = net.bus.index[-1]
+    net.bus["max_vm_pu"] = np.nan
+    net.bus.loc[end_bus, "max_vm_pu"] = 0.9
+    oos_bus = pp.create_bus(net, 0.4, in_service=False)
+    buses = net.bus.index[1:]
+    hc = calc_hosting_capacity(net, buses=buses, max_p_kw=20., verify=False)
+    # voltage limit violated in the base case
+    assert np.all(hc.max_p_kw.drop(oos_bus) == 0)
+    assert np.all(hc.constraint.drop(oos_bus) == "voltage")
+    assert np.all(hc.element.drop(oos_bus) == end_bus)
+    assert np.isnan(hc.max_p_kw.at[oos_bus])
+
+    net.bus["max_vm_pu"] = np.nan
+    hc = calc_hosting_capacity(net, buses=buses, max_p_kw=20.)
+    assert np.all(hc.max_p_kw.drop(oos_bus) == 20.)
+    assert np.all(hc.constraint.drop(oos_bus) == "max_p_kw")
+    assert hc.verified.drop(oos_bus).all()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, "-xs"])
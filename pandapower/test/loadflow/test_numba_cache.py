@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import subprocess
+import sys
+
+import pytest
+
+import pandapower as pp
+import pandapower.networks as nw
+
+
+def test_precompile():
+    pytest.importorskip("numba")
+    kernels = pp.precompile()
+    assert "pandapower.pf.makeYbus.gen_Ybus" in kernels.index
+    assert "pandapower.pf.create_jacobian_numba.create_J" in kernels.index
+    assert "pandapower.pf.create_jacobian_numba.create_J2" in kernels.index
+    assert (kernels.signatures > 0).all()
+    assert kernels.cached.dtype == bool
+
+    kernels = pp.precompile(check_cache=False)
+    assert "cached" not in kernels.columns
+
+    net = nw.example_simple()
+    pp.runpp(net, numba=True)
+    assert net.converged
+
+
+def test_import_is_lightweight():
+    code = "import sys, pandapower; print(' '.join(m for m in ('networkx', 'geopandas', " \
+           "'pandapower.opf.opf', 'pandapower.topology') if m in sys.modules))"
+    out = subprocess.check_output([sys.executable, "-c", code])
+    assert out.decode().strip() == ""
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, "-xs"])
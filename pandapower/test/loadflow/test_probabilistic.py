@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import copy
+
+import numpy as np
+import pytest
+
+import pandapower as pp
+from pandapower.networks import create_cigre_network_mv, example_multivoltage
+from pandapower.probabilistic import run_probabilistic
+
+
+def _random_samples(net, n_samples, seed=0):
+    rng = np.random.RandomState(seed)
+    load_factors = rng.uniform(0.2, 1.2, (n_samples, len(net.load)))
+    sgen_factors = rng.uniform(0., 1., (n_samples, len(net.sgen)))
+    return {("load", "p_kw"): load_factors * net.load.p_kw.values,
+            ("load", "q_kvar"): load_factors * net.load.q_kvar.values,
+            ("sgen", "p_kw"): sgen_factors * net.sgen.p_kw.values}
+
+
+def _runpp_samples(net, samples, n_samples):
+    vm, line_loading, trafo_loading = [], [], []
+    for sample in range(n_samples):
+        for (element, variable), val in samples.items():
+            net[element][variable] = val[sample]
+        pp.runpp(net)
+        vm.append(net.res_bus.vm_pu.values)
+        line_loading.append(net.res_line.loading_percent.values)
+        trafo_loading.append(net.res_trafo.loading_percent.values)
+    return np.array(vm), np.array(line_loading), np.array(trafo_loading)
+
+
+@pytest.mark.parametrize("method", ["newton", "linear"])
+def test_probabilistic_cigre_mv(method):
+    net = create_cigre_network_mv(with_der="pv_wind")
+    n_samples = 20
+    samples = _random_samples(net, n_samples)
+    net.trafo["max_loading_percent"] = 100.
+    # limits within the range of the samples, so that the linear method corrects some samples
+    results = run_probabilistic(copy.deepcopy(net), samples, method=method, batch_size=8,
+                                quantiles=[0.1, 0.9], min_vm_pu=0.96, max_loading_percent=60.)
+    assert np.all(results["converged"])
+    vm, line_loading, trafo_loading = _runpp_samples(net, samples, n_samples)
+
+    res_bus = results["res_bus"]
+    # the linearized results are only exact for samples close to the limits
+    atol, atol_loading = (1e-8, 1e-3) if method == "newton" else (1e-2, 2.)
+    assert np.allclose(res_bus.vm_pu_min.values, vm.min(axis=0), atol=atol)
+    assert np.allclose(res_bus.vm_pu_max.values, vm.max(axis=0), atol=atol)
+    assert np.allclose(res_bus.vm_pu_mean.values, vm.mean(axis=0), atol=atol)
+    assert np.allclose(res_bus.vm_pu_q10.values, np.percentile(vm, 10, axis=0), atol=atol)
+    assert np.allclose(res_bus.p_undervoltage.values, np.mean(vm < 0.96, axis=0))
+    assert np.allclose(res_bus.p_overvoltage.values, 0)
+
+    res_line = results["res_line"]
+    assert np.allclose(res_line.loading_percent_max.values, line_loading.max(axis=0),
+                       atol=atol_loading)
+    assert np.allclose(res_line.loading_percent_q90.values,
+                       np.percentile(line_loading, 90, axis=0), atol=atol_loading)
+    assert np.allclose(res_line.p_overload.values, np.mean(line_loading > 60., axis=0))
+    assert np.allclose(results["res_trafo"].loading_percent_max.values,
+                       trafo_loading.max(axis=0), atol=atol_loading)
+    if method == "newton":
+        assert np.all(results["iterations"] > 0)
+    else:
+        assert np.any(results["iterations"] == 0) and np.any(results["iterations"] > 0)
+
+
+def test_probabilistic_out_of_service():
+    net = example_multivoltage()
+    net.line.in_service.iloc[3] = False
+    net.bus.loc[net.bus.index[-1], "max_vm_pu"] = 1.01
+    n_samples = 6
+    samples = _random_samples(net, n_samples, seed=1)
+    samples[("load", "p_kw")] = samples[("load", "p_kw")].tolist()
+    results = run_probabilistic(copy.deepcopy(net), samples)
+    assert np.all(results["converged"])
+    vm, line_loading, _ = _runpp_samples(net, samples, n_samples)
+    assert np.allclose(results["res_bus"].vm_pu_max.values, np.max(vm, axis=0), equal_nan=True)
+    assert np.allclose(results["res_line"].loading_percent_max.values,
+                       np.max(line_loading, axis=0))
+    assert results["res_line"].loading_percent_max.iloc[3] == 0
+
+
+def test_probabilistic_invalid_method():
+    net = example_multivoltage()
+    with pytest.raises(ValueError):
+        run_probabilistic(net, {}, method="monte carlo")
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, "-xs"])
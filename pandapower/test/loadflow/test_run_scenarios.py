@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pandapower as pp
+from pandapower.networks import example_simple, case9
+from pandapower.scenarios import run_scenarios
+
+
+def _scale_sgen(net, scaling):
+    net.sgen.scaling = scaling
+    net.load.q_kvar *= 2
+
+
+def _assert_scenario_equal_to_runpp(results, i, net):
+    pp.runpp(net)
+    assert results["converged"][i]
+    assert np.allclose(results["res_bus"]["vm_pu"][i], net.res_bus.vm_pu.values, equal_nan=True)
+    assert np.allclose(results["res_line"]["loading_percent"][i],
+                       net.res_line.loading_percent.values, equal_nan=True)
+    assert np.allclose(results["res_trafo"]["p_hv_kw"][i], net.res_trafo.p_hv_kw.values)
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_scenarios_deltas(n_workers):
+    net = example_simple()
+    scenarios = [{("load", "scaling"): 0.5},
+                 {("load", "scaling"): 1.5, ("sgen", "p_kw"): np.array([-1000.])},
+                 {("switch", "closed"): {5: True}},
+                 {("line", "in_service"): pd.Series([False], index=[3])}]
+    net_orig = copy.deepcopy(net)
+    results = run_scenarios(net, scenarios, n_workers=n_workers)
+    # the network is not changed
+    assert pp.nets_equal(net, net_orig)
+
+    for i, scenario in enumerate(scenarios):
+        net_scenario = copy.deepcopy(net)
+        for (element, column), value in scenario.items():
+            if isinstance(value, (dict, pd.Series)):
+                for idx, val in value.items():
+                    net_scenario[element][column].at[idx] = val
+            else:
+                net_scenario[element][column] = value
+        _assert_scenario_equal_to_runpp(results, i, net_scenario)
+
+
+def test_scenarios_meshed_outages():
+    # outages which do not disconnect any bus are solved on the ppci of the base case
+    net = case9()
+    scenarios = [{("line", "in_service"): {idx: False}, ("load", "p_kw"): net.load.p_kw * 1.2}
+                 for idx in net.line.index]
+    results = run_scenarios(net, scenarios, n_workers=1)
+    for i, idx in enumerate(net.line.index):
+        net_scenario = copy.deepcopy(net)
+        net_scenario.line.at[idx, "in_service"] = False
+        net_scenario.load.p_kw *= 1.2
+        _assert_scenario_equal_to_runpp(results, i, net_scenario)
+
+
+def test_scenarios_fn():
+    net = example_simple()
+    scalings = [0., 0.5, 1.]
+    net_orig = copy.deepcopy(net)
+    results = run_scenarios(net, scalings, scenario_fn=_scale_sgen, n_workers=2, chunksize=2)
+    assert pp.nets_equal(net, net_orig)
+    for i, scaling in enumerate(scalings):
+        net_scenario = copy.deepcopy(net)
+        _scale_sgen(net_scenario, scaling)
+        _assert_scenario_equal_to_runpp(results, i, net_scenario)
+
+
+def test_scenarios_not_converged():
+    net = example_simple()
+    scenarios = [{("load", "scaling"): 1.}, {("load", "scaling"): 1e4}]
+    results = run_scenarios(net, scenarios, n_workers=1, max_iteration=10)
+    assert np.array_equal(results["converged"], [True, False])
+    assert np.all(np.isnan(results["res_bus"]["vm_pu"][1]))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-xs"])
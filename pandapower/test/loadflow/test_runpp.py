@@ -9,12 +9,13 @@ import os
 
 import numpy as np
 import pandas as pd
+import pandas.testing as pdt
 import pytest
 
 import pandapower as pp
-from pandapower.auxiliary import _check_connectivity, _add_ppc_options
+from pandapower.auxiliary import _check_connectivity, _add_ppc_options, _DeferredTable
 from pandapower.networks import create_cigre_network_mv, four_loads_with_branches_out, \
-    example_simple, simple_four_bus_system
+    example_simple, simple_four_bus_system, example_multivoltage
 from pandapower.pd2ppc import _pd2ppc
 from pandapower.pf.create_jacobian import _create_J_without_numba
 from pandapower.pf.run_newton_raphson_pf import _get_pf_variables_from_ppci
@@ -418,6 +419,38 @@ def test_bsfw_algorithm():
     assert np.allclose(va_nr, va_alg)
 
 
+def test_bfsw_algorithm_meshed():
+    # the root bus is not the first bus of the ppc
+    net = pp.networks.mv_oberrhein()
+    # close two rings of the open ring network
+    open_switches = net.switch.index[~net.switch.closed.values]
+    net.switch.loc[open_switches[:2], "closed"] = True
+
+    pp.runpp(net)
+    vm_nr = net.res_bus.vm_pu.copy()
+    va_nr = net.res_bus.va_degree.copy()
+
+    pp.runpp(net, algorithm='bfsw')
+    assert np.allclose(vm_nr, net.res_bus.vm_pu)
+    assert np.allclose(va_nr, net.res_bus.va_degree)
+
+
+def test_bfsw_recycle_dlf():
+    net = example_simple()
+    recycle = dict(_is_elements=True, ppc=True, Ybus=True, bfsw=True)
+    pp.runpp(net, algorithm='bfsw', recycle=recycle)
+    DLF = net._ppc["internal"]["DLF"]
+    assert DLF.nnz > 0
+
+    net.load.p_kw *= 2
+    pp.runpp(net, algorithm='bfsw', recycle=recycle)
+    assert np.allclose(net._ppc["internal"]["DLF"].toarray(), DLF.toarray())
+    vm_recycle = net.res_bus.vm_pu.copy()
+
+    pp.runpp(net, algorithm='bfsw')
+    assert np.allclose(net.res_bus.vm_pu, vm_recycle)
+
+
 def test_pypower_algorithms_iter():
     alg_to_test = ['fdbx', 'fdxb', 'gs']
     for alg in alg_to_test:
@@ -472,6 +505,125 @@ def test_recycle():
     assert np.allclose(net.res_gen.vm_pu.iloc[0], u_set)
 
 
+
+@pytest.mark.parametrize("numba", [True, False])
+def test_recycle_ybus_update(numba):
+    net = create_cigre_network_mv(with_der="pv_wind")
+    net.trafo.tp_side = "hv"
+    net.trafo.tp_mid = 0
+    net.trafo.tp_pos = 0
+    net.trafo.tp_st_percent = 2.5
+    pp.create_shunt(net, 5, q_kvar=0.)
+    net_ref = copy.deepcopy(net)
+    net_ref.trafo.tp_pos = [2, -1]
+    net_ref.shunt.q_kvar = -500.
+    pp.runpp(net_ref, numba=numba)
+
+    # tap changes and shunt changes are applied to the recycled admittance matrices
+    recycle = dict(_is_elements=True, ppc=True, Ybus=True)
+    pp.runpp(net, recycle=recycle, numba=numba)
+    net.trafo.tp_pos = [2, -1]
+    net.shunt.q_kvar = -500.
+    pp.runpp(net, recycle=recycle, numba=numba)
+    assert np.allclose(net.res_bus.values, net_ref.res_bus.values)
+    assert np.allclose(net.res_trafo.values, net_ref.res_trafo.values)
+
+
+@pytest.mark.parametrize("numba", [True, False])
+def test_update_ybus(numba):
+    from pandapower.pf.updateYbus import updateYbus, updateYbusShunts, changed_branch_rows
+    from pandapower.pf.run_newton_raphson_pf import _get_numba_functions
+    from pandapower.idx_brch import BR_STATUS, TAP, F_BUS
+    from pandapower.idx_bus import BS
+
+    net = create_cigre_network_mv(with_der="pv_wind")
+    pp.runpp(net)
+    ppci = net._ppc
+    makeYbus, _ = _get_numba_functions(ppci, {"numba": numba})
+    baseMVA, bus, branch = ppci["baseMVA"], ppci["bus"], ppci["branch"]
+    Ybus, Yf, Yt = makeYbus(baseMVA, bus, branch)
+
+    branch_new = branch.copy()
+    branch_new[[2, 5], BR_STATUS] = 0
+    branch_new[branch_new[:, TAP].real > 0, TAP] *= 1.02
+    bus_new = bus.copy()
+    bus_new[3, BS] += 0.5
+    rows = changed_branch_rows(branch, branch_new)
+    assert updateYbus(Ybus, Yf, Yt, branch, branch_new, rows)
+    assert updateYbusShunts(baseMVA, Ybus, bus, bus_new)
+
+    Ybus_ref, Yf_ref, Yt_ref = makeYbus(baseMVA, bus_new, branch_new)
+    for Y, Y_ref in ((Ybus, Ybus_ref), (Yf, Yf_ref), (Yt, Yt_ref)):
+        assert np.allclose(Y.toarray(), Y_ref.toarray())
+
+    # a changed topology requires a rebuild
+    branch_topo = branch_new.copy()
+    branch_topo[0, F_BUS] = branch_topo[1, F_BUS] + 1
+    data = Ybus.data.copy()
+    assert not updateYbus(Ybus, Yf, Yt, branch_new, branch_topo, [0])
+    assert np.array_equal(Ybus.data, data)
+
+
+def _record_splu(monkeypatch):
+    """
+    Records the column permutation of each LU factorization of the Jacobian in the Newton-Raphson
+    power flow.
+    """
+    import pandapower.pf.newtonpf as newtonpf
+    permc_specs = []
+    splu = newtonpf.splu
+
+    def recording_splu(A, permc_spec=None, **kwargs):
+        permc_specs.append(permc_spec)
+        return splu(A, permc_spec=permc_spec, **kwargs)
+
+    monkeypatch.setattr(newtonpf, "splu", recording_splu)
+    return permc_specs
+
+
+def test_lu_reuse(monkeypatch):
+    net = create_cigre_network_mv(with_der="pv_wind")
+    pp.runpp(net)
+    res_bus = net.res_bus.copy()
+    iterations = net._ppc["iterations"]
+
+    permc_specs = _record_splu(monkeypatch)
+    pp.runpp(net, lu_reuse=True)
+    assert np.allclose(net.res_bus.values, res_bus.values)
+    assert net._ppc["iterations"] == iterations
+    # the ordering is computed in the first iteration and reused in the following ones
+    assert permc_specs == ["COLAMD"] + ["NATURAL"] * (iterations - 1)
+
+    # the ordering is kept if the ppc is recycled
+    net.load.p_kw *= 1.2
+    del permc_specs[:]
+    pp.runpp(net, lu_reuse=True, recycle=dict(_is_elements=True, ppc=True, Ybus=True))
+    assert len(permc_specs) == net._ppc["iterations"]
+    assert "COLAMD" not in permc_specs
+    res_bus_recycle = net.res_bus.copy()
+    pp.runpp(net)
+    assert np.allclose(net.res_bus.values, res_bus_recycle.values)
+
+    # with jacobian_reuse > 1 the Jacobian is only factorized in every n-th iteration
+    del permc_specs[:]
+    pp.runpp(net, jacobian_reuse=2, max_iteration=30)
+    assert np.allclose(net.res_bus.values, res_bus_recycle.values)
+    assert len(permc_specs) == (net._ppc["iterations"] + 1) // 2
+    assert permc_specs[0] == "COLAMD"
+
+
+def test_dishonest_newton():
+    net = create_cigre_network_mv(with_der="pv_wind")
+    pp.runpp(net)
+    res_bus = net.res_bus.copy()
+    iterations = net._ppc["iterations"]
+
+    pp.runpp(net, jacobian_reuse=3, max_iteration=30)
+    assert np.allclose(net.res_bus.vm_pu.values, res_bus.vm_pu.values)
+    assert np.allclose(net.res_bus.va_degree.values, res_bus.va_degree.values)
+    assert net._ppc["iterations"] >= iterations
+
+
 @pytest.mark.xfail
 def test_zip_loads_gridcal():
     # Tests newton power flow considering zip loads against GridCal's pf result
@@ -945,5 +1097,39 @@ def test_dc_with_ext_grid_at_one_bus():
     assert np.allclose(net.res_ext_grid.p_kw.values, [0,0])
 
 
+def test_results_on_demand():
+    ref = example_multivoltage()
+    pp.create_dcline(ref, 18, 24, p_kw=1e3, loss_percent=1, loss_kw=10, vm_from_pu=1.01,
+                     vm_to_pu=1.01)
+    net = copy.deepcopy(ref)
+    pp.runpp(ref)
+    res_tables = [key for key in ref.keys() if key.startswith("res_")]
+
+    for results in ["lazy", ["line", "trafo"], ["load"]]:
+        pp.runpp(net, results=results)
+        assert isinstance(net._deferred["res_trafo3w"], _DeferredTable)
+        assert len(net.bus) == len(ref.bus) and len(net.gen) == len(ref.gen)
+        for key in res_tables:
+            pdt.assert_frame_equal(net[key], ref[key])
+
+    # results which are not accessed are discarded by the next power flow
+    pp.runpp(net, results="lazy")
+    pp.runpp(net)
+    assert all(isinstance(dict.__getitem__(net, key), pd.DataFrame) for key in res_tables)
+    pp.runpp(net, results="lazy")
+    assert copy.deepcopy(net).res_line.shape == net.res_line.shape
+
+    with pytest.raises(ValueError):
+        pp.runpp(net, results=["foo"])
+
+
+def test_switch_results_on_demand(r_switch_net):
+    net = r_switch_net
+    pp.runpp(net, r_switch=0.01)
+    res_switch = net.res_switch.copy()
+    del net["res_switch"]
+    pp.runpp(net, r_switch=0.01, results="lazy")
+    pdt.assert_frame_equal(net.res_switch, res_switch)
+
 if __name__ == "__main__":
     pytest.main(["test_runpp.py"])
\ No newline at end of file
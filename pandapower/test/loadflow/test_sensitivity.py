@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import copy
+
+import numpy as np
+import pytest
+
+import pandapower as pp
+from pandapower.networks import create_cigre_network_mv, example_simple
+from pandapower.sensitivity import calc_sensitivities
+
+
+def _finite_difference(net, element, index, variable, delta=1., **kwargs):
+    net_delta = copy.deepcopy(net)
+    net_delta[element][variable].at[index] += delta
+    pp.runpp(net_delta, **kwargs)
+    return {table: (net_delta[table] - net[table]) / delta
+            for table in ["res_bus", "res_line", "res_trafo"]}
+
+
+@pytest.mark.parametrize("trafo_loading", ["current", "power"])
+def test_sensitivities_cigre_mv(trafo_loading):
+    net = create_cigre_network_mv(with_der="pv_wind")
+    net.line.in_service.iloc[2] = False
+    pp.runpp(net, trafo_loading=trafo_loading)
+    elements = {"sgen": [0, 3], "load": None}
+    results = calc_sensitivities(net, elements=elements)
+    assert results["res_bus"]["vm_pu"]["p_kw"].shape == (len(net.bus), 2 + len(net.load))
+    assert results["res_line"]["loading_percent"]["q_kvar"].iloc[2].abs().sum() == 0
+    # sgen 3 is disconnected by the line which is out of service
+    assert np.all(results["res_line"]["loading_percent"]["p_kw"][("sgen", 3)] == 0)
+
+    for element, index in [("sgen", 0), ("load", net.load.index[5])]:
+        for variable in ["p_kw", "q_kvar"]:
+            delta = _finite_difference(net, element, index, variable,
+                                       trafo_loading=trafo_loading)
+            for table, res_variables in results.items():
+                for res_variable, sens in res_variables.items():
+                    # results of unsupplied buses and branches are NaN
+                    expected = delta[table][res_variable].values
+                    supplied = ~np.isnan(expected)
+                    assert np.allclose(sens[variable][(element, index)].values[supplied],
+                                       expected[supplied], atol=1e-8, rtol=1e-2)
+
+
+def test_sensitivities_bus_injections():
+    net = example_simple()
+    pp.runpp(net)
+    results = calc_sensitivities(net)
+    dvm_dp = results["res_bus"]["vm_pu"]["p_kw"]
+    assert list(dvm_dp.columns) == list(net.bus.index)
+    # no sensitivities to injections at the slack bus and to reactive power at the gen bus
+    slack = net.ext_grid.bus.iloc[0]
+    gen_bus = net.gen.bus.iloc[0]
+    assert np.allclose(dvm_dp[slack], 0)
+    assert np.allclose(results["res_bus"]["vm_pu"]["q_kvar"][gen_bus], 0)
+    assert np.allclose(results["res_bus"]["vm_pu"]["p_kw"].loc[gen_bus], 0)
+
+    # the bus injections are not scaled
+    load = net.load.index[0]
+    delta = _finite_difference(net, "load", load, "q_kvar")
+    dvm_dq = results["res_bus"]["vm_pu"]["q_kvar"][net.load.bus.at[load]]
+    assert np.allclose(dvm_dq.values * net.load.scaling.at[load], delta["res_bus"]["vm_pu"].values,
+                       atol=1e-9, rtol=1e-2)
+
+    # only the voltages of few buses are solved with the transposed system
+    buses = net.bus.index[[2, 5]]
+    voltages = calc_sensitivities(net, buses=buses, branches=())
+    assert list(voltages.keys()) == ["res_bus"]
+    for variable in ["p_kw", "q_kvar"]:
+        assert np.allclose(voltages["res_bus"]["va_degree"][variable].values,
+                           results["res_bus"]["va_degree"][variable].loc[buses].values)
+
+
+def test_sensitivities_without_power_flow():
+    net = example_simple()
+    with pytest.raises(UserWarning):
+        calc_sensitivities(net)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, "-xs"])
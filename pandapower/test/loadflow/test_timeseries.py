@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pandapower as pp
+from pandapower.networks import create_cigre_network_mv, example_simple
+from pandapower.timeseries import run_timeseries
+
+
+def _random_profiles(net, n_steps, seed=0):
+    rng = np.random.RandomState(seed)
+    load_factors = rng.uniform(0.2, 1.2, (n_steps, len(net.load)))
+    sgen_factors = rng.uniform(0., 1., (n_steps, len(net.sgen)))
+    return {("load", "p_kw"): load_factors * net.load.p_kw.values,
+            ("load", "q_kvar"): load_factors * net.load.q_kvar.values,
+            ("sgen", "p_kw"): sgen_factors * net.sgen.p_kw.values}
+
+
+def _assert_timeseries_equal_to_runpp(net, profiles, n_steps, **kwargs):
+    results = run_timeseries(copy.deepcopy(net), profiles, **kwargs)
+    assert np.all(results["converged"])
+    assert np.all(results["iterations"] > 0)
+    for step in range(n_steps):
+        for (element, variable), val in profiles.items():
+            net[element][variable] = val[step]
+        pp.runpp(net, **kwargs)
+        assert np.allclose(results["res_bus"]["vm_pu"][step], net.res_bus.vm_pu.values,
+                           equal_nan=True)
+        assert np.allclose(results["res_bus"]["va_degree"][step], net.res_bus.va_degree.values,
+                           equal_nan=True)
+        for variable, val in results["res_line"].items():
+            assert np.allclose(val[step], net.res_line[variable].values, atol=1e-5)
+        for variable, val in results["res_trafo"].items():
+            assert np.allclose(val[step], net.res_trafo[variable].values, atol=1e-5)
+        for variable, val in results["res_ext_grid"].items():
+            assert np.allclose(val[step], net.res_ext_grid[variable].values, atol=1e-5)
+
+
+def test_timeseries_cigre_mv():
+    net = create_cigre_network_mv(with_der="pv_wind")
+    n_steps = 5
+    profiles = _random_profiles(net, n_steps)
+    _assert_timeseries_equal_to_runpp(net, profiles, n_steps)
+
+
+def test_timeseries_bfsw():
+    net = create_cigre_network_mv(with_der="pv_wind")
+    n_steps = 3
+    profiles = _random_profiles(net, n_steps, seed=1)
+    _assert_timeseries_equal_to_runpp(net, profiles, n_steps, algorithm="bfsw")
+
+
+def test_timeseries_oos_elements():
+    net = example_simple()
+    net.line.in_service.iloc[2] = False
+    b = pp.create_bus(net, vn_kv=20., in_service=False)
+    pp.create_line(net, 6, b, 1., "NA2XS2Y 1x240 RM/25 12/20 kV")
+    pp.create_load(net, b, p_kw=100)
+    pp.create_load(net, 5, p_kw=300, in_service=False)
+    n_steps = 4
+    profiles = _random_profiles(net, n_steps, seed=2)
+    _assert_timeseries_equal_to_runpp(net, profiles, n_steps)
+
+
+def test_timeseries_dataframe_profile():
+    net = example_simple()
+    p_kw = pd.DataFrame([[500.], [1000.], [1500.]], columns=net.load.index[:1])
+    results = run_timeseries(net, {("load", "p_kw"): p_kw})
+    assert np.all(results["converged"])
+    assert results["res_bus"]["vm_pu"].shape == (3, len(net.bus))
+    # a higher load leads to lower voltages
+    assert np.all(np.diff(results["res_bus"]["vm_pu"][:, net.load.bus.iloc[0]]) < 0)
+
+    with pytest.raises(ValueError):
+        run_timeseries(net, {("load", "p_kw"): pd.DataFrame([[1.]], columns=[1000])})
+    with pytest.raises(ValueError):
+        run_timeseries(net, {("line", "length_km"): np.ones((3, len(net.line)))})
+
+
+def test_timeseries_not_converged():
+    net = example_simple()
+    p_kw = np.array([net.load.p_kw.values, net.load.p_kw.values * 1e4, net.load.p_kw.values])
+    results = run_timeseries(net, {("load", "p_kw"): p_kw}, max_iteration=10)
+    assert np.array_equal(results["converged"], [True, False, True])
+    assert np.all(np.isnan(results["res_bus"]["vm_pu"][1]))
+    assert not np.any(np.isnan(results["res_bus"]["vm_pu"][[0, 2]]))
+
+
+def test_timeseries_recycle_ignored(caplog):
+    net = example_simple()
+    p_kw = np.array([net.load.p_kw.values, net.load.p_kw.values * 2])
+    ref = run_timeseries(copy.deepcopy(net), {("load", "p_kw"): p_kw})
+    results = run_timeseries(net, {("load", "p_kw"): p_kw}, recycle=dict(_is_elements=True,
+                                                                         ppc=True, Ybus=True))
+    assert "recycle option is ignored" in caplog.text
+    assert np.allclose(results["res_bus"]["vm_pu"], ref["res_bus"]["vm_pu"])
+
+
+if __name__ == "__main__":
+    pytest.main(["test_timeseries.py"])
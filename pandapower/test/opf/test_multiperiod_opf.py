@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pandapower as pp
+import pandapower.networks as nw
+from pandapower.multiperiod_opf import rundcopp_multiperiod
+
+try:
+    import pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def cigre_dcopf_net():
+    net = nw.create_cigre_network_mv(with_der="pv_wind")
+    net.line["max_loading_percent"] = 200
+    net.trafo["max_loading_percent"] = 100
+    net.sgen["min_p_kw"] = -net.sgen.sn_kva
+    net.sgen["max_p_kw"] = 0
+    net.sgen["controllable"] = True
+    net.load["controllable"] = False
+    for i in net.sgen.index:
+        pp.create_polynomial_cost(net, i, "sgen", np.array([-0.01, 0]))
+    pp.create_polynomial_cost(net, 0, "ext_grid", np.array([0.05, 0]))
+    return net
+
+
+@pytest.fixture
+def storage_net():
+    net = pp.create_empty_network()
+    b0 = pp.create_bus(net, vn_kv=20.)
+    b1 = pp.create_bus(net, vn_kv=20.)
+    pp.create_ext_grid(net, b0, min_p_kw=-1e5, max_p_kw=1e5)
+    pp.create_line(net, b0, b1, length_km=1., std_type="NA2XS2Y 1x240 RM/25 12/20 kV",
+                   max_loading_percent=100.)
+    pp.create_load(net, b1, p_kw=1000., controllable=False)
+    pp.create_storage(net, b1, p_kw=0., max_e_kwh=1000., min_e_kwh=100., soc_percent=50.,
+                      max_p_kw=500., min_p_kw=-500., controllable=True)
+    # quadratic costs of the infeed make a flat infeed profile optimal
+    pp.create_polynomial_cost(net, 0, "ext_grid", np.array([-1e-4, 0, 0]))
+    return net
+
+
+def test_multiperiod_equals_sequential_dcopp(cigre_dcopf_net):
+    net = cigre_dcopf_net
+    n_steps = 4
+    rng = np.random.RandomState(0)
+    p_load = net.load.p_kw.values * rng.uniform(0.5, 1., (n_steps, len(net.load)))
+    p_available = pd.DataFrame(-net.sgen.sn_kva.values[:4] * rng.uniform(0, 1, (n_steps, 4)),
+                               columns=net.sgen.index[:4])
+    results = rundcopp_multiperiod(net, {("load", "p_kw"): p_load,
+                                         ("sgen", "min_p_kw"): p_available})
+    assert np.all(results["converged"])
+    for step in range(n_steps):
+        ref = copy.deepcopy(net)
+        ref.load["p_kw"] = p_load[step]
+        ref.sgen.loc[p_available.columns, "min_p_kw"] = p_available.values[step]
+        pp.rundcopp(ref)
+        assert np.isclose(results["cost"][step], ref.res_cost, rtol=1e-6)
+        assert np.allclose(results["res_sgen"]["p_kw"][step], ref.res_sgen.p_kw, atol=1e-1)
+        assert np.allclose(results["res_load"]["p_kw"][step], ref.res_load.p_kw, atol=1e-6)
+        assert np.allclose(results["res_ext_grid"]["p_kw"][step], ref.res_ext_grid.p_kw, atol=1e-1)
+        assert np.allclose(results["res_bus"]["va_degree"][step], ref.res_bus.va_degree,
+                           atol=1e-4)
+        assert np.allclose(results["res_line"]["p_from_kw"][step], ref.res_line.p_from_kw,
+                           atol=1e-1)
+        assert np.allclose(results["res_trafo"]["loading_percent"][step],
+                           ref.res_trafo.loading_percent, atol=1e-3)
+
+
+def test_multiperiod_storage(storage_net):
+    net = storage_net
+    n_steps = 8
+    p_load = np.array([[200.], [200.], [200.], [200.], [1800.], [1800.], [1800.], [1800.]])
+    results = rundcopp_multiperiod(net, {("load", "p_kw"): p_load}, time_step_h=0.5)
+
+    p_storage = results["res_storage"]["p_kw"][:, 0]
+    e_kwh = results["res_storage"]["soc_percent"][:, 0] * 10.
+    assert np.allclose(np.diff(np.r_[500., e_kwh]), p_storage * 0.5, atol=1e-3)
+    assert np.all(e_kwh > 100. - 1e-3) and np.all(e_kwh < 1000. + 1e-3)
+    assert e_kwh[-1] > 500. - 1e-3
+    assert np.all(np.abs(p_storage) < 500. + 1e-3)
+    # the storage charges with 250 kW until it is full and discharges to the initial energy
+    assert np.all(p_storage[:4] > 0) and np.all(p_storage[4:] < 0)
+    p_infeed = -results["res_ext_grid"]["p_kw"][:, 0]
+    assert np.allclose(p_infeed, p_load[:, 0] + p_storage, atol=1e-2)
+    assert np.isclose(np.ptp(p_infeed), np.ptp(p_load) - 500., atol=1e-2)
+
+    # without final state of charge constraint the storage is emptied
+    results = rundcopp_multiperiod(net, {("load", "p_kw"): p_load}, time_step_h=0.5,
+                                   keep_final_soc=False)
+    assert np.isclose(results["res_storage"]["soc_percent"][-1, 0], 10., atol=1e-3)
+
+
+def test_multiperiod_ramping(storage_net):
+    net = storage_net
+    net.storage["in_service"] = False
+    net.ext_grid["max_ramp_kw"] = 300.
+    results = rundcopp_multiperiod(net, {}, n_steps=3)
+    assert np.allclose(results["res_ext_grid"]["p_kw"], -1000., atol=1e-2)
+
+    net.storage["in_service"] = True
+    p_load = np.array([[200.], [1000.], [1800.]])
+    results = rundcopp_multiperiod(net, {("load", "p_kw"): p_load}, keep_final_soc=False)
+    p_infeed = -results["res_ext_grid"]["p_kw"][:, 0]
+    assert np.all(np.abs(np.diff(p_infeed)) < 300. + 1e-3)
+    assert np.allclose(p_infeed, p_load[:, 0] + results["res_storage"]["p_kw"][:, 0], atol=1e-2)
+
+
+def test_multiperiod_profile_errors(storage_net):
+    with pytest.raises(ValueError):
+        rundcopp_multiperiod(storage_net, {})
+    with pytest.raises(ValueError):
+        rundcopp_multiperiod(storage_net, {("load", "p_kw"): np.ones((2, 1))}, n_steps=3)
+    with pytest.raises(ValueError):
+        rundcopp_multiperiod(storage_net, {("load", "q_kvar"): np.ones((2, 1))})
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-xs"])
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import copy
+
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+
+import pandapower as pp
+import pandapower.networks as nw
+from pandapower.auxiliary import _check_if_numba_is_installed
+from pandapower.idx_brch import RATE_A
+from pandapower.opf.pips import _kkt_matrix
+
+try:
+    import pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+numba_installed = _check_if_numba_is_installed(True)
+
+
+@pytest.fixture
+def cigre_opf_net():
+    net = nw.create_cigre_network_mv(with_der="pv_wind")
+    net.bus["max_vm_pu"] = 1.1
+    net.bus["min_vm_pu"] = 0.9
+    net.line["max_loading_percent"] = 200
+    net.trafo["max_loading_percent"] = 100
+    net.sgen["min_p_kw"] = -net.sgen.sn_kva
+    net.sgen["max_p_kw"] = 0
+    net.sgen["max_q_kvar"] = 10
+    net.sgen["min_q_kvar"] = -10
+    net.sgen["controllable"] = True
+    net.load["controllable"] = False
+    for i in net.sgen.index:
+        pp.create_polynomial_cost(net, i, "sgen", np.array([1e-2, -1, 0]))
+    pp.create_polynomial_cost(net, 0, "ext_grid", np.array([1e-3, 2, 0]))
+    return net
+
+
+def _opf_model(net, calculate_voltage_angles):
+    from pypower.makeYbus import makeYbus
+    from pandapower.optimal_powerflow import _init_opf
+    from pandapower.opf.opf import _add_multiplier_columns
+    from pandapower.opf.opf_setup import opf_setup
+    from pandapower.run import _init_runopp_options
+
+    _init_runopp_options(net, calculate_voltage_angles=calculate_voltage_angles,
+                         check_connectivity=False, r_switch=0.0, delta=1e-10, init="flat",
+                         numba=True, trafo3w_losses="hv")
+    ppc, ppci, ppopt = _init_opf(net, False)
+    _add_multiplier_columns(ppci)
+    om = opf_setup(ppci, ppopt)
+    om.build_cost_params()
+    Ybus, Yf, Yt = makeYbus(ppci["baseMVA"], ppci["bus"], ppci["branch"])
+    branch = ppci["branch"]
+    il = np.flatnonzero((branch[:, RATE_A] != 0) & (branch[:, RATE_A] < 1e10))
+    return om, ppopt, Ybus, Yf[il, :], Yt[il, :], il
+
+
+@pytest.mark.skipif(not numba_installed, reason="requires numba")
+@pytest.mark.parametrize("calculate_voltage_angles", [False, True])
+def test_derivatives_equal_pypower(cigre_opf_net, calculate_voltage_angles):
+    from pypower.opf_consfcn import opf_consfcn
+    from pandapower.opf.opf_hessfcn import opf_hessfcn
+    from pandapower.opf.opf_derivatives import _make_derivative_patterns, opf_consfcn_numba, \
+        opf_hessfcn_numba
+
+    om, ppopt, Ybus, Yf, Yt, il = _opf_model(cigre_opf_net, calculate_voltage_angles)
+    d = _make_derivative_patterns(om, Ybus, Yf, Yt, ppopt, il)
+    assert d is not None
+    nb, nl2 = Ybus.shape[0], len(il)
+    rng = np.random.RandomState(0)
+    x0, _, _ = om.getv()
+    x = x0 + rng.uniform(-0.1, 0.1, len(x0))
+    x[nb:2 * nb] = rng.uniform(0.95, 1.05, nb)
+
+    h, g, dh, dg = opf_consfcn(x, om, Ybus, Yf, Yt, ppopt, il)
+    h_numba, g_numba, dh_numba, dg_numba = opf_consfcn_numba(x, om, d)
+    assert np.allclose(h.ravel(), h_numba)
+    assert np.allclose(g, g_numba)
+    assert abs(dh - dh_numba).max() < 1e-8 * abs(dh).max()
+    assert abs(dg - dg_numba).max() < 1e-8 * abs(dg).max()
+
+    lmbda = {"eqnonlin": rng.randn(2 * nb), "ineqnonlin": rng.rand(2 * nl2)}
+    lmbda["ineqnonlin"][::3] = 0
+    Lxx = opf_hessfcn(x, lmbda, om, Ybus, Yf, Yt, ppopt, il, 1e-4)
+    Lxx_numba = opf_hessfcn_numba(x, lmbda, om, d, 1e-4)
+    assert abs(Lxx - Lxx_numba).max() < 1e-8 * abs(Lxx).max()
+
+    # the pattern does not depend on the multipliers
+    lmbda["ineqnonlin"][:] = 0
+    Lxx_zero_mu = opf_hessfcn_numba(x, lmbda, om, d, 1e-4)
+    assert np.array_equal(Lxx_zero_mu.indices, Lxx_numba.indices)
+    assert np.array_equal(Lxx_zero_mu.indptr, Lxx_numba.indptr)
+
+
+def test_runopp_numba_equals_pypower_derivatives(cigre_opf_net):
+    net = cigre_opf_net
+    ref = copy.deepcopy(net)
+    pp.runopp(net, numba=True)
+    pp.runopp(ref, numba=False)
+    assert net.OPF_converged
+    assert np.isclose(net.res_cost, ref.res_cost, rtol=1e-6)
+    assert np.allclose(net.res_bus.vm_pu, ref.res_bus.vm_pu, atol=1e-6)
+    assert np.allclose(net.res_sgen.p_kw, ref.res_sgen.p_kw, atol=1e-2)
+    assert np.allclose(net.res_line.loading_percent, ref.res_line.loading_percent, atol=1e-4)
+
+
+def test_kkt_matrix_keeps_pattern():
+    M = csr_matrix(np.array([[2., 1., 0.], [1., 3., 0.], [0., 0., 4.]]))
+    dg = csr_matrix(np.array([[1.], [0.], [1.]]))
+    kkt = {}
+    Ab = _kkt_matrix(M, dg, 1, kkt)
+    assert np.allclose(Ab.toarray(), [[2, 1, 0, 1], [1, 3, 0, 0], [0, 0, 4, 1], [1, 0, 1, 0]])
+    keys = kkt["keys"]
+
+    # an entry which is dropped from M keeps its place in the KKT matrix
+    M = csr_matrix(np.array([[2., 0., 0.], [0., 3., 0.], [0., 0., 5.]]))
+    Ab = _kkt_matrix(M, dg, 1, kkt)
+    assert kkt["keys"] is keys
+    assert Ab.nnz == len(keys)
+    assert np.allclose(Ab.toarray(), [[2, 0, 0, 1], [0, 3, 0, 0], [0, 0, 5, 1], [1, 0, 1, 0]])
+
+    # a new entry extends the pattern
+    M = csr_matrix(np.array([[2., 0., 1.], [0., 3., 0.], [1., 0., 5.]]))
+    Ab = _kkt_matrix(M, dg, 1, kkt)
+    assert len(kkt["keys"]) == len(keys) + 2
+    assert np.allclose(Ab.toarray(), [[2, 0, 1, 1], [0, 3, 0, 0], [1, 0, 5, 1], [1, 0, 1, 0]])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-xs"])
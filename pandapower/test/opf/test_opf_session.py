@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import copy
+
+import numpy as np
+import pytest
+
+import pandapower as pp
+import pandapower.networks as nw
+from pandapower.opf_session import OPFSession
+
+try:
+    import pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def cigre_opf_net():
+    net = nw.create_cigre_network_mv(with_der="pv_wind")
+    net.bus["max_vm_pu"] = 1.1
+    net.bus["min_vm_pu"] = 0.9
+    net.line["max_loading_percent"] = 200
+    net.trafo["max_loading_percent"] = 100
+    net.sgen["min_p_kw"] = -net.sgen.sn_kva
+    net.sgen["max_p_kw"] = 0
+    net.sgen["max_q_kvar"] = 10
+    net.sgen["min_q_kvar"] = -10
+    net.sgen["controllable"] = True
+    net.sgen.loc[net.sgen.bus == 4, "in_service"] = False
+    net.sgen.loc[net.sgen.bus == 6, "controllable"] = False
+    net.load["controllable"] = False
+    net.load["min_p_kw"] = 10e3
+    net.load["max_p_kw"] = 20e3
+    net.load["min_q_kvar"] = 0
+    net.load["max_q_kvar"] = 5e3
+    net.load.loc[0, "controllable"] = True
+    for i in net.sgen.index[net.sgen.controllable]:
+        pp.create_polynomial_cost(net, i, "sgen", np.array([1e-2, -1, 0]))
+    pp.create_polynomial_cost(net, 0, "load", np.array([1e-3, -2, 0]))
+    pp.create_polynomial_cost(net, 0, "ext_grid", np.array([1e-3, 2, 0]))
+    return net
+
+
+def assert_results_equal(net, ref):
+    assert net.OPF_converged
+    assert np.isclose(net.res_cost, ref.res_cost, rtol=1e-5)
+    assert np.allclose(net.res_bus.vm_pu, ref.res_bus.vm_pu, atol=1e-4)
+    assert np.allclose(net.res_sgen.p_kw, ref.res_sgen.p_kw, atol=1)
+    assert np.allclose(net.res_load.p_kw, ref.res_load.p_kw, atol=1)
+    assert np.allclose(net.res_ext_grid.p_kw, ref.res_ext_grid.p_kw, atol=5)
+
+
+def test_opf_session_sequence(cigre_opf_net):
+    net = cigre_opf_net
+    ref = copy.deepcopy(net)
+    p_load = net.load.p_kw.values.copy()
+    sn_kva = net.sgen.sn_kva.values
+    rng = np.random.RandomState(1)
+
+    session = OPFSession(net)
+    iterations = []
+    for step in range(4):
+        # loads, available sgen power, flexibility of the controllable load and the ext_grid
+        # price change in every step
+        min_p_kw = -sn_kva * rng.uniform(0.2, 1., len(sn_kva))
+        for n in [net, ref]:
+            n.load["p_kw"] = p_load * (0.6 + 0.1 * step)
+            n.sgen["min_p_kw"] = min_p_kw
+            n.load.loc[0, "max_p_kw"] = 20e3 - 2e3 * step
+            n.polynomial_cost.at[n.polynomial_cost.index[-1], "c"] = \
+                np.array([[1e-3, 1.5 + step, 0]])
+        session.run()
+        iterations.append(session.iterations)
+        pp.runopp(ref)
+        assert_results_equal(net, ref)
+
+    # warm started runs need fewer iterations than the first run
+    assert max(iterations[1:]) < iterations[0]
+
+
+def test_opf_session_dcline_pwl():
+    net = pp.create_empty_network()
+    b5 = pp.create_bus(net, 380)
+    b3 = pp.create_bus(net, 380)
+    b2 = pp.create_bus(net, 380)
+    b4 = pp.create_bus(net, 380)
+    b1 = pp.create_bus(net, 380)
+    pp.create_line(net, b1, b2, 30, "490-AL1/64-ST1A 380.0")
+    pp.create_line(net, b3, b4, 20, "490-AL1/64-ST1A 380.0")
+    pp.create_line(net, b4, b5, 20, "490-AL1/64-ST1A 380.0")
+    pp.create_dcline(net, name="dc line", from_bus=b2, to_bus=b3, p_kw=0.2e6, loss_percent=1.0,
+                     loss_kw=500, vm_from_pu=1.01, vm_to_pu=1.012, max_p_kw=1e6)
+    pp.create_ext_grid(net, b1, 1.02, max_p_kw=0., min_p_kw=-1e12)
+    pp.create_ext_grid(net, b5, 1.02, max_p_kw=0., min_p_kw=-1e12)
+    pp.create_load(net, bus=b4, p_kw=800e3, controllable=False)
+    pp.create_piecewise_linear_cost(net, 0, "ext_grid",
+                                    np.array([[-1e12, 0.1 * 1e12], [1e12, -.1 * 1e12]]))
+    pp.create_piecewise_linear_cost(net, 1, "ext_grid",
+                                    np.array([[-1e12, 0.08 * 1e12], [1e12, -.08 * 1e12]]))
+    net.bus["max_vm_pu"] = 2
+    net.bus["min_vm_pu"] = 0
+    net.line["max_loading_percent"] = 1000
+    ref = copy.deepcopy(net)
+
+    session = OPFSession(net)
+    for p_kw, price in [(800e3, 0.08), (700e3, 0.12), (900e3, 0.09)]:
+        for n in [net, ref]:
+            n.load["p_kw"] = p_kw
+            n.piecewise_linear_cost.at[1, "f"] = np.array([[price * 1e12, -price * 1e12]])
+        session.run()
+        pp.runopp(ref)
+        assert net.OPF_converged
+        assert np.isclose(net.res_cost, ref.res_cost, rtol=1e-5)
+        assert np.allclose(net.res_ext_grid.p_kw, ref.res_ext_grid.p_kw, atol=1)
+        assert np.allclose(net.res_dcline.p_from_kw, ref.res_dcline.p_from_kw, atol=1)
+        # the auxiliary dcline gens are removed after each run
+        assert len(net.gen) == 0
+
+
+def test_opf_session_cost_structure_change(cigre_opf_net):
+    net = cigre_opf_net
+    session = OPFSession(net)
+    session.run()
+    om = session.om
+
+    # a piecewise linear cost instead of the polynomial ext_grid cost builds the model again
+    net.ext_grid["min_p_kw"] = -1e5
+    net.ext_grid["max_p_kw"] = 1e5
+    net.polynomial_cost.drop(net.polynomial_cost.index[-1], inplace=True)
+    pp.create_piecewise_linear_cost(net, 0, "ext_grid",
+                                    np.array([[-1e5, 2e5], [0, 0], [1e5, -1e5]]))
+    ref = copy.deepcopy(net)
+    session.run()
+    assert session.om is not om
+    pp.runopp(ref)
+    assert_results_equal(net, ref)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-xs"])
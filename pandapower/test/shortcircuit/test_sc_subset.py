@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import numpy as np
+import pytest
+
+import pandapower.networks as nw
+import pandapower.shortcircuit as sc
+import pandapower.shortcircuit.impedance as impedance
+
+
+@pytest.fixture
+def meshed_net():
+    net = nw.mv_oberrhein()
+    net.ext_grid["s_sc_max_mva"] = 1000.
+    net.ext_grid["rx_max"] = 0.1
+    net.sgen["sn_kva"] = abs(net.sgen.p_kw) * 1.1
+    net.sgen["k"] = 1.2
+    return net
+
+
+def test_bus_subset(meshed_net):
+    net = meshed_net
+    sc.calc_sc(net, ip=True, ith=True, r_fault_ohm=1.)
+    res_all = net.res_bus_sc.copy()
+
+    buses = net.bus.index[[5, 17, 42, 100]]
+    sc.calc_sc(net, ip=True, ith=True, r_fault_ohm=1., bus=buses)
+    assert np.array_equal(net.res_bus_sc.index.values, buses)
+    assert np.allclose(net.res_bus_sc.values, res_all.loc[buses].values)
+
+    sc.calc_sc(net, ip=True, ith=True, r_fault_ohm=1., bus=buses[0])
+    assert len(net.res_bus_sc) == 1
+    assert np.allclose(net.res_bus_sc.values, res_all.loc[[buses[0]]].values)
+
+
+def test_bus_subset_invalid(meshed_net):
+    net = meshed_net
+    with pytest.raises(UserWarning, match="not in net.bus"):
+        sc.calc_sc(net, bus=[net.bus.index[0], net.bus.index.max() + 1000])
+
+    net.bus.loc[net.bus.index[3], "in_service"] = False
+    with pytest.raises(UserWarning, match="out of service"):
+        sc.calc_sc(net, bus=net.bus.index[:5])
+
+
+def test_zbus_blocks(meshed_net):
+    net = meshed_net
+    sc.calc_sc(net, branch_results=True)
+    res_bus, res_line = net.res_bus_sc.copy(), net.res_line_sc.copy()
+
+    block_entries = impedance.ZBUS_BLOCK_ENTRIES
+    impedance.ZBUS_BLOCK_ENTRIES = 10 * len(net.bus)
+    try:
+        sc.calc_sc(net, branch_results=True)
+    finally:
+        impedance.ZBUS_BLOCK_ENTRIES = block_entries
+    assert np.allclose(net.res_bus_sc.values, res_bus.values)
+    assert np.allclose(net.res_line_sc.values, res_line.values, equal_nan=True)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, "-xs"])
@@ -24,27 +24,52 @@ def feeder_network():
     return net
 
 
-def test_determine_stubs(feeder_network):
+@pytest.mark.parametrize("library", ["networkx", "scipy"])
+def test_determine_stubs(feeder_network, library):
     net = feeder_network
     sec_bus = pp.create_bus(net, vn_kv=20.)
     sec_line = pp.create_line(net, 3, sec_bus, length_km=3, std_type="NA2XS2Y 1x185 RM/25 12/20 kV")
-    top.determine_stubs(net)
+    top.determine_stubs(net, library=library)
     assert not np.any(net.bus.on_stub.loc[set(net.bus.index) - {sec_bus}].values)
     assert not np.any(net.line.is_stub.loc[set(net.line.index) - {sec_line}].values)
     assert net.bus.on_stub.at[sec_bus]
     assert net.line.is_stub.at[sec_line]
 
 
-def test_distance(feeder_network):
+@pytest.mark.parametrize("library", ["networkx", "scipy"])
+def test_determine_stubs_meshed(library):
+    # a meshed area (buses 1, 2, 3) behind a single line and a bus with two parallel lines, which
+    # count as one connection
+    net = pp.create_empty_network()
+    for _ in range(5):
+        pp.create_bus(net, vn_kv=20.)
+    pp.create_ext_grid(net, 0)
+    for fb, tb in [(1, 3), (1, 2), (0, 1), (2, 3), (0, 4), (4, 0)]:
+        pp.create_line(net, fb, tb, length_km=1., std_type="NA2XS2Y 1x185 RM/25 12/20 kV")
+    stubs = top.determine_stubs(net, library=library)
+    assert stubs == {1, 2, 3, 4}
+    assert net.bus.on_stub.values.tolist() == [False, True, True, True, True]
+    assert net.line.is_stub.all()
+
+    # with a second connection to the external grid, only the bus at the parallel lines is on a
+    # stub
+    pp.create_line(net, 3, 0, length_km=1., std_type="NA2XS2Y 1x185 RM/25 12/20 kV")
+    stubs = top.determine_stubs(net, library=library)
+    assert stubs == {4}
+    assert net.line.is_stub.values.tolist() == [False, False, False, False, True, True, False]
+
+
+@pytest.mark.parametrize("library", ["networkx", "scipy"])
+def test_distance(feeder_network, library):
     net = feeder_network
-    dist = top.calc_distance_to_bus(net, 0)
+    dist = top.calc_distance_to_bus(net, 0, library=library)
     assert np.allclose(dist.sort_index().values, [0, 12, 13, 5])
 
-    dist = top.calc_distance_to_bus(net, 0, notravbuses={3})
+    dist = top.calc_distance_to_bus(net, 0, notravbuses={3}, library=library)
     assert np.allclose(dist.sort_index().values, [0, 12, 18, 5])
 
     pp.create_switch(net, bus=3, element=2, et="l", closed=False)
-    dist = top.calc_distance_to_bus(net, 0)
+    dist = top.calc_distance_to_bus(net, 0, library=library)
     assert np.allclose(dist.sort_index().values, [0, 12, 18, 5])
 
 
@@ -122,6 +147,11 @@ def test_unsupplied_buses_with_switches():
     ub = top.unsupplied_buses(net, respect_switches=False)
     assert ub == {14}
 
+    ub = top.unsupplied_buses(net, library="scipy")
+    assert ub == {1, 2, 3, 7, 8, 9, 10, 14}
+    ub = top.unsupplied_buses(net, respect_switches=False, library="scipy")
+    assert ub == {14}
+
 
 def test_graph_characteristics(feeder_network):
     # adapt network
@@ -161,6 +191,27 @@ def test_graph_characteristics(feeder_network):
                                 12: [(2, 11)], 13: [(2, 11)]}
     assert notn1_areas == {8: {9, 10}, 3: {4, 5, 6}, 2: {11, 12, 13}}
 
+    g = top.create_csgraph(net, respect_switches=False)
+    stubs = top.determine_stubs(net, mg=g)
+    assert stubs == stub_buses
+
+
+def test_csgraph_connected_components():
+    net = pp.networks.mv_oberrhein()
+    net.bus.loc[net.bus.index[5:10], "in_service"] = False
+    mg = top.create_nxgraph(net)
+    g = top.create_csgraph(net)
+    assert set(g.nodes()) == set(mg.nodes())
+
+    for notravbuses in [set(), set(net.bus.index[10::7])]:
+        cc_nx = sorted(sorted(cc) for cc in top.connected_components(mg, notravbuses))
+        cc_sp = sorted(sorted(cc) for cc in top.connected_components(g, notravbuses))
+        assert cc_nx == cc_sp
+
+        bus = net.ext_grid.bus.iloc[0]
+        assert set(top.connected_component(mg, bus, notravbuses)) == \
+            set(top.connected_component(g, bus, notravbuses))
+
 
 if __name__ == '__main__':
     pass
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2018 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+from pandapower.build_bus import _controllable_to_bool
+from pandapower.idx_brch import F_BUS, T_BUS, PF, QF, PT, QT
+from pandapower.idx_bus import PD, QD, VM, VA, BASE_KV
+from pandapower.idx_gen import PG, QG
+from pandapower.pd2ppc import _ppc2ppci_index
+from pandapower.powerflow import LoadflowNotConverged, _init_ppci, _run_pf_algorithm
+from pandapower.run import _run_base_case
+
+try:
+    import pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+
+def run_timeseries(net, profiles, **kwargs):
+    """
+    Runs a series of power flows in which only the active and reactive power of loads, static
+    generators and storages change from one time step to the next.
+
+    The network is converted to the internal pypower format only once. The admittance matrix is
+    reused in all time steps (see the recycle option of runpp), only the PD / QD columns of the
+    internal bus matrix are updated and every time step is initialized with the voltages of the
+    previous one. The results are not written to the res_* tables but collected in preallocated
+    (n_steps x n_elements) arrays.
+
+    INPUT:
+        **net** - The pandapower format network
+
+        **profiles** (dict) - values of the time series, the keys are tuples (element, variable)
+        with element in ["load", "sgen", "storage"] and variable in ["p_kw", "q_kvar"]. The
+        values are either numpy arrays of shape (n_steps, len(net[element])) with the columns in
+        the order of net[element] or pandas DataFrames with the element indices as columns.
+        Elements and variables which are not given in profiles keep their value from net.
+
+    OPTIONAL:
+        **kwargs** - power flow options that are passed to runpp (e.g. algorithm, tolerance_kva,
+        max_iteration). The recycle option is ignored (with a warning). The base case power flow
+        with the values in net is carried out with these options and its results are written to
+        the res_* tables as usual.
+
+    OUTPUT:
+        **results** (dict) - contains the arrays
+
+            - "converged" (n_steps, bool) - power flow convergence of each time step
+            - "iterations" (n_steps, int) - number of iterations of each time step
+
+        and a dict for each of "res_bus", "res_line", "res_trafo" and "res_ext_grid" with one
+        (n_steps x n_elements) array per result variable. Buses that are out of service and time
+        steps that did not converge are NaN.
+
+    EXAMPLE:
+        profiles = {("load", "p_kw"): p_load, ("sgen", "p_kw"): p_sgen}
+
+        results = run_timeseries(net, profiles)
+
+        vm_pu = results["res_bus"]["vm_pu"]
+    """
+    try:
+        ppc, ppci = _run_base_case(net, constant_power_loads=False, **kwargs)
+    except LoadflowNotConverged:
+        logger.warning("base case power flow did not converge - time series is initialized "
+                       "with the initial voltages of the power flow options")
+        ppc, ppci = _init_ppci(net, None)
+
+    values, n_steps = _get_profile_values(net, profiles)
+    incidence, pd_fixed, qd_fixed = _get_injection_incidence(net, ppci, values)
+
+    results = _init_result_arrays(net, n_steps)
+    options = _get_time_step_options(net)
+
+    bus_init = ppci["bus"].copy()
+    gen_init = ppci["gen"].copy()
+    v_start = bus_init[:, [VM, VA]]
+    for step in range(n_steps):
+        bus = bus_init.copy()
+        bus[:, [VM, VA]] = v_start
+        bus[:, PD] = pd_fixed
+        bus[:, QD] = qd_fixed
+        for (element, variable), val in values.items():
+            column = PD if variable == "p_kw" else QD
+            bus[:, column] += incidence[element] * val[step]
+        ppci["bus"] = bus
+        ppci["gen"] = gen_init.copy()
+
+        ppci = _run_pf_algorithm(ppci, options, VERBOSE=0)
+        results["converged"][step] = ppci["success"]
+        results["iterations"][step] = ppci["iterations"]
+        if ppci["success"]:
+            _write_time_step_results(net, ppci, results, step)
+            v_start = ppci["bus"][:, [VM, VA]]
+        else:
+            # do not initialize the next time step with a diverged voltage vector
+            v_start = bus_init[:, [VM, VA]]
+
+    n_failed = n_steps - np.sum(results["converged"])
+    if n_failed:
+        logger.warning("power flow did not converge in %i of %i time steps" % (n_failed, n_steps))
+    return results
+
+
+def _get_profile_values(net, profiles, elements=("load", "sgen", "storage"),
+                        variables=("p_kw", "q_kvar")):
+    values = dict()
+    n_steps = None
+    for (element, variable), profile in profiles.items():
+        if element not in elements:
+            raise ValueError("time series are only supported for %s, not for %s"
+                             % (", ".join(elements), element))
+        if variable not in variables:
+            raise ValueError("time series are only supported for %s, not for %s"
+                             % (", ".join(variables), variable))
+        if isinstance(profile, pd.DataFrame):
+            # elements without a profile keep their value from net
+            columns = net[element].index.get_indexer(profile.columns)
+            if np.any(columns < 0):
+                raise ValueError("profile for %s %s contains unknown %s indices"
+                                 % (element, variable, element))
+            val = np.tile(net[element][variable].values.astype(float), (profile.shape[0], 1))
+            val[:, columns] = profile.values
+        else:
+            val = np.asarray(profile, dtype=float)
+            if val.ndim != 2 or val.shape[1] != len(net[element]):
+                raise ValueError("profile for %s %s must have shape (n_steps, %i)"
+                                 % (element, variable, len(net[element])))
+        if n_steps is None:
+            n_steps = val.shape[0]
+        elif n_steps != val.shape[0]:
+            raise ValueError("all profiles must have the same number of time steps")
+        values[(element, variable)] = val
+    if n_steps is None:
+        raise ValueError("no profiles given")
+    return values, n_steps
+
+
+def _get_injection_incidence(net, ppci, values, scaled=True):
+    """
+    Returns a sparse matrix for each element which maps the element values in kW / kvar to the
+    PD / QD of the ppci buses, as well as the part of PD and QD which is not covered by any
+    profile. In OPF mode, the controllable elements are not part of PD / QD. If scaled is False,
+    the matrices do not contain the scaling of the elements and have to be multiplied with the
+    scaled values.
+    """
+    bus_lookup = net["_pd2ppc_lookups"]["bus"]
+    n_bus = ppci["bus"].shape[0]
+    pd_fixed = ppci["bus"][:, PD].copy()
+    qd_fixed = ppci["bus"][:, QD].copy()
+    incidence = dict()
+    for element in set(element for element, _ in values.keys()):
+        df = net[element]
+        weight = net["_is_elements"][element] / 1e3
+        if scaled:
+            weight = weight * df["scaling"].values
+        if net["_options"]["mode"] == "opf" and "controllable" in df.columns:
+            weight[_controllable_to_bool(df["controllable"])] = 0.
+        bus = bus_lookup[df["bus"].values]
+        # elements at out of service buses are not part of the ppci
+        oos = (weight == 0) | (bus >= n_bus)
+        weight[oos] = 0.
+        bus[oos] = 0
+        incidence[element] = csr_matrix((weight, (bus, np.arange(len(df)))),
+                                        shape=(n_bus, len(df)))
+    for (element, variable), _ in values.items():
+        val = net[element][variable].values
+        if not scaled:
+            val = val * net[element]["scaling"].values
+        if variable == "p_kw":
+            pd_fixed -= incidence[element] * val
+        else:
+            qd_fixed -= incidence[element] * val
+    return incidence, pd_fixed, qd_fixed
+
+
+def _get_time_step_options(net):
+    options = dict(net["_options"])
+    options["recycle"] = dict(_is_elements=True, ppc=True, Ybus=True, bfsw=True)
+    # every time step is initialized with the results of the previous one
+    options["init_vm_pu"] = "results"
+    options["init_va_degree"] = "results"
+    return options
+
+
+def _init_result_arrays(net, n_steps):
+    result_variables = {"res_bus": ("bus", ["vm_pu", "va_degree"]),
+                        "res_line": ("line", ["p_from_kw", "q_from_kvar", "p_to_kw", "q_to_kvar",
+                                              "i_ka", "loading_percent"]),
+                        "res_trafo": ("trafo", ["p_hv_kw", "q_hv_kvar", "p_lv_kw", "q_lv_kvar",
+                                                "loading_percent"]),
+                        "res_ext_grid": ("ext_grid", ["p_kw", "q_kvar"])}
+    results = {"converged": np.zeros(n_steps, dtype=bool),
+               "iterations": np.zeros(n_steps, dtype=int)}
+    for res_element, (element, variables) in result_variables.items():
+        results[res_element] = {variable: np.full((n_steps, len(net[element])), np.nan)
+                                for variable in variables}
+    return results
+
+
+def _write_time_step_results(net, ppci, results, step):
+    bus = ppci["bus"]
+    branch = ppci["branch"]
+    n_bus = bus.shape[0]
+
+    # bus voltages
+    bus_idx = net["_pd2ppc_lookups"]["bus"][net["bus"].index.values]
+    in_ppci = (bus_idx >= 0) & (bus_idx < n_bus)
+    results["res_bus"]["vm_pu"][step, in_ppci] = bus[bus_idx[in_ppci], VM]
+    results["res_bus"]["va_degree"][step, in_ppci] = bus[bus_idx[in_ppci], VA]
+
+    # branch flows
+    br_idx = branch[:, (F_BUS, T_BUS)].real.astype(int)
+    u_ft = bus[br_idx, VM] * bus[br_idx, BASE_KV]
+    s_ft = np.sqrt(branch[:, (PF, PT)].real ** 2 + branch[:, (QF, QT)].real ** 2) * 1e3
+    i_ft = s_ft * 1e-3 / u_ft / np.sqrt(3)
+    branch_lookup = _ppc2ppci_index(ppci["internal"]["branch_is"])
+    branch_ranges = net["_pd2ppc_lookups"]["branch"]
+
+    if "line" in branch_ranges:
+        f, t = branch_ranges["line"]
+        _write_branch_results(results["res_line"], step, branch, i_ft, branch_lookup[f:t],
+                              ["p_from_kw", "q_from_kvar", "p_to_kw", "q_to_kvar"])
+        res_line = results["res_line"]
+        line = net["line"]
+        i_max = line["max_i_ka"].values * line["df"].values * line["parallel"].values
+        res_line["loading_percent"][step] = res_line["i_ka"][step] / i_max * 100
+
+    if "trafo" in branch_ranges:
+        f, t = branch_ranges["trafo"]
+        ppci_idx = branch_lookup[f:t]
+        _write_branch_results(results["res_trafo"], step, branch, i_ft, ppci_idx,
+                              ["p_hv_kw", "q_hv_kvar", "p_lv_kw", "q_lv_kvar"])
+        trafo = net["trafo"]
+        is_br = ppci_idx >= 0
+        if net["_options"]["trafo_loading"] == "current":
+            vns = np.vstack([trafo["vn_hv_kv"].values, trafo["vn_lv_kv"].values]).T
+            lds_trafo = i_ft[ppci_idx[is_br]] * vns[is_br] * 1000. * np.sqrt(3) \
+                        / trafo["sn_kva"].values[is_br, np.newaxis] * 100.
+        else:
+            lds_trafo = s_ft[ppci_idx[is_br]] / trafo["sn_kva"].values[is_br, np.newaxis] * 100.
+        loading = np.zeros(len(trafo))
+        loading[is_br] = np.max(lds_trafo, axis=1)
+        results["res_trafo"]["loading_percent"][step] = \
+            loading / trafo["parallel"].values / trafo["df"].values
+
+    # ext_grid infeed
+    eg_is = net["_is_elements"]["ext_grid"]
+    gen_lookup = _ppc2ppci_index(ppci["internal"]["gen_is"])
+    gen_idx = gen_lookup[net["_pd2ppc_lookups"]["ext_grid"][net["ext_grid"].index.values[eg_is]]]
+    res_eg = results["res_ext_grid"]
+    res_eg["p_kw"][step] = 0.
+    res_eg["q_kvar"][step] = 0.
+    res_eg["p_kw"][step, eg_is] = -ppci["gen"][gen_idx, PG] * 1e3
+    res_eg["q_kvar"][step, eg_is] = -ppci["gen"][gen_idx, QG] * 1e3
+
+
+def _write_branch_results(res, step, branch, i_ft, ppci_idx, variables):
+    is_br = ppci_idx >= 0
+    br = branch[ppci_idx[is_br]]
+    for variable, column in zip(variables, (PF, QF, PT, QT)):
+        res[variable][step] = 0.
+        res[variable][step, is_br] = br[:, column].real * 1e3
+    if "i_ka" in res:
+        res["i_ka"][step] = 0.
+        with np.errstate(invalid='ignore'):
+            res["i_ka"][step, is_br] = np.max(i_ft[ppci_idx[is_br]], axis=1)
@@ -15,7 +15,6 @@ from pandapower.create import create_empty_network, create_piecewise_linear_cost
     create_line_from_parameters, create_impedance
 from pandapower.opf.validate_opf_input import _check_necessary_opf_parameters
 from pandapower.run import runpp
-from pandapower.topology import unsupplied_buses
 
 try:
     import pplog as logging
@@ -1085,21 +1084,42 @@ def pp_elements(bus=True, bus_elements=True, branch_elements=True, res_elements=
     return pp_elms
 
 
+def _index_array(indices):
+    """ Returns the given indices (scalar, list, set, pandas index or array) as numpy array. """
+    if isinstance(indices, (set, frozenset)):
+        indices = list(indices)
+    return np.atleast_1d(np.asarray(indices))
+
+
+def _element_bus_columns(bus_elements=True, branch_elements=True):
+    """ Returns a dict of the elements (without switches) and the columns of the buses they are
+    connected to. """
+    columns = defaultdict(list)
+    for element, column in sorted(element_bus_tuples(bus_elements=bus_elements,
+                                                     branch_elements=branch_elements)):
+        if element != "switch":
+            columns[element].append(column)
+    return columns
+
+
 def drop_buses(net, buses, drop_elements=True):
     """
     Drops specified buses, their bus_geodata and by default drops all elements connected to
     them as well.
     """
+    buses = _index_array(buses)
     net["bus"].drop(buses, inplace=True)
-    net["bus_geodata"].drop(set(buses) & set(net["bus_geodata"].index), inplace=True)
+    net["bus_geodata"].drop(net["bus_geodata"].index[np.isin(net["bus_geodata"].index.values,
+                                                             buses)], inplace=True)
     if drop_elements:
         drop_elements_at_buses(net, buses)
 
 
 def drop_switches_at_buses(net, buses):
-    i = net["switch"][(net["switch"]["bus"].isin(buses))
-                      | ((net["switch"]["element"].isin(buses))
-                         & (net["switch"]["et"] == "b"))].index
+    buses = _index_array(buses)
+    i = net["switch"].index[np.isin(net["switch"]["bus"].values, buses) |
+                            (np.isin(net["switch"]["element"].values, buses) &
+                             (net["switch"]["et"].values == "b"))]
     net["switch"].drop(i, inplace=True)
     logger.info("dropped %d switches" % len(i))
 
@@ -1108,21 +1128,22 @@ def drop_elements_at_buses(net, buses):
     """
     drop elements connected to given buses
     """
-    for element, column in element_bus_tuples():
-        if element == "switch":
-            drop_switches_at_buses(net, buses)
-
-        elif any(net[element][column].isin(buses)):
-            eid = net[element][net[element][column].isin(buses)].index
-            if element == 'line':
-                drop_lines(net, eid)
-            elif element == 'trafo' or element == 'trafo3w':
-                drop_trafos(net, eid, table=element)
-            else:
-                n_el = net[element].shape[0]
-                net[element].drop(eid, inplace=True)
-                if net[element].shape[0] < n_el:
-                    logger.info("dropped %d %s elements" % (n_el - net[element].shape[0], element))
+    buses = _index_array(buses)
+    drop_switches_at_buses(net, buses)
+    for element, columns in _element_bus_columns().items():
+        connected = np.zeros(len(net[element]), dtype=bool)
+        for column in columns:
+            connected |= np.isin(net[element][column].values, buses)
+        if not connected.any():
+            continue
+        eid = net[element].index[connected]
+        if element == 'line':
+            drop_lines(net, eid)
+        elif element == 'trafo' or element == 'trafo3w':
+            drop_trafos(net, eid, table=element)
+        else:
+            net[element].drop(eid, inplace=True)
+            logger.info("dropped %d %s elements" % (len(eid), element))
 
 
 def drop_trafos(net, trafos, table="trafo"):
@@ -1216,6 +1237,7 @@ def set_isolated_areas_out_of_service(net):
     """
     Set all isolated buses and all elements connected to isolated buses out of service.
     """
+    from pandapower.topology import unsupplied_buses
     closed_switches = set()
     unsupplied = unsupplied_buses(net)
     logger.info("set %d of %d unsupplied buses out of service" % (
@@ -1244,69 +1266,165 @@ def set_isolated_areas_out_of_service(net):
         logger.info('closed %d switches: %s' % (len(closed_switches), closed_switches))
 
 
+def _elements_in_groups(net, element, columns, bus, group, keys):
+    """
+    Returns the positions of the rows of net[element] whose buses (columns) all belong to the
+    same group and the group numbers. bus and group are the positions in net.bus and the groups of
+    the bus-group pairs sorted by bus, keys are the pairs as group * len(net.bus) + bus.
+    """
+    n = len(net.bus)
+    first = net.bus.index.get_indexer(net[element][columns[0]].values)
+    first[first < 0] = n  # buses which do not exist belong to no group
+    start = np.searchsorted(bus, first, "left")
+    count = np.searchsorted(bus, first, "right") - start
+    rows = np.repeat(np.arange(len(first)), count)
+    pairs = np.repeat(start - np.cumsum(count) + count, count) + np.arange(count.sum())
+    grp = group[pairs]
+    for column in columns[1:]:
+        pos = net.bus.index.get_indexer(net[element][column].values[rows])
+        inside = (pos >= 0) & np.isin(grp * n + pos, keys)
+        rows, grp = rows[inside], grp[inside]
+    return rows, grp
+
+
+def _select_subnets(net, buses, groups, n_groups, include_results=False):
+    """
+    Selects the subnets of several groups of buses in one pass over the element tables. buses and
+    groups are arrays of bus indices and of the numbers (0 ... n_groups - 1) of the groups they
+    belong to, a bus can belong to several groups. The elements of a group are the elements whose
+    buses all belong to the group and the switches between its buses, lines and trafos.
+    Returns a list of pandapowerNets.
+    """
+    n = len(net.bus)
+    pos = net.bus.index.get_indexer(buses)
+    keys = np.unique(groups[pos >= 0] * n + pos[pos >= 0])
+    group, bus = keys // n, keys % n
+    order = np.argsort(bus, kind="mergesort")
+    bus, group = bus[order], group[order]
+
+    # rows and groups of the selected elements
+    selected = {"bus": (bus, group)}
+    for element, columns in _element_bus_columns().items():
+        if element in net:
+            selected[element] = _elements_in_groups(net, element, columns, bus, group, keys)
+    rows, grp = _elements_in_groups(net, "switch", ["bus"], bus, group, keys)
+    et = net.switch.et.values[rows]
+    element = net.switch.element.values[rows]
+    keep = np.zeros(len(rows), dtype=bool)
+    for elm_et, elm in [("b", "bus"), ("l", "line"), ("t", "trafo")]:
+        is_et = et == elm_et
+        elm_pos = net[elm].index.get_indexer(element[is_et])
+        elm_rows, elm_grp = selected[elm]
+        keep[is_et] = (elm_pos >= 0) & np.isin(grp[is_et] * len(net[elm]) + elm_pos,
+                                               elm_grp * len(net[elm]) + elm_rows)
+    selected["switch"] = (rows[keep], grp[keep])
+    for geo, elm in [("bus_geodata", "bus"), ("line_geodata", "line")]:
+        if geo in net:
+            elm_rows, elm_grp = selected[elm]
+            geo_pos = net[geo].index.get_indexer(net[elm].index.values[elm_rows])
+            selected[geo] = (geo_pos[geo_pos >= 0], elm_grp[geo_pos >= 0])
+    if include_results:
+        for table in list(net.keys()):
+            if not table.startswith("res_") or not isinstance(net[table], pd.DataFrame):
+                continue
+            elm = table[4:]
+            for suffix in ("_est", "_sc"):
+                if elm.endswith(suffix):
+                    elm = elm[:-len(suffix)]
+            if elm not in selected:
+                continue
+            elm_rows, elm_grp = selected[elm]
+            res_pos = net[table].index.get_indexer(net[elm].index.values[elm_rows])
+            selected[table] = (res_pos[res_pos >= 0], elm_grp[res_pos >= 0])
+
+    # all other tables of the subnets are empty
+    empty = create_empty_network()
+    subnets = [pandapowerNet({key: value.copy() if isinstance(value, pd.DataFrame) else
+                              copy.deepcopy(value) for key, value in empty.items()
+                              if key != "std_types"}) for _ in range(n_groups)]
+    for subnet in subnets:
+        subnet["std_types"] = copy.deepcopy(net["std_types"])
+    for table, (rows, grp) in selected.items():
+        order = np.lexsort((rows, grp))
+        rows = rows[order]
+        bounds = np.searchsorted(grp[order], np.arange(n_groups + 1))
+        for g, subnet in enumerate(subnets):
+            subnet[table] = net[table].iloc[rows[bounds[g]:bounds[g + 1]]]
+    return subnets
+
+
 def select_subnet(net, buses, include_switch_buses=False, include_results=False,
                   keep_everything_else=False):
     """
     Selects a subnet by a list of bus indices and returns a net with all elements
     connected to them.
     """
-    buses = set(buses)
+    buses = np.unique(_index_array(buses))
     if include_switch_buses:
         # we add both buses of a connected line, the one selected is not switch.bus
 
-        # for all line switches
-        for _, s in net["switch"].query("et=='l'").iterrows():
-            # get from/to-bus of the connected line
-            fb = net["line"]["from_bus"].at[s["element"]]
-            tb = net["line"]["to_bus"].at[s["element"]]
-            # if one bus of the line is selected and its not the switch-bus, add the other bus
-            if fb in buses and s["bus"] != fb:
-                buses.add(tb)
-            if tb in buses and s["bus"] != tb:
-                buses.add(fb)
-
-    p2 = create_empty_network()
-
-    p2.bus = net.bus.loc[buses]
-    for elm in pp_elements(bus=False, bus_elements=True, branch_elements=False, res_elements=False):
-        p2[elm] = net[elm][net[elm].bus.isin(buses)]
-
-    p2.line = net.line[(net.line.from_bus.isin(buses)) & (net.line.to_bus.isin(buses))]
-    p2.dcline = net.dcline[(net.dcline.from_bus.isin(buses)) & (net.dcline.to_bus.isin(buses))]
-    p2.trafo = net.trafo[(net.trafo.hv_bus.isin(buses)) & (net.trafo.lv_bus.isin(buses))]
-    p2.trafo3w = net.trafo3w[(net.trafo3w.hv_bus.isin(buses)) & (net.trafo3w.mv_bus.isin(buses)) &
-                             (net.trafo3w.lv_bus.isin(buses))]
-    p2.impedance = net.impedance[(net.impedance.from_bus.isin(buses)) &
-                                 (net.impedance.to_bus.isin(buses))]
-
-    if include_results:
-        for table in net.keys():
-            if net[table] is None:
-                continue
-            elif table == "res_bus":
-                p2[table] = net[table].loc[buses]
-            elif table.startswith("res_"):
-                p2[table] = net[table].loc[p2[table.split("res_")[1]].index]
-    if "bus_geodata" in net:
-        p2["bus_geodata"] = net["bus_geodata"].loc[net["bus_geodata"].index.isin(buses)]
-    if "line_geodata" in net:
-        lines = p2.line.index
-        p2["line_geodata"] = net["line_geodata"].loc[net["line_geodata"].index.isin(lines)]
-
-    # switches
-    si = [i for i, s in net["switch"].iterrows()
-          if s["bus"] in buses and
-          ((s["et"] == "b" and s["element"] in p2["bus"].index) or
-           (s["et"] == "l" and s["element"] in p2["line"].index) or
-           (s["et"] == "t" and s["element"] in p2["trafo"].index))]
-    p2["switch"] = net["switch"].loc[si]
+        # for all line switches get from/to-bus of the connected line
+        line_switch = net["switch"].et.values == "l"
+        line = net["line"].index.get_indexer(net["switch"].element.values[line_switch])
+        fb = net["line"]["from_bus"].values[line]
+        tb = net["line"]["to_bus"].values[line]
+        sb = net["switch"].bus.values[line_switch]
+        # if one bus of the line is selected and its not the switch-bus, add the other bus
+        buses = np.union1d(buses, np.concatenate((tb[np.isin(fb, buses) & (sb != fb)],
+                                                  fb[np.isin(tb, buses) & (sb != tb)])))
+
+    p2 = _select_subnets(net, buses, np.zeros(len(buses), dtype=int), 1,
+                         include_results=include_results)[0]
     # return a pandapowerNet
     if keep_everything_else:
-        newnet = copy.deepcopy(net)
-        newnet.update(p2)
-        return pandapowerNet(newnet)
-    p2["std_types"] = copy.deepcopy(net["std_types"])
-    return pandapowerNet(p2)
+        p2.update({key: copy.deepcopy(value) for key, value in net.items() if key not in p2})
+    return p2
+
+
+def split_by_feeder(net, feeder_buses=None, respect_switches=True, include_results=False):
+    """
+    Splits a net into its feeders. A feeder consists of the buses which are connected to each
+    other without passing a feeder bus, together with the feeder buses it is connected to. The
+    feeders are determined with one graph search and all subnets are selected in one pass over the
+    element tables, which is much faster than calling select_subnet for each feeder.
+
+    INPUT:
+        **net** (pandapowerNet) - The pandapower network
+
+    OPTIONAL:
+        **feeder_buses** (iterable, None) - The buses at which the net is cut, e.g. the busbars
+            of the substations. If None, the buses of the external grids and the low voltage
+            buses of the transformers are used.
+
+        **respect_switches** (bool, True) - If True, open switches separate feeders
+
+        **include_results** (bool, False) - If True, the result tables are selected as well
+
+    OUTPUT:
+        **subnets** (list) - One pandapowerNet per feeder, which contains the elements whose
+            buses all belong to the feeder, like select_subnet. The feeder buses and their bus
+            elements (e.g. the external grids) are part of every feeder they are connected to.
+            Out of service buses and lines do not belong to any feeder.
+
+    EXAMPLE:
+        import pandapower.networks as nw
+
+        net = nw.mv_oberrhein()
+
+        feeders = pp.split_by_feeder(net)
+    """
+    from pandapower.topology import create_csgraph, connected_components
+    if feeder_buses is None:
+        feeder_buses = np.union1d(net.ext_grid.bus.values, net.trafo.lv_bus.values)
+    g = create_csgraph(net, respect_switches=respect_switches)
+    feeders = [sorted(cc) for cc in connected_components(g, notravbuses=set(
+        _index_array(feeder_buses).tolist()))]
+    if not len(feeders):
+        return []
+    feeders.sort()
+    buses = np.concatenate(feeders).astype(np.int64)
+    groups = np.repeat(np.arange(len(feeders)), [len(cc) for cc in feeders])
+    return _select_subnets(net, buses, groups, len(feeders), include_results=include_results)
 
 
 def merge_nets(net1, net2, validate=True, tol=1e-9, **kwargs):
@@ -1314,49 +1432,72 @@ def merge_nets(net1, net2, validate=True, tol=1e-9, **kwargs):
     Function to concatenate two nets into one data structure. All element tables get new,
     continuous indizes in order to avoid duplicates.
     """
-    net = copy.deepcopy(net1)
-    net1 = copy.deepcopy(net1)
-    net2 = copy.deepcopy(net2)
-    create_continuous_bus_index(net2, start=net1.bus.index.max() + 1)
     if validate:
+        # the separate power flows must not change the given nets
+        net1 = copy.deepcopy(net1)
+        net2 = copy.deepcopy(net2)
         runpp(net1, **kwargs)
         runpp(net2, **kwargs)
 
-    def adapt_switches(net, element, offset=0):
-        switches = net.switch[net.switch.et == element[0]]  # element[0] == "l" for "line", ect.
-        new_index = [net[element].index.get_loc(ix) + offset
-                     for ix in switches.element.values]
-        if len(new_index):
-            net.switch.loc[switches.index, "element"] = new_index
-
-    for element, table in net.items():
-        if element.startswith("_") or element.startswith("res") or element == "dtypes":
+    # continuous bus indices of net2 following the buses of net1
+    start = net1.bus.index.max() + 1
+    new_bus2 = np.arange(start, start + len(net2.bus))
+    bus_columns = _element_bus_columns()
+    bus_columns["switch"] = ["bus"]
+
+    def new_bus_indices(buses):
+        return new_bus2[net2.bus.index.get_indexer(buses)]
+
+    def adapt_switches(net, switch, offsets):
+        switch = switch.copy()
+        element = switch.element.values.copy()
+        for elm, offset in offsets.items():
+            is_et = switch.et.values == elm[0]  # elm[0] == "l" for "line", ect.
+            element[is_et] = net[elm].index.get_indexer(element[is_et]) + offset
+        switch["element"] = element
+        return switch
+
+    net = pandapowerNet()
+    for element, table in net1.items():
+        if not isinstance(table, pd.DataFrame) or element.startswith("_") or \
+                element.startswith("res") or element == "dtypes" or \
+                not (len(table) > 0 or len(net2[element]) > 0):
+            net[element] = copy.deepcopy(table)
             continue
-        if type(table) == pd.DataFrame and (len(table) > 0 or len(net2[element]) > 0):
-            if element == "switch":
-                adapt_switches(net2, "line", offset=len(net1.line))
-                adapt_switches(net1, "line")
-                adapt_switches(net2, "trafo", offset=len(net1.trafo))
-                adapt_switches(net1, "trafo")
-            if element == "line_geodata":
-                ni = [net1.line.index.get_loc(ix) for ix in net1["line_geodata"].index]
-                net1.line_geodata.set_index(np.array(ni), inplace=True)
-                ni = [net2.line.index.get_loc(ix) + len(net1.line)
-                      for ix in net2["line_geodata"].index]
-                net2.line_geodata.set_index(np.array(ni), inplace=True)
-            ignore_index = element not in ("bus", "bus_geodata", "line_geodata")
-            dtypes = net1[element].dtypes
-            try:
-                net[element] = pd.concat([net1[element], net2[element]], ignore_index=ignore_index,
-                                         sort=True)
-            except:
-                # pandas legacy < 0.21
-                net[element] = pd.concat([net1[element], net2[element]], ignore_index=ignore_index)
-            _preserve_dtypes(net[element], dtypes)
+        table1, table2 = table, net2[element]
+        if element in bus_columns:
+            table2 = table2.copy()
+            for column in bus_columns[element]:
+                table2[column] = new_bus_indices(table2[column].values)
+        if element == "bus" or element == "bus_geodata":
+            table2 = table2.copy(deep=False)
+            table2.index = new_bus_indices(table2.index.values)
+        elif element == "switch":
+            table1 = adapt_switches(net1, table1, {"line": 0, "trafo": 0})
+            table2 = adapt_switches(net2, table2, {"line": len(net1.line),
+                                                   "trafo": len(net1.trafo)})
+            is_b = table2.et.values == "b"
+            table2.loc[is_b, "element"] = new_bus_indices(table2.element.values[is_b])
+        elif element == "line_geodata":
+            # geodata of lines which do not exist are dropped
+            line1 = net1.line.index.get_indexer(table1.index.values)
+            table1 = table1.iloc[line1 >= 0]
+            table1.index = line1[line1 >= 0]
+            line2 = net2.line.index.get_indexer(table2.index.values)
+            table2 = table2.iloc[line2 >= 0]
+            table2.index = line2[line2 >= 0] + len(net1.line)
+        ignore_index = element not in ("bus", "bus_geodata", "line_geodata")
+        dtypes = net1[element].dtypes
+        try:
+            net[element] = pd.concat([table1, table2], ignore_index=ignore_index, sort=True)
+        except:
+            # pandas legacy < 0.21
+            net[element] = pd.concat([table1, table2], ignore_index=ignore_index)
+        _preserve_dtypes(net[element], dtypes)
     # update standard types of net by data of net2
     for type_ in net.std_types.keys():
         # net2.std_types[type_].update(net1.std_types[type_])  # if net1.std_types have priority
-        net.std_types[type_].update(net2.std_types[type_])
+        net.std_types[type_].update(copy.deepcopy(net2.std_types[type_]))
     if validate:
         runpp(net, **kwargs)
         dev1 = max(abs(net.res_bus.loc[net1.bus.index].vm_pu.values - net1.res_bus.vm_pu.values))
@@ -8,6 +8,8 @@ from itertools import combinations
 
 import networkx as nx
 import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
 
 try:
     import pplog as logging
@@ -173,3 +175,162 @@ def create_nxgraph(net, respect_switches=True, include_lines=True, include_trafo
                     del mg._adj[b][i]  # networkx versions 2.0
     mg.remove_nodes_from(net.bus[~net.bus.in_service].index)
     return mg
+
+
+class CsrGraph(object):
+    """
+    Sparse representation of a pandapower network's topology, which is created by create_csgraph.
+    The buses are represented by their position in net.bus, the edges (lines, impedances, trafos,
+    trafo3w and bus-bus switches) are stored as arrays, parallel edges are kept.
+
+    The graph searches connected_component, connected_components, unsupplied_buses,
+    calc_distance_to_bus and determine_stubs run on scipy.sparse.csgraph if a CsrGraph is passed
+    instead of a NetworkX graph.
+    """
+
+    def __init__(self, bus, node, notrav, f, t, weight, element_type, element):
+        self.bus = bus  # bus indices of the rows and columns of the adjacency matrix
+        self.node = node  # True for buses which are part of the graph
+        self.notrav = notrav  # True for notravbuses
+        self.f = f
+        self.t = t
+        self.weight = weight
+        self.element_type = element_type
+        self.element = element
+        self._lookup = pd.Series(np.arange(len(bus)), index=bus)
+        self._adjacency = None
+
+    def nodes(self):
+        """
+        Returns the indices of the buses in the graph.
+        """
+        return self.bus[self.node]
+
+    def positions(self, buses):
+        """
+        Returns the positions of the given bus indices in the adjacency matrix.
+        """
+        return self._lookup.loc[_bus_array(buses)].values
+
+    def adjacency(self, notravbuses=None):
+        """
+        Returns the directed adjacency matrix (scipy.sparse.csr_matrix) with the edge weights.
+        The edges which start at notravbuses are removed, for parallel edges only the smallest
+        weight is kept. Edges with zero weight are stored as explicit zeros.
+        """
+        if notravbuses is None and self._adjacency is not None:
+            return self._adjacency
+        notrav = self.notrav.copy()
+        if notravbuses is not None and len(notravbuses):
+            notrav[self.positions(notravbuses)] = True
+        f = np.concatenate((self.f, self.t))
+        t = np.concatenate((self.t, self.f))
+        weight = np.concatenate((self.weight, self.weight))
+        traversable = ~notrav[f]
+        f, t, weight = f[traversable], t[traversable], weight[traversable]
+        order = np.lexsort((weight, t, f))
+        f, t, weight = f[order], t[order], weight[order]
+        first = np.ones(len(f), dtype=bool)
+        first[1:] = (f[1:] != f[:-1]) | (t[1:] != t[:-1])
+        n = len(self.bus)
+        adj = csr_matrix((weight[first], (f[first], t[first])), shape=(n, n))
+        if notravbuses is None:
+            self._adjacency = adj
+        return adj
+
+
+def create_csgraph(net, respect_switches=True, include_lines=True, include_trafos=True,
+                   include_impedances=True, nogobuses=None, notravbuses=None):
+    """
+     Converts a pandapower network into a CsrGraph, a sparse graph representation for the graph
+     searches of scipy.sparse.csgraph. The graph has the same nodes and edges as the NetworkX graph
+     of create_nxgraph, but is created from the element tables without any loops over the
+     elements. The line lengths in km are the edge weights, all other edges have zero weight.
+
+     INPUT:
+        **net** (pandapowerNet) - variable that contains a pandapower network
+
+
+     OPTIONAL:
+        **respect_switches** (boolean, True) - True: open switches (line, trafo, bus) are being \
+            considered (no edge between nodes)
+            False: open switches are being ignored
+
+        **include_lines** (boolean, True) - determines, whether lines get converted to edges
+
+        **include_impedances** (boolean, True) - determines, whether per unit impedances
+            (net.impedance) are converted to edges
+
+        **include_trafos** (boolean, True) - determines, whether trafos get converted to edges
+
+        **nogobuses** (integer/list, None) - nogobuses are not being considered in the graph
+
+        **notravbuses** (integer/list, None) - lines connected to these buses are not being
+            considered in the graph
+
+     OUTPUT:
+        **g** (CsrGraph) - Returns the sparse graph
+
+     EXAMPLE:
+         import pandapower.topology as top
+
+         g = top.create_csgraph(net, respect_switches=False)
+         unsupplied = top.unsupplied_buses(net, mg=g)
+
+    """
+    edges = []
+
+    def add_edges(element_type, df, f, t, mask, weight=None):
+        edges.append((df[f].values[mask], df[t].values[mask],
+                      np.zeros(mask.sum()) if weight is None else weight[mask],
+                      np.full(mask.sum(), element_type, dtype=object), df.index.values[mask]))
+
+    if include_lines:
+        # lines with open switches can be excluded
+        mask = net.line.in_service.values.astype(bool)
+        if respect_switches:
+            open_line = net.switch.element[(net.switch.et == "l") & (net.switch.closed == 0)]
+            mask &= ~net.line.index.isin(open_line)
+        add_edges("l", net.line, "from_bus", "to_bus", mask, net.line.length_km.values)
+
+    if include_impedances:
+        add_edges("i", net.impedance, "from_bus", "to_bus",
+                  net.impedance.in_service.values.astype(bool))
+
+    if include_trafos:
+        mask = net.trafo.in_service.values.astype(bool)
+        if respect_switches:
+            open_trafo = net.switch.element[(net.switch.et == "t") & (net.switch.closed == 0)]
+            mask &= ~net.trafo.index.isin(open_trafo)
+        add_edges("t", net.trafo, "hv_bus", "lv_bus", mask)
+        mask = net.trafo3w.in_service.values.astype(bool)
+        for f, t in [("hv_bus", "mv_bus"), ("mv_bus", "lv_bus"), ("hv_bus", "lv_bus")]:
+            add_edges("t3", net.trafo3w, f, t, mask)
+
+    bus_switch = (net.switch.et == "b").values
+    if respect_switches:
+        bus_switch &= net.switch.closed.values.astype(bool)
+    add_edges("s", net.switch, "bus", "element", bus_switch)
+
+    bus = net.bus.index.values
+    node = net.bus.in_service.values.astype(bool)
+    if nogobuses is not None:
+        node &= ~net.bus.index.isin(_bus_array(nogobuses))
+    notrav = np.zeros(len(bus), dtype=bool)
+    if notravbuses is not None:
+        notrav = net.bus.index.isin(_bus_array(notravbuses))
+
+    lookup = pd.Series(np.arange(len(bus)), index=bus)
+    f, t, weight, element_type, element = [np.concatenate(e) for e in zip(*edges)]
+    f = lookup.loc[f].values
+    t = lookup.loc[t].values
+    # only edges between buses of the graph
+    in_graph = node[f] & node[t]
+    return CsrGraph(bus, node, notrav, f[in_graph], t[in_graph], weight[in_graph].astype(float),
+                    element_type[in_graph], element[in_graph])
+
+
+def _bus_array(buses):
+    if isinstance(buses, (set, frozenset)):
+        buses = list(buses)
+    return np.atleast_1d(np.asarray(buses, dtype=np.int64))
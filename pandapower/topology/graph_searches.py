@@ -5,9 +5,12 @@
 
 
 import networkx as nx
+import numpy as np
 import pandas as pd
+from scipy.sparse import csr_matrix, csgraph
 
-from pandapower.topology.create_graph import create_nxgraph
+from pandapower.auxiliary import subtree_ranges
+from pandapower.topology.create_graph import create_nxgraph, create_csgraph, CsrGraph, _bus_array
 
 
 def connected_component(mg, bus, notravbuses=[]):
@@ -16,6 +19,7 @@ def connected_component(mg, bus, notravbuses=[]):
 
     INPUT:
         **mg** (NetworkX graph) - NetworkX Graph or MultiGraph that represents a pandapower network.
+            If a CsrGraph (see create_csgraph) is given, the search runs on scipy.sparse.csgraph.
 
         **bus** (integer) - Index of the bus at which the search for connected components originates
 
@@ -36,6 +40,11 @@ def connected_component(mg, bus, notravbuses=[]):
 
     """
 
+    if isinstance(mg, CsrGraph):
+        for b in _csgraph_connected_component(mg, bus, notravbuses):
+            yield b
+        return
+
     yield bus
     visited = {bus}
     stack = [(bus, iter(mg[bus]))]
@@ -58,6 +67,8 @@ def connected_components(mg, notravbuses=set()):
 
      INPUT:
         **mg** (NetworkX graph) - NetworkX Graph or MultiGraph that represents a pandapower network.
+            If a CsrGraph (see create_csgraph) is given, the components are calculated with
+            scipy.sparse.csgraph.
 
 
      OPTIONAL:
@@ -77,6 +88,11 @@ def connected_components(mg, notravbuses=set()):
 
     """
 
+    if isinstance(mg, CsrGraph):
+        for cc in _csgraph_connected_components(mg, notravbuses):
+            yield cc
+        return
+
     nodes = set(mg.nodes()) - notravbuses
     while nodes:
         cc = set(connected_component(mg, nodes.pop(), notravbuses=notravbuses))
@@ -90,7 +106,7 @@ def connected_components(mg, notravbuses=set()):
 
 
 def calc_distance_to_bus(net, bus, respect_switches=True, nogobuses=None,
-                         notravbuses=None):
+                         notravbuses=None, library="networkx"):
     """
         Calculates the shortest distance between a source bus and all buses connected to it.
 
@@ -110,6 +126,10 @@ def calc_distance_to_bus(net, bus, respect_switches=True, nogobuses=None,
         **notravbuses** (integer/list, None) - lines connected to these buses are not being
                                               considered
 
+        **library** (string, "networkx") - "networkx": Dijkstra search on the NetworkX graph
+                                           "scipy": Dijkstra search on a CsrGraph with
+                                           scipy.sparse.csgraph
+
      OUTPUT:
         **dist** - Returns a pandas series with containing all distances to the source bus
                    in km.
@@ -120,12 +140,19 @@ def calc_distance_to_bus(net, bus, respect_switches=True, nogobuses=None,
          dist = top.calc_distance_to_bus(net, 5)
 
     """
+    if library == "scipy":
+        g = create_csgraph(net, respect_switches=respect_switches,
+                           nogobuses=nogobuses, notravbuses=notravbuses)
+        dist = csgraph.dijkstra(g.adjacency(), directed=True, indices=g.positions(bus)[0])
+        reached = np.isfinite(dist)
+        return pd.Series(dist[reached], index=g.bus[reached])
     g = create_nxgraph(net, respect_switches=respect_switches,
                        nogobuses=nogobuses, notravbuses=notravbuses)
     return pd.Series(nx.single_source_dijkstra_path_length(g, bus))
 
 
-def unsupplied_buses(net, mg=None, in_service_only=False, slacks=None, respect_switches=True):
+def unsupplied_buses(net, mg=None, in_service_only=False, slacks=None, respect_switches=True,
+                     library="networkx"):
     """
      Finds buses, that are not connected to an external grid.
 
@@ -134,6 +161,7 @@ def unsupplied_buses(net, mg=None, in_service_only=False, slacks=None, respect_s
 
      OPTIONAL:
         **mg** (NetworkX graph) - NetworkX Graph or MultiGraph that represents a pandapower network.
+            A CsrGraph (see create_csgraph) can be given instead.
 
         **in_service_only** (boolean, False) - Defines whether only in service buses should be
             included in unsupplied_buses.
@@ -144,6 +172,9 @@ def unsupplied_buses(net, mg=None, in_service_only=False, slacks=None, respect_s
         **respect_switches** (boolean, True) - Fixes how to consider switches - only in case of no
             given mg.
 
+        **library** (string, "networkx") - Graph which is created in case of no given mg.
+            "networkx": NetworkX MultiGraph, "scipy": CsrGraph
+
      OUTPUT:
         **ub** (set) - unsupplied buses
 
@@ -153,13 +184,18 @@ def unsupplied_buses(net, mg=None, in_service_only=False, slacks=None, respect_s
          top.unsupplied_buses(net)
     """
 
-    mg = mg or create_nxgraph(net, respect_switches=respect_switches)
+    if mg is None:
+        mg = create_csgraph(net, respect_switches=respect_switches) if library == "scipy" else \
+            create_nxgraph(net, respect_switches=respect_switches)
     if slacks is None:
         slacks = set(net.ext_grid[net.ext_grid.in_service].bus.values)
-    not_supplied = set()
-    for cc in nx.connected_components(mg):
-        if not set(cc) & slacks:
-            not_supplied.update(set(cc))
+    if isinstance(mg, CsrGraph):
+        not_supplied = _csgraph_unsupplied_buses(mg, slacks)
+    else:
+        not_supplied = set()
+        for cc in nx.connected_components(mg):
+            if not set(cc) & slacks:
+                not_supplied.update(set(cc))
 
     buses_remove = set()
     if in_service_only:
@@ -352,13 +388,20 @@ def get_2connected_buses(g, roots):
 
         **roots** - Roots of the graphsearch
     """
-    char_dict = find_graph_characteristics(g, roots, characteristics=['connected', 'stub_buses'])
-    connected, stub_buses = char_dict['connected'], char_dict['stub_buses']
-    two_connected = connected - stub_buses
+    char_dict = find_graph_characteristics(g, roots, characteristics=['connected', 'bridges'])
+    connected, bridges = char_dict['connected'], char_dict['bridges']
+    # the buses which are connected to the roots without a bridge in between. Parallel edges
+    # count as one edge, so that they are removed together with the bridge
+    h = nx.Graph(g)
+    h.remove_edges_from(bridges)
+    two_connected = set()
+    for root in roots:
+        if root in h and root not in two_connected:
+            two_connected |= nx.node_connected_component(h, root)
     return connected, two_connected
 
 
-def determine_stubs(net, roots=None, mg=None, respect_switches=False):
+def determine_stubs(net, roots=None, mg=None, respect_switches=False, library="networkx"):
     """
      Finds stubs in a network. Open switches are being ignored. Results are being written in a new
      column in the bus table ("on_stub") and line table ("is_stub") as True/False value.
@@ -371,6 +414,17 @@ def determine_stubs(net, roots=None, mg=None, respect_switches=False):
         **roots** (integer/list, None) - indices of buses that should be excluded (by default, the
                                          ext_grid buses will be set as roots)
 
+        **mg** (NetworkX graph, None) - NetworkX Graph or MultiGraph that represents a pandapower
+                                        network. A CsrGraph (see create_csgraph) can be given
+                                        instead, the stubs are then found with vectorized bridge
+                                        detection on scipy.sparse.csgraph.
+
+        **library** (string, "networkx") - Graph which is created in case of no given mg.
+                                           "networkx": NetworkX MultiGraph, "scipy": CsrGraph.
+                                           Both find the buses behind a bridge, i.e. a line or
+                                           other branch whose removal disconnects them from the
+                                           roots, and give the same results also in meshed grids
+
      EXAMPLE:
          import pandapower.topology as top
 
@@ -379,7 +433,8 @@ def determine_stubs(net, roots=None, mg=None, respect_switches=False):
 
     """
     if mg is None:
-        mg = create_nxgraph(net, respect_switches=respect_switches)
+        mg = create_csgraph(net, respect_switches=respect_switches) if library == "scipy" else \
+            create_nxgraph(net, respect_switches=respect_switches)
     # remove buses with degree lower 2 until none left
     if roots is None:
         roots = set(net.ext_grid.bus)
@@ -390,7 +445,10 @@ def determine_stubs(net, roots=None, mg=None, respect_switches=False):
     #            break
     #        mg.remove_nodes_from(dgo)
     #    n1_buses = mg.nodes()
-    _, n1_buses = get_2connected_buses(mg, roots)
+    if isinstance(mg, CsrGraph):
+        n1_buses = _csgraph_2connected_buses(mg, roots)
+    else:
+        _, n1_buses = get_2connected_buses(mg, roots)
     net.bus["on_stub"] = True
     net.bus.loc[n1_buses, "on_stub"] = False
     net.line["is_stub"] = ~((net.line.from_bus.isin(n1_buses)) & (net.line.to_bus.isin(n1_buses)))
@@ -496,3 +554,118 @@ def estimate_voltage_vector(net):
                 res_bus.va_degree.loc[res_bus.va_degree.isnull()] = 0.
                 return res_bus
     return res_bus
+
+
+def _csgraph_connected_component(g, bus, notravbuses):
+    # the search starts at bus even if it is a notravbus
+    notravbuses = set(_bus_array(notravbuses)) - {bus}
+    adj = g.adjacency(notravbuses) if len(notravbuses) else g.adjacency()
+    order = csgraph.breadth_first_order(adj, g.positions(bus)[0], directed=True,
+                                        return_predecessors=False)
+    return g.bus[order]
+
+
+def _csgraph_connected_components(g, notravbuses):
+    n = len(g.bus)
+    is_notrav = np.zeros(n, dtype=bool)
+    if len(notravbuses):
+        is_notrav[g.positions(notravbuses)] = True
+    notrav = g.notrav | is_notrav
+    trav = g.node & ~notrav
+    adj = g.adjacency(notravbuses if len(notravbuses) else None).tocoo()
+    inner = trav[adj.row] & trav[adj.col]
+    _, labels = csgraph.connected_components(
+        csr_matrix((np.ones(inner.sum()), (adj.row[inner], adj.col[inner])), shape=(n, n)),
+        directed=False)
+    # notravbuses are part of every component from which they are reached
+    reached = trav[adj.row] & notrav[adj.col]
+    buses = np.concatenate((np.flatnonzero(trav), adj.col[reached]))
+    cc_labels = np.concatenate((labels[trav], labels[adj.row[reached]]))
+    order = np.lexsort((buses, cc_labels))
+    buses, cc_labels = buses[order], cc_labels[order]
+    split = np.flatnonzero(cc_labels[1:] != cc_labels[:-1]) + 1
+    for cc in np.split(g.bus[buses], split):
+        if len(cc):
+            yield set(cc)
+    # notravbuses of the graph which are not reached from any other bus
+    lonely = g.node & g.notrav & ~is_notrav
+    lonely[adj.col[reached]] = False
+    for b in g.bus[lonely]:
+        yield {b}
+    # directly connected notravbuses
+    pairs = is_notrav[g.f] & is_notrav[g.t]
+    for f, t in set(zip(g.bus[g.f[pairs]], g.bus[g.t[pairs]])):
+        yield set([f, t])
+
+
+def _csgraph_unsupplied_buses(g, slacks):
+    n = len(g.bus)
+    slacks = _bus_array(slacks)
+    slacks = g.positions(slacks[np.in1d(slacks, g.bus)])
+    slacks = slacks[g.node[slacks]]
+    # all slacks are connected to an additional root bus
+    adj = g.adjacency().tocoo()
+    row = np.concatenate((adj.row, np.full(len(slacks), n)))
+    col = np.concatenate((adj.col, slacks))
+    reachable = csgraph.breadth_first_order(
+        csr_matrix((np.ones(len(row)), (row, col)), shape=(n + 1, n + 1)), n, directed=True,
+        return_predecessors=False)
+    not_supplied = g.node.copy()
+    not_supplied[reachable[1:]] = False
+    return set(g.bus[not_supplied])
+
+
+def _csgraph_2connected_buses(g, roots):
+    """
+    Returns all buses which are connected to the roots without a bridge in between, which are
+    the buses that are not on a stub. Parallel edges count as one edge and all roots are
+    connected to an additional root bus, as in the NetworkX search of find_graph_characteristics.
+
+    A tree edge of the bfs tree is a bridge if no other edge connects its subtree with the rest
+    of the graph. In a depth-first numbering of the bfs tree each subtree is a contiguous range,
+    so it is sufficient to compare the smallest and largest position which is linked to the
+    subtree with the range of the subtree.
+    """
+    n = len(g.bus)
+    roots = g.positions(roots)
+    roots = np.unique(roots[g.node[roots]])
+    keys = np.unique(np.minimum(g.f, g.t) * (n + 1) + np.maximum(g.f, g.t))
+    f, t = np.divmod(keys, n + 1)
+    f, t = f[f != t], t[f != t]
+    f = np.concatenate((f, np.full(len(roots), n)))
+    t = np.concatenate((t, roots))
+    order, preds = csgraph.breadth_first_order(
+        csr_matrix((np.ones(len(f)), (f, t)), shape=(n + 1, n + 1)), n, directed=False,
+        return_predecessors=True)
+    preorder, pos, size, _ = subtree_ranges(order.astype(np.int64), preds.astype(np.int64), n + 1)
+
+    # edges which are not part of the bfs tree
+    connected = np.zeros(n + 1, dtype=bool)
+    connected[order] = True
+    tree_keys = np.minimum(preds[order[1:]], order[1:]) * (n + 1) + \
+        np.maximum(preds[order[1:]], order[1:])
+    non_tree = connected[f] & ~np.in1d(np.minimum(f, t) * (n + 1) + np.maximum(f, t), tree_keys)
+    u, v = f[non_tree], t[non_tree]
+    low, high = pos.copy(), pos.copy()
+    np.minimum.at(low, u, pos[v])
+    np.minimum.at(low, v, pos[u])
+    np.maximum.at(high, u, pos[v])
+    np.maximum.at(high, v, pos[u])
+
+    # tree edges between the additional root bus and the roots are not part of the network
+    buses = order[1:][preds[order[1:]] != n]
+    start, end = pos[buses], pos[buses] + size[buses]
+    bridge = np.zeros(len(buses), dtype=bool)
+    if len(buses):
+        idx = np.empty(2 * len(buses), dtype=np.int64)
+        idx[0::2], idx[1::2] = start, end
+        low_subtree = np.minimum.reduceat(np.append(low[preorder], len(order)), idx)[::2]
+        high_subtree = np.maximum.reduceat(np.append(high[preorder], -1), idx)[::2]
+        bridge = (low_subtree >= start) & (high_subtree < end)
+
+    # all buses below a bridge are on a stub
+    stub_count = np.zeros(len(order) + 1, dtype=np.int64)
+    np.add.at(stub_count, start[bridge], 1)
+    np.add.at(stub_count, end[bridge], -1)
+    two_connected = preorder[np.cumsum(stub_count[:-1]) == 0]
+    return set(g.bus[two_connected[two_connected < n]])